@@ -0,0 +1,149 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Shared helpers for the testing framework benchmarks
+
+Benchmarks are executed from the pylib directory, for example:
+    python -m testing.benchmarks.runner_overhead
+"""
+
+import os
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional
+
+from testing.framework import test_runner
+from testing.framework.console_logger import ConsoleLogger
+from testing.framework.lang_factory import get_lang_factory
+from testing.framework.test_corpus import TestCorpus
+from testing.framework.types import TestSuiteExecOpts
+from testing.framework.worker_pool import WorkerPool
+
+LANGUAGES = ['python', 'js', 'cpp', 'java']
+
+SUM_SIGNATURE = 'int[a];int[b];int'
+
+SUM_SOLUTIONS = {
+    'python': '''
+def sum(a: int, b: int) -> int:
+    return a + b
+''',
+    'js': '''
+function sum(a, b) {
+    return a + b;
+}
+''',
+    'cpp': '''
+class Solution {
+public:
+    int sum(int a, int b) {
+        return a + b;
+    }
+};
+''',
+    'java': '''
+class Solution {
+    int sum(int a, int b) {
+        return a + b;
+    }
+}
+'''
+}
+
+
+class RecordingWeb:
+    """
+    Replacement of the reviewer's web view, which just records all evaluated scripts
+    """
+
+    def __init__(self):
+        self.scripts = []
+
+    def eval(self, script: str):
+        """
+        Records a script instead of evaluating it
+        :param script: target script
+        """
+        self.scripts.append(script)
+
+    def has(self, text: str) -> bool:
+        """
+        :param text: target text
+        :return: True if any recorded script contains the text
+        """
+        return any(text in script for script in self.scripts)
+
+
+def make_resource_dir(path: str) -> Dict[str, bool]:
+    """
+    Builds a resource directory layout (the one bundled with AnkiCode) out of toolchains installed in the system
+    :param path: target directory
+    :return: map of language -> True if the language's toolchain has been found
+    """
+    framework_dir = os.path.dirname(os.path.abspath(test_runner.__file__))
+    available = {}
+
+    def link(target: Optional[str], *name: str) -> bool:
+        if target is None:
+            return False
+        dest = os.path.join(path, *name)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if not os.path.exists(dest):
+            os.symlink(target, dest)
+        return True
+
+    available['python'] = link(sys.executable, 'libs', 'python', 'bin', 'python3')
+    available['js'] = link(shutil.which('node'), 'libs', 'node', 'bin', 'node')
+    available['cpp'] = link(shutil.which('clang++') or shutil.which('g++'), 'libs', 'cpp', 'bin', 'clang++')
+    os.makedirs(os.path.join(path, 'libs', 'cpp', 'headers'), exist_ok=True)
+    link(os.path.join(framework_dir, 'cpp', 'cpp_lib'), 'cpp_lib')
+    java_home = os.environ.get('JAVA_HOME')
+    jars_dir = os.environ.get('JACKSON_JARS_DIR')
+    available['java'] = bool(java_home and jars_dir) and \
+        link(os.path.join(java_home, 'bin'), 'libs', 'jdk', 'bin') and \
+        link(jars_dir, 'libs', 'jdk', 'lib')
+    return available
+
+
+def use_resource_dir(path: str):
+    """
+    Points test runners to the resource directory
+    :param path: target directory
+    """
+    test_runner.get_resource_path = lambda: path
+
+
+def make_test_cases(count: int) -> List[str]:
+    """
+    Generates test case rows for the sum(a, b) problem
+    :param count: amount of test cases
+    :return: list of rows, the first row contains the signature
+    """
+    return [SUM_SIGNATURE] + [f'{i};{i + 1};{2 * i + 1}' for i in range(count)]
+
+
+def run_suite(lang: str, src: str, rows: List[str], fn_name: str = 'sum', opts: str = None,
+              worker_pool: WorkerPool = None, media_dir: str = None) -> (float, RecordingWeb):
+    """
+    Generates a test suite, executes it and measures the elapsed time
+    :param lang: target language
+    :param src: solution source code
+    :param rows: test case rows
+    :param fn_name: solution function name
+    :param opts: execution options, by default they are taken from the signature row
+    :param worker_pool: pool of warm workers, by default a new process is started
+    :param media_dir: media folder, which contains inputs referenced by the test cases
+    :return: tuple of elapsed seconds and the web view with recorded logs
+    """
+    factory = get_lang_factory(lang)
+    corpus = TestCorpus.of(fn_name, '', rows, media_dir)
+    web = RecordingWeb()
+    logger = ConsoleLogger(web)
+    test_suite_src = factory.get_test_suite_generator().generate_test_suite_src(corpus.ts, corpus.tree, src)
+    started = time.perf_counter()
+    factory.get_test_runner().run(test_suite_src, corpus, TestSuiteExecOpts(opts) if opts else corpus.opts,
+                                  logger, worker_pool)
+    elapsed = time.perf_counter() - started
+    logger.flush()
+    return elapsed, web
@@ -0,0 +1,103 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Measures the overhead of the generated input/output converters on big linked structures:
+a solution returns its argument as is, so the elapsed time is spent in the harness
+(parsing, building the structure, serializing it back) rather than in the solution.
+
+Every case is checked against the expected value, so the benchmark also verifies the round trip.
+Every time is the best of REPEAT runs, the start-up time (a run with the smallest input) is subtracted.
+
+Usage (from the pylib directory):
+    python -m testing.benchmarks.converter_overhead [nodes]
+"""
+
+import json
+import re
+import sys
+import tempfile
+from typing import List
+
+from testing.benchmarks.bench_utils import LANGUAGES, make_resource_dir, run_suite, use_resource_dir
+from testing.framework.lang_factory import get_lang_factory
+from testing.framework.test_corpus import TestCorpus
+
+REPEAT = 3
+
+STRUCTURES = ['binary_tree', 'linked_list']
+
+RETURN_STATEMENTS = {
+    'python': 'return value',
+    'js': 'return value;',
+    'cpp': 'return value;',
+    'java': 'return value;'
+}
+
+
+def make_solution(lang: str, corpus: TestCorpus) -> str:
+    """
+    Generates a solution, which returns its argument as is, out of the card's template
+    :param lang: target language
+    :param corpus: compiled test cases
+    :return: solution source code
+    """
+    template = get_lang_factory(lang).get_template_generator().generate_template(corpus.tree, corpus.ts)
+    return re.sub(r'(//|#)Add code here(\n\s*pass)?', RETURN_STATEMENTS[lang], template)
+
+
+def make_values(structure: str, nodes: int) -> List:
+    """
+    Generates a structure's JSON value, a binary tree gets a null child at every 7th position
+    :param structure: binary_tree or linked_list
+    :param nodes: amount of values
+    :return: list of values
+    """
+    if structure == 'linked_list':
+        return list(range(nodes))
+    return [None if i % 7 == 6 else i for i in range(nodes - 1)] + [nodes - 1]
+
+
+def make_rows(structure: str, nodes: int) -> List[str]:
+    """
+    :param structure: binary_tree or linked_list
+    :param nodes: amount of values
+    :return: test case rows, the first row contains the signature
+    """
+    value = json.dumps(make_values(structure, nodes))
+    return [f'{structure}(int)[value];{structure}(int)', f'{value};{value}']
+
+
+def measure(lang: str, structure: str, nodes: int) -> float:
+    """
+    :param lang: target language
+    :param structure: binary_tree or linked_list
+    :param nodes: amount of values
+    :return: converters' time in milliseconds
+    """
+    src = make_solution(lang, TestCorpus.of('identity', '', make_rows(structure, 1)))
+    elapsed_one = min(run_suite(lang, src, make_rows(structure, 1), fn_name='identity')[0]
+                      for _ in range(REPEAT))
+    elapsed_all = None
+    for _ in range(REPEAT):
+        elapsed, web = run_suite(lang, src, make_rows(structure, nodes), fn_name='identity')
+        if not web.has('All tests'):
+            raise Exception(f'{lang} {structure} test suite has failed: {[s[:300] for s in web.scripts[-3:]]}')
+        elapsed_all = elapsed if elapsed_all is None else min(elapsed_all, elapsed)
+    return (elapsed_all - elapsed_one) * 1000
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as resource_dir:
+        available = make_resource_dir(resource_dir)
+        use_resource_dir(resource_dir)
+        print(f'{f"ms/{nodes} nodes":<18}' + ''.join(f'{structure:>16}' for structure in STRUCTURES))
+        for lang in LANGUAGES:
+            if not available[lang]:
+                print(f'{lang:<18}{"toolchain not found":>16}')
+                continue
+            print(f'{lang:<18}' + ''.join(f'{measure(lang, structure, nodes):>16.3f}' for structure in STRUCTURES))
+
+
+if __name__ == '__main__':
+    main()
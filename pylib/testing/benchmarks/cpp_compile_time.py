@@ -0,0 +1,99 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Measures the C++ compile time of a typical card's test suite (a grid of ints and a map of lists):
+    - sources: jute.cpp is compiled together with the test suite, headers are parsed every time
+    - jute.o: the prebuilt jute object is linked
+    - jute.o + pch: the prebuilt jute object is linked, the common headers are precompiled
+The compile cache is bypassed, prebuilt libraries are built before measuring. Every time is the best of REPEAT runs.
+
+Usage (from the pylib directory):
+    python -m testing.benchmarks.cpp_compile_time [repeat]
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+
+from testing.benchmarks.bench_utils import make_resource_dir, use_resource_dir
+from testing.framework import test_runner
+from testing.framework.lang_factory import get_lang_factory
+from testing.framework.syntax.syntax_tree import SyntaxTree
+from testing.framework.types import Command, TestSuite
+from testing.framework.workspace import workspace_pool
+
+SIGNATURE = ['array(array(int))[grid]', 'map(string, list(int))[groups]', 'list(int)']
+SOLUTION = '''
+class Solution {
+public:
+    vector<int> solve(vector<vector<int>> grid, map<string, vector<int>> groups) {
+        vector<int> result;
+        for (auto &row : grid) {
+            int total = 0;
+            for (int value : row) {
+                total += value;
+            }
+            result.push_back(total + (int) groups.size());
+        }
+        return result;
+    }
+};
+'''
+
+
+def measure(cmd: Command, repeat: int) -> float:
+    """
+    :param cmd: compile command
+    :param repeat: amount of runs
+    :return: best compile time in milliseconds
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(cmd.args, env=cmd.get_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                              text=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        if proc.returncode != 0:
+            raise Exception(f'Compilation has failed: {proc.stderr}')
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as resource_dir:
+        if not make_resource_dir(resource_dir)['cpp']:
+            print('C++ toolchain not found')
+            return
+        use_resource_dir(resource_dir)
+        resource_path = test_runner.get_resource_path()
+        factory = get_lang_factory('cpp')
+        ts = TestSuite()
+        ts.fn_name = 'solve'
+        ts.description = ''
+        src = factory.get_test_suite_generator().generate_test_suite_src(ts, SyntaxTree.of(SIGNATURE), SOLUTION)
+        workspace = workspace_pool.acquire('main.cpp')
+        src_file = test_runner.create_src_file(src, 'main.cpp', workspace)
+        runner = factory.get_test_runner()
+        runner.get_jute_object(resource_path, test_runner.isWin)
+        runner.get_pch_flags(resource_path, test_runner.isWin)
+
+        runner_cls = type(runner)
+        modes = {
+            'sources': runner_cls(),
+            'jute.o': runner_cls(),
+            'jute.o + pch': runner_cls()
+        }
+        modes['sources'].get_jute_object = lambda *args: None
+        modes['sources'].get_pch_flags = lambda *args: []
+        modes['jute.o'].get_pch_flags = lambda *args: []
+        print(f'{"ms/compile":<16}{"time":>10}')
+        for name, mode_runner in modes.items():
+            cmd = mode_runner.get_compile_cmd(src_file, resource_path, test_runner.isWin)
+            print(f'{name:<16}{measure(cmd, repeat):>10.1f}')
+        workspace_pool.release(workspace, False)
+
+
+if __name__ == '__main__':
+    main()
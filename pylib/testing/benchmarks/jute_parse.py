@@ -0,0 +1,128 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Micro-benchmark of the C++ jute library and the generated C++ converters:
+    - parse: JSON text -> jute::jValue
+    - convert: jute::jValue -> vector (generated input converter)
+    - serialize: jute::jValue -> JSON text
+for a flat array of SIZE ints and a SIDE x SIDE nested array (SIZE elements in total).
+The jute object is optimized and the converters are not, the same way as in test suites.
+
+Usage (from the pylib directory):
+    python -m testing.benchmarks.jute_parse [size]
+"""
+
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from testing.framework.cpp.cpp_input_converter import CppInputConverter
+from testing.framework.string_utils import render_template
+from testing.framework.syntax.syntax_tree import SyntaxTree
+from testing.framework.types import ConverterFn
+
+CPP_LIB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'framework', 'cpp')
+
+BENCHMARK_SRC = '''
+#include <chrono>
+#include <iostream>
+#include <string>
+#include <vector>
+#include "cpp_lib/jute.h"
+using namespace std;
+
+{% for c in converters %}
+{{c.ret_type}} {{c.fn_name}}({{c.arg_type}} {{c.arg_name}}) {
+{{c.src}}
+}
+{% endfor %}
+
+double elapsed_ms(chrono::high_resolution_clock::time_point started) {
+    return chrono::duration<double, milli>(chrono::high_resolution_clock::now() - started).count();
+}
+
+int main() {
+    int size = {{size}};
+    int side = {{side}};
+    string flat = "[";
+    for (int i = 0; i < size; i++) {
+        flat += (i ? "," : "") + to_string(i);
+    }
+    flat += "]";
+    string nested = "[";
+    for (int i = 0; i < side; i++) {
+        nested += i ? ",[" : "[";
+        for (int j = 0; j < side; j++) {
+            nested += (j ? "," : "") + to_string(i * side + j);
+        }
+        nested += "]";
+    }
+    nested += "]";
+
+    auto started = chrono::high_resolution_clock::now();
+    jute::jValue flat_value = jute::parser::parse(flat);
+    double flat_parse = elapsed_ms(started);
+    started = chrono::high_resolution_clock::now();
+    vector<int> flat_result = {{flat_converter}}(flat_value);
+    double flat_convert = elapsed_ms(started);
+    started = chrono::high_resolution_clock::now();
+    string flat_json = flat_value.to_string();
+    double flat_serialize = elapsed_ms(started);
+
+    started = chrono::high_resolution_clock::now();
+    jute::jValue nested_value = jute::parser::parse(nested);
+    double nested_parse = elapsed_ms(started);
+    started = chrono::high_resolution_clock::now();
+    vector<vector<int>> nested_result = {{nested_converter}}(nested_value);
+    double nested_convert = elapsed_ms(started);
+    started = chrono::high_resolution_clock::now();
+    string nested_json = nested_value.to_string();
+    double nested_serialize = elapsed_ms(started);
+
+    if (flat_json != flat || nested_json != nested || (int) flat_result.size() != size
+            || (int) nested_result.size() != side) {
+        cerr << "unexpected result" << endl;
+        return 1;
+    }
+    cout << "flat " << flat_parse << " " << flat_convert << " " << flat_serialize << endl;
+    cout << "nested " << nested_parse << " " << nested_convert << " " << nested_serialize << endl;
+    return 0;
+}
+'''
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    side = int(math.sqrt(size))
+    compiler = shutil.which('clang++') or shutil.which('g++')
+    if compiler is None:
+        print('C++ toolchain not found')
+        return
+    ConverterFn.reset_counter()
+    converter = CppInputConverter()
+    _, flat_converters = converter.get_converters(SyntaxTree.of(['list(int)']))
+    _, nested_converters = converter.get_converters(SyntaxTree.of(['list(list(int))']))
+    src = render_template(BENCHMARK_SRC, converters=flat_converters + nested_converters, size=size, side=side,
+                          flat_converter=flat_converters[-1].fn_name, nested_converter=nested_converters[-1].fn_name)
+    with tempfile.TemporaryDirectory() as build_dir:
+        with open(os.path.join(build_dir, 'main.cpp'), 'w') as f:
+            f.write(src)
+        jute_object = os.path.join(build_dir, 'jute.o')
+        binary = os.path.join(build_dir, 'main.run')
+        subprocess.run([compiler, '-std=c++14', '-O2', '-c', os.path.join(CPP_LIB_PATH, 'cpp_lib', 'jute.cpp'),
+                        '-o', jute_object], check=True)
+        subprocess.run([compiler, '-std=c++14', '-I', CPP_LIB_PATH, jute_object, os.path.join(build_dir, 'main.cpp'),
+                        '-o', binary], check=True)
+        output = subprocess.run([binary], check=True, stdout=subprocess.PIPE, text=True).stdout
+    print(f'{"ms":<24}{"parse":>12}{"convert":>12}{"serialize":>12}')
+    for line in output.strip().split('\n'):
+        name, *times = line.split()
+        label = f'{name} ({size} ints)' if name == 'flat' else f'{name} ({side}x{side})'
+        print(f'{label:<24}' + ''.join(f'{float(t):>12.1f}' for t in times))
+
+
+if __name__ == '__main__':
+    main()
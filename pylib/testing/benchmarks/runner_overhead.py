@@ -0,0 +1,68 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Measures the per-case overhead of TestRunner's I/O loop for every language:
+    - polling: non-blocking reads with a short sleep (the fallback used on Windows)
+    - selectors: event-driven reads (Unix)
+both in lockstep mode (every test case waits for the previous response) and pipelined mode
+
+The per-case overhead is calculated as (T(N cases) - T(1 case)) / (N - 1), so that process start-up
+and compilation times are excluded. Every time is the best of REPEAT runs.
+
+Usage (from the pylib directory):
+    python -m testing.benchmarks.runner_overhead [cases]
+"""
+
+import functools
+import sys
+import tempfile
+
+from testing.benchmarks.bench_utils import LANGUAGES, SUM_SOLUTIONS, make_resource_dir, make_test_cases, \
+    run_suite, use_resource_dir
+from testing.framework import test_runner
+from testing.framework.io_utils import PipeReader
+
+REPEAT = 3
+
+
+def measure(lang: str, cases: int, opts: str) -> float:
+    """
+    :param lang: target language
+    :param cases: amount of test cases
+    :param opts: execution options
+    :return: per-case overhead in milliseconds
+    """
+    elapsed_one = min(run_suite(lang, SUM_SOLUTIONS[lang], make_test_cases(1), opts=opts)[0]
+                      for _ in range(REPEAT))
+    elapsed_all = None
+    for _ in range(REPEAT):
+        elapsed, web = run_suite(lang, SUM_SOLUTIONS[lang], make_test_cases(cases), opts=opts)
+        if not web.has('All tests'):
+            raise Exception(f'{lang} test suite has failed: {web.scripts[-3:]}')
+        elapsed_all = elapsed if elapsed_all is None else min(elapsed_all, elapsed)
+    return (elapsed_all - elapsed_one) / (cases - 1) * 1000
+
+
+def main():
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with tempfile.TemporaryDirectory() as resource_dir:
+        available = make_resource_dir(resource_dir)
+        use_resource_dir(resource_dir)
+        modes = [('polling', 'pipeline=1'), ('selectors', 'pipeline=1'),
+                 ('polling', ''), ('selectors', '')]
+        print(f'{"ms/case":<10}' + ''.join(f'{reader + (", lockstep" if opts else ", pipelined"):>24}'
+                                          for reader, opts in modes))
+        for lang in LANGUAGES:
+            if not available[lang]:
+                print(f'{lang:<10}{"toolchain not found":>24}')
+                continue
+            results = []
+            for reader, opts in modes:
+                test_runner.PipeReader = functools.partial(PipeReader, use_polling=reader == 'polling')
+                results.append(measure(lang, cases, opts))
+            print(f'{lang:<10}' + ''.join(f'{result:>24.3f}' for result in results))
+        test_runner.PipeReader = PipeReader
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Measures the latency of a test run (a single test case) for every language:
+    - cold: the runtime is started (and the test suite is compiled) for every run
+    - warm: the test suite is submitted to a pre-started worker from the language's worker pool
+Every time is the median of REPEAT runs.
+
+Usage (from the pylib directory):
+    python -m testing.benchmarks.worker_latency [repeat]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+
+from testing.benchmarks.bench_utils import LANGUAGES, SUM_SOLUTIONS, make_resource_dir, make_test_cases, \
+    run_suite, use_resource_dir
+from testing.framework.lang_factory import get_lang_factory
+from testing.framework.worker_pool import WorkerPool
+
+WARM_UP_TIMEOUT_SEC = 30
+
+
+def wait_warm(pool: WorkerPool):
+    """
+    Blocks until the pool has a warm worker
+    :param pool: target pool
+    """
+    pool.warm_up()
+    deadline = time.monotonic() + WARM_UP_TIMEOUT_SEC
+    while not pool.idle:
+        if not pool.enabled or time.monotonic() > deadline:
+            raise Exception('Worker has failed to start')
+        time.sleep(0.01)
+
+
+def measure(lang: str, repeat: int, pool: WorkerPool = None) -> float:
+    """
+    :param lang: target language
+    :param repeat: amount of runs
+    :param pool: worker pool, cold runs if None
+    :return: median latency in milliseconds
+    """
+    times = []
+    for _ in range(repeat):
+        if pool is not None:
+            wait_warm(pool)
+        elapsed, web = run_suite(lang, SUM_SOLUTIONS[lang], make_test_cases(1), worker_pool=pool)
+        if not web.has('All tests'):
+            raise Exception(f'{lang} test suite has failed: {web.scripts[-3:]}')
+        times.append(elapsed * 1000)
+    return statistics.median(times)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as resource_dir:
+        available = make_resource_dir(resource_dir)
+        use_resource_dir(resource_dir)
+        print(f'{"ms/run":<10}{"cold":>12}{"warm":>12}')
+        for lang in LANGUAGES:
+            if not available[lang]:
+                print(f'{lang:<10}{"toolchain not found":>24}')
+                continue
+            pool = get_lang_factory(lang).get_worker_pool()
+            cold = measure(lang, repeat)
+            warm = f'{measure(lang, repeat, pool):>12.1f}' if pool.enabled else f'{"n/a":>12}'
+            pool.shutdown()
+            print(f'{lang:<10}{cold:>12.1f}{warm}')
+
+
+if __name__ == '__main__':
+    main()
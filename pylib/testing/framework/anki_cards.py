@@ -0,0 +1,116 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Cards API
+
+Card level API of the Testing framework: extracts test cases and reference solutions from coding cards
+and verifies cards in batches. It depends on the ANKI library, but not on its GUI (aqt),
+so that cards can be verified headless (see batch_runner)
+"""
+
+import functools
+import os
+from typing import Callable, List, Optional, Tuple
+
+from anki.cards import Card
+from anki.collection import Collection
+from testing.framework.batch_runner import BatchJob, BatchRunner, CardReport, DEFAULT_WORKERS
+from testing.framework.lang_factory import get_lang_factory, AbstractLangFactory
+from testing.framework.string_utils import strip_html_tags
+from testing.framework.test_corpus import TestCorpus, corpus_cache
+
+CORPUS_CACHE_DIR_NAME = 'ankicode-corpus'
+
+
+def parse_anki_card(card: Card) -> Tuple[str, str, List[str]]:
+    """
+    extracts target function name, test description and test case rows from a card
+    :param card: input card
+    :return: tuple: function name, description, test case rows
+    """
+    note = card.note()
+    model = card.model()['flds']
+    description = strip_html_tags(note[model[1]['name']])  # todo: come up with better solution than indexes
+    fn_name = note[model[2]['name']]
+    rows = strip_html_tags(note[model[4]['name']]).split('\n')
+    return fn_name, description, rows
+
+
+def get_reference_solution(card: Card) -> str:
+    """
+    extracts the reference solution from a card
+    :param card: input card
+    :return: solution source code
+    """
+    note = card.note()
+    model = card.model()['flds']
+    return strip_html_tags(note[model[3]['name']])  # todo: come up with better solution than indexes
+
+
+def is_coding_card(card: Card) -> bool:
+    """
+    :param card: input card
+    :return: whether the card's question contains a code editor
+    """
+    return '{{code:' in card.template()['qfmt']
+
+
+def use_corpus_cache_dir(col: Collection):
+    """
+    Persists compiled test cases next to the collection
+    :param col: collection
+    """
+    if corpus_cache.directory is None and col.path:
+        corpus_cache.directory = os.path.join(os.path.dirname(col.path), CORPUS_CACHE_DIR_NAME)
+
+
+def get_test_corpus(card: Card) -> TestCorpus:
+    """
+    Returns a card's compiled test cases, they are compiled once per note's modification
+    and persisted next to the collection
+    :param card: target card
+    :return: compiled corpus
+    """
+    note = card.note()
+    use_corpus_cache_dir(card.col)
+    return corpus_cache.get(note.id, note.mod, lambda: TestCorpus.of(*parse_anki_card(card), card.col.media.dir()))
+
+
+def build_test_context(card: Card, lang: str) -> Tuple[TestCorpus, AbstractLangFactory]:
+    """
+    Builds testing context
+    :param card: target card
+    :param lang: target language
+    :return: tuple of compiled test cases and language factory
+    """
+    factory = get_lang_factory(lang)
+    if factory is None:
+        raise Exception('Unknown language ' + lang)
+    return get_test_corpus(card), factory
+
+
+def verify_cards(col: Collection, query: str, lang: str, workers: int = DEFAULT_WORKERS,
+                 on_progress: Optional[Callable[[CardReport, int, int], None]] = None) -> List[CardReport]:
+    """
+    Runs reference solutions of the coding cards matching a search query against their test cases
+    :param col: collection
+    :param query: search query, e.g. "deck:Algorithms"
+    :param lang: language of the reference solutions
+    :param workers: max number of cards verified at the same time
+    :param on_progress: called with a card's report, count of verified cards and count of all cards after every card
+    :return: the cards' reports
+    """
+    factory = get_lang_factory(lang)
+    if factory is None:
+        raise Exception('Unknown language ' + lang)
+    use_corpus_cache_dir(col)
+    jobs = []
+    # the collection is read here, batch workers only compile test cases of the cards
+    for card_id in col.find_cards(query):
+        card = col.getCard(card_id)
+        if is_coding_card(card):
+            note = card.note()
+            compile_corpus = functools.partial(TestCorpus.of, *parse_anki_card(card), col.media.dir())
+            jobs.append(BatchJob(card.id, note.id, get_reference_solution(card),
+                                 functools.partial(corpus_cache.get, note.id, note.mod, compile_corpus)))
+    return BatchRunner(factory, workers).run(jobs, on_progress)
@@ -1,102 +1,212 @@
 # Copyright: Daveight and contributors
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 """
-Facade API to the Testing framework which is accessed from ANKI
+Facade API to the Testing framework which is accessed from ANKI's GUI,
+the card level API, which doesn't depend on the GUI, is in anki_cards
 """
 
+import copy
 import sys
-from typing import Tuple, List, Callable, Optional
+import time
+from typing import List, Callable, Optional, Dict
 from anki.cards import Card
 from aqt.utils import run_async
-from testing.framework.lang_factory import get_lang_factory, AbstractLangFactory
+# verify_cards is re-exported, the card level API has been moved to a module, which doesn't depend on the GUI
+from testing.framework.anki_cards import build_test_context, verify_cards
+from testing.framework.complexity import ComplexityProbe, get_complexity_order
+from testing.framework.test_corpus import TestCorpus
 from testing.framework.test_runner import TestRunner
-from testing.framework.types import TestSuite, TestSuiteExecOpts
 from testing.framework.console_logger import ConsoleLogger
-from testing.framework.syntax.syntax_tree import SyntaxTree
-from testing.framework.string_utils import strip_html_tags
+BENCHMARK_HISTORY_CONFIG_KEY = 'ankicode_benchmarks_{}'  # formatted with a card's id
+MAX_BENCHMARK_HISTORY = 100  # max benchmark scores kept per card
+DEFAULT_BENCHMARK_REPS = 10
 
 
-def parse_anki_card(card: Card) -> Tuple[str, str, List[str]]:
+def get_solution_template(card: Card, lang: str) -> str:
     """
-    extracts target function name, test description and test case rows from a card
-    :param card: input card
-    :return: tuple: function name, description, test case rows
+    Generates test solution template for the given Card and language
+    :param card: target card
+    :param lang: target programming language
+    :return: solution template src
     """
-    note = card.note()
-    model = card.model()['flds']
-    description = strip_html_tags(note[model[1]['name']])  # todo: come up with better solution than indexes
-    fn_name = note[model[2]['name']]
-    rows = strip_html_tags(note[model[4]['name']]).split('\n')
-    return fn_name, description, rows
+    corpus, factory = build_test_context(card, lang)
+    # workers aren't warmed up here: a template is rendered on every review, even if tests are never run,
+    # the pool is warmed up by the first run instead (see WorkerPool.acquire)
+    return factory.get_template_generator().generate_template(corpus.tree, corpus.ts)
 
 
-def build_test_context(card: Card, lang: str) -> Tuple[SyntaxTree,
-                                                       TestSuite,
-                                                       TestSuiteExecOpts,
-                                                       AbstractLangFactory,
-                                                       List[str]]:
+runner: Optional[TestRunner] = None
+
+
+@run_async
+def run_tests(card: Card, src: str, lang: str, logger: ConsoleLogger, fncomplete: Callable):
     """
-    Builds testing context
+    Executes tests for a given test suite and user code
     :param card: target card
-    :param lang: target language
-    :return: tuple of syntax tree, test suite, language factory and list of rows
+    :param src: target solution src to be executed
+    :param lang: target programming language
+    :param logger: console logger
+    :param fncomplete: complete callback
     """
-    fn_name, description, rows = parse_anki_card(card)
-    factory = get_lang_factory(lang)
-    if factory is None:
-        raise Exception('Unknown language ' + lang)
+    execute_tests(card, src, lang, logger, fncomplete)
 
-    tree = SyntaxTree.of(rows[0].split(';'))
-    ts = TestSuite()
-    ts.fn_name = fn_name
-    ts.description = description
 
-    opts = TestSuiteExecOpts(tree.nodes[-1].name)
+@run_async
+def run_benchmark(card: Card, src: str, lang: str, logger: ConsoleLogger, fncomplete: Callable,
+                  reps: int = DEFAULT_BENCHMARK_REPS):
+    """
+    Executes tests for a given test suite and user code, every test is repeated after warm-up to measure
+    its median time. The benchmark's score is recorded in the card's history and compared with the previous one
+    :param card: target card
+    :param src: target solution src to be executed
+    :param lang: target programming language
+    :param logger: console logger
+    :param fncomplete: complete callback
+    :param reps: how many times every test is repeated
+    """
+    from aqt import mw
+    score_ms = execute_tests(card, src, lang, logger, lambda: None, reps)
+    # the collection is owned by the main thread, so the score is recorded there
+    mw.taskman.run_on_main(lambda: complete_benchmark(card, lang, score_ms, reps, logger, fncomplete))
 
-    return tree, ts, opts, factory, rows
 
+def complete_benchmark(card: Card, lang: str, score_ms: Optional[float], reps: int, logger: ConsoleLogger,
+                       fncomplete: Callable):
+    """
+    Records a benchmark's score in the card's history and compares it with the previous one,
+    it must be called on the main thread
+    :param card: target card
+    :param lang: language of the benchmarked solution
+    :param score_ms: benchmark's score in ms, None - if the benchmark has failed
+    :param reps: how many times every test has been repeated
+    :param logger: console logger
+    :param fncomplete: complete callback
+    """
+    try:
+        if score_ms is not None:
+            previous = record_benchmark_score(card, lang, score_ms, reps)
+            if previous is not None:
+                change = (score_ms / previous['score_ms'] - 1) * 100 if previous['score_ms'] else 0
+                logger.info(f'Previous benchmark score: {previous["score_ms"]:.3f} ms ({change:+.1f}%)')
+    except:
+        logger.error("Unexpected runtime error: " + str(sys.exc_info()))
+    finally:
+        fncomplete()
 
-def get_solution_template(card: Card, lang: str) -> str:
+
+@run_async
+def run_complexity_probe(card: Card, src: str, lang: str, logger: ConsoleLogger, fncomplete: Callable):
     """
-    Generates test solution template for the given Card and language
+    Estimates the time complexity of user code: it's timed on generated inputs of growing size
     :param card: target card
+    :param src: target solution src to be probed
     :param lang: target programming language
-    :return: solution template src
+    :param logger: console logger
+    :param fncomplete: complete callback
     """
-    tree, ts, _, factory, _ = build_test_context(card, lang)
-    return factory.get_template_generator().get_template(tree, ts)
+    global runner
+    if runner is not None:
+        raise Exception('Cannot run tests, while another execution is active')
 
+    logger.clear()
 
-runner: Optional[TestRunner] = None
+    try:
+        corpus, factory = build_test_context(card, lang)
+        test_suite_src = factory.get_test_suite_generator().generate_test_suite_src(corpus.ts, corpus.tree, src)
+        runner = factory.get_test_runner()
+        probe_complexity(runner, test_suite_src, corpus, logger)
+    except:
+        logger.error("Unexpected runtime error: " + str(sys.exc_info()))
+    finally:
+        fncomplete()
+        runner = None
 
 
-@run_async
-def run_tests(card: Card, src: str, lang: str, logger: ConsoleLogger, fncomplete: Callable):
+def probe_complexity(test_runner: TestRunner, test_suite_src: str, corpus: TestCorpus, logger: ConsoleLogger):
     """
-    Executes tests for a given test suite and user code
+    Estimates the time complexity of a test suite's solution, if the card has the expected complexity option
+    and the estimated one is worse, an error is logged
+    :param test_runner: test runner
+    :param test_suite_src: source code of the solution's test suite
+    :param corpus: card's compiled test cases
+    :param logger: console logger
+    """
+    expected = corpus.opts.expected_complexity
+    if expected is not None:
+        get_complexity_order(expected)
+    logger.info('Estimating time complexity...')
+    result = ComplexityProbe(test_runner).run(test_suite_src, corpus)
+    logger.info(result.to_html())
+    if expected is not None and result.is_worse_than(expected):
+        logger.error(f'Time complexity {result.fit.to_text()} is worse than expected O({expected})')
+
+
+def execute_tests(card: Card, src: str, lang: str, logger: ConsoleLogger, fncomplete: Callable,
+                  benchmark: int = 0) -> Optional[float]:
+    """
+    Executes tests for a given test suite and user code. If all tests have passed and the card has
+    the expected complexity option, the solution's time complexity is estimated as well
     :param card: target card
     :param src: target solution src to be executed
     :param lang: target programming language
     :param logger: console logger
     :param fncomplete: complete callback
+    :param benchmark: how many times every test is repeated to measure its timing, 0 - tests are executed once
+    :return: benchmark's score in ms or None - if tests haven't been benchmarked or have failed
     """
     global runner
     if runner is not None:
         raise Exception('Cannot run tests, while another execution is active')
 
     logger.clear()
-    tree, ts, opts, factory, rows = build_test_context(card, lang)
 
+    score_ms = None
     try:
+        corpus, factory = build_test_context(card, lang)
         test_suite_gen = factory.get_test_suite_generator()
-        test_suite_src = test_suite_gen.generate_test_suite_src(ts, tree, src)
+        test_suite_src = test_suite_gen.generate_test_suite_src(corpus.ts, corpus.tree, src)
         runner = factory.get_test_runner()
-        runner.run(test_suite_src, rows, opts, logger)
+        opts = corpus.opts
+        if benchmark:
+            # the corpus is cached, so its options are not modified
+            opts = copy.copy(corpus.opts)
+            opts.benchmark = benchmark
+        passed = runner.run(test_suite_src, corpus, opts, logger, factory.get_worker_pool())
+        if passed and not benchmark and corpus.opts.expected_complexity is not None:
+            probe_complexity(runner, test_suite_src, corpus, logger)
+        score_ms = runner.benchmark_score
     except:
         logger.error("Unexpected runtime error: " + str(sys.exc_info()))
     finally:
         fncomplete()
         runner = None
+    return score_ms
+
+
+def get_benchmark_history(card: Card) -> List[Dict]:
+    """
+    :param card: target card
+    :return: the card's benchmark scores from the oldest to the latest one: dicts with time (unix timestamp),
+             lang, score_ms and reps keys
+    """
+    return card.col.get_config(BENCHMARK_HISTORY_CONFIG_KEY.format(card.id), [])
+
+
+def record_benchmark_score(card: Card, lang: str, score_ms: float, reps: int) -> Optional[Dict]:
+    """
+    Appends a benchmark's score to the card's history, only the latest MAX_BENCHMARK_HISTORY scores are kept.
+    The collection is modified, so it must be called on the main thread
+    :param card: target card
+    :param lang: language of the benchmarked solution
+    :param score_ms: benchmark's score in ms
+    :param reps: how many times every test has been repeated
+    :return: the previous score of a solution in the same language or None - if it's the first one
+    """
+    history = list(get_benchmark_history(card))
+    previous = next((entry for entry in reversed(history) if entry['lang'] == lang), None)
+    history.append({'time': int(time.time()), 'lang': lang, 'score_ms': score_ms, 'reps': reps})
+    card.col.set_config(BENCHMARK_HISTORY_CONFIG_KEY.format(card.id), history[-MAX_BENCHMARK_HISTORY:])
+    return previous
 
 
 def stop_tests():
@@ -0,0 +1,340 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Batch Runner API
+
+Verifies many cards at once: every card's reference solution is run against the card's test cases.
+Cards are verified in parallel by a bounded pool of threads, each thread drives its own test runner,
+the results are collected into a machine-readable report (pass/fail, durations, compile errors).
+
+Usage (from the pylib directory):
+    python -m testing.framework.batch_runner <collection> <search query> <language> [--workers N] [--report FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from testing.framework.console_logger import TestLogger
+from testing.framework.lang_factory import AbstractLangFactory
+from testing.framework.sandbox import ResourceUsage
+from testing.framework.string_utils import strip_html_tags
+from testing.framework.test_corpus import TestCorpus
+from testing.framework.test_runner import TestRunner
+
+PASSED = 'passed'
+FAILED = 'failed'
+TIME_LIMIT_EXCEEDED = 'time_limit_exceeded'
+MEMORY_LIMIT_EXCEEDED = 'memory_limit_exceeded'
+COMPILE_ERROR = 'compile_error'
+ERROR = 'error'
+CANCELLED = 'cancelled'
+STATUSES = [PASSED, FAILED, TIME_LIMIT_EXCEEDED, MEMORY_LIMIT_EXCEEDED, COMPILE_ERROR, ERROR, CANCELLED]
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+REPORT_FORMAT_VERSION = 1
+MESSAGE_LIMIT = 4096  # max characters of a card's messages kept in the report
+
+
+class BatchJob:
+    """
+    A card to be verified: its reference solution and a function returning its compiled test cases
+    (test cases are compiled by a batch worker, so that a broken card fails its own job only)
+    """
+
+    def __init__(self, card_id: int, note_id: int, src: str, get_corpus: Callable[[], TestCorpus]):
+        self.card_id = card_id
+        self.note_id = note_id
+        self.src = src
+        self.get_corpus = get_corpus
+
+
+class CardReport:
+    """
+    Result of a card's verification
+    """
+
+    def __init__(self, card_id: int, note_id: int):
+        self.card_id = card_id
+        self.note_id = note_id
+        self.status: Optional[str] = None
+        self.tests_count = 0
+        self.tests_passed = 0
+        self.failed_test: Optional[int] = None
+        self.durations: List[float] = []
+        self.cpu_durations: List[float] = []
+        self.cpu_sec: Optional[float] = None
+        self.peak_memory_kb: Optional[int] = None
+        self.elapsed_ms = 0.0
+        self.messages: List[str] = []
+
+    def set_status(self, status: str):
+        """
+        Sets the card's status, the first failure wins
+        :param status: one of STATUSES
+        """
+        if self.status is None:
+            self.status = status
+
+    def add_message(self, msg: str):
+        """
+        :param msg: message in HTML (as it's displayed in the console), stored as a plain text
+        """
+        text = strip_html_tags(msg.replace('<br/>', '<br>'))
+        if text and sum(len(m) for m in self.messages) < MESSAGE_LIMIT:
+            self.messages.append(text[:MESSAGE_LIMIT])
+
+    def to_dict(self) -> Dict:
+        """
+        :return: the report's JSON representation
+        """
+        return {
+            'card_id': self.card_id,
+            'note_id': self.note_id,
+            'status': self.status,
+            'tests': self.tests_count,
+            'passed': self.tests_passed,
+            'failed_test': self.failed_test,
+            'duration_ms': round(sum(self.durations), 3),
+            'max_duration_ms': round(max(self.durations), 3) if self.durations else None,
+            'cpu_ms': round(sum(self.cpu_durations), 3) if self.cpu_durations else None,
+            'process_cpu_sec': round(self.cpu_sec, 3) if self.cpu_sec is not None else None,
+            'peak_memory_kb': self.peak_memory_kb,
+            'elapsed_ms': round(self.elapsed_ms, 3),
+            'messages': self.messages
+        }
+
+
+class ReportTestLogger(TestLogger):
+    """
+    Test logger which records tests' outcomes into a card's report instead of displaying them
+    """
+
+    def __init__(self, report: CardReport, tests_count: int):
+        super().__init__(None, None, tests_count)
+        self.report = report
+
+    def passed(self, index: int, duration_ms: float, cpu_ms: Optional[float] = None,
+               profile: Optional[Dict[str, int]] = None, bench_ns: Optional[List[int]] = None):
+        self.report.tests_passed += 1
+        self.report.durations.append(duration_ms)
+        if cpu_ms is not None:
+            self.report.cpu_durations.append(cpu_ms)
+
+    def fail(self, index: int, args, expected, result, diff: str = ''):
+        self.report.set_status(FAILED)
+        self.report.failed_test = index
+        self.report.add_message(f'args: {args}<br>expected: {expected}<br>result: {result}'
+                                + (f'<br>difference:<br>{diff}' if diff else ''))
+
+    def time_limit_exceeded(self, index: int, limit_ms: int, scope: str = 'test'):
+        self.report.set_status(TIME_LIMIT_EXCEEDED)
+        self.report.failed_test = index
+        self.report.add_message(f'{scope} time limit: {limit_ms} ms')
+
+    def memory_limit_exceeded(self, index: int, limit_mb: int):
+        self.report.set_status(MEMORY_LIMIT_EXCEEDED)
+        self.report.failed_test = index
+        self.report.add_message(f'memory limit: {limit_mb} MB')
+
+    def cancel(self):
+        self.report.set_status(CANCELLED)
+
+    def resource_usage(self, usage: Optional[ResourceUsage]):
+        if usage is not None:
+            self.report.cpu_sec = usage.cpu_sec
+            self.report.peak_memory_kb = usage.peak_memory_kb
+
+    def log(self, msg: str, flush: bool = False):
+        pass
+
+
+class ReportLogger:
+    """
+    Console logger of a batch job: errors are recorded into a card's report, errors logged
+    while a test suite is being compiled are compile errors, the other messages are dropped
+    """
+
+    def __init__(self, report: CardReport):
+        self.report = report
+        self.compiling = False
+
+    def get_testing_logger(self, tests_count: int) -> TestLogger:
+        """
+        :param tests_count: count of tests to be executed
+        :return: test logger recording tests' outcomes into the report
+        """
+        return ReportTestLogger(self.report, tests_count)
+
+    def info(self, msg: str):
+        """
+        :param msg: progress message, it's used to track whether the test suite is being compiled
+        """
+        if msg.startswith('Compiling'):
+            self.compiling = True
+        elif msg.startswith('Running tests'):
+            self.compiling = False
+
+    def error(self, msg: str):
+        """
+        :param msg: error message
+        """
+        self.report.set_status(COMPILE_ERROR if self.compiling else ERROR)
+        self.report.add_message(msg)
+
+    def log(self, msg: str):
+        pass
+
+    def flush(self):
+        pass
+
+    def clear(self):
+        pass
+
+
+def verify(job: BatchJob, factory: AbstractLangFactory, runner: TestRunner) -> CardReport:
+    """
+    Runs a card's reference solution against the card's test cases
+    :param job: target card
+    :param factory: language factory
+    :param runner: test runner, which is not used by other threads
+    :return: the card's report
+    """
+    report = CardReport(job.card_id, job.note_id)
+    started = time.perf_counter()
+    try:
+        corpus = job.get_corpus()
+        report.tests_count = len(corpus.cases)
+        src = factory.get_test_suite_generator().generate_test_suite_src(corpus.ts, corpus.tree, job.src)
+        runner.run(src, corpus, corpus.opts, ReportLogger(report), factory.get_worker_pool())
+    except Exception as e:
+        report.set_status(ERROR)
+        report.add_message(f'Unexpected runtime error: {e!r}')
+    if report.status is None:
+        if report.tests_passed == report.tests_count:
+            report.status = PASSED
+        else:
+            report.status = ERROR
+            report.add_message(f'Test suite has stopped after {report.tests_passed} of {report.tests_count} tests')
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
+
+
+class BatchRunner:
+    """
+    Verifies cards in parallel by a bounded pool of threads, every thread has its own test runner
+    (a test runner executes one test suite at a time), test suites' processes share the global CPU budget
+    """
+
+    def __init__(self, factory: AbstractLangFactory, workers: int = DEFAULT_WORKERS):
+        """
+        :param factory: language factory
+        :param workers: max number of cards verified at the same time
+        """
+        self.factory = factory
+        self.workers = max(1, workers)
+        self.runners: List[TestRunner] = []
+        self.stopped = False
+        self.lock = threading.Lock()
+
+    def run(self, jobs: List[BatchJob],
+            on_progress: Optional[Callable[[CardReport, int, int], None]] = None) -> List[CardReport]:
+        """
+        Verifies cards, blocks until all of them are verified (or the batch is stopped)
+        :param jobs: cards to verify
+        :param on_progress: called with a card's report, count of verified cards and count of all cards
+                            after every card
+        :return: the cards' reports in the order of jobs, cards which haven't been verified are omitted
+        """
+        reports: List[Optional[CardReport]] = [None] * len(jobs)
+        pending: Iterator[int] = iter(range(len(jobs)))
+        done = [0]
+
+        def work(runner: TestRunner):
+            while True:
+                with self.lock:
+                    index = next(pending, None)
+                    if index is None or self.stopped:
+                        return
+                report = verify(jobs[index], self.factory, runner)
+                with self.lock:
+                    reports[index] = report
+                    done[0] += 1
+                    count = done[0]
+                if on_progress is not None:
+                    on_progress(report, count, len(jobs))
+
+        self.stopped = False
+        self.runners = [self.factory.new_test_runner() for _ in range(min(self.workers, len(jobs)))]
+        threads = [threading.Thread(target=work, args=(runner,), daemon=True) for runner in self.runners]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.runners = []
+        return [report for report in reports if report is not None]
+
+    def stop(self):
+        """
+        Stops the batch: running test suites are killed, pending cards are skipped
+        """
+        with self.lock:
+            self.stopped = True
+        for runner in list(self.runners):
+            runner.kill()
+
+
+def make_report(reports: List[CardReport], lang: str, query: str) -> Dict:
+    """
+    :param reports: cards' reports
+    :param lang: target language
+    :param query: search query, which has selected the cards
+    :return: batch report's JSON representation: counts of cards per status and the cards' reports
+    """
+    return {
+        'version': REPORT_FORMAT_VERSION,
+        'lang': lang,
+        'query': query,
+        'cards': len(reports),
+        'statuses': {status: sum(1 for r in reports if r.status == status) for status in STATUSES},
+        'duration_ms': round(sum(sum(r.durations) for r in reports), 3),
+        'elapsed_ms': round(sum(r.elapsed_ms for r in reports), 3),
+        'results': [r.to_dict() for r in reports]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs coding cards' reference solutions against their test cases")
+    parser.add_argument('collection', help='path to the collection file')
+    parser.add_argument('query', help='search query selecting the cards, e.g. "deck:Algorithms"')
+    parser.add_argument('lang', help="language of the cards' reference solutions")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='max number of cards verified at once')
+    parser.add_argument('--report', default='-', help='path to the JSON report, STDOUT by default')
+    args = parser.parse_args()
+
+    # the card level API requires the ANKI library (but not its GUI), so the batch runner itself doesn't depend on it
+    from anki import Collection
+    from testing.framework.anki_cards import verify_cards
+
+    col = Collection(args.collection)
+    try:
+        reports = verify_cards(col, args.query, args.lang, args.workers,
+                               lambda r, done, total: print(f'[{done}/{total}] card {r.card_id}: {r.status}',
+                                                            file=sys.stderr))
+    finally:
+        col.close(save=False)
+    report = make_report(reports, args.lang, args.query)
+    if args.report == '-':
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if report['statuses'][PASSED] == len(reports) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Result Comparator API
+
+Compares a test's result with the expected value. The comparison is compiled once per test suite from the result's
+type (SyntaxTree), so that only the checks relevant for the type are executed for every test case:
+    - floats are compared with a tolerance (4 digits after the point), other primitives must be equal
+    - arrays, lists and linked lists are compared as multisets if the order is ignored, otherwise element by element
+    - binary trees and objects (serialized as lists of field values) are always compared element by element
+    - maps are compared key by key
+The comparison stops at the first mismatch. DeepDiff is used only to describe a mismatch for the failure message.
+"""
+
+import json
+from collections import Counter
+from typing import Any, Callable, NamedTuple
+
+from deepdiff import DeepDiff
+
+from testing.framework.syntax.syntax_tree import SyntaxTree, SyntaxTreeVisitor
+
+FLOAT_DIGITS = 4
+
+# marks keys of values, which don't match the expected type, so they never collide with keys of well-typed values
+_RAW = object()
+
+
+class TypeComparator(NamedTuple):
+    """
+    Comparison functions for a type:
+        - equals - checks whether two values are equal
+        - key - returns a hashable key of a value, values are equal if and only if their keys are equal
+                (it's used to compare containers as multisets)
+    """
+    equals: Callable[[Any, Any], bool]
+    key: Callable[[Any], Any]
+
+
+def raw_key(value) -> Any:
+    """
+    :param value: value of an unexpected type
+    :return: hashable key of the value
+    """
+    return _RAW, json.dumps(value, sort_keys=True)
+
+
+def raw_equals(a, b) -> bool:
+    """
+    Strict equality of values of unexpected types (True and 1 are not equal)
+    """
+    return type(a) is type(b) and a == b
+
+
+def is_number(value) -> bool:
+    """
+    :return: True if the value is an int or a float (but not a bool)
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def float_key(value) -> Any:
+    """
+    :param value: float value
+    :return: value rounded to FLOAT_DIGITS digits (negative zero is normalized)
+    """
+    if not is_number(value):
+        return raw_key(value)
+    return round(float(value), FLOAT_DIGITS) + 0.0
+
+
+def primitive_key(value) -> Any:
+    """
+    :param value: int, long, string or bool value
+    :return: value along with its type (True and 1 have different keys)
+    """
+    if isinstance(value, (list, dict)):
+        return raw_key(value)
+    return type(value), value
+
+
+class ResultComparator(SyntaxTreeVisitor):
+    """
+    Builds comparison functions for a result's type
+    """
+
+    def __init__(self, ignore_order: bool):
+        """
+        :param ignore_order: if the order of array, list and linked list elements must be ignored
+        """
+        self.ignore_order = ignore_order
+
+    def visit_array(self, node: SyntaxTree, context) -> TypeComparator:
+        return self.sequence(self.render(node.first_child(), context), self.ignore_order)
+
+    def visit_list(self, node: SyntaxTree, context) -> TypeComparator:
+        return self.sequence(self.render(node.first_child(), context), self.ignore_order)
+
+    def visit_linked_list(self, node: SyntaxTree, context) -> TypeComparator:
+        return self.sequence(self.render(node.first_child(), context), self.ignore_order)
+
+    def visit_binary_tree(self, node: SyntaxTree, context) -> TypeComparator:
+        """
+        Binary tree is serialized in level order (missing children are nulls), its shape depends on the order
+        """
+        return self.sequence(self.render(node.first_child(), context), False)
+
+    def visit_map(self, node: SyntaxTree, context) -> TypeComparator:
+        """
+        Map is serialized to a JSON object, so its keys are strings and compared as is
+        """
+        value = self.render(node.second_child(), context)
+
+        def equals(a, b) -> bool:
+            if not isinstance(a, dict) or not isinstance(b, dict):
+                return raw_equals(a, b)
+            if len(a) != len(b):
+                return False
+            for k, v in a.items():
+                if k not in b or not value.equals(v, b[k]):
+                    return False
+            return True
+
+        def key(a) -> Any:
+            if not isinstance(a, dict):
+                return raw_key(a)
+            return frozenset((k, value.key(v)) for k, v in a.items())
+
+        return TypeComparator(equals, key)
+
+    def visit_obj(self, node: SyntaxTree, context) -> TypeComparator:
+        """
+        Object is serialized to a list of its field values
+        """
+        fields = [self.render(child, context) for child in node.nodes]
+
+        def equals(a, b) -> bool:
+            if not isinstance(a, list) or not isinstance(b, list):
+                return raw_equals(a, b)
+            if len(a) != len(fields) or len(b) != len(fields):
+                return raw_equals(a, b)
+            return all(field.equals(x, y) for field, x, y in zip(fields, a, b))
+
+        def key(a) -> Any:
+            if not isinstance(a, list) or len(a) != len(fields):
+                return raw_key(a)
+            return tuple(field.key(x) for field, x in zip(fields, a))
+
+        return TypeComparator(equals, key)
+
+    def visit_float(self, node: SyntaxTree, context) -> TypeComparator:
+        def equals(a, b) -> bool:
+            if not is_number(a) or not is_number(b):
+                return raw_equals(a, b)
+            return float_key(a) == float_key(b)
+
+        return TypeComparator(equals, float_key)
+
+    def visit_int(self, node: SyntaxTree, context) -> TypeComparator:
+        return self.primitive()
+
+    def visit_long(self, node: SyntaxTree, context) -> TypeComparator:
+        return self.primitive()
+
+    def visit_string(self, node: SyntaxTree, context) -> TypeComparator:
+        return self.primitive()
+
+    def visit_bool(self, node: SyntaxTree, context) -> TypeComparator:
+        return self.primitive()
+
+    def render(self, tree: SyntaxTree, context) -> TypeComparator:
+        """
+        Builds comparison functions for a node, untyped comparison is used for unknown types
+        """
+        return tree.accept(self, context) or TypeComparator(untyped_equals(self.ignore_order), raw_key)
+
+    @staticmethod
+    def primitive() -> TypeComparator:
+        return TypeComparator(raw_equals, primitive_key)
+
+    @staticmethod
+    def sequence(item: TypeComparator, ignore_order: bool) -> TypeComparator:
+        """
+        :param item: comparison functions of the sequence's elements
+        :param ignore_order: if the sequences must be compared as multisets
+        :return: comparison functions of a sequence
+        """
+        def equals(a, b) -> bool:
+            if not isinstance(a, list) or not isinstance(b, list):
+                return raw_equals(a, b)
+            if len(a) != len(b):
+                return False
+            if ignore_order:
+                return Counter(map(item.key, a)) == Counter(map(item.key, b))
+            for x, y in zip(a, b):
+                if not item.equals(x, y):
+                    return False
+            return True
+
+        def key(a) -> Any:
+            if not isinstance(a, list):
+                return raw_key(a)
+            if ignore_order:
+                return frozenset(Counter(map(item.key, a)).items())
+            return tuple(map(item.key, a))
+
+        return TypeComparator(equals, key)
+
+
+def untyped_equals(ignore_order: bool) -> Callable[[Any, Any], bool]:
+    """
+    :param ignore_order: if the order of list elements must be ignored
+    :return: equality check for values of an unknown type
+    """
+    return lambda a, b: DeepDiff(a, b, ignore_order=ignore_order, significant_digits=FLOAT_DIGITS) == {}
+
+
+def get_comparator(node: SyntaxTree, ignore_order: bool) -> Callable[[Any, Any], bool]:
+    """
+    Builds a comparison function for a result's type
+    :param node: result's type node
+    :param ignore_order: if the order of array, list and linked list elements must be ignored
+    :return: function, which checks whether a result is equal to the expected value
+    """
+    return ResultComparator(ignore_order).render(node, None).equals
+
+
+def describe_difference(expected, result, ignore_order: bool) -> str:
+    """
+    :param expected: expected value
+    :param result: actual result
+    :param ignore_order: if the order of list elements is ignored
+    :return: human-readable description of the difference between the values
+    """
+    return DeepDiff(expected, result, ignore_order=ignore_order, significant_digits=FLOAT_DIGITS).pretty()
@@ -0,0 +1,233 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Compile Cache API
+
+Content-addressed on-disk cache of compilation outputs (binaries, class files, object files).
+An entry is a directory named by the hash of everything which affects the compilation output:
+the source code, the compile command and the toolchain version. Entries are evicted in LRU order
+(by the entry directory's modification time), when the cache grows over its max size.
+The default cache directory is accessible by the current user only, as cached binaries are executed.
+Outputs which reference their own location (e.g. clang's precompiled headers reference the header they
+are built from) are built in place, in the entry's directory.
+"""
+
+import hashlib
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+from typing import Callable, List, Optional
+
+CACHE_DIR_NAME = 'compile-cache'
+USER_DIR_PREFIX = 'ankicode-'
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+TMP_PREFIX = 'tmp-'
+BUILDING_MARKER = '.building'
+
+
+def hash_key(*parts: str) -> str:
+    """
+    :param parts: strings which identify a compilation output
+    :return: cache key
+    """
+    sha = hashlib.sha256()
+    for part in parts:
+        sha.update(part.encode('utf-8'))
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+def link_or_copy(src: str, dst: str):
+    """
+    Hard links a file (it's cheap and safe, as cached files are never modified), copies it if linking is not supported
+    :param src: source path
+    :param dst: destination path
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def get_dir_size(path: str) -> int:
+    """
+    :param path: target directory
+    :return: total size of the directory's files
+    """
+    size = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                size += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                pass
+    return size
+
+
+def get_default_cache_dir() -> Optional[str]:
+    """
+    Creates the current user's directory in the temp directory, which is accessible by the user only
+    :return: cache directory or None - if the user's directory is owned by another user or is writable by others
+    """
+    if sys.platform.startswith('win32'):
+        # the temp directory is per-user on windows
+        return os.path.join(tempfile.gettempdir(), 'ankicode', CACHE_DIR_NAME)
+    path = os.path.join(tempfile.gettempdir(), f'{USER_DIR_PREFIX}{os.getuid()}')
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.lstat(path)
+        # entries planted by other users must not be executed
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return None
+    except OSError:
+        return None
+    return os.path.join(path, CACHE_DIR_NAME)
+
+
+class CompileCache:
+    """
+    On-disk cache of compilation outputs, safe to be shared between threads and processes
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        :param directory: cache directory, it's created on the first write; the current user's directory by default
+        :param max_size: max size of the cache in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.disabled = False
+
+    def get_directory(self) -> Optional[str]:
+        """
+        :return: cache directory or None - if the cache is disabled, as the default directory cannot be trusted
+        """
+        if self.directory is None and not self.disabled:
+            self.directory = get_default_cache_dir()
+            self.disabled = self.directory is None
+        return self.directory
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Looks up an entry and marks it as recently used
+        :param key: cache key
+        :return: entry's directory or None if there is no such entry
+        """
+        directory = self.get_directory()
+        if directory is None:
+            return None
+        path = os.path.join(directory, key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        if os.path.exists(os.path.join(path, BUILDING_MARKER)):
+            return None
+        return path
+
+    def put(self, key: str, files: List[str]) -> Optional[str]:
+        """
+        Stores files as a new entry, the entry appears atomically
+        :param key: cache key
+        :param files: files to store
+        :return: entry's directory or None if the files cannot be stored
+        """
+        directory = self.get_directory()
+        if directory is None:
+            return None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            tmp = tempfile.mkdtemp(prefix=TMP_PREFIX, dir=directory)
+            for file in files:
+                link_or_copy(file, os.path.join(tmp, os.path.basename(file)))
+            path = os.path.join(directory, key)
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # the same entry has been stored concurrently
+                shutil.rmtree(tmp, ignore_errors=True)
+        except OSError:
+            return None
+        self.evict()
+        return self.get(key)
+
+    def build(self, key: str, build_entry: Callable[[str], bool]) -> Optional[str]:
+        """
+        Builds a new entry in place: the entry appears atomically, but it's hidden until it's built
+        :param key: cache key
+        :param build_entry: builds outputs in the given directory, returns False if the build has failed
+        :return: entry's directory or None if the entry cannot be built (or it's being built concurrently)
+        """
+        directory = self.get_directory()
+        if directory is None:
+            return None
+        path = os.path.join(directory, key)
+        marker = os.path.join(path, BUILDING_MARKER)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            tmp = tempfile.mkdtemp(prefix=TMP_PREFIX, dir=directory)
+            open(os.path.join(tmp, BUILDING_MARKER), 'w').close()
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # the same entry is being built concurrently
+                shutil.rmtree(tmp, ignore_errors=True)
+                return self.get(key)
+            if not build_entry(path):
+                shutil.rmtree(path, ignore_errors=True)
+                return None
+            os.remove(marker)
+        except OSError:
+            return None
+        self.evict()
+        return self.get(key)
+
+    def restore(self, key: str, target_dir: str) -> bool:
+        """
+        Places an entry's files into the target directory
+        :param key: cache key
+        :param target_dir: target directory
+        :return: True if the entry has been found and restored
+        """
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            for file in os.listdir(path):
+                link_or_copy(os.path.join(path, file), os.path.join(target_dir, file))
+        except OSError:
+            return False
+        return True
+
+    def evict(self):
+        """
+        Removes least recently used entries, until the cache fits into its max size
+        """
+        directory = self.get_directory()
+        if directory is None:
+            return
+        with self.lock:
+            try:
+                names = [name for name in os.listdir(directory) if not name.startswith(TMP_PREFIX)]
+            except OSError:
+                return
+            entries = []
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), get_dir_size(path), path))
+                except OSError:
+                    pass
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_size:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+
+compile_cache = CompileCache()
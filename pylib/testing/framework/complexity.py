@@ -0,0 +1,419 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Complexity Probe API
+
+Estimates a solution's time complexity: inputs of growing size are generated from the signature's syntax tree
+(seeded by the input's size, so that probes are reproducible), the solution is benchmarked on them by its test suite
+and the timings are fitted against the complexity models: O(1), O(log n), O(n), O(n log n), O(n^2) and O(2^n).
+Every model t(n) = a + c * f(n), where a >= 0 is the call's overhead, is fitted by least squares of the relative
+residuals, so that every input's size has the same weight. The exponential model's base is not fixed (e.g. naive
+fibonacci is O(1.6^n)), the best fitting base of EXPONENT_BASES is used. Timings are affected by caches and noise,
+so that close models (e.g. O(n) and O(n log n)) fit almost equally well: the best fit is the slowest growing model,
+whose RMS relative error is within FIT_TOLERANCE of the lowest one. A solution, whose timings are all below
+NOISE_FLOOR_MS, is O(1): such timings are dominated by the timer's resolution and caches.
+
+Size of an input is:
+    - number of items of top level containers (arrays, lists, linked lists, binary trees, maps),
+      a nested container has the square root of its parent's size, so that the input's total size is about n
+    - length of top level strings
+    - value of top level integers, if the signature has neither containers nor strings (e.g. fibonacci(n)),
+      otherwise they are random numbers from 1 to n
+Inputs grow until a call of the solution exceeds the probe's time limit.
+"""
+
+import copy
+import json
+import math
+import random
+import string
+from typing import Callable, List, Optional, Tuple
+
+from testing.framework.console_logger import TestLogger, median
+from testing.framework.sandbox import ResourceUsage
+from testing.framework.syntax.syntax_tree import SyntaxTree, SyntaxTreeVisitor
+from testing.framework.test_corpus import TestCorpus
+from testing.framework.test_runner import TestRunner
+from testing.framework.types import NS_PER_MS, TestSuiteExecOpts
+
+
+def log2_log2(n: int) -> float:
+    """
+    :param n: input's size
+    :return: log2(log2(n)), sizes below 4 are treated as 4
+    """
+    return math.log2(math.log2(max(n, 4)))
+
+
+def log2_exp(base: float) -> Callable[[int], float]:
+    """
+    :param base: exponent's base
+    :return: log2 of the exponential function with the base
+    """
+    return lambda n: n * math.log2(base)
+
+
+EXPONENT_BASES = [1 + i / 8 for i in range(1, 17)]  # 1.125 .. 3
+# complexity models ordered by their growth: name and variants of log2 of the model's function
+# (models are compared in log space, since exponents overflow floats for large inputs)
+COMPLEXITY_MODELS: List[Tuple[str, List[Callable[[int], float]]]] = [
+    ('1', [lambda n: 0.0]),
+    ('log n', [log2_log2]),
+    ('n', [lambda n: math.log2(n)]),
+    ('n log n', [lambda n: math.log2(n) + log2_log2(n)]),
+    ('n^2', [lambda n: 2 * math.log2(n)]),
+    ('2^n', [log2_exp(base) for base in EXPONENT_BASES]),
+]
+# sizes of the generated inputs, they grow by a factor of sqrt(2)
+PROBE_SIZES = sorted(set(round(2 ** (k / 2)) for k in range(4, 33)))
+PROBE_SEED = 'ankicode'
+PROBE_REPS = 5
+PROBE_WARMUP = 1
+PROBE_TIME_LIMIT_MS = 500  # max duration of the solution's call, larger inputs are not generated
+MIN_FIT_POINTS = 4  # min number of input sizes to fit the models
+FIT_TOLERANCE = 0.15  # relative excess of the lowest RMS error, which is tolerated for a slower growing model
+NOISE_FLOOR_MS = 0.01
+MIN_TIME_MS = 0.000001  # timer's resolution
+MAX_ITEM_VALUE = 1000000  # numbers in containers are within [-MAX_ITEM_VALUE, MAX_ITEM_VALUE]
+STRING_ITEM_LENGTH = 8  # max length of strings in containers
+
+
+def get_complexity_order(expression: str) -> int:
+    """
+    :param expression: complexity, e.g. "n log n", "O(n^2)" or "nlogn"
+    :return: index of the complexity's model in COMPLEXITY_MODELS
+    :raises Exception if the complexity is unknown
+    """
+    name = expression.strip().lower()
+    if name.startswith('o(') and name.endswith(')'):
+        name = name[2:-1]
+    name = name.replace(' ', '').replace('*', '')
+    for order, (model, _) in enumerate(COMPLEXITY_MODELS):
+        if name == model.replace(' ', ''):
+            return order
+    raise Exception(f'Unknown complexity: {expression}, expected one of: ' +
+                    ', '.join(model for model, _ in COMPLEXITY_MODELS))
+
+
+class ComplexityFit:
+    """
+    Complexity model fitted to a solution's timings
+    """
+
+    def __init__(self, order: int, error: float):
+        """
+        :param order: index of the model in COMPLEXITY_MODELS
+        :param error: RMS of the fit's relative residuals
+        """
+        self.order = order
+        self.error = error
+
+    @property
+    def model(self) -> str:
+        """
+        :return: model's name, e.g. "n log n"
+        """
+        return COMPLEXITY_MODELS[self.order][0]
+
+    def to_text(self) -> str:
+        """
+        :return: model in big O notation
+        """
+        return f'O({self.model})'
+
+
+def fit_complexity(sizes: List[int], times_ms: List[float]) -> Optional[ComplexityFit]:
+    """
+    Fits the timings against every complexity model
+    :param sizes: inputs' sizes in ascending order
+    :param times_ms: solution's time per input's size
+    :return: the best fit or None - if there are less than MIN_FIT_POINTS timings
+    """
+    if len(sizes) < MIN_FIT_POINTS:
+        return None
+    times_ms = [max(t, MIN_TIME_MS) for t in times_ms]
+    errors = [min(fit_model(sizes, times_ms, log_fn) for log_fn in variants) for _, variants in COMPLEXITY_MODELS]
+    if max(times_ms) < NOISE_FLOOR_MS:
+        return ComplexityFit(0, errors[0])
+    lowest = min(errors)
+    order = next(order for order, error in enumerate(errors) if error <= lowest * (1 + FIT_TOLERANCE))
+    return ComplexityFit(order, errors[order])
+
+
+def fit_model(sizes: List[int], times_ms: List[float], log_fn: Callable[[int], float]) -> float:
+    """
+    Fits t(n) = a + c * f(n), a >= 0, c >= 0 by weighted least squares, weights are 1 / t^2
+    :param sizes: inputs' sizes in ascending order
+    :param times_ms: solution's positive time per input's size
+    :param log_fn: log2 of the model's function f
+    :return: RMS of the fit's relative residuals
+    """
+    # the model's values are normalized by its value for the largest input
+    top = log_fn(sizes[-1])
+    values = [2.0 ** (log_fn(size) - top) for size in sizes]
+    weights = [1 / (t * t) for t in times_ms]
+    s = sum(weights)
+    sf = sum(w * f for w, f in zip(weights, values))
+    sff = sum(w * f * f for w, f in zip(weights, values))
+    st = sum(w * t for w, t in zip(weights, times_ms))
+    sft = sum(w * f * t for w, f, t in zip(weights, values, times_ms))
+    # constant and pure model's fits are the boundaries of a, c >= 0
+    candidates = [(st / s, 0.0), (0.0, sft / sff)]
+    det = s * sff - sf * sf
+    if det > 0:
+        overhead, coefficient = (st * sff - sf * sft) / det, (s * sft - sf * st) / det
+        if overhead >= 0 and coefficient >= 0:
+            candidates.append((overhead, coefficient))
+    return min(math.sqrt(sum(((t - a - c * f) / t) ** 2 for f, t in zip(values, times_ms)) / len(sizes))
+               for a, c in candidates)
+
+
+def nested_size(size: int) -> int:
+    """
+    :param size: container's size
+    :return: size of the containers nested in it
+    """
+    return max(1, math.isqrt(size))
+
+
+def is_scalar_signature(tree: SyntaxTree) -> bool:
+    """
+    :param tree: signature's syntax tree
+    :return: True - if the arguments have neither containers, strings nor user types, so integers are the size
+    """
+    return not any(node.is_container_type() or node.is_array_type() or node.user_type or node.node_type == 'string'
+                   for node in tree.nodes[:-1])
+
+
+class InputGenerator(SyntaxTreeVisitor):
+    """
+    Generates random JSON values of the arguments' types, a node's context is the value's size
+    """
+
+    def __init__(self, rng: random.Random, scalar: bool):
+        """
+        :param rng: random numbers generator
+        :param scalar: if top level integers are the input's size
+        """
+        self.rng = rng
+        self.scalar = scalar
+
+    def visit_array(self, node: SyntaxTree, context):
+        return self.visit_list(node, context)
+
+    def visit_list(self, node: SyntaxTree, context):
+        child = node.first_child()
+        return [self.render(child, nested_size(context)) for _ in range(context)]
+
+    def visit_linked_list(self, node: SyntaxTree, context):
+        return self.visit_list(node, context)
+
+    def visit_binary_tree(self, node: SyntaxTree, context):
+        # level-order values without gaps form a complete tree
+        return self.visit_list(node, context)
+
+    def visit_map(self, node: SyntaxTree, context):
+        values = []
+        for _ in range(context):
+            values.append(self.render(node.first_child(), nested_size(context)))
+            values.append(self.render(node.second_child(), nested_size(context)))
+        return values
+
+    def visit_int(self, node: SyntaxTree, context):
+        if node.parent.is_root():
+            return context if self.scalar else self.rng.randint(1, context)
+        return self.rng.randint(-MAX_ITEM_VALUE, MAX_ITEM_VALUE)
+
+    def visit_long(self, node: SyntaxTree, context):
+        return self.visit_int(node, context)
+
+    def visit_float(self, node: SyntaxTree, context):
+        if node.parent.is_root():
+            return round(self.rng.uniform(0, context), 3)
+        return round(self.rng.uniform(-MAX_ITEM_VALUE, MAX_ITEM_VALUE), 3)
+
+    def visit_string(self, node: SyntaxTree, context):
+        length = context if node.parent.is_root() else min(context, STRING_ITEM_LENGTH)
+        return ''.join(self.rng.choices(string.ascii_lowercase, k=length))
+
+    def visit_bool(self, node: SyntaxTree, context):
+        return self.rng.random() < 0.5
+
+    def visit_obj(self, node: SyntaxTree, context):
+        return [self.render(child, context) for child in node.nodes]
+
+
+def generate_args(tree: SyntaxTree, size: int, seed: str = PROBE_SEED) -> str:
+    """
+    :param tree: signature's syntax tree
+    :param size: input's size
+    :param seed: seed of the generated values, the same seed and size always produce the same input
+    :return: JSON arguments line of a test case
+    """
+    generator = InputGenerator(random.Random(f'{seed}:{size}'), is_scalar_signature(tree))
+    return json.dumps([generator.render(node, size) for node in tree.nodes[:-1]], separators=(',', ':'))
+
+
+def get_probe_opts(opts: TestSuiteExecOpts) -> TestSuiteExecOpts:
+    """
+    :param opts: card's execution options
+    :return: options of the probe's run: results are not checked, every input is benchmarked
+    """
+    probe_opts = copy.copy(opts)
+    probe_opts.check_results = False
+    probe_opts.benchmark = PROBE_REPS
+    probe_opts.benchmark_warmup = PROBE_WARMUP
+    probe_opts.time_limit_ms = PROBE_TIME_LIMIT_MS
+    probe_opts.suite_time_limit_ms = None
+    probe_opts.parallel = 1
+    probe_opts.profile = False
+    return probe_opts
+
+
+def make_probe_corpus(corpus: TestCorpus, sizes: List[int], seed: str = PROBE_SEED) -> TestCorpus:
+    """
+    :param corpus: card's compiled test cases
+    :param sizes: inputs' sizes in ascending order
+    :param seed: seed of the generated values
+    :return: corpus of the generated inputs, they have no expected values
+    """
+    cases = [(generate_args(corpus.tree, size, seed), None) for size in sizes]
+    return TestCorpus(corpus.ts, corpus.tree, get_probe_opts(corpus.opts), cases)
+
+
+class ProbeResult:
+    """
+    Outcome of a complexity probe:
+        - sizes - sizes of the inputs the solution has been timed on
+        - times_ms - the solution's median time per input
+        - fit - the best fitted complexity model, None - if there are not enough timings
+        - limit_size - size of the input, which has exceeded the time or memory limit
+        - errors - the test suite's errors
+        - cancelled - if the probe has been stopped
+    """
+
+    def __init__(self):
+        self.sizes: List[int] = []
+        self.times_ms: List[float] = []
+        self.fit: Optional[ComplexityFit] = None
+        self.limit_size: Optional[int] = None
+        self.errors: List[str] = []
+        self.cancelled = False
+
+    def is_worse_than(self, expected: str) -> bool:
+        """
+        :param expected: expected complexity, e.g. "n log n"
+        :return: True - if the fitted complexity is higher than the expected one
+        """
+        return self.fit is not None and self.fit.order > get_complexity_order(expected)
+
+    def to_html(self) -> str:
+        """
+        :return: the probe's outcome to be displayed in the console
+        """
+        if self.cancelled:
+            return 'Complexity probe was interrupted'
+        if self.errors:
+            return 'Complexity probe has failed:<br/>' + '<br/>'.join(self.errors)
+        limit = f', input of size {self.limit_size} has exceeded the limits' if self.limit_size is not None else ''
+        if self.fit is None:
+            return f'Complexity cannot be estimated: the solution has been timed on {len(self.sizes)} ' \
+                   f'input sizes, at least {MIN_FIT_POINTS} are required{limit}'
+        return f'Time complexity: {self.fit.to_text()} (fit error: {self.fit.error * 100:.1f}%, ' \
+               f'input sizes: {self.sizes[0]}..{self.sizes[-1]}{limit})'
+
+
+class ProbeTestLogger(TestLogger):
+    """
+    Test logger which records the solution's timings into the probe's result instead of displaying them
+    """
+
+    def __init__(self, result: ProbeResult, sizes: List[int]):
+        super().__init__(None, None, len(sizes))
+        self.result = result
+        self.input_sizes = sizes
+
+    def passed(self, index: int, duration_ms: float, cpu_ms: Optional[float] = None,
+               profile: Optional[dict] = None, bench_ns: Optional[List[int]] = None):
+        self.result.sizes.append(self.input_sizes[index - 1])
+        self.result.times_ms.append(median(bench_ns) / NS_PER_MS if bench_ns else duration_ms)
+
+    def time_limit_exceeded(self, index: int, limit_ms: int, scope: str = 'test'):
+        self.result.limit_size = self.input_sizes[index - 1]
+
+    def memory_limit_exceeded(self, index: int, limit_mb: int):
+        self.result.limit_size = self.input_sizes[index - 1]
+
+    def cancel(self):
+        self.result.cancelled = True
+
+    def resource_usage(self, usage: Optional[ResourceUsage]):
+        pass
+
+    def log(self, msg: str, flush: bool = False):
+        pass
+
+
+class ProbeLogger:
+    """
+    Console logger of a complexity probe: errors are recorded into the probe's result, the other messages
+    (including the user's output) are dropped
+    """
+
+    def __init__(self, result: ProbeResult, sizes: List[int]):
+        self.result = result
+        self.sizes = sizes
+
+    def get_testing_logger(self, tests_count: int) -> TestLogger:
+        """
+        :param tests_count: count of the generated inputs
+        :return: test logger recording the solution's timings into the probe's result
+        """
+        return ProbeTestLogger(self.result, self.sizes)
+
+    def info(self, msg: str):
+        pass
+
+    def error(self, msg: str):
+        """
+        :param msg: error message
+        """
+        self.result.errors.append(msg)
+
+    def log(self, msg: str):
+        pass
+
+    def flush(self):
+        pass
+
+    def clear(self):
+        pass
+
+
+class ComplexityProbe:
+    """
+    Times a solution on generated inputs of growing size and fits the timings against the complexity models
+    """
+
+    def __init__(self, runner: TestRunner, sizes: Optional[List[int]] = None, seed: str = PROBE_SEED):
+        """
+        :param runner: test runner, the probe's test suite is executed by it (so it's stopped along with the runner)
+        :param sizes: inputs' sizes in ascending order, by default PROBE_SIZES
+        :param seed: seed of the generated values
+        """
+        self.runner = runner
+        self.sizes = sizes if sizes is not None else PROBE_SIZES
+        self.seed = seed
+
+    def run(self, src_code: str, corpus: TestCorpus) -> ProbeResult:
+        """
+        :param src_code: source code of the solution's test suite
+        :param corpus: card's compiled test cases
+        :return: the probe's outcome
+        """
+        result = ProbeResult()
+        probe_corpus = make_probe_corpus(corpus, self.sizes, self.seed)
+        self.runner.run(src_code, probe_corpus, probe_corpus.opts, ProbeLogger(result, self.sizes))
+        if not result.errors and not result.cancelled:
+            result.fit = fit_complexity(result.sizes, result.times_ms)
+        return result
@@ -1,83 +1,326 @@
 # Copyright: Daveight and contributors
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+import html
 import json
+import math
 import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
 
-import throttle
+from testing.framework.sandbox import ResourceUsage
+from testing.framework.types import NS_PER_MS
 
-INVOCATION_LIMIT = 5
-INVOCATION_DELAY_SEC = 0.1
-DEBOUNCE_DELAY_SEC = 0.5
+FRAME_INTERVAL_SEC = 0.1  # buffered messages are displayed at most once per interval
+LOG_BUFFER_LIMIT = 256 * 1024  # max characters buffered between frames, the middle of the output is dropped
+# phases of a test case's execution reported by a profiled test suite, the solution's call is the "solve" phase
+PROFILE_PHASES = ['parse', 'convert_in', 'solve', 'convert_out', 'serialize']
 
 
-def debounce(delay):
+def percentile(values: List[float], p: float) -> float:
     """
-    Debounce a function's execution
-    :param delay: debounce delay
-    :return: decorator function
+    Nearest-rank percentile
+    :param values: sorted non-empty list of values
+    :param p: percentile from 0 to 100
+    :return: the smallest value, which is greater or equal to p percent of the values
     """
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
 
-    def decorate(f):
+
+def median(values: List[float]) -> float:
+    """
+    :param values: non-empty list of values
+    :return: the middle value, or the mean of the two middle values if the count is even
+    """
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def median_absolute_deviation(values: List[float]) -> float:
+    """
+    Robust measure of the values' spread, it isn't affected by a few outliers (e.g. GC pauses)
+    :param values: non-empty list of values
+    :return: median of the absolute deviations from the values' median
+    """
+    center = median(values)
+    return median([abs(value - center) for value in values])
+
+
+class LogPump:
+    """
+    Streams log messages to the web view: messages are buffered and displayed by a single background thread
+    in frames (one web.eval per FRAME_INTERVAL_SEC, the latest progress bar update is sent along with the frame).
+    If more than LOG_BUFFER_LIMIT characters are buffered between frames, the first and the last halves are kept
+    and the middle is dropped
+    """
+
+    def __init__(self, web, interval: float = FRAME_INTERVAL_SEC, limit: int = LOG_BUFFER_LIMIT):
         """
-        adapted decorator
-        :param f: input function
+        :param web: target web view
+        :param interval: min interval between frames
+        :param limit: max characters buffered between frames
         """
+        self.web = web
+        self.interval = interval
+        self.limit = limit
+        self.head: List[str] = []
+        self.head_size = 0
+        self.tail = deque()
+        self.tail_size = 0
+        self.dropped = 0
+        self.progress: Optional[str] = None
+        self.cond = threading.Condition()
+        self.emit_lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
 
-        def wrapped(*args, **kwargs):
-            """
-            wrapped function, sets timer execution for the original function,
-            cancels the previous timer
-            :param args: function args
-            :param kwargs: function kwargs
-            """
-            if hasattr(decorate, 'timer'):
-                decorate.timer.cancel()
-            decorate.timer = threading.Timer(delay, f, args=args, kwargs=kwargs)
-            decorate.timer.start()
+    def write(self, msg: str, progress: Optional[str] = None):
+        """
+        Buffers a message, it's displayed with the next frame
+        :param msg: target message
+        :param progress: script updating the progress bar, only the latest one is evaluated
+        """
+        half = self.limit // 2
+        with self.cond:
+            if len(msg) > half:
+                self.dropped += len(msg) - half // 2 * 2
+                msg = msg[:half // 2] + msg[len(msg) - half // 2:]
+            if not self.tail and self.head_size + len(msg) <= half:
+                self.head.append(msg)
+                self.head_size += len(msg)
+            else:
+                self.tail.append(msg)
+                self.tail_size += len(msg)
+                while self.tail_size > half:
+                    dropped = self.tail.popleft()
+                    self.tail_size -= len(dropped)
+                    self.dropped += len(dropped)
+            if progress is not None:
+                self.progress = progress
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.cond.notify()
 
-        return wrapped
+    def has_pending(self) -> bool:
+        """
+        :return: True - if there are messages or a progress update to be displayed
+        """
+        return bool(self.head or self.tail or self.progress is not None)
 
-    return decorate
+    def take_frame(self) -> str:
+        """
+        Empties the buffer
+        :return: script displaying the buffered messages and updating the progress bar
+        """
+        with self.cond:
+            text = ''.join(self.head)
+            if self.dropped:
+                text += f'<br/>... output is truncated ({self.dropped} characters)<br/>'
+            text += ''.join(self.tail)
+            scripts = ['_showConsoleLog(%s)' % json.dumps(text)] if text else []
+            if self.progress is not None:
+                scripts.append(self.progress)
+            self.discard()
+        return ';'.join(scripts)
+
+    def flush(self):
+        """
+        Displays the buffered messages right now
+        """
+        with self.emit_lock:
+            script = self.take_frame()
+            if script:
+                self.web.eval(script)
+
+    def discard(self):
+        """
+        Drops the buffered messages and progress update
+        """
+        with self.cond:
+            self.head.clear()
+            self.head_size = 0
+            self.tail.clear()
+            self.tail_size = 0
+            self.dropped = 0
+            self.progress = None
+
+    def eval(self, script: str):
+        """
+        Drops the buffered messages and evaluates a script right now
+        :param script: target script
+        """
+        with self.emit_lock:
+            self.discard()
+            self.web.eval(script)
+
+    def run(self):
+        """
+        Background thread, displays a frame every interval while there are buffered messages
+        """
+        while True:
+            with self.cond:
+                self.cond.wait_for(self.has_pending)
+            time.sleep(self.interval)
+            self.flush()
 
 
 class TestLogger:
     """
-    Logger which is used to log testing events, it is backed by throttle.Valve
-    to prevent a big amount of console.logger invocations (because it can affect
-    the browser)
+    Logger which is used to log testing events, messages are displayed by the log pump
+    to prevent a big amount of web view invocations (because it can affect the browser)
     """
-    def __init__(self, console, web, tests_count: int):
+    def __init__(self, console, web, tests_count: int, pump: Optional[LogPump] = None):
         self.console = console
         self.web = web
-        self.message_buf = []
-        self.valve = throttle.Valve()
+        self.pump = pump if pump is not None else LogPump(web)
         self.active = True
         self.tests_count = tests_count
         self.index = 0
         self.progress = 0
+        self.durations: List[float] = []
+        self.cpu_durations: List[float] = []
+        self.phase_durations: Dict[str, List[float]] = {}
+        self.peak_rss_kb: Optional[int] = None
+        self.bench_medians: List[float] = []
 
-    def passed(self, index: int, duration_ms: int):
+    def passed(self, index: int, duration_ms: float, cpu_ms: Optional[float] = None,
+               profile: Optional[Dict[str, int]] = None, bench_ns: Optional[List[int]] = None):
         """
         Display "passed" message
         :param index: a test's index
-        :param duration_ms: a test's duration time in ms
+        :param duration_ms: a test's wall time in ms
+        :param cpu_ms: a test's CPU time in ms
+        :param profile: a test's phases timings in ns and peak RSS in KB, if the test suite is profiled
+        :param bench_ns: wall time in ns of the test's repetitions, if the test suite is benchmarked
         """
         self.progress = int(float(index / self.tests_count) * 100)
-        self.log(f'Test <span class="passed">PASSED</span> ({index}/{self.tests_count}) - {duration_ms} ms<br/>')
+        self.durations.append(duration_ms)
+        if profile is not None:
+            self.add_profile(duration_ms, profile)
+        cpu = ''
+        if cpu_ms is not None:
+            self.cpu_durations.append(cpu_ms)
+            cpu = f' (cpu {cpu_ms:.3f} ms)'
+        bench = ''
+        if bench_ns:
+            samples = [ns / NS_PER_MS for ns in bench_ns]
+            self.bench_medians.append(median(samples))
+            bench = f', median: {self.bench_medians[-1]:.3f} ms, MAD: {median_absolute_deviation(samples):.3f} ms'
+        self.log(f'Test <span class="passed">PASSED</span> ({index}/{self.tests_count}) - '
+                 f'{duration_ms:.3f} ms{cpu}{bench}<br/>')
 
-    def fail(self, index: int, args, expected, result):
+    def summary(self):
         """
-        Display "passed" message
+        Display statistics of the passed tests' wall time
+        """
+        if not self.durations:
+            return
+        durations = sorted(self.durations)
+        total = sum(durations)
+        cpu = f', cpu total: {sum(self.cpu_durations):.3f} ms' if self.cpu_durations else ''
+        self.log(f'Total: {total:.3f} ms, mean: {total / len(durations):.3f} ms, '
+                 f'p50: {percentile(durations, 50):.3f} ms, p95: {percentile(durations, 95):.3f} ms, '
+                 f'max: {durations[-1]:.3f} ms{cpu}<br/>')
+
+    def benchmark(self, reps: int, warmup: int) -> Optional[float]:
+        """
+        Display the benchmark's score: sum of the passed tests' median wall time
+        :param reps: how many times every test has been repeated
+        :param warmup: how many times every test has been repeated before its timing was measured
+        :return: the score in ms or None - if the test suite hasn't reported the repetitions' timings
+        """
+        if not self.bench_medians:
+            return None
+        score = sum(self.bench_medians)
+        self.log(f'Benchmark score: {score:.3f} ms (sum of medians of {reps} runs after {warmup} warm-up runs '
+                 f'per test)<br/>')
+        return score
+
+    def resource_usage(self, usage: Optional[ResourceUsage]):
+        """
+        Display resources consumed by the test suite's processes
+        :param usage: CPU time and peak memory, nothing is displayed if it's None
+        """
+        if usage is None:
+            return
+        memory = f', peak memory: {usage.peak_memory_kb / 1024:.1f} MB' if usage.peak_memory_kb is not None else ''
+        self.log(f'Resources: cpu {usage.cpu_sec:.3f} s{memory}<br/>')
+
+    def add_profile(self, duration_ms: float, profile: Dict[str, int]):
+        """
+        Accumulates a test's phases timings
+        :param duration_ms: a test's wall time in ms
+        :param profile: a test's phases timings in ns and peak RSS in KB
+        """
+        for phase in PROFILE_PHASES:
+            ns = profile.get(phase + '_ns')
+            if phase == 'solve':
+                self.phase_durations.setdefault(phase, []).append(duration_ms)
+            elif ns is not None:
+                self.phase_durations.setdefault(phase, []).append(ns / NS_PER_MS)
+        if profile.get('peak_rss_kb') is not None:
+            self.peak_rss_kb = max(self.peak_rss_kb or 0, profile['peak_rss_kb'])
+
+    def instrumentation(self):
+        """
+        Display the passed tests' phases timings aggregated across the test suite: total time and its share,
+        mean, p95 and max time of every phase, and the test suite's peak RSS
+        """
+        if not self.phase_durations:
+            return
+        total = sum(sum(durations) for durations in self.phase_durations.values()) or 1
+        lines = ''
+        for phase in PROFILE_PHASES:
+            if phase not in self.phase_durations:
+                continue
+            durations = sorted(self.phase_durations[phase])
+            phase_total = sum(durations)
+            lines += f'&nbsp;&nbsp;&nbsp;&nbsp;{phase.replace("_", "-")}: {phase_total:.3f} ms ' \
+                     f'({phase_total / total * 100:.1f}%), mean: {phase_total / len(durations):.3f} ms, ' \
+                     f'p95: {percentile(durations, 95):.3f} ms, max: {durations[-1]:.3f} ms<br/>'
+        if self.peak_rss_kb is not None:
+            lines += f'&nbsp;&nbsp;&nbsp;&nbsp;peak RSS: {self.peak_rss_kb / 1024:.1f} MB<br/>'
+        self.log(f'Profile:<br/>{lines}')
+
+    def fail(self, index: int, args, expected, result, diff: str = ''):
+        """
+        Display "failed" message
         :param index: a test's index
         :param args: a test's arguments in JSON
         :param expected: expected value in JSON
         :param result: actual result in JSON
+        :param diff: description of the difference between the expected value and the result
         """
         self.progress = -1
+        diff_lines = ''.join(f'&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;{html.escape(line)}<br/>'
+                             for line in diff.split('\n') if line)
         self.log(f'''Test <span class='failed'>FAILED</span> ({index}/{self.tests_count})<br/>
             &nbsp;&nbsp;&nbsp;&nbsp;args: {args}<br/>
             &nbsp;&nbsp;&nbsp;&nbsp;expected: {expected}<br/>
-            &nbsp;&nbsp;&nbsp;&nbsp;result: {result}<br/>''', flush=True)
+            &nbsp;&nbsp;&nbsp;&nbsp;result: {result}<br/>
+            {'&nbsp;&nbsp;&nbsp;&nbsp;difference:<br/>' + diff_lines if diff_lines else ''}''', flush=True)
+
+    def time_limit_exceeded(self, index: int, limit_ms: int, scope: str = 'test'):
+        """
+        Display "time limit exceeded" message
+        :param index: a test's index
+        :param limit_ms: violated time limit in ms
+        :param scope: 'test' - if the test's time limit is violated, 'suite' - if the whole test suite's one
+        """
+        self.progress = -1
+        self.log(f'''Test <span class='failed'>TIME LIMIT EXCEEDED</span> ({index}/{self.tests_count})<br/>
+            &nbsp;&nbsp;&nbsp;&nbsp;{scope} time limit: {limit_ms} ms<br/>''', flush=True)
+
+    def memory_limit_exceeded(self, index: int, limit_mb: int):
+        """
+        Display "memory limit exceeded" message
+        :param index: a test's index
+        :param limit_mb: violated memory limit in MB
+        """
+        self.progress = -1
+        self.log(f'''Test <span class='failed'>MEMORY LIMIT EXCEEDED</span> ({index}/{self.tests_count})<br/>
+            &nbsp;&nbsp;&nbsp;&nbsp;memory limit: {limit_mb} MB<br/>''', flush=True)
 
     def cancel(self):
         """
@@ -86,46 +329,35 @@ class TestLogger:
         Displays cancelled message to console
         """
         self.active = False
-        self.message_buf.clear()
-        self.console.log(f'<br/><span class="cancel">Tests execution was interrupted...</span><br/><br/>')
-        self.web.eval('_setProgressCancelled()')
+        self.pump.discard()
+        self.pump.write(f'<br/><span class="cancel">Tests execution was interrupted...</span><br/><br/>',
+                        '_setProgressCancelled()')
+        self.pump.flush()
 
     def log(self, msg: str, flush: bool = False):
         """
         Internal function which is used to display log
-        It doesn't display log message directly, instead, it puts message to a buffer
-        which is used to accumulate message and display them regarding INVCATION_DELAY_SEC
-        and INVOCATION_LIMIT settings
+        It doesn't display log message directly, instead, it puts message to the log pump's buffer,
+        which is displayed (along with the current progress) every FRAME_INTERVAL_SEC
         :param msg: target message to log
         :param flush: force mode, if buffer must be flushed and displayed right now
         """
-        self.index += 1
-        self.message_buf.append(msg)
-        allow = self.valve.check(INVOCATION_DELAY_SEC, INVOCATION_LIMIT, self.index)
-        if flush or allow:
-            self.flush_buffer()
-        else:
-            self.log_debounce()
-
-    def flush_buffer(self):
-        """
-        Flushes and displayes the current message buffer
-        """
         if not self.active:
             return
-        self.console.log(''.join(self.message_buf))
-        self.message_buf.clear()
+        self.index += 1
         if self.progress >= 0:
-            self.web.eval('_setProgress(%s)' % json.dumps(str(self.progress)))
+            progress = '_setProgress(%s)' % json.dumps(str(self.progress))
         else:
-            self.web.eval('_setProgressError()')
+            progress = '_setProgressError()'
+        self.pump.write(msg, progress)
+        if flush:
+            self.flush_buffer()
 
-    @debounce(DEBOUNCE_DELAY_SEC)
-    def log_debounce(self):
+    def flush_buffer(self):
         """
-        Adds debounce logs flushing, after execution is completed but there are some messages in the buf
+        Flushes and displays the current message buffer
         """
-        self.flush_buffer()
+        self.pump.flush()
 
 
 class ConsoleLogger:
@@ -135,13 +367,14 @@ class ConsoleLogger:
 
     def __init__(self, web):
         self.web = web
+        self.pump = LogPump(web)
 
     def get_testing_logger(self, tests_count: int) -> TestLogger:
         """
         Updates progress bar with the total count of tests
         :param tests_count: count of tests to be executed
         """
-        return TestLogger(self, self.web, tests_count)
+        return TestLogger(self, self.web, tests_count, self.pump)
 
     def info(self, msg: str):
         """
@@ -156,19 +389,23 @@ class ConsoleLogger:
         Sets error state to the Progress Bar
         :param msg: target message
         """
-        self.log(f'<span class="failed">{msg}</span><br/>')
-        self.web.eval('_setProgressError()')
+        self.pump.write(f'<span class="failed">{msg}</span><br/>', '_setProgressError()')
 
     def log(self, msg: str):
         """
-        Internal function to log message to the web console
+        Internal function to log message to the web console, it's displayed with the log pump's next frame
         :param msg: target message
         """
-        self.web.eval('_showConsoleLog(%s)' % json.dumps(msg))
+        self.pump.write(msg)
+
+    def flush(self):
+        """
+        Displays the buffered messages right now
+        """
+        self.pump.flush()
 
     def clear(self):
         """
-        Clears the console and resets the progress bar
+        Clears the console and resets the progress bar, the buffered messages are dropped
         """
-        self.web.eval('_cleanConsoleLog()')
-        self.web.eval('_initializeProgress()')
+        self.pump.eval('_cleanConsoleLog();_initializeProgress()')
@@ -30,7 +30,7 @@ class CppInputConverter(TypeConverter):
             \t{{type_name}} obj;
             {% for c in converters %}\tobj.{{c.prop_name}} = {{c.fn_name}}(value[{{loop.index0}}]);{% endfor %}
             \treturn obj;''', type_name=type_name, converters=converters)
-        return ConverterFn(node.name, src, 'jute::jValue', type_name)
+        return ConverterFn(node.name, src, 'const jute::jValue&', type_name)
 
     def visit_array(self, node: SyntaxTree, context):
         """
@@ -57,12 +57,12 @@ class CppInputConverter(TypeConverter):
         inner_converter: ConverterFn = self.render(node.first_child(), context)
         src = render_template('''
             \tvector<{{converter.ret_type}}> result;
-            \tfor (int i = 0; i < value.size(); i++) {
-                \t\t{{converter.ret_type}} obj = {{converter.fn_name}}(value[i]);
-                \t\tresult.push_back(obj);
+            \tresult.reserve(value.size());
+            \tfor (const jute::jValue& item : value) {
+                \t\tresult.push_back({{converter.fn_name}}(item));
             \t}
             \treturn result;''', converter=inner_converter)
-        return ConverterFn(node.name, src, 'jute::jValue', 'vector<' + inner_converter.ret_type + '>')
+        return ConverterFn(node.name, src, 'const jute::jValue&', 'vector<' + inner_converter.ret_type + '>')
 
     def visit_map(self, node: SyntaxTree, context):
         """
@@ -79,13 +79,11 @@ class CppInputConverter(TypeConverter):
         src = render_template('''
             \t{{ret_type}} result;
             \tfor (int i = 0; i < value.size(); i+=2) {
-            \t\t{{converters[0].ret_type}} k = {{converters[0].fn_name}}(value[i]);
-            \t\t{{converters[1].ret_type}} v = {{converters[1].fn_name}}(value[i + 1]);
-            \t\tresult[k] = v;
+            \t\tresult[{{converters[0].fn_name}}(value[i])] = {{converters[1].fn_name}}(value[i + 1]);
             \t}
             \treturn result;
         ''', converters=converters, ret_type=ret_type)
-        return ConverterFn(node.name, src, 'jute::jValue', ret_type)
+        return ConverterFn(node.name, src, 'const jute::jValue&', ret_type)
 
     def visit_int(self, node: SyntaxTree, context):
         """
@@ -95,7 +93,7 @@ class CppInputConverter(TypeConverter):
         :param context: generation context
         :return: converter fn
         """
-        return ConverterFn(node.name, 'return value.as_int();', 'jute::jValue', 'int')
+        return ConverterFn(node.name, 'return value.as_int();', 'const jute::jValue&', 'int')
 
     def visit_long(self, node: SyntaxTree, context):
         """
@@ -105,7 +103,7 @@ class CppInputConverter(TypeConverter):
         :param context: generation context
         :return: converter fn
         """
-        return ConverterFn(node.name, 'return value.as_long();', 'jute::jValue', 'long int')
+        return ConverterFn(node.name, 'return value.as_long();', 'const jute::jValue&', 'long int')
 
     def visit_float(self, node: SyntaxTree, context):
         """
@@ -115,7 +113,7 @@ class CppInputConverter(TypeConverter):
         :param context: generation context
         :return: converter fn
         """
-        return ConverterFn(node.name, 'return value.as_double();', 'jute::jValue', 'double')
+        return ConverterFn(node.name, 'return value.as_double();', 'const jute::jValue&', 'double')
 
     def visit_string(self, node: SyntaxTree, context):
         """
@@ -125,7 +123,7 @@ class CppInputConverter(TypeConverter):
         :param context: generation context
         :return: converter fn
         """
-        return ConverterFn(node.name, 'return value.as_string();', 'jute::jValue', 'string')
+        return ConverterFn(node.name, 'return value.as_string();', 'const jute::jValue&', 'string')
 
     def visit_bool(self, node: SyntaxTree, context):
         """
@@ -135,7 +133,7 @@ class CppInputConverter(TypeConverter):
         :param context: generation context
         :return: converter fn
         """
-        return ConverterFn(node.name, 'return value.as_bool();', 'jute::jValue', 'bool')
+        return ConverterFn(node.name, 'return value.as_bool();', 'const jute::jValue&', 'bool')
 
     def visit_linked_list(self, node: SyntaxTree, context):
         """
@@ -155,15 +153,14 @@ class CppInputConverter(TypeConverter):
             shared_ptr<ListNode<{{child.ret_type}}>> node = head;
             \tfor (int i = 1; i < value.size(); i++) {
             \t\tshared_ptr<ListNode<{{child.ret_type}}>> nextNode = make_shared<ListNode<{{child.ret_type}}>>();
-            \t\t{{child.ret_type}} obj = {{child.fn_name}}(value[i]);
-            \t\tnextNode->data = obj;
+            \t\tnextNode->data = {{child.fn_name}}(value[i]);
             \t\tnextNode->next = nullptr;
             \t\tnode->next = nextNode;
             \t\tnode = nextNode;
             \t}
             return head;
         ''', child=child)
-        return ConverterFn(node.name, src, 'jute::jValue', 'shared_ptr<ListNode<' + child.ret_type + '>>')
+        return ConverterFn(node.name, src, 'const jute::jValue&', 'shared_ptr<ListNode<' + child.ret_type + '>>')
 
     def visit_binary_tree(self, node: SyntaxTree, context):
         """
@@ -174,36 +171,26 @@ class CppInputConverter(TypeConverter):
         child: ConverterFn = self.render(node.first_child(), context)
         src = render_template('''
             vector<shared_ptr<BinaryTreeNode<{{child.ret_type}}>>> nodes;
+            nodes.reserve(value.size());
             for (int i = 0; i < value.size(); i++) {
-            \tshared_ptr<BinaryTreeNode<{{child.ret_type}}>> node = make_shared<BinaryTreeNode<{{child.ret_type}}>>();
-            \tnode->left = nullptr;
-            \tnode->right = nullptr;
             \tif (value[i].is_null()) {
-            \t\tnode = nullptr;
+            \t\tnodes.push_back(nullptr);
             \t} else {
-            \t\tnode->data = {{child.fn_name}}(value[i]);
+            \t\tnodes.push_back(make_shared<BinaryTreeNode<{{child.ret_type}}>>({{child.fn_name}}(value[i]), nullptr, nullptr));
             \t}
-            \tnodes.push_back(node);
             }
-            queue<shared_ptr<BinaryTreeNode<{{child.ret_type}}>>> children;
-            for (int i = 0; i < nodes.size(); i++) {
-                \tchildren.push(nodes[i]);
-            }
-            shared_ptr<BinaryTreeNode<{{child.ret_type}}>> root = children.front();
-            children.pop();
-            for (int i = 0; i < nodes.size(); i++) {
-            \tshared_ptr<BinaryTreeNode<{{child.ret_type}}>> node = nodes[i];
-            \tif (node != nullptr) {
-            \t\tif (!children.empty()) {
-            \t\t\tnode->left = children.front();
-            \t\t\tchildren.pop();
-            \t\t}
-            \t\tif (!children.empty()) {
-            \t\t\tnode->right = children.front();
-            \t\t\tchildren.pop();
+            int child = 1;
+            for (int i = 0; i < nodes.size() && child < nodes.size(); i++) {
+            \tif (nodes[i] != nullptr) {
+            \t\tnodes[i]->left = nodes[child++];
+            \t\tif (child < nodes.size()) {
+            \t\t\tnodes[i]->right = nodes[child++];
             \t\t}
             \t}
             }
-            return root;
+            if (nodes.empty()) {
+            \treturn nullptr;
+            }
+            return nodes[0];
         ''', child=child)
-        return ConverterFn(node.name, src, 'jute::jValue', 'shared_ptr<BinaryTreeNode<' + child.ret_type + '>>')
+        return ConverterFn(node.name, src, 'const jute::jValue&', 'shared_ptr<BinaryTreeNode<' + child.ret_type + '>>')
@@ -5,6 +5,7 @@
 #include <sstream>
 #include <fstream>
 #include <cstring>
+#include <cstdlib>
 #include "jute.h"
 using namespace std;
 using namespace jute;
@@ -48,31 +49,35 @@ string deserialize(const string& ref) {
     return out;
 }
 
-string jValue::to_string_d(int d) {
-    if (type == JSTRING)   return string("\"") + svalue + string("\"");
-    if (type == JNUMBER)   return svalue;
-    if (type == JBOOLEAN)  {
-        return svalue;
-    }
-    if (type == JNULL)     return "null";
-    if (type == JOBJECT) {
-        string s = string("{");
+void jValue::write(string& out) const {
+    if (type == JSTRING) {
+        out += '"';
+        out += svalue;
+        out += '"';
+    } else if (type == JNUMBER || type == JBOOLEAN) {
+        out += svalue;
+    } else if (type == JNULL) {
+        out += "null";
+    } else if (type == JOBJECT) {
+        out += '{';
         for (size_t i=0;i<properties.size();i++) {
-            s += string("\"") + properties[i].first + string("\":") + properties[i].second.to_string_d(d+1) + string(i==properties.size()-1?"":",");
+            if (i) out += ',';
+            out += '"';
+            out += properties[i].first;
+            out += "\":";
+            properties[i].second.write(out);
         }
-        s += string("}");
-        return s;
-    }
-    if (type == JARRAY) {
-        string s = "[";
+        out += '}';
+    } else if (type == JARRAY) {
+        out += '[';
         for (size_t i=0;i<arr.size();i++) {
-            if (i) s += ",";
-            s += arr[i].to_string_d(d+1);
+            if (i) out += ',';
+            arr[i].write(out);
         }
-        s += "]";
-        return s;
+        out += ']';
+    } else {
+        out += "##";
     }
-    return "##";
 }
 jValue::jValue() {
     this->type = JUNKNOWN;
@@ -81,10 +86,12 @@ jValue::jValue(jType tp) {
     this->type = tp;
 }
 
-string jValue::to_string() {
-    return to_string_d(1);
+string jValue::to_string() const {
+    string out;
+    write(out);
+    return out;
 }
-jType jValue::get_type() {
+jType jValue::get_type() const {
     return type;
 }
 void jValue::set_type(jType tp) {
@@ -92,10 +99,10 @@ void jValue::set_type(jType tp) {
 }
 void jValue::add_property(string key, jValue v) {
     mpindex[key] = properties.size();
-    properties.push_back(make_pair(key, v));
+    properties.emplace_back(std::move(key), std::move(v));
 }
 void jValue::add_element(jValue v) {
-    arr.push_back(v);
+    arr.push_back(std::move(v));
 }
 void jValue::reduce_right() {
     for (int i = arr.size() - 1; i > 0; i--) {
@@ -107,43 +114,31 @@ void jValue::reduce_right() {
     }
 }
 void jValue::set_string(string s) {
-    svalue = s;
+    svalue = std::move(s);
 }
-bool jValue::is_null() {
+bool jValue::is_null() const {
     return svalue == "null";
 }
-int jValue::as_int() {
-    stringstream ss;
-    ss << svalue;
-    int k;
-    ss >> k;
-    return k;
+int jValue::as_int() const {
+    return (int)strtol(svalue.c_str(), NULL, 10);
 }
-double jValue::as_double() {
-    stringstream ss;
-    ss << svalue;
-    double k;
-    ss >> k;
-    return k;
+double jValue::as_double() const {
+    return strtod(svalue.c_str(), NULL);
 }
-long int jValue::as_long() {
-    stringstream ss;
-    ss << svalue;
-    long int k;
-    ss >> k;
-    return k;
+long int jValue::as_long() const {
+    return strtol(svalue.c_str(), NULL, 10);
 }
-bool jValue::as_bool() {
+bool jValue::as_bool() const {
     if (svalue == "true") return true;
     return false;
 }
-void* jValue::as_null() {
+void* jValue::as_null() const {
     return NULL;
 }
-string jValue::as_string() {
+string jValue::as_string() const {
     return deserialize(svalue);
 }
-int jValue::size() {
+int jValue::size() const {
     if (type == JARRAY) {
         return (int)arr.size();
     }
@@ -152,198 +147,152 @@ int jValue::size() {
     }
     return 0;
 }
-jValue jValue::operator[](int i) {
-    if (type == JARRAY) {
+
+static const jValue undefined;
+
+const jValue& jValue::operator[](int i) const {
+    if (type == JARRAY && i >= 0 && i < (int)arr.size()) {
         return arr[i];
     }
-    if (type == JOBJECT) {
+    if (type == JOBJECT && i >= 0 && i < (int)properties.size()) {
         return properties[i].second;
     }
-    return jValue();
+    return undefined;
+}
+const jValue& jValue::operator[](const string& s) const {
+    map<string, size_t>::const_iterator it = mpindex.find(s);
+    if (it == mpindex.end()) return undefined;
+    return properties[it->second].second;
 }
-jValue jValue::operator[](string s) {
-    if (mpindex.find(s) == mpindex.end()) return jValue();
-    return properties[mpindex[s]].second;
+jValue::const_iterator jValue::begin() const {
+    return arr.begin();
+}
+jValue::const_iterator jValue::end() const {
+    return arr.end();
 }
 
-struct parser::token {
-    string value;
-    token_type type;
-    token(string value="",token_type type=UNKNOWN): value(value), type(type) {}
-};
 bool parser::is_whitespace(const char c) {
     return isspace(c);
 }
-int parser::next_whitespace(const string& source, int i) {
-    while (i < (int)source.length()) {
-        if (source[i] == '"') {
-            i++;
-            while (i < (int)source.length() && (source[i] != '"' || source[i-1] == '\\')) i++;
-        }
-        if (source[i] == '\'') {
-            i++;
-            while (i < (int)source.length() && (source[i] != '\'' || source[i-1] == '\\')) i++;
-        }
-        if (is_whitespace(source[i])) return i;
-        i++;
-    }
-    return (int)source.length();
+void parser::skip_whitespaces(const string& source, size_t& i) {
+    while (i < source.length() && is_whitespace(source[i])) i++;
 }
-int parser::skip_whitespaces(const string& source, int i) {
-    while (i < (int)source.length()) {
-        if (!is_whitespace(source[i])) return i;
+size_t parser::find_string_end(const string& source, size_t i) {
+    // i points to the opening quote, returns position of the closing one (or the end of the source)
+    char quote = source[i++];
+    while (i < source.length() && source[i] != quote) {
+        if (source[i] == '\\') i++;
         i++;
     }
-    return -1;
+    return i < source.length() ? i : source.length();
+}
+bool parser::starts_with(const string& source, size_t i, const char* literal) {
+    return source.compare(i, strlen(literal), literal) == 0;
 }
 
-vector<parser::token> parser::tokenize(string source) {
-    source += " ";
-    vector<token> tokens;
-    int index = skip_whitespaces(source, 0);
-    while (index >= 0) {
-        int next = next_whitespace(source, index);
-        string str = source.substr(index, next-index);
-
-        size_t k = 0;
-        while (k < str.length()) {
-            if (str[k] == '"') {
-                size_t tmp_k = k+1;
-                while (tmp_k < str.length() && (str[tmp_k] != '"' || str[tmp_k-1] == '\\')) tmp_k++;
-                tokens.push_back(token(str.substr(k+1, tmp_k-k-1), STRING));
-                k = tmp_k+1;
-                continue;
-            }
-            if (str[k] == '\'') {
-                size_t tmp_k = k+1;
-                while (tmp_k < str.length() && (str[tmp_k] != '\'' || str[tmp_k-1] == '\\')) tmp_k++;
-                tokens.push_back(token(str.substr(k+1, tmp_k-k-1), STRING));
-                k = tmp_k+1;
-                continue;
-            }
-            if (str[k] == ',') {
-                tokens.push_back(token(",", COMMA));
-                k++;
-                continue;
-            }
-            if (str[k] == 't' && k+3 < str.length() && str.substr(k, 4) == "true") {
-                tokens.push_back(token("true", BOOLEAN));
-                k += 4;
-                continue;
-            }
-            if (str[k] == 'f' && k+4 < str.length() && str.substr(k, 5) == "false") {
-                tokens.push_back(token("false", BOOLEAN));
-                k += 5;
-                continue;
-            }
-            if (str[k] == 'n' && k+3 < str.length() && str.substr(k, 4) == "null") {
-                tokens.push_back(token("null", NUL));
-                k += 4;
-                continue;
-            }
-            if (str[k] == '}') {
-                tokens.push_back(token("}", CROUSH_CLOSE));
-                k++;
-                continue;
+// parses the value starting at i in a single pass (without intermediate tokens), moves i past the value
+jValue parser::parse_value(const string& source, size_t& i) {
+    jValue current;
+    skip_whitespaces(source, i);
+    if (i >= source.length()) {
+        return current;
+    }
+    char c = source[i];
+    if (c == '{') {
+        current.set_type(JOBJECT);
+        i++;
+        while (true) {
+            skip_whitespaces(source, i);
+            if (i >= source.length()) break;
+            if (source[i] == '}') {
+                i++;
+                break;
             }
-            if (str[k] == '{') {
-                tokens.push_back(token("{", CROUSH_OPEN));
-                k++;
+            if (source[i] == ',') {
+                i++;
                 continue;
             }
-            if (str[k] == ']') {
-                tokens.push_back(token("]", BRACKET_CLOSE));
-                k++;
+            if (source[i] != '"' && source[i] != '\'') {
+                i++; // skip an unknown character
                 continue;
             }
-            if (str[k] == '[') {
-                tokens.push_back(token("[", BRACKET_OPEN));
-                k++;
-                continue;
+            size_t end = find_string_end(source, i);
+            string key = source.substr(i + 1, end - i - 1);
+            i = end + 1;
+            skip_whitespaces(source, i);
+            if (i < source.length() && source[i] == ':') i++;
+            current.add_property(std::move(key), parse_value(source, i));
+        }
+        return current;
+    }
+    if (c == '[') {
+        current.set_type(JARRAY);
+        i++;
+        while (true) {
+            skip_whitespaces(source, i);
+            if (i >= source.length()) break;
+            if (source[i] == ']') {
+                i++;
+                break;
             }
-            if (str[k] == ':') {
-                tokens.push_back(token(":", COLON));
-                k++;
+            if (source[i] == ',') {
+                i++;
                 continue;
             }
-            if (str[k] == '-' || (str[k] <= '9' && str[k] >= '0')) {
-                size_t tmp_k = k;
-                if (str[tmp_k] == '-') tmp_k++;
-                while (tmp_k < str.size() && ((str[tmp_k] <= '9' && str[tmp_k] >= '0') || str[tmp_k] == '.')) tmp_k++;
-                tokens.push_back(token(str.substr(k, tmp_k-k), NUMBER));
-                k = tmp_k;
+            size_t start = i;
+            jValue element = parse_value(source, i);
+            if (i == start) {
+                i++; // skip an unknown character
                 continue;
             }
-            tokens.push_back(token(str.substr(k), UNKNOWN));
-            k = str.length();
+            current.add_element(std::move(element));
         }
-
-        index = skip_whitespaces(source, next);
-    }
-    return tokens;
-}
-
-jValue parser::json_parse(const vector<token>& v, int i, int& r) {
-    jValue current;
-    if (v[i].type == CROUSH_OPEN) {
-        current.set_type(JOBJECT);
-        int k = i+1;
-        while (v[k].type != CROUSH_CLOSE) {
-            string key = v[k].value;
-            k+=2; // k+1 should be ':'
-            int j = k;
-            jValue vv = json_parse(v, k, j);
-            current.add_property(key, vv);
-            k = j;
-            if (v[k].type == COMMA) k++;
-        }
-        r = k+1;
         return current;
     }
-    if (v[i].type == BRACKET_OPEN) {
-        current.set_type(JARRAY);
-        int k = i+1;
-        while (v[k].type != BRACKET_CLOSE) {
-            int j = k;
-            jValue vv = json_parse(v, k, j);
-            current.add_element(vv);
-            k = j;
-            if (v[k].type == COMMA) k++;
-        }
-        r = k+1;
+    if (c == '"' || c == '\'') {
+        size_t end = find_string_end(source, i);
+        current.set_type(JSTRING);
+        current.set_string(source.substr(i + 1, end - i - 1));
+        i = end + 1;
         return current;
     }
-    if (v[i].type == NUMBER) {
+    if (c == '-' || (c <= '9' && c >= '0')) {
+        size_t start = i;
+        if (source[i] == '-') i++;
+        while (i < source.length() && ((source[i] <= '9' && source[i] >= '0') || source[i] == '.')) i++;
+        if (i < source.length() && (source[i] == 'e' || source[i] == 'E')) {
+            i++;
+            if (i < source.length() && (source[i] == '+' || source[i] == '-')) i++;
+            while (i < source.length() && source[i] <= '9' && source[i] >= '0') i++;
+        }
         current.set_type(JNUMBER);
-        current.set_string(v[i].value);
-        r = i+1;
+        current.set_string(source.substr(start, i - start));
         return current;
     }
-    if (v[i].type == STRING) {
-        current.set_type(JSTRING);
-        current.set_string(v[i].value);
-        r = i+1;
+    if (starts_with(source, i, "true")) {
+        current.set_type(JBOOLEAN);
+        current.set_string("true");
+        i += 4;
         return current;
     }
-    if (v[i].type == BOOLEAN) {
+    if (starts_with(source, i, "false")) {
         current.set_type(JBOOLEAN);
-        current.set_string(v[i].value);
-        r = i+1;
+        current.set_string("false");
+        i += 5;
         return current;
     }
-    if (v[i].type == NUL) {
+    if (starts_with(source, i, "null")) {
         current.set_type(JNULL);
         current.set_string("null");
-        r = i+1;
+        i += 4;
         return current;
     }
     return current;
 }
 
 jValue parser::parse(const string& str) {
-    int k;
-    const std::vector<token>& v = tokenize(str);
-    return json_parse(v, 0, k);
+    size_t i = 0;
+    return parse_value(str, i);
 }
 
 jValue parser::parse_file(const string& filename) {
@@ -19,43 +19,45 @@ namespace jute {
         std::vector<std::pair<std::string, jValue> > properties;
         std::map<std::string, size_t> mpindex;
         std::vector<jValue> arr;
-        std::string to_string_d(int);
+        void write(std::string& out) const;
     public:
+        typedef std::vector<jValue>::const_iterator const_iterator;
+
         jValue();
         jValue(jType);
-        std::string to_string();
-        jType get_type();
+        std::string to_string() const;
+        jType get_type() const;
         void set_type(jType);
         void add_property(std::string key, jValue v);
         void add_element(jValue v);
         void reduce_right();
         void set_string(std::string s);
-        bool is_null();
-        int as_int();
-        long int as_long();
-        double as_double();
-        bool as_bool();
-        void* as_null();
-        std::string as_string();
-        int size();
-        jValue operator[](int i);
-        jValue operator[](std::string s);
+        bool is_null() const;
+        int as_int() const;
+        long int as_long() const;
+        double as_double() const;
+        bool as_bool() const;
+        void* as_null() const;
+        std::string as_string() const;
+        int size() const;
+        // array elements (object properties by index), an undefined value is returned if there is no such element
+        const jValue& operator[](int i) const;
+        const jValue& operator[](const std::string& s) const;
+        // iteration over array elements
+        const_iterator begin() const;
+        const_iterator end() const;
     };
 
     class parser {
     private:
-        enum token_type {UNKNOWN, STRING, NUMBER, CROUSH_OPEN, CROUSH_CLOSE, BRACKET_OPEN, BRACKET_CLOSE, COMMA, COLON, BOOLEAN, NUL};
-
-        struct token;
         static bool is_whitespace(const char c);
-        static int next_whitespace(const std::string& source, int i);
-        static int skip_whitespaces(const std::string& source, int i);
-
-        static std::vector<token> tokenize(std::string source);
-        static jValue json_parse(const std::vector<token>& v, int i, int& r);
+        static void skip_whitespaces(const std::string& source, size_t& i);
+        static size_t find_string_end(const std::string& source, size_t i);
+        static bool starts_with(const std::string& source, size_t i, const char* literal);
+        static jValue parse_value(const std::string& source, size_t& i);
     public:
         static jValue parse(const std::string& str);
         static jValue parse_file(const std::string& str);
     };
 }
-#endif
\ No newline at end of file
+#endif
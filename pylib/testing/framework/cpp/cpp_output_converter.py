@@ -26,10 +26,8 @@ class CppOutputConverter(TypeConverter):
         src = render_template('''
             \tjute::jValue result;
             \tresult.set_type(jute::JARRAY);
-            \tjute::jValue prop;
             {% for converter in converters %}
-            \tprop = {{converter.fn_name}}(value.{{converter.prop_name}});
-            \tresult.add_element(prop);
+            \tresult.add_element({{converter.fn_name}}(value.{{converter.prop_name}}));
             {% endfor %}
             \treturn result;
             ''', type_name=type_name, converters=converters)
@@ -81,7 +79,6 @@ class CppOutputConverter(TypeConverter):
         src = render_template('''
             \tjute::jValue result;
             \tresult.set_type(jute::JARRAY);
-            \tjute::jValue prop;
             \tfor (auto const& x :value) {
             \t\tresult.add_element({{converters[0].fn_name}}(x.first));
             \t\tresult.add_element({{converters[1].fn_name}}(x.second));
@@ -198,26 +195,22 @@ class CppOutputConverter(TypeConverter):
         src = render_template('''
             jute::jValue result;
             result.set_type(jute::JARRAY);
-            queue<shared_ptr<BinaryTreeNode<{{child.arg_type}}>>> q;
-            set<shared_ptr<BinaryTreeNode<{{child.arg_type}}>>> visited;
-            q.push(value);
-            while (!q.empty()) {
-            \tshared_ptr<BinaryTreeNode<{{child.arg_type}}>> node = q.front();
-            \tq.pop();
-            \tif (node != nullptr) {
-            \t\tvisited.insert(node);
-            \t\tresult.add_element({{child.fn_name}}(node->data));
-            \t\tif (node->left != nullptr && visited.count(node->left) == 0) {
-            \t\t\tq.push(node->left);
-            \t\t}
-            \t\tif (node->right != nullptr && visited.count(node->right) == 0) {
-            \t\t\tq.push(node->right);
-            \t\t}
+            if (value == nullptr) {
+            \treturn result;
+            }
+            vector<shared_ptr<BinaryTreeNode<{{child.arg_type}}>>> q;
+            unordered_set<BinaryTreeNode<{{child.arg_type}}>*> visited;
+            q.push_back(value);
+            for (int i = 0; i < q.size(); i++) {
+            \tshared_ptr<BinaryTreeNode<{{child.arg_type}}>> node = q[i];
+            \tif (node == nullptr || !visited.insert(node.get()).second) {
+            \t\tresult.add_element(jute::jValue(jute::JNULL));
             \t} else {
-            \t\tjute::jValue empty(jute::JNULL);
-            \t\tresult.add_element(empty);
+            \t\tresult.add_element({{child.fn_name}}(node->data));
+            \t\tq.push_back(node->left);
+            \t\tq.push_back(node->right);
             \t}
-            } 
+            }
             result.reduce_right();
             return result;''', child=child)
         return ConverterFn(node.name, src, 'shared_ptr<BinaryTreeNode<' + child.arg_type + '>>', 'jute::jValue')
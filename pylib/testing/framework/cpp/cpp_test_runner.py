@@ -3,9 +3,20 @@
 """
 C++ Test Runner API Implementation
 """
+import os
+from glob import glob
+from typing import Callable, Dict, List, Optional
+
+from testing.framework.compile_cache import hash_key
+from testing.framework.cpp.cpp_test_suite_gen import HEADERS
 from testing.framework.string_utils import get_line_number_prefix
-from testing.framework.test_runner import TestRunner
-from testing.framework.types import SrcFile
+from testing.framework.test_runner import TestRunner, get_toolchain_version
+from testing.framework.types import Command, SrcFile
+
+JUTE_SOURCES = ['jute.h', 'jute.cpp']
+JUTE_OBJECT = 'jute.o'
+PCH_HEADER = 'pch.h'
+CPP_MEMORY_OVERHEAD_MB = 32
 
 
 class CppTestRunner(TestRunner):
@@ -19,34 +30,182 @@ class CppTestRunner(TestRunner):
         """
         return 'main.cpp'
 
-    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Command:
         """
         Builds a C++ execute command.
 
         :param src_file: target source file containing a test suite
         :param resource_path: AnkiCode resource path
         :param is_win: True - if windows, False - if Unix/MacOS
-        :return: shell command to execute a test suite
+        :return: command to execute a test suite
         """
-        return f'{src_file.file.name}.run'
+        return Command([f'{src_file.path}.run'])
 
-    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Optional[Command]:
         """
-        Builds a C++ compile command.
+        Builds a C++ compile command, which uses the precompiled header and links the prebuilt jute object
+        (if they are available).
 
         :param src_file: target source file containing a test suite
         :param resource_path: AnkiCode resource path
         :param is_win: True - if windows, False - if Unix/MacOS
-        :return: shell command to compile a source file
+        :return: command to compile a source file
         """
-        libs_path = f'{resource_path}/cpp_lib'
+        jute_object = self.get_jute_object(resource_path, is_win)
+        libs = [jute_object] if jute_object is not None else \
+            sorted(glob(os.path.join(resource_path, 'cpp_lib', '*.cpp')))
+        compiler = self.get_compiler(resource_path, is_win)
+        args = self.get_pch_flags(resource_path, is_win) + libs + [src_file.path]
         if is_win:
-            return f'{resource_path}/libs/cpp/bin/g++.exe {libs_path}/*.cpp {src_file.file.name} ' + \
-                   f'-I {resource_path} -liconv -static -std=c++11 -o {src_file.file.name}.run'
+            return Command([compiler] + args +
+                           ['-I', resource_path, '-liconv', '-static', '-std=c++11', '-o', f'{src_file.path}.run'])
         else:
-            return f'export CPATH={resource_path}/libs/cpp/headers:{resource_path} &&' + \
-                   f'{resource_path}/libs/cpp/bin/clang++ -Werror=return-type -std=c++14 -pedantic ' + \
-                   f'{libs_path}/*.cpp {src_file.file.name} -o {src_file.file.name}.run'
+            return Command([compiler, '-Werror=return-type', '-std=c++14', '-pedantic'] + args +
+                           ['-o', f'{src_file.path}.run'], self.get_compiler_env(resource_path))
+
+    def get_memory_overhead_mb(self) -> Optional[int]:
+        """
+        :return: address space of the C++ runtime
+        """
+        return CPP_MEMORY_OVERHEAD_MB
+
+    def get_toolchain_version_cmd(self, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :return: command printing the C++ compiler's version
+        """
+        return Command([self.get_compiler(resource_path, is_win), '--version'])
+
+    @staticmethod
+    def get_compiler(resource_path: str, is_win: bool) -> str:
+        """
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :return: path of the bundled C++ compiler
+        """
+        return os.path.join(resource_path, 'libs', 'cpp', 'bin', 'g++.exe' if is_win else 'clang++')
+
+    @staticmethod
+    def get_compiler_env(resource_path: str) -> Dict[str, str]:
+        """
+        :param resource_path: AnkiCode resource path
+        :return: environment variables of the bundled clang: include paths of the bundled headers and libraries
+        """
+        return {'CPATH': f'{os.path.join(resource_path, "libs", "cpp", "headers")}:{resource_path}'}
+
+    def get_lib_compile_cmd(self, resource_path: str, is_win: bool, args: List[str]) -> Command:
+        """
+        Builds a command, which compiles a library (an object file or a precompiled header)
+        with the same options as test suites.
+
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :param args: compiler's input and output arguments
+        :return: command to compile a library
+        """
+        if is_win:
+            return Command([self.get_compiler(resource_path, is_win), '-I', resource_path, '-std=c++11'] + args)
+        else:
+            return Command([self.get_compiler(resource_path, is_win), '-std=c++14', '-pedantic'] + args,
+                           self.get_compiler_env(resource_path))
+
+    def get_jute_object(self, resource_path: str, is_win: bool) -> Optional[str]:
+        """
+        Returns the jute library's object file, it's built (with optimizations) on the first use
+        and rebuilt when the library's sources or the toolchain change.
+
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :return: path of the object file or None if it cannot be built
+        """
+        path = self.get_prebuilt_lib(resource_path, is_win, {}, [JUTE_OBJECT],
+                                     lambda build_dir: ['-O2', '-c', os.path.join(resource_path, 'cpp_lib', 'jute.cpp'),
+                                                        '-o', os.path.join(build_dir, JUTE_OBJECT)])
+        return os.path.join(path, JUTE_OBJECT) if path is not None else None
+
+    def get_pch_flags(self, resource_path: str, is_win: bool) -> List[str]:
+        """
+        Returns compiler flags, which make a test suite use the precompiled header of the headers included by every
+        test suite. The header is built on the first use and rebuilt when the headers or the toolchain change.
+
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :return: compiler flags or an empty list if the header cannot be built
+        """
+        version = get_toolchain_version(self.get_toolchain_version_cmd(resource_path, is_win))
+        if version is None:
+            return []
+        is_clang = 'clang version' in version
+        pch_file = PCH_HEADER + ('.pch' if is_clang else '.gch')
+        header_src = ''.join(f'#include {header}\n' for header in HEADERS)
+        path = self.get_prebuilt_lib(resource_path, is_win, {PCH_HEADER: header_src}, [PCH_HEADER, pch_file],
+                                     lambda build_dir: ['-x', 'c++-header', os.path.join(build_dir, PCH_HEADER),
+                                                        '-o', os.path.join(build_dir, pch_file)])
+        if path is None:
+            return []
+        if is_clang:
+            return ['-include-pch', os.path.join(path, pch_file)]
+        # GCC picks up the precompiled header placed next to the included one
+        return ['-include', os.path.join(path, PCH_HEADER)]
+
+    def get_prebuilt_lib(self, resource_path: str, is_win: bool, sources: Dict[str, str], outputs: List[str],
+                         get_args: Callable[[str], List[str]]) -> Optional[str]:
+        """
+        Returns a library's directory from the compile cache, the library is built on a cache miss.
+        The cache key depends on the library's sources, the jute library's sources, the bundled headers
+        and the toolchain, so the library is rebuilt when any of them changes.
+
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :param sources: files to be created in the build directory, file name -> content
+        :param outputs: files to be stored in the cache
+        :param get_args: returns the compiler's input and output arguments for a build directory
+        :return: library's directory or None if the library cannot be built
+        """
+        version = get_toolchain_version(self.get_toolchain_version_cmd(resource_path, is_win))
+        if version is None:
+            return None
+        try:
+            key_parts = [version, str(self.get_lib_compile_cmd(resource_path, is_win, get_args('')))]
+            for name in JUTE_SOURCES:
+                with open(os.path.join(resource_path, 'cpp_lib', name)) as f:
+                    key_parts.append(f.read())
+            headers_path = os.path.join(resource_path, 'libs', 'cpp', 'headers')
+            if os.path.exists(headers_path):
+                key_parts.append(str(os.path.getmtime(headers_path)))
+        except OSError:
+            return None
+        for name, content in sorted(sources.items()):
+            key_parts += [name, content]
+        key = hash_key(*key_parts)
+        path = self.compile_cache.get(key)
+        if path is not None:
+            return path
+        return self.compile_cache.build(key, lambda build_dir: self.build_lib(resource_path, is_win, sources, outputs,
+                                                                             get_args, build_dir))
+
+    def build_lib(self, resource_path: str, is_win: bool, sources: Dict[str, str], outputs: List[str],
+                  get_args: Callable[[str], List[str]], build_dir: str) -> bool:
+        """
+        Builds a library in its final directory, as clang's precompiled header references the header it's built from
+
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :param sources: files to be created in the build directory, file name -> content
+        :param outputs: files to be built
+        :param get_args: returns the compiler's input and output arguments for a build directory
+        :param build_dir: build directory
+        :return: True if the library has been built
+        """
+        for name, content in sources.items():
+            with open(os.path.join(build_dir, name), 'w') as f:
+                f.write(content)
+        cmd = self.get_lib_compile_cmd(resource_path, is_win, get_args(build_dir))
+        proc = self.backend.start(cmd)
+        proc.communicate()
+        self.backend.release(proc)
+        return proc.returncode == 0 and all(os.path.exists(os.path.join(build_dir, name)) for name in outputs)
 
     def get_error_message(self, error: str, file_name: str, code_offset: int) -> str:
         """
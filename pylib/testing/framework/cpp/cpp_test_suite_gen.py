@@ -10,6 +10,27 @@ from testing.framework.string_utils import render_template
 from testing.framework.test_suite_gen import TestSuiteGenerator, TestSuiteConverters
 from testing.framework.types import TestSuite
 
+# headers included by every test suite, the C++ runner precompiles them
+HEADERS = [
+    '<vector>',
+    '<array>',
+    '"cpp_lib/jute.h"',
+    '<functional>',
+    '<stdexcept>',
+    '<string>',
+    '<chrono>',
+    '<ctime>',
+    '<queue>',
+    '<set>',
+    '<unordered_set>',
+    '<memory>',
+    '<cstdlib>'
+]
+# peak RSS is reported on Unix only
+UNIX_HEADERS = [
+    '<sys/resource.h>'
+]
+
 
 class CppTestSuiteGenerator(TestSuiteGenerator):
     """
@@ -23,17 +44,9 @@ class CppTestSuiteGenerator(TestSuiteGenerator):
         """
         :return: string containing C++ includes
         """
-        return '''
-            \t#include <vector>
-            \t#include <array>
-            \t#include "cpp_lib/jute.h"
-            \t#include <functional>
-            \t#include <stdexcept>
-            \t#include <string>
-            \t#include <chrono>
-            \t#include <queue> 
-            \t#include <set>
-            \tusing namespace std;'''
+        return '\n' + '\n'.join(f'#include {header}' for header in HEADERS) + \
+            '\n#ifndef _WIN32\n' + '\n'.join(f'#include {header}' for header in UNIX_HEADERS) + '\n#endif' + \
+            '\nusing namespace std;'
 
     def get_testing_src(self, ts: TestSuite, converters: TestSuiteConverters, solution_src: str):
         """
@@ -50,28 +63,96 @@ class CppTestSuiteGenerator(TestSuiteGenerator):
                     {{c.src}}
                 }
             {% endfor %}
+            long long get_elapsed_ns(std::chrono::steady_clock::time_point start,
+            \tstd::chrono::steady_clock::time_point end) {
+            \treturn std::chrono::duration_cast<std::chrono::nanoseconds>(end - start).count();
+            }
+            long long get_peak_rss_kb() {
+            #ifdef _WIN32
+            \treturn -1;
+            #else
+            \tstruct rusage usage;
+            \tgetrusage(RUSAGE_SELF, &usage);
+            #ifdef __APPLE__
+            \treturn usage.ru_maxrss / 1024;
+            #else
+            \treturn usage.ru_maxrss;
+            #endif
+            #endif
+            }
             int main() {
             \tSolution solution;
             \tstd::string buf;
-            \twhile (true) {
-            \t\tstd::getline(std::cin, buf);
+            \tint index = 0;
+            \tconst char* profile_env = std::getenv("ANKICODE_PROFILE");
+            \tbool profile = profile_env != nullptr && std::string(profile_env) == "1";
+            \tconst char* bench_reps_env = std::getenv("ANKICODE_BENCHMARK_REPS");
+            \tint bench_reps = bench_reps_env != nullptr ? std::atoi(bench_reps_env) : 0;
+            \tconst char* bench_warmup_env = std::getenv("ANKICODE_BENCHMARK_WARMUP");
+            \tint bench_warmup = bench_warmup_env != nullptr ? std::atoi(bench_warmup_env) : 0;
+            \twhile (std::getline(std::cin, buf) && !buf.empty()) {
+            \t\tauto parse_started = std::chrono::steady_clock::now();
             \t\tjute::jValue row = jute::parser::parse(buf);
-            \t\tauto started = std::chrono::high_resolution_clock::now();
+            \t\tauto convert_in_started = std::chrono::steady_clock::now();
+                {% for converter in converters.args %}
+                    \t\t{{converter.ret_type}} arg{{loop.index0}} = {{converter.fn_name}}(row[{{loop.index0}}]);
+                {% endfor %}
+            \t\tauto started = std::chrono::steady_clock::now();
+            \t\tstd::clock_t started_cpu = std::clock();
             \t\t{{converters.result.ret_type}} result = solution.{{ts.fn_name}}(
                 {% for converter in converters.args %}
-                    \t\t{{converter.fn_name}}(row[{{loop.index0}}]){% if not loop.last %}, {% endif %}
+                    \t\targ{{loop.index0}}{% if not loop.last %}, {% endif %}
                 {% endfor %});
-            \t\tauto done = std::chrono::high_resolution_clock::now();
+            \t\tstd::clock_t done_cpu = std::clock();
+            \t\tauto done = std::chrono::steady_clock::now();
+            \t\tauto convert_out_started = std::chrono::steady_clock::now();
             \t\tjute::jValue json_result = {{converters.output.fn_name}}(result);
+            \t\tauto serialize_started = std::chrono::steady_clock::now();
             \t\tjute::jValue response;
             \t\tresponse.set_type(jute::JOBJECT);
-            \t\tresponse.add_property("result", json_result);
-            \t\tjute::jValue duration;
-            \t\tduration.set_type(jute::JNUMBER);
-            \t\tduration.set_string(
-                std::to_string(std::chrono::duration_cast<std::chrono::milliseconds>(done-started).count()));
-            \t\tresponse.add_property("duration", duration);
-            \t\tstd::cout << response.to_string() << endl;
+            \t\tjute::jValue response_index;
+            \t\tresponse_index.set_type(jute::JNUMBER);
+            \t\tresponse_index.set_string(std::to_string(index++));
+            \t\tresponse.add_property("index", std::move(response_index));
+            \t\tresponse.add_property("result", std::move(json_result));
+            \t\tjute::jValue duration_ns;
+            \t\tduration_ns.set_type(jute::JNUMBER);
+            \t\tduration_ns.set_string(std::to_string(get_elapsed_ns(started, done)));
+            \t\tresponse.add_property("duration_ns", std::move(duration_ns));
+            \t\tjute::jValue cpu_ns;
+            \t\tcpu_ns.set_type(jute::JNUMBER);
+            \t\tcpu_ns.set_string(std::to_string((long long) ((done_cpu - started_cpu) * (1e9 / CLOCKS_PER_SEC))));
+            \t\tresponse.add_property("cpu_ns", std::move(cpu_ns));
+            \t\tstd::string payload = response.to_string();
+            \t\tif (profile) {
+            \t\t\tlong long peak_rss_kb = get_peak_rss_kb();
+            \t\t\tpayload.pop_back();
+            \t\t\tpayload += ",\\"profile\\":{\\"parse_ns\\":" + std::to_string(get_elapsed_ns(parse_started, convert_in_started)) +
+            \t\t\t\t",\\"convert_in_ns\\":" + std::to_string(get_elapsed_ns(convert_in_started, started)) +
+            \t\t\t\t",\\"convert_out_ns\\":" + std::to_string(get_elapsed_ns(convert_out_started, serialize_started)) +
+            \t\t\t\t",\\"serialize_ns\\":" + std::to_string(get_elapsed_ns(serialize_started, std::chrono::steady_clock::now())) +
+            \t\t\t\t",\\"peak_rss_kb\\":" + (peak_rss_kb < 0 ? std::string("null") : std::to_string(peak_rss_kb)) + "}}";
+            \t\t}
+            \t\tif (bench_reps > 0) {
+            \t\t\tstd::string bench_ns;
+            \t\t\tfor (int rep = 0; rep < bench_warmup + bench_reps; rep++) {
+                {% for converter in converters.args %}
+                    \t\t\t\t{{converter.ret_type}} bench_arg{{loop.index0}} = {{converter.fn_name}}(row[{{loop.index0}}]);
+                {% endfor %}
+            \t\t\t\tauto bench_started = std::chrono::steady_clock::now();
+            \t\t\t\tsolution.{{ts.fn_name}}(
+                {% for converter in converters.args %}
+                    \t\t\t\tbench_arg{{loop.index0}}{% if not loop.last %}, {% endif %}
+                {% endfor %});
+            \t\t\t\tlong long elapsed_ns = get_elapsed_ns(bench_started, std::chrono::steady_clock::now());
+            \t\t\t\tif (rep >= bench_warmup) {
+            \t\t\t\t\tbench_ns += (bench_ns.empty() ? "" : ",") + std::to_string(elapsed_ns);
+            \t\t\t\t}
+            \t\t\t}
+            \t\t\tpayload.pop_back();
+            \t\t\tpayload += ",\\"bench_ns\\":[" + bench_ns + "]}";
+            \t\t}
+            \t\tstd::cout << "\\x1e__ankicode_result__" << payload.size() << '\\n' << payload << endl;
             \t}
             \treturn 0;
             }''', ts=ts, src=solution_src, converters=converters)
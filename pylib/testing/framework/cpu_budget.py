@@ -0,0 +1,48 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+CPU Budget API
+
+Global budget of CPU cores shared by all test runs of the session, so that concurrent runs
+(or a run sharded across several processes) don't oversubscribe the machine.
+"""
+
+import os
+import threading
+
+
+class CpuBudget:
+    """
+    Counts cores taken by running test suites, a run always gets at least one core,
+    so that it's never blocked by other runs
+    """
+
+    def __init__(self, cpus: int = os.cpu_count() or 1):
+        """
+        :param cpus: total number of cores
+        """
+        self.cpus = cpus
+        self.available = cpus
+        self.lock = threading.Lock()
+
+    def acquire(self, wanted: int) -> int:
+        """
+        Takes cores from the budget
+        :param wanted: number of cores wanted
+        :return: number of cores granted, from 1 to wanted
+        """
+        with self.lock:
+            granted = max(1, min(wanted, self.available))
+            self.available -= granted
+            return granted
+
+    def release(self, count: int):
+        """
+        Returns cores to the budget
+        :param count: number of cores granted by acquire
+        """
+        with self.lock:
+            self.available += count
+
+
+cpu_budget = CpuBudget()
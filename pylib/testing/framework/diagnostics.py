@@ -0,0 +1,197 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Diagnostics API
+
+Parses compilers' output (gcc, clang, javac) into structured diagnostics: location, severity and message.
+Output is parsed while the compiler is running, once the limits are reached the rest of the output is dropped,
+so that huge outputs (e.g. template instantiation errors) neither slow the parsing down nor flood the console.
+Line numbers in the solution's file are relative to the solution's first line (see SrcFile.code_offset).
+"""
+
+import html
+import os
+import re
+from typing import List, Optional
+
+from testing.framework.io_utils import LineSplitter
+
+ERROR = 'error'
+WARNING = 'warning'
+NOTE = 'note'
+# <file>:<line>[:<column>]: <severity>: <message>
+DIAGNOSTIC = re.compile(r'^(?P<file>.+?):(?P<line>\d+):(?:(?P<column>\d+):)? '
+                        r'(?P<severity>fatal error|error|warning|note): (?P<message>.*)$')
+# lines, which don't carry any information: headers of the diagnostics' scope and summaries
+NOISE = re.compile(r'^(?:In file included from |\s+from |[^:\s]+: In |Note: |\d+ (?:error|warning)s?$)')
+# source excerpt's line: <line number> | <source>
+EXCERPT = re.compile(r'^(\s*)(\d+)( \| .*)$')
+MAX_ERRORS = 10
+MAX_CONTEXT_LINES = 8  # source excerpt and notes kept per error
+MAX_OUTPUT_CHARS = 16 * 1024
+
+
+class Diagnostic:
+    """
+    Compiler's message about a location in the source
+    """
+
+    def __init__(self, line: Optional[int], column: Optional[int], severity: str, message: str,
+                 file: Optional[str] = None):
+        """
+        :param line: line number, relative to the solution's first line if it's in the solution's file
+        :param column: column number, None - if it's not reported
+        :param severity: one of ERROR, WARNING, NOTE
+        :param message: compiler's message
+        :param file: file's name, None - if it's the solution's file
+        """
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.message = message
+        self.file = file
+        self.context: List[str] = []
+
+    def __eq__(self, other):
+        return isinstance(other, Diagnostic) and self.__dict__ == other.__dict__
+
+    def __repr__(self):
+        return f'Diagnostic({self.to_text()!r})'
+
+    def to_text(self) -> str:
+        """
+        :return: the diagnostic's first line: [file:][line:[column:]] severity: message
+        """
+        location = ''
+        if self.line is not None:
+            location = f'{self.line}:' + (f'{self.column}:' if self.column is not None else '') + ' '
+        if self.file is not None:
+            location = f'{self.file}:{location}'
+        return f'{location}{self.severity}: {self.message}'
+
+
+class DiagnosticParser:
+    """
+    Streaming parser of a compiler's STDERR. Warnings (and their notes) are dropped, errors are kept
+    with their context lines, lines which don't belong to any diagnostic (e.g. linker errors) are kept as is
+    """
+
+    def __init__(self, src_file_name: str, code_offset: int, max_errors: int = MAX_ERRORS,
+                 max_chars: int = MAX_OUTPUT_CHARS):
+        """
+        :param src_file_name: name of the solution's file
+        :param code_offset: number of lines, which precede the solution in its file
+        :param max_errors: max number of errors kept
+        :param max_chars: max number of characters kept
+        """
+        self.src_file_name = src_file_name
+        self.code_offset = code_offset
+        self.max_errors = max_errors
+        self.max_chars = max_chars
+        self.diagnostics: List[Diagnostic] = []
+        self.other: List[str] = []
+        self.current: Optional[Diagnostic] = None
+        self.skipping = False
+        self.in_src_file = False  # if the last diagnostic's or note's location is in the solution's file
+        self.chars = 0
+        self.truncated = False
+        self.lines = LineSplitter()
+
+    def feed(self, data: bytes) -> bool:
+        """
+        Parses the next chunk of the output
+        :param data: chunk of bytes
+        :return: True - if the limits are reached, the rest of the output can be dropped
+        """
+        if self.truncated:
+            return True
+        for line in self.lines.feed(data):
+            self.parse_line(line.decode('utf-8', 'replace').rstrip('\r\n'))
+            if self.truncated:
+                break
+        return self.truncated
+
+    def flush(self):
+        """
+        Parses the output's last incomplete line
+        """
+        rest = self.lines.flush()
+        if rest and not self.truncated:
+            self.parse_line(rest.decode('utf-8', 'replace').rstrip('\r\n'))
+
+    def parse_line(self, line: str):
+        """
+        :param line: output's line without new-line
+        """
+        if not line.strip() or NOISE.match(line):
+            return
+        match = DIAGNOSTIC.match(line)
+        if match is not None:
+            severity = ERROR if match['severity'] == 'fatal error' else match['severity']
+            file = os.path.basename(match['file'])
+            self.in_src_file = file == self.src_file_name
+            if severity == NOTE:
+                if self.current is not None:
+                    self.add_context(line)
+                return
+            self.skipping = severity != ERROR
+            if self.skipping:
+                return
+            if len(self.diagnostics) >= self.max_errors:
+                self.truncated = True
+                return
+            line_number = int(match['line'])
+            if self.in_src_file:
+                file = None
+                line_number -= self.code_offset
+            self.current = Diagnostic(line_number if line_number > 0 else None,
+                                      int(match['column']) if match['column'] else None,
+                                      severity, match['message'], file)
+            self.diagnostics.append(self.current)
+            self.count_chars(line)
+        elif self.skipping:
+            return
+        elif self.current is not None:
+            self.add_context(line)
+        else:
+            self.other.append(line)
+            self.count_chars(line)
+
+    def add_context(self, line: str):
+        """
+        :param line: line, which belongs to the current diagnostic
+        """
+        if len(self.current.context) < MAX_CONTEXT_LINES and not self.skipping:
+            match = EXCERPT.match(line)
+            if match is not None and self.in_src_file:
+                number = str(int(match[2]) - self.code_offset)
+                line = match[1] + number.rjust(len(match[2])) + match[3]
+            self.current.context.append(line)
+            self.count_chars(line)
+
+    def count_chars(self, line: str):
+        """
+        :param line: kept line
+        """
+        self.chars += len(line)
+        if self.chars > self.max_chars:
+            self.truncated = True
+
+    def has_errors(self) -> bool:
+        """
+        :return: True - if the compiler has reported errors
+        """
+        return bool(self.diagnostics)
+
+    def to_html(self) -> str:
+        """
+        :return: kept diagnostics and lines, escaped to be displayed in the console
+        """
+        lines = []
+        for diagnostic in self.diagnostics:
+            lines.append(diagnostic.to_text())
+            lines += diagnostic.context
+        lines += self.other
+        if self.truncated:
+            lines.append('... compiler output is truncated')
+        return '<br>'.join(html.escape(line, quote=False) for line in lines)
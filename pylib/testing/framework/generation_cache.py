@@ -0,0 +1,57 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Generation Cache API
+
+Generated sources (solution templates, test suites' code surrounding the user's source) depend only on
+a card's signature, function name and description, so they are generated once per language and reused
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from testing.framework.syntax.syntax_tree import SyntaxTree
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+def get_generation_key(tree: SyntaxTree, *parts: str) -> Hashable:
+    """
+    :param tree: source syntax tree
+    :param parts: other strings which affect generated sources (function name, description)
+    :return: key identifying everything which affects generated sources
+    """
+    return (tree.to_string(),) + parts
+
+
+class GenerationCache:
+    """
+    LRU cache of generated sources, safe to be shared between threads
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        :param max_entries: max number of cached entries
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, generate: Callable[[], Any]) -> Any:
+        """
+        Looks up an entry, generates it if it's not cached
+        :param key: cache key
+        :param generate: function generating the entry
+        :return: cached or generated entry
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        value = generate()
+        with self.lock:
+            self.entries[key] = value
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
@@ -19,10 +19,16 @@ Example use:
 __all__ = (
     "pipe_non_blocking_set",
     "pipe_non_blocking_is_error_blocking",
-    "PortableBlockingIOError")
+    "PortableBlockingIOError",
+    "non_blocking_readlines",
+    "PipeReader",
+    "LineSplitter",
+    "FrameSplitter")
 
 import os
 import sys
+import time
+from typing import List, Optional, Tuple
 
 if sys.platform.startswith("win32"):
     def pipe_non_blocking_set(fd):
@@ -145,3 +151,211 @@ def non_blocking_readlines(f, chunk=1024):
             data = data[n + 1:]
             blocks.clear()
         blocks.append(data)
+
+
+class PipeReader:
+    """
+    Multiplexes reading from several pipes (usually STDOUT and STDERR of a child process).
+
+    On Unix it is backed by selectors, so that a reader wakes up exactly when the child writes something.
+    On Windows selectors don't support pipes, so it falls back to non-blocking reads with a short polling interval.
+
+    reader = PipeReader()
+    reader.register(process.stdout, 'out')
+    reader.register(process.stderr, 'err')
+
+    for key, data in reader.read(timeout=1):  # data is b'' when a pipe reached EOF
+        ...
+    """
+
+    POLL_INTERVAL_SEC = 0.005
+
+    def __init__(self, use_polling: bool = sys.platform.startswith("win32"), chunk: int = 65536):
+        self.use_polling = use_polling
+        self.chunk = chunk
+        self.keys = {}
+        self.selector = None
+        if not use_polling:
+            import selectors
+            self.selector = selectors.DefaultSelector()
+
+    def register(self, f, key):
+        """
+        Starts listening to a pipe
+        :param f: target pipe
+        :param key: key which will be returned together with the pipe's data
+        """
+        fd = f.fileno()
+        pipe_non_blocking_set(fd)
+        self.keys[fd] = key
+        if self.selector is not None:
+            import selectors
+            self.selector.register(fd, selectors.EVENT_READ, key)
+
+    def unregister(self, fd: int):
+        """
+        Stops listening to a pipe
+        :param fd: target file descriptor
+        """
+        if fd in self.keys:
+            del self.keys[fd]
+            if self.selector is not None:
+                self.selector.unregister(fd)
+
+    def is_empty(self) -> bool:
+        """
+        :return: True - if there are no pipes left to read from
+        """
+        return not self.keys
+
+    def read(self, timeout: float = None):
+        """
+        Waits until at least one of the pipes has data (or timeout has expired) and reads from it.
+        Pipes which reached EOF are returned with b'' data and unregistered.
+        :param timeout: max time in seconds to wait for data, None - wait infinitely
+        :return: list of tuples - pipe's key, data
+        """
+        if self.selector is not None:
+            ready = [key.fd for key, _ in self.selector.select(timeout)] if self.keys else []
+        else:
+            ready = list(self.keys.keys())
+        result = []
+        for fd in ready:
+            try:
+                data = os.read(fd, self.chunk)
+            except PortableBlockingIOError as ex:
+                if not pipe_non_blocking_is_error_blocking(ex):
+                    raise ex
+                continue
+            except OSError:
+                data = b''
+            result.append((self.keys[fd], data))
+            if not data:
+                self.unregister(fd)
+        if self.selector is None and not result and timeout != 0:
+            time.sleep(self.POLL_INTERVAL_SEC if timeout is None else min(timeout, self.POLL_INTERVAL_SEC))
+        return result
+
+    def close(self):
+        """
+        Releases resources held by the reader
+        """
+        for fd in list(self.keys.keys()):
+            self.unregister(fd)
+        if self.selector is not None:
+            self.selector.close()
+
+
+class LineSplitter:
+    """
+    Accumulates chunks of bytes and splits them into complete lines
+    """
+
+    def __init__(self):
+        self.blocks = []
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Appends data to the buffer
+        :param data: next chunk of bytes
+        :return: list of complete lines (including trailing new-line) found so far
+        """
+        lines = []
+        start = 0
+        n = data.find(b'\n')
+        while n != -1:
+            lines.append(b''.join(self.blocks) + data[start:n + 1])
+            self.blocks.clear()
+            start = n + 1
+            n = data.find(b'\n', start)
+        if start < len(data):
+            self.blocks.append(data[start:])
+        return lines
+
+    def flush(self) -> bytes:
+        """
+        :return: incomplete line remaining in the buffer
+        """
+        rest = b''.join(self.blocks)
+        self.blocks.clear()
+        return rest
+
+
+class FrameSplitter:
+    """
+    Splits a stream of bytes into text and length-prefixed frames, a frame looks like:
+        <marker><payload length in bytes>\n<payload>\n
+    Text is returned as soon as it arrives, every byte of the stream is scanned only once
+    """
+
+    MAX_HEADER_LENGTH = 20
+
+    def __init__(self, marker: bytes):
+        self.marker = marker
+        self.buf = bytearray()
+        self.frame_length: Optional[int] = None
+        self.after_frame = False
+
+    def feed(self, data: bytes) -> List[Tuple[bool, bytes]]:
+        """
+        Appends data to the buffer
+        :param data: next chunk of bytes
+        :return: list of tuples - True and a frame's payload or False and a chunk of text
+        """
+        self.buf += data
+        items = []
+        pos = 0
+        while pos < len(self.buf):
+            if self.frame_length is not None:
+                if len(self.buf) - pos < self.frame_length:
+                    break
+                items.append((True, bytes(self.buf[pos:pos + self.frame_length])))
+                pos += self.frame_length
+                self.frame_length = None
+                self.after_frame = True
+                continue
+            if self.after_frame:
+                # a frame is followed by a new-line, which can be translated into \r\n by the runtime
+                if self.buf[pos] == ord('\r'):
+                    pos += 1
+                    continue
+                if self.buf[pos] == ord('\n'):
+                    pos += 1
+                self.after_frame = False
+                continue
+            start = self.buf.find(self.marker, pos)
+            if start == -1:
+                # keep a tail, which can be the beginning of a marker
+                end = self.buf.find(self.marker[:1], max(pos, len(self.buf) - len(self.marker) + 1))
+                end = len(self.buf) if end == -1 else end
+                if end > pos:
+                    items.append((False, bytes(self.buf[pos:end])))
+                pos = end
+                break
+            if start > pos:
+                items.append((False, bytes(self.buf[pos:start])))
+                pos = start
+            header_start = start + len(self.marker)
+            header_end = self.buf.find(b'\n', header_start, header_start + self.MAX_HEADER_LENGTH)
+            if header_end == -1 and len(self.buf) - header_start < self.MAX_HEADER_LENGTH:
+                break
+            header = bytes(self.buf[header_start:header_end]).strip() if header_end != -1 else b''
+            if not header.isdigit():
+                # not a frame, the marker is a part of the text
+                items.append((False, bytes(self.buf[start:header_start])))
+                pos = header_start
+                continue
+            self.frame_length = int(header)
+            pos = header_end + 1
+        del self.buf[:pos]
+        return items
+
+    def flush(self) -> bytes:
+        """
+        :return: text remaining in the buffer, an incomplete frame is returned as text
+        """
+        rest = bytes(self.buf)
+        self.buf.clear()
+        self.frame_length = None
+        self.after_frame = False
+        return rest
@@ -192,28 +192,24 @@ class JavaInputConverter(TypeConverter):
         """
         child: ConverterFn = self.render(node.first_child(), context)
         src = render_template('''
-            List<BinaryTreeNode<{{child.ret_type}}>> nodes = new ArrayList<>();
+            List<BinaryTreeNode<{{child.ret_type}}>> nodes = new ArrayList<>(value.size());
             for (JsonNode n : value) {
-            \tBinaryTreeNode<{{child.ret_type}}> node = new BinaryTreeNode<>();
             \tif (n.isNull()) {
-            \t\tnode = null;
+            \t\tnodes.add(null);
             \t} else {
-            \t\tnode.data = {{child.fn_name}}(n);
+            \t\tnodes.add(new BinaryTreeNode<>({{child.fn_name}}(n), null, null));
             \t}
-            \tnodes.add(node);
             }
-            Deque<BinaryTreeNode<{{child.ret_type}}>> children = new LinkedList<>(nodes);
-            BinaryTreeNode<{{child.ret_type}}> root = children.removeFirst();
-            for (BinaryTreeNode<{{child.ret_type}}> node : nodes) {
+            int child = 1;
+            for (int i = 0; i < nodes.size() && child < nodes.size(); i++) {
+            \tBinaryTreeNode<{{child.ret_type}}> node = nodes.get(i);
             \tif (node != null) {
-            \t\tif (!children.isEmpty()) {
-            \t\t\tnode.left = children.removeFirst();
-            \t\t}
-            \t\tif (!children.isEmpty()) {
-            \t\t\tnode.right = children.removeFirst();
+            \t\tnode.left = nodes.get(child++);
+            \t\tif (child < nodes.size()) {
+            \t\t\tnode.right = nodes.get(child++);
             \t\t}
             \t}
             }
-            return root;
+            return nodes.isEmpty() ? null : nodes.get(0);
         ''', child=child)
         return ConverterFn(node.name, src, 'JsonNode', 'BinaryTreeNode<' + child.ret_type + '>')
@@ -185,30 +185,24 @@ class JavaOutputConverter(TypeConverter):
         child = self.render(node.first_child(), context)
         src = render_template('''
             List<{{child.ret_type}}> result = new ArrayList<>();
-            Queue<BinaryTreeNode<{{child.arg_type}}>> queue = new LinkedList<>();
+            if (value == null) {
+            \treturn result;
+            }
+            List<BinaryTreeNode<{{child.arg_type}}>> queue = new ArrayList<>();
             Set<BinaryTreeNode<{{child.arg_type}}>> visited = new HashSet<>();
             queue.add(value);
-            while (!queue.isEmpty()) {
-            \tBinaryTreeNode<{{child.arg_type}}> node = queue.poll();
-            \tif (node != null) {
-            \t\tvisited.add(node);
-            \t\tresult.add({{child.fn_name}}(node.data));
-            \t\tif (node.left != null && !visited.contains(node.left)) {
-            \t\t\tqueue.add(node.left);
-            \t\t}
-            \t\tif (node.right != null && !visited.contains(node.right)) {
-            \t\t\tqueue.add(node.right);
-            \t\t}
-            \t} else {
+            for (int i = 0; i < queue.size(); i++) {
+            \tBinaryTreeNode<{{child.arg_type}}> node = queue.get(i);
+            \tif (node == null || !visited.add(node)) {
             \t\tresult.add(null);
-            \t}
-            }
-            for (int i = result.size() - 1; i > 0; i--) {
-            \tif (result.get(i) == null) {
-            \t\tresult.remove(i);
             \t} else {
-            \t\tbreak;
+            \t\tresult.add({{child.fn_name}}(node.data));
+            \t\tqueue.add(node.left);
+            \t\tqueue.add(node.right);
             \t}
             }
+            while (result.get(result.size() - 1) == null) {
+            \tresult.remove(result.size() - 1);
+            }
             return result;''', child=child)
         return ConverterFn(node.name, src, 'BinaryTreeNode<' + child.arg_type + '>', 'List<' + child.ret_type + '>')
@@ -3,9 +3,15 @@
 """
 Java Test Runner API Implementation
 """
+import os
+from typing import Optional, Tuple
+
+from testing.framework.java.java_worker import WORKER_FILE_NAME, WORKER_SRC
 from testing.framework.string_utils import get_line_number_prefix
 from testing.framework.test_runner import TestRunner
-from testing.framework.types import SrcFile
+from testing.framework.types import Command, SrcFile
+
+WORKER_CLASS_FILE = 'Worker.class'
 
 
 class JavaTestRunner(TestRunner):
@@ -25,30 +31,97 @@ class JavaTestRunner(TestRunner):
         """
         return 'Solution.java'
 
-    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Command:
         """
         Builds a java execute command.
 
         :param src_file: target source file containing a test suite
         :param resource_path: AnkiCode resource path
         :param is_win: True - if windows, False - if Unix/MacOS
-        :return: shell command to execute a test suite
+        :return: command to execute a test suite
         """
-        class_paths = (';' if is_win else ':').join([f'{resource_path}{path}' for path in self.LIBS] +
-                                                    [src_file.directory.name])
-        return f'{resource_path}/libs/jdk/bin/java -Xss10m -cp {class_paths} Runner'
+        return self.get_java_cmd(resource_path, is_win, src_file.directory.name, 'Runner')
 
-    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Optional[Command]:
         """
         Builds a java compile command.
 
         :param src_file: target source file containing a test suite
         :param resource_path: AnkiCode resource path
         :param is_win: True - if windows, False - if Unix/MacOS
-        :return: shell command to compile a source file
+        :return: command to compile a source file
+        """
+        return Command([self.get_jdk_tool(resource_path, is_win, 'javac'), '-cp',
+                        self.get_class_paths(resource_path, is_win), src_file.path])
+
+    def get_toolchain_version_cmd(self, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :return: command printing the java compiler's version
+        """
+        return Command([self.get_jdk_tool(resource_path, is_win, 'javac'), '-version'])
+
+    @staticmethod
+    def get_jdk_tool(resource_path: str, is_win: bool, name: str) -> str:
+        """
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :param name: tool's name
+        :return: path of the bundled JDK's tool
+        """
+        return os.path.join(resource_path, 'libs', 'jdk', 'bin', name + ('.exe' if is_win else ''))
+
+    def get_class_paths(self, resource_path: str, is_win: bool, *paths: str) -> str:
+        """
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :param paths: class paths to be added to the bundled libraries
+        :return: class path argument
+        """
+        return (';' if is_win else ':').join([f'{resource_path}{path}' for path in self.LIBS] + list(paths))
+
+    def get_java_cmd(self, resource_path: str, is_win: bool, class_path: str, main_class: str) -> Command:
+        """
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :param class_path: directory containing compiled classes
+        :param main_class: class to execute
+        :return: command starting a JVM
+        """
+        return Command([self.get_jdk_tool(resource_path, is_win, 'java'), '-Xss10m', '-cp',
+                        self.get_class_paths(resource_path, is_win, class_path), main_class])
+
+    def get_worker_src(self) -> Optional[Tuple[str, str]]:
+        """
+        :return: Java worker's file name and source code
+        """
+        return WORKER_FILE_NAME, WORKER_SRC
+
+    def get_worker_compile_cmd(self, worker_dir: str, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        Builds a command, which compiles the worker (once).
+
+        :param worker_dir: directory containing the worker's source
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :return: command to compile the worker or None - if it's already compiled
+        """
+        if os.path.exists(os.path.join(worker_dir, WORKER_CLASS_FILE)):
+            return None
+        return Command([self.get_jdk_tool(resource_path, is_win, 'javac'), '-cp',
+                        self.get_class_paths(resource_path, is_win), WORKER_FILE_NAME], cwd=worker_dir)
+
+    def get_worker_cmd(self, worker_dir: str, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        Builds a command, which starts a JVM executing the worker.
+
+        :param worker_dir: directory containing the worker's source
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False - if Unix/MacOS
+        :return: command to start a worker
         """
-        class_paths = (';' if is_win else ':').join([f'{resource_path}{path}' for path in self.LIBS])
-        return f'{resource_path}/libs/jdk/bin/javac -cp {class_paths} {src_file.file.name}'
+        return self.get_java_cmd(resource_path, is_win, worker_dir, 'Worker')
 
     def get_error_message(self, error: str, file_name: str, code_offset: int) -> str:
         """
@@ -25,8 +25,11 @@ class JavaTestSuiteGenerator(TestSuiteGenerator):
         :return: string containing Java imports
         """
         return '''
+            import java.io.BufferedReader;
             import java.io.File;
             import java.io.IOException;
+            import java.io.InputStreamReader;
+            import java.nio.charset.StandardCharsets;
             import java.util.stream.Collectors;
             import java.nio.file.Files;
             import java.nio.file.Path;
@@ -54,6 +57,8 @@ class JavaTestSuiteGenerator(TestSuiteGenerator):
                 \tstatic {
                     \t\tmapper = new ObjectMapper();
                     \t\tmapper.setVisibility(PropertyAccessor.FIELD, JsonAutoDetect.Visibility.ANY);
+                    \t\t// the response is ASCII only, so that its length is equal to the number of bytes
+                    \t\tmapper.configure(com.fasterxml.jackson.core.JsonGenerator.Feature.ESCAPE_NON_ASCII, true);
                 \t}
                 {% for c in converters.all %}
                     \tstatic {{c.ret_type}} {{c.fn_name}}({{c.arg_type}} {{c.arg_name}}) {
@@ -67,24 +72,88 @@ class JavaTestSuiteGenerator(TestSuiteGenerator):
                 \t\t\t.findFirst()
                 \t\t\t.orElseThrow(() -> new IllegalStateException("Cannot find method {{fn_name}}"));
                 \t\tmethod.setAccessible(true);
-                \t\tScanner scanner = new Scanner(System.in);
-                \t\twhile (true) {
-                \t\t\tString line = scanner.nextLine();
+                \t\tjava.lang.management.ThreadMXBean threads = java.lang.management.ManagementFactory.getThreadMXBean();
+                \t\tboolean profile = "1".equals(System.getenv("ANKICODE_PROFILE"));
+                \t\tint benchReps = getIntEnv("ANKICODE_BENCHMARK_REPS");
+                \t\tint benchWarmup = getIntEnv("ANKICODE_BENCHMARK_WARMUP");
+                \t\t// lines of large test cases are read in chunks of the buffer's size
+                \t\tBufferedReader reader = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8), 1 << 16);
+                \t\tint index = 0;
+                \t\tString line;
+                \t\twhile ((line = reader.readLine()) != null) {
+                \t\t\tif (line.isEmpty()) {
+                \t\t\t\tbreak;
+                \t\t\t}
+                \t\t\tlong parseStart = System.nanoTime();
                 \t\t\tJsonNode rows = mapper.readTree(line);
+                \t\t\tlong convertInStart = System.nanoTime();
+                {% for converter in converters.args %}
+                    \t\t\t{{converter.ret_type}} arg{{loop.index0}} = {{converter.fn_name}}(rows.get({{loop.index0}}));
+                {% endfor %}
                 \t\t\tlong start = System.nanoTime();
+                \t\t\tlong startCpu = threads.getCurrentThreadCpuTime();
                 \t\t\t\t{{converters.result.ret_type}} result = solution.{{fn_name}}(
                 {% for converter in converters.args %}
-                    \t\t\t\t{{converter.fn_name}}(rows.get({{loop.index0}})){% if not loop.last %}, {% endif %}
+                    \t\t\t\targ{{loop.index0}}{% if not loop.last %}, {% endif %}
                 {% endfor %});
-                \t\t\tlong end = System.nanoTime();
-                \t\t\tlong duration = TimeUnit.MILLISECONDS.convert(end - start, TimeUnit.NANOSECONDS);
+                \t\t\tlong cpuNs = threads.getCurrentThreadCpuTime() - startCpu;
+                \t\t\tlong durationNs = System.nanoTime() - start;
+                \t\t\tlong convertOutStart = System.nanoTime();
+                \t\t\tObject jsonResult = {{converters.output.fn_name}}(result);
+                \t\t\tlong serializeStart = System.nanoTime();
                 \t\t\tMap<String, Object> map = new HashMap<>();
-                \t\t\tmap.put("result", {{converters.output.fn_name}}(result));
-                \t\t\tmap.put("duration", duration);
-                \t\t\tSystem.out.println(getJson(map));
+                \t\t\tmap.put("index", index++);
+                \t\t\tmap.put("result", jsonResult);
+                \t\t\tmap.put("duration_ns", durationNs);
+                \t\t\tmap.put("cpu_ns", cpuNs);
+                \t\t\tString response = getJson(map);
+                \t\t\tif (profile) {
+                \t\t\t\tMap<String, Object> phases = new HashMap<>();
+                \t\t\t\tphases.put("parse_ns", convertInStart - parseStart);
+                \t\t\t\tphases.put("convert_in_ns", start - convertInStart);
+                \t\t\t\tphases.put("convert_out_ns", serializeStart - convertOutStart);
+                \t\t\t\tphases.put("serialize_ns", System.nanoTime() - serializeStart);
+                \t\t\t\tphases.put("peak_rss_kb", getPeakRssKb());
+                \t\t\t\tresponse = response.substring(0, response.length() - 1) + ", \\"profile\\": " + getJson(phases) + "}";
+                \t\t\t}
+                \t\t\tif (benchReps > 0) {
+                \t\t\t\tList<Long> benchNs = new ArrayList<>();
+                \t\t\t\tfor (int rep = 0; rep < benchWarmup + benchReps; rep++) {
+                {% for converter in converters.args %}
+                    \t\t\t\t\t{{converter.ret_type}} benchArg{{loop.index0}} = {{converter.fn_name}}(rows.get({{loop.index0}}));
+                {% endfor %}
+                \t\t\t\t\tlong benchStart = System.nanoTime();
+                \t\t\t\t\tsolution.{{fn_name}}(
+                {% for converter in converters.args %}
+                    \t\t\t\t\t\tbenchArg{{loop.index0}}{% if not loop.last %}, {% endif %}
+                {% endfor %});
+                \t\t\t\t\tlong benchDurationNs = System.nanoTime() - benchStart;
+                \t\t\t\t\tif (rep >= benchWarmup) {
+                \t\t\t\t\t\tbenchNs.add(benchDurationNs);
+                \t\t\t\t\t}
+                \t\t\t\t}
+                \t\t\t\tresponse = response.substring(0, response.length() - 1) + ", \\"bench_ns\\": " + getJson(benchNs) + "}";
+                \t\t\t}
+                \t\t\tSystem.out.print("\\u001e__ankicode_result__" + response.length() + "\\n" + response + "\\n");
                 \t\t\tSystem.out.flush();
                 \t\t}
                 \t}
+                \tstatic int getIntEnv(String name) {
+                \t\tString value = System.getenv(name);
+                \t\treturn value == null || value.isEmpty() ? 0 : Integer.parseInt(value);
+                \t}
+                \tstatic Long getPeakRssKb() {
+                \t\ttry {
+                \t\t\tfor (String line : Files.readAllLines(new File("/proc/self/status").toPath())) {
+                \t\t\t\tif (line.startsWith("VmHWM:")) {
+                \t\t\t\t\treturn Long.parseLong(line.replaceAll("[^0-9]", ""));
+                \t\t\t\t}
+                \t\t\t}
+                \t\t} catch(Exception exc) {
+                \t\t\t// peak RSS is reported on Linux only
+                \t\t}
+                \t\treturn null;
+                \t}
                 \tstatic String getJson(Object obj) {
                 \t\ttry {
                 \t\t\treturn mapper.writeValueAsString(obj);
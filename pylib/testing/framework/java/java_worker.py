@@ -0,0 +1,140 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Java Warm Worker
+
+Compiles and executes test suites one after another in the same JVM (using the compiler API),
+each test suite is loaded by a fresh class loader. See worker_pool.py for the protocol.
+"""
+
+WORKER_FILE_NAME = 'Worker.java'
+
+WORKER_SRC = r'''import com.fasterxml.jackson.databind.ObjectMapper;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import javax.tools.JavaCompiler;
+import javax.tools.ToolProvider;
+
+public class Worker {
+
+	private static final String JOB_DONE_MARKER = "__ankicode_job_done__";
+
+	/**
+	 * Test suite's STDIN: passes the job's lines through, including the empty line, then reports EOF
+	 */
+	private static class JobInputStream extends InputStream {
+
+		private final BufferedReader reader;
+		private byte[] buf = new byte[0];
+		private int pos = 0;
+		private boolean done = false;
+
+		JobInputStream(BufferedReader reader) {
+			this.reader = reader;
+		}
+
+		private boolean fill() throws IOException {
+			while (pos >= buf.length) {
+				if (done) {
+					return false;
+				}
+				String line = reader.readLine();
+				if (line == null || line.isEmpty()) {
+					done = true;
+					line = "";
+				}
+				buf = (line + "\n").getBytes(StandardCharsets.UTF_8);
+				pos = 0;
+			}
+			return true;
+		}
+
+		@Override
+		public int read() throws IOException {
+			if (!fill()) {
+				return -1;
+			}
+			return buf[pos++] & 0xff;
+		}
+
+		@Override
+		public int read(byte[] b, int off, int len) throws IOException {
+			if (len == 0) {
+				return 0;
+			}
+			if (!fill()) {
+				return -1;
+			}
+			int n = Math.min(len, buf.length - pos);
+			System.arraycopy(buf, pos, b, off, n);
+			pos += n;
+			return n;
+		}
+	}
+
+	private static void delete(File file) {
+		File[] children = file.listFiles();
+		if (children != null) {
+			for (File child : children) {
+				delete(child);
+			}
+		}
+		file.delete();
+	}
+
+	public static void main(String[] args) throws Exception {
+		JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+		if (compiler == null) {
+			System.err.println("Java compiler API is not available");
+			System.exit(1);
+		}
+		ObjectMapper mapper = new ObjectMapper();
+		BufferedReader reader = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+		System.out.println(JOB_DONE_MARKER);
+		System.out.flush();
+		String line;
+		while ((line = reader.readLine()) != null) {
+			if (line.isEmpty()) {
+				continue;
+			}
+			String file = mapper.readTree(line).get("file").asText();
+			Path classDir = Files.createTempDirectory("ankicode-classes");
+			try {
+				int status = compiler.run(null, null, System.err, "-cp", System.getProperty("java.class.path"),
+						"-d", classDir.toString(), file);
+				if (status != 0) {
+					System.err.flush();
+					System.exit(1);
+				}
+				try (URLClassLoader loader = new URLClassLoader(new URL[]{classDir.toUri().toURL()},
+						Worker.class.getClassLoader())) {
+					Method main = loader.loadClass("Runner").getMethod("main", String[].class);
+					main.setAccessible(true);
+					System.setIn(new JobInputStream(reader));
+					main.invoke(null, (Object) new String[0]);
+				} catch (InvocationTargetException e) {
+					System.err.print("Exception in thread \"main\" ");
+					e.getCause().printStackTrace();
+					System.err.flush();
+					System.exit(1);
+				}
+			} finally {
+				delete(classDir.toFile());
+			}
+			System.out.println(JOB_DONE_MARKER);
+			System.out.flush();
+		}
+	}
+}
+'''
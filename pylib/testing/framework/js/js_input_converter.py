@@ -177,30 +177,18 @@ class JsInputConverter(TypeConverter):
         child: ConverterFn = self.render(node.first_child(), context)
         src = render_template('''
             const nodes = []
-            for (let n of value) {
-            \tlet node = new BinaryTreeNode()
-            \tif (n == null) {
-            \t\tnode = null
-            \t} else {
-            \t\tnode.data = {{child.fn_name}}(n)
-            \t}
-            \tnodes.push(node)
-            }
-            const children = []
-            for (n of nodes) {
-                children.push(n)
+            for (const item of value) {
+            \tnodes.push(item == null ? null : new BinaryTreeNode({{child.fn_name}}(item)))
             }
-            const root = children.shift()
-            for (let node of nodes) {
-            \tif (node != null) {
-            \t\tif (children.length) {
-            \t\t\tnode.left = children.shift()
-            \t\t}
-            \t\tif (children.length) {
-            \t\t\tnode.right = children.shift()
+            let child = 1
+            for (let i = 0; i < nodes.length && child < nodes.length; i++) {
+            \tif (nodes[i] != null) {
+            \t\tnodes[i].left = nodes[child++]
+            \t\tif (child < nodes.length) {
+            \t\t\tnodes[i].right = nodes[child++]
             \t\t}
             \t}
             }
-            return root
+            return nodes.length ? nodes[0] : null
         ''', child=child)
         return ConverterFn(node.name, src, '')
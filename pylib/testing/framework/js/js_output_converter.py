@@ -178,30 +178,24 @@ class JsOutputConverter(TypeConverter):
         child = self.render(node.first_child(), context)
         src = render_template('''
             const result = []
-            const queue = []
+            if (value == null) {
+            \treturn result
+            }
+            const queue = [value]
             const visited = new Set()
-            queue.push(value)
-            while (queue.length) {
-            \tnode = queue.shift()
-            \tif (node) {
+            for (let i = 0; i < queue.length; i++) {
+            \tconst node = queue[i]
+            \tif (node == null || visited.has(node)) {
+            \t\tresult.push(null)
+            \t} else {
             \t\tvisited.add(node)
             \t\tresult.push({{child.fn_name}}(node.data))
-            \t\tif (node.left != null && !visited.has(node.left)) {
-            \t\t\tqueue.push(node.left)
-            \t\t}
-            \t\tif (node.right != null && !visited.has(node.right)) {
-            \t\t\tqueue.push(node.right)
-            \t\t}
-            \t} else {
-            \t\tresult.push(null);
+            \t\tqueue.push(node.left)
+            \t\tqueue.push(node.right)
             \t}
             }
-            for (let i = result.length - 1; i > 0; i--) {
-            \tif (result[i] == null) {
-            \t\tresult.pop()
-            \t} else {
-            \t\tbreak
-            \t}
+            while (result[result.length - 1] == null) {
+            \tresult.pop()
             }
             return result''', child=child)
         return ConverterFn(node.name, src, '')
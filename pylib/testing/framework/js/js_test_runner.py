@@ -3,10 +3,13 @@
 """
 JS Test Runner API Implementation
 """
+import os
+from typing import Optional, Tuple
 
+from testing.framework.js.js_worker import WORKER_FILE_NAME, WORKER_SRC
 from testing.framework.string_utils import get_line_number_prefix
 from testing.framework.test_runner import TestRunner
-from testing.framework.types import SrcFile
+from testing.framework.types import Command, SrcFile
 
 
 class JsTestRunner(TestRunner):
@@ -20,25 +23,52 @@ class JsTestRunner(TestRunner):
         """
         return 'test.js'
 
-    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Optional[Command]:
         """
         No compilation
         """
-        pass
+        return None
 
-    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Command:
         """
-        Builds shell command to execute source file using embedded Node interpreter
+        Builds command to execute source file using embedded Node interpreter
 
         :param src_file: target source file to execute
         :param resource_path: AnkiCode resource path
         :param is_win: True - if windows, False if Unix/MacOS
-        :return: shell command to execute a source file
+        :return: command to execute a source file
         """
+        return self.get_node_cmd(src_file.path, resource_path, is_win)
+
+    def get_worker_src(self) -> Optional[Tuple[str, str]]:
+        """
+        :return: JavaScript worker's file name and source code
+        """
+        return WORKER_FILE_NAME, WORKER_SRC
+
+    def get_worker_cmd(self, worker_dir: str, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        Builds command to start a worker using embedded node
+
+        :param worker_dir: directory containing the worker's source
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False if Unix/MacOS
+        :return: command to start a worker
+        """
+        return self.get_node_cmd(os.path.join(worker_dir, WORKER_FILE_NAME), resource_path, is_win)
+
+    @staticmethod
+    def get_node_cmd(file_name: str, resource_path: str, is_win: bool) -> Command:
+        """
+        :param file_name: JS file to execute
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False if Unix/MacOS
+        :return: command to execute a JS file using embedded node
+        """
+        node_path = os.path.join(resource_path, 'libs', 'node')
         if is_win:
-            return f'{resource_path}/libs/node/node.exe {src_file.file.name}'
-        else:
-            return f'cd {resource_path}/libs/node && {resource_path}/libs/node/bin/node {src_file.file.name}'
+            return Command([os.path.join(node_path, 'node.exe'), file_name])
+        return Command([os.path.join(node_path, 'bin', 'node'), file_name], cwd=node_path)
 
     def get_error_message(self, error: str, file_name: str, code_offset: int) -> str:
         """
@@ -45,18 +45,60 @@ class JsTestSuiteGenerator(TestSuiteGenerator):
             }
             {% endfor %}
             {{solution_src}}
+            const profile = process.env.ANKICODE_PROFILE === '1';
+            const benchReps = parseInt(process.env.ANKICODE_BENCHMARK_REPS || '0', 10);
+            const benchWarmup = parseInt(process.env.ANKICODE_BENCHMARK_WARMUP || '0', 10);
+            let index = 0;
             rl.on('line', function(line) {
-            \tconst start = new Date().getTime();
+            \tif (line === '') {
+            \t\trl.close();
+            \t\treturn;
+            \t}
+            \tconst parseStart = process.hrtime.bigint();
             \tconst cols = JSON.parse(line)
+            \tconst convertInStart = process.hrtime.bigint();
             \tconst args = []
             {% for converter in converters.args %}
             \targs.push({{converter.fn_name}}(cols[{{loop.index0}}]));
             {% endfor %}
+            \tconst start = process.hrtime.bigint();
+            \tconst startCpu = process.cpuUsage();
             \tconst result = {{ts.fn_name}}(...args);
-            \tconst end = new Date().getTime();
-            \tconsole.log(JSON.stringify({
-            \t\t'result': {{converters.output.fn_name}}(result),
-            \t\t'duration': (end-start)
-            \t}));
+            \tconst cpu = process.cpuUsage(startCpu);
+            \tconst durationNs = Number(process.hrtime.bigint() - start);
+            \tconst convertOutStart = process.hrtime.bigint();
+            \tconst jsonResult = {{converters.output.fn_name}}(result);
+            \tconst serializeStart = process.hrtime.bigint();
+            \tlet response = JSON.stringify({
+            \t\t'index': index++,
+            \t\t'result': jsonResult,
+            \t\t'duration_ns': durationNs,
+            \t\t'cpu_ns': (cpu.user + cpu.system) * 1000
+            \t});
+            \tif (profile) {
+            \t\tresponse = response.slice(0, -1) + ', "profile": ' + JSON.stringify({
+            \t\t\t'parse_ns': Number(convertInStart - parseStart),
+            \t\t\t'convert_in_ns': Number(start - convertInStart),
+            \t\t\t'convert_out_ns': Number(serializeStart - convertOutStart),
+            \t\t\t'serialize_ns': Number(process.hrtime.bigint() - serializeStart),
+            \t\t\t'peak_rss_kb': process.resourceUsage().maxRSS
+            \t\t}) + '}';
+            \t}
+            \tif (benchReps > 0) {
+            \t\tconst benchNs = [];
+            \t\tfor (let rep = 0; rep < benchWarmup + benchReps; rep++) {
+            \t\t\tconst benchArgs = [];
+            {% for converter in converters.args %}
+            \t\t\tbenchArgs.push({{converter.fn_name}}(cols[{{loop.index0}}]));
+            {% endfor %}
+            \t\t\tconst benchStart = process.hrtime.bigint();
+            \t\t\t{{ts.fn_name}}(...benchArgs);
+            \t\t\tif (rep >= benchWarmup) {
+            \t\t\t\tbenchNs.push(Number(process.hrtime.bigint() - benchStart));
+            \t\t\t}
+            \t\t}
+            \t\tresponse = response.slice(0, -1) + ', "bench_ns": ' + JSON.stringify(benchNs) + '}';
+            \t}
+            \tprocess.stdout.write('\\x1e__ankicode_result__' + Buffer.byteLength(response) + '\\n' + response + '\\n');
             });
             ''', ts=ts, converters=converters, solution_src=solution_src)
@@ -0,0 +1,68 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+JavaScript Warm Worker
+
+Executes test suites one after another in the same node process, each test suite runs in a fresh VM context
+with its own process.stdin. See worker_pool.py for the protocol.
+"""
+
+WORKER_FILE_NAME = 'worker.js'
+
+WORKER_SRC = r'''const fs = require('fs');
+const module_ = require('module');
+const readline = require('readline');
+const stream = require('stream');
+const vm = require('vm');
+
+const JOB_DONE_MARKER = '__ankicode_job_done__';
+let job = null;
+let pending = 0;
+let closed = false;
+
+function runJob(file) {
+  const stdin = new stream.Readable({read() {}});
+  const proc = new Proxy(process, {get: (target, prop) => prop === 'stdin' ? stdin : target[prop]});
+  const context = vm.createContext({
+    require: module_.createRequire(file), console, process: proc, Buffer, URL, TextEncoder, TextDecoder,
+    setTimeout, setInterval, setImmediate, clearTimeout, clearInterval, clearImmediate, queueMicrotask
+  });
+  vm.runInContext(fs.readFileSync(file, 'utf8'), context, {filename: file});
+  return stdin;
+}
+
+function endJob(stdin) {
+  stdin.push('\n');
+  stdin.push(null);
+  pending++;
+  stdin.on('end', () => {
+    console.log(JOB_DONE_MARKER);
+    if (--pending === 0 && closed) {
+      process.exit(0);
+    }
+  });
+  stdin.on('pause', () => setImmediate(() => stdin.resume()));
+  stdin.resume();
+}
+
+const rl = readline.createInterface({input: process.stdin, terminal: false});
+rl.on('line', function(line) {
+  if (job !== null) {
+    if (line === '') {
+      endJob(job);
+      job = null;
+    } else {
+      job.push(line + '\n');
+    }
+  } else if (line !== '') {
+    job = runJob(JSON.parse(line).file);
+  }
+});
+rl.on('close', () => {
+  closed = true;
+  if (pending === 0) {
+    process.exit(0);
+  }
+});
+console.log(JOB_DONE_MARKER);
+'''
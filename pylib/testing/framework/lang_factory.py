@@ -15,6 +15,7 @@ from testing.framework.python.python_test_suite_gen import PythonTestSuiteGenera
 from testing.framework.template_gen import TemplateGenerator
 from testing.framework.test_runner import TestRunner
 from testing.framework.test_suite_gen import TestSuiteGenerator
+from testing.framework.worker_pool import WorkerPool
 
 
 class AbstractLangFactory(ABC):
@@ -26,6 +27,7 @@ class AbstractLangFactory(ABC):
         self.template_gen = template_gen
         self.test_suite_gen = test_suite_gen
         self.code_runner = code_runner
+        self.worker_pool = WorkerPool(code_runner)
 
     def get_template_generator(self) -> TemplateGenerator:
         """
@@ -45,6 +47,18 @@ class AbstractLangFactory(ABC):
         """
         return self.code_runner
 
+    def new_test_runner(self) -> TestRunner:
+        """
+        :return: Returns a new language specific code runner, so that several test suites can be run at the same time
+        """
+        return type(self.code_runner)()
+
+    def get_worker_pool(self) -> WorkerPool:
+        """
+        :return: Returns pool of warm workers, which execute the language's test suites
+        """
+        return self.worker_pool
+
 
 class JavaLangFactory(AbstractLangFactory):
     """
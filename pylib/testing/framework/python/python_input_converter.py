@@ -162,22 +162,16 @@ class PythonInputConverter(TypeConverter):
         """
         child: ConverterFn = self.render(node.first_child(), context)
         src = render_template('''
-            \tnodes = []
-            \tfor item in value:
-            \t\tnode = BinaryTreeNode()
-            \t\tif item is None:
-            \t\t\tnode = None
-            \t\telse:
-            \t\t\tnode.data = {{child.fn_name}}(item)
-            \t\tnodes.append(node)
-            \tchildren = [n for n in nodes]
-            \troot = children.pop(0)
+            \tnodes = [None if item is None else BinaryTreeNode({{child.fn_name}}(item)) for item in value]
+            \tchild = 1
             \tfor node in nodes:
+            \t\tif child >= len(nodes):
+            \t\t\tbreak
             \t\tif node is not None:
-            \t\t\tif children:
-            \t\t\t\tnode.left = children.pop(0)
-            \t\t\tif children:
-            \t\t\t\tnode.right = children.pop(0)
-            \treturn root
+            \t\t\tnode.left = nodes[child]
+            \t\t\tif child + 1 < len(nodes):
+            \t\t\t\tnode.right = nodes[child + 1]
+            \t\t\tchild += 2
+            \treturn nodes[0] if nodes else None
         ''', child=child)
         return ConverterFn(node.name, src, '', 'BinaryTreeNode[' + child.ret_type + ']')
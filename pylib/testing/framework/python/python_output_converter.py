@@ -168,27 +168,22 @@ class PythonOutputConverter(TypeConverter):
         child = self.render(node.first_child(), context)
         src = render_template('''
             \tresult = []
-            \tqueue = []
-            \tvisited = set([])
-            \tqueue.append(value)
-            \twhile queue:
-            \t\tnode = queue.pop(0)
-            \t\tif node is not None:
-            \t\t\tvisited.add(node)
-            \t\t\tresult.append({{child.fn_name}}(node.data))
-            \t\t\tif node.left is not None and not node.left in visited:
-            \t\t\t\tqueue.append(node.left)
-            \t\t\tif node.right is not None and not node.right in visited:
-            \t\t\t\tqueue.append(node.right)
-            \t\telse:
+            \tif value is None:
+            \t\treturn result
+            \tqueue = [value]
+            \tvisited = set()
+            \ti = 0
+            \twhile i < len(queue):
+            \t\tnode = queue[i]
+            \t\ti += 1
+            \t\tif node is None or node in visited:
             \t\t\tresult.append(None)
-            \tj = None
-            \tfor i in range(len(result) - 1, 1, -1):
-            \t\tif result[i] is None:
-            \t\t\tj = i
             \t\telse:
-            \t\t\tbreak
-            \tif j is not None:
-            \t\tresult = result[:j]
+            \t\t\tvisited.add(node)
+            \t\t\tresult.append({{child.fn_name}}(node.data))
+            \t\t\tqueue.append(node.left)
+            \t\t\tqueue.append(node.right)
+            \twhile result[-1] is None:
+            \t\tresult.pop()
             \treturn result''', child=child)
         return ConverterFn(node.name, src, 'BinaryTreeNode[' + child.arg_type + ']', 'List[' + child.ret_type + ']')
@@ -4,11 +4,16 @@
 Python Test Runner API Implementation
 """
 
+import os
 import re
+from typing import Optional, Tuple
 
+from testing.framework.python.python_worker import WORKER_FILE_NAME, WORKER_SRC
 from testing.framework.string_utils import get_line_number_prefix
 from testing.framework.test_runner import TestRunner
-from testing.framework.types import SrcFile
+from testing.framework.types import Command, SrcFile
+
+PYTHON_MEMORY_OVERHEAD_MB = 64
 
 
 class PythonTestRunner(TestRunner):
@@ -16,29 +21,60 @@ class PythonTestRunner(TestRunner):
     Executes python code, processes STDERR
     """
 
-    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Command:
         """
-        Builds shell command to execute source file using embedded python interpreter
+        Builds command to execute source file using embedded python interpreter
 
         :param src_file: target source file to execute
         :param resource_path: AnkiCode resource path
         :param is_win: True - if windows, False if Unix/MacOS
-        :return: shell command to execute source file
+        :return: command to execute source file
+        """
+        return self.get_python_cmd(src_file.path, resource_path, is_win)
+
+    def get_worker_src(self) -> Optional[Tuple[str, str]]:
+        """
+        :return: Python worker's file name and source code
+        """
+        return WORKER_FILE_NAME, WORKER_SRC
+
+    def get_worker_cmd(self, worker_dir: str, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        Builds command to start a worker using embedded python interpreter
+
+        :param worker_dir: directory containing the worker's source
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False if Unix/MacOS
+        :return: command to start a worker
+        """
+        return self.get_python_cmd(os.path.join(worker_dir, WORKER_FILE_NAME), resource_path, is_win)
+
+    @staticmethod
+    def get_python_cmd(file_name: str, resource_path: str, is_win: bool) -> Command:
         """
+        :param file_name: python file to execute
+        :param resource_path: AnkiCode resource path
+        :param is_win: True - if windows, False if Unix/MacOS
+        :return: command to execute a python file using embedded python interpreter
+        """
+        python_path = os.path.join(resource_path, 'libs', 'python')
         if is_win:
-            cmd = f'set PYTHONPATH={resource_path}/libs/python && ' + \
-                  f'{resource_path}/libs/python/python.exe -u {src_file.file.name}'
-        else:
-            cmd = f'PYTHONPATH={resource_path}/libs/python/lib/python3:{resource_path}' + \
-                  '/libs/python/lib/python3/lib-dynload ' + \
-                  f'{resource_path}/libs/python/bin/python3 -u {src_file.file.name}'
-        return cmd
+            return Command([os.path.join(python_path, 'python.exe'), '-u', file_name], {'PYTHONPATH': python_path})
+        lib_path = os.path.join(python_path, 'lib', 'python3')
+        return Command([os.path.join(python_path, 'bin', 'python3'), '-u', file_name],
+                       {'PYTHONPATH': f'{lib_path}:{os.path.join(lib_path, "lib-dynload")}'})
+
+    def get_memory_overhead_mb(self) -> Optional[int]:
+        """
+        :return: address space of the interpreter with the test suite's imports
+        """
+        return PYTHON_MEMORY_OVERHEAD_MB
 
-    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Optional[Command]:
         """
         No compilation
         """
-        pass
+        return None
 
     def get_error_message(self, error: str, file_name: str, code_offset: int) -> str:
         """
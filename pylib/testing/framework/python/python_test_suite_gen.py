@@ -27,8 +27,10 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
         :return: string containing Python imports
         """
         return '''
-            import datetime
             import json
+            import os
+            import sys
+            import time
             from typing import *'''
 
     def get_testing_src(self, ts: TestSuite, converters: TestSuiteConverters, solution_src: str) -> str:
@@ -44,19 +46,61 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
             def {{converter.fn_name}}({{converter.arg_name}}) -> {{converter.ret_type}}:
             {{converter.src}}
             {% endfor %}
+            def get_peak_rss_kb():
+            \ttry:
+            \t\timport resource
+            \texcept ImportError:
+            \t\treturn None
+            \trss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            \treturn rss // 1024 if sys.platform == 'darwin' else rss
+            profile = os.environ.get('ANKICODE_PROFILE') == '1'
+            bench_reps = int(os.environ.get('ANKICODE_BENCHMARK_REPS') or 0)
+            bench_warmup = int(os.environ.get('ANKICODE_BENCHMARK_WARMUP') or 0)
+            index = 0
             while True:
-            \tline = input()
+            \tline = sys.stdin.readline().strip()
+            \tif not line:
+            \t\tbreak
+            \tparse_start = time.perf_counter_ns()
             \tvalues = json.loads(line)
+            \tconvert_in_start = time.perf_counter_ns()
             \targs = []
             {% for c in converters.args %}
             \targs.append({{c.fn_name}}(values[{{loop.index0}}]))
             {% endfor %}
-            \tstart = datetime.datetime.now()
+            \tstart = time.perf_counter_ns()
+            \tstart_cpu = time.process_time_ns()
             \tresult = {{fn_name}}(*args)
-            \tend = datetime.datetime.now()
-            \ttime_diff = (end - start)
-            \tduration = (time_diff.days * 86400000) + (time_diff.seconds * 1000) + (time_diff.microseconds / 1000)
-            \tprint(json.dumps({
-            \t\t'result': {{converters.output.fn_name}}(result),
-            \t\t'duration': duration }, default=lambda obj: obj.__dict__))
+            \tcpu_ns = time.process_time_ns() - start_cpu
+            \tduration_ns = time.perf_counter_ns() - start
+            \tconvert_out_start = time.perf_counter_ns()
+            \tjson_result = {{converters.output.fn_name}}(result)
+            \tserialize_start = time.perf_counter_ns()
+            \tresponse = json.dumps({
+            \t\t'index': index,
+            \t\t'result': json_result,
+            \t\t'duration_ns': duration_ns,
+            \t\t'cpu_ns': cpu_ns }, default=lambda obj: obj.__dict__)
+            \tif profile:
+            \t\tresponse = response[:-1] + ', "profile": ' + json.dumps({
+            \t\t\t'parse_ns': convert_in_start - parse_start,
+            \t\t\t'convert_in_ns': start - convert_in_start,
+            \t\t\t'convert_out_ns': serialize_start - convert_out_start,
+            \t\t\t'serialize_ns': time.perf_counter_ns() - serialize_start,
+            \t\t\t'peak_rss_kb': get_peak_rss_kb() }) + '}'
+            \tif bench_reps:
+            \t\tbench_ns = []
+            \t\tfor rep in range(bench_warmup + bench_reps):
+            \t\t\targs = []
+            {% for c in converters.args %}
+            \t\t\targs.append({{c.fn_name}}(values[{{loop.index0}}]))
+            {% endfor %}
+            \t\t\tbench_start = time.perf_counter_ns()
+            \t\t\t{{fn_name}}(*args)
+            \t\t\tif rep >= bench_warmup:
+            \t\t\t\tbench_ns.append(time.perf_counter_ns() - bench_start)
+            \t\tresponse = response[:-1] + ', "bench_ns": ' + json.dumps(bench_ns) + '}'
+            \tsys.stdout.write('\\x1e__ankicode_result__' + str(len(response)) + '\\n' + response + '\\n')
+            \tsys.stdout.flush()
+            \tindex += 1
             ''', ts=ts, converters=converters, fn_name=to_snake_case(ts.fn_name), retab=True)
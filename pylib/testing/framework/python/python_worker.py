@@ -0,0 +1,50 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Python Warm Worker
+
+Executes test suites one after another in the same interpreter, each test suite gets a fresh __main__ module.
+See worker_pool.py for the protocol.
+"""
+
+WORKER_FILE_NAME = 'worker.py'
+
+WORKER_SRC = r'''import json
+import sys
+import traceback
+import types
+
+JOB_DONE_MARKER = '__ankicode_job_done__'
+
+
+def run_job(file_name):
+    module = types.ModuleType('__main__')
+    module.__file__ = file_name
+    sys.modules['__main__'] = module
+    with open(file_name) as f:
+        code = compile(f.read(), file_name, 'exec')
+    exec(code, module.__dict__)
+
+
+def main():
+    print(JOB_DONE_MARKER, flush=True)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            run_job(json.loads(line)['file'])
+        except Exception as e:
+            # skip the worker's frames, the same way as if the test suite was executed directly
+            tb = e.__traceback__
+            while tb is not None and tb.tb_frame.f_code.co_filename == __file__:
+                tb = tb.tb_next
+            traceback.print_exception(type(e), e, tb)
+            sys.exit(1)
+        sys.stdout.flush()
+        print(JOB_DONE_MARKER, flush=True)
+
+
+if __name__ == '__main__':
+    main()
+'''
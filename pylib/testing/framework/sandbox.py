@@ -0,0 +1,487 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Sandbox API
+
+Execution backends start the processes of test suites, compilers and warm workers. Commands are executed
+without a shell, their arguments are built by test runners (see types.Command):
+    - ProcessBackend - a process is started with the user's privileges, test suites are limited by
+      rlimits only (see watchdog.get_rlimits_setter)
+    - SandboxBackend (Linux) - a process is started in a session (process group) of its own, with rlimits,
+      which are set before the program is executed: by util-linux's prlimit, which executes the program once
+      the limits are set, or by a preexec function, which only makes system calls (if prlimit is not installed).
+      If a cgroup v2 delegated to the user is given by ANKICODE_CGROUP, every test suite's process is put into
+      a cgroup of its own, which limits CPU, memory and number of processes, kills the whole process tree at once
+      and accounts the CPU time and peak memory of the run. Without cgroups the process group is killed,
+      resources are accounted by the OS for the test suite's process (wait4).
+      The process is moved into its cgroup by the parent right after it has started, so the program's startup
+      is limited by rlimits only.
+      Sources and compilation outputs are stored in a private directory on tmpfs (if it's available)
+
+The sandbox is used on Linux by default, it's disabled by ANKICODE_SANDBOX=0.
+The host's cgroups are never modified, the delegated cgroup must be prepared by Anki's launcher: e.g. a scope
+started by `systemd-run --user --scope -p Delegate=yes`, whose processes have been moved into a leaf cgroup
+and whose memory and pids controllers are enabled for child cgroups (cgroup.subtree_control)
+"""
+
+import functools
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+if not sys.platform.startswith('win32'):
+    import resource
+
+from testing.framework.types import Command, TestSuiteExecOpts
+from testing.framework.watchdog import MB, get_rlimits, get_rlimits_setter, kill_process_tree
+
+SANDBOX_ENV_VAR = 'ANKICODE_SANDBOX'
+CGROUP_ENV_VAR = 'ANKICODE_CGROUP'  # directory of the delegated cgroup v2
+SANDBOX_PIDS_MAX = 256
+SANDBOX_CPU_CORES = 1  # CPU quota of a test suite's process, test runs take one core of the CPU budget per process
+SANDBOX_FILE_SIZE_LIMIT = 256 * MB
+# the cgroup's memory limit is a backstop, the precise limit is enforced by the watchdog
+CGROUP_MEMORY_SLACK_MB = 64
+CGROUP_CPU_PERIOD_US = 100000
+CGROUP_CONTROLLERS = ['memory', 'pids']  # controllers which must be enabled for child cgroups
+CGROUP_PREFIX = 'ankicode-'
+CGROUP_REMOVE_ATTEMPTS = 100
+CGROUP_REMOVE_INTERVAL_SEC = 0.01
+TMPFS_DIR = '/dev/shm'
+
+
+class ResourceUsage:
+    """
+    Resources consumed by a test run's processes
+    """
+
+    def __init__(self, cpu_sec: float, peak_memory_kb: Optional[int], oom_killed: bool = False):
+        """
+        :param cpu_sec: CPU time (user and system) in seconds
+        :param peak_memory_kb: peak memory in KB, None - if it's not known
+        :param oom_killed: if a process has been killed, because the memory limit has been exceeded
+        """
+        self.cpu_sec = cpu_sec
+        self.peak_memory_kb = peak_memory_kb
+        self.oom_killed = oom_killed
+
+    @staticmethod
+    def combine(usages: List[Optional['ResourceUsage']]) -> Optional['ResourceUsage']:
+        """
+        :param usages: resources consumed by processes executed at the same time
+        :return: total CPU time, max peak memory or None - if usage of any process is not known
+        """
+        if not usages or any(usage is None for usage in usages):
+            return None
+        peaks = [usage.peak_memory_kb for usage in usages if usage.peak_memory_kb is not None]
+        return ResourceUsage(sum(usage.cpu_sec for usage in usages), max(peaks) if peaks else None,
+                             any(usage.oom_killed for usage in usages))
+
+    def __eq__(self, other):
+        return isinstance(other, ResourceUsage) and self.__dict__ == other.__dict__
+
+
+def get_prlimit_args(prlimit: str, limits: List[Tuple[int, int]]) -> List[str]:
+    """
+    :param prlimit: path of util-linux's prlimit
+    :param limits: tuples of resource and value
+    :return: prlimit's arguments, prlimit sets the limits and executes the program given after the arguments
+    """
+    options = {resource.RLIMIT_CORE: 'core', resource.RLIMIT_FSIZE: 'fsize', resource.RLIMIT_CPU: 'cpu',
+               resource.RLIMIT_AS: 'as'}
+    return [prlimit] + [f'--{options[limit]}={value}' for limit, value in limits] + ['--']
+
+
+def set_rlimits(limits: List[Tuple[int, int]]):
+    """
+    Sets limits of the current process, it's executed between fork and exec, so it only makes system calls
+    :param limits: tuples of resource and value
+    """
+    for limit, value in limits:
+        resource.setrlimit(limit, (value, value))
+
+
+def reap(proc: subprocess.Popen) -> Optional[Tuple[float, int]]:
+    """
+    Waits for a process, which must have been killed or exited, and takes its resource usage from the OS
+    :param proc: target process
+    :return: tuple of CPU time in seconds and peak RSS in KB or None - if the process has been already awaited
+    """
+    if proc.returncode is not None:
+        return None
+    try:
+        _, status, rusage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        return None
+    proc.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    peak_kb = rusage.ru_maxrss // 1024 if sys.platform == 'darwin' else rusage.ru_maxrss
+    return rusage.ru_utime + rusage.ru_stime, peak_kb
+
+
+def read_cgroup_file(path: str, name: str) -> Optional[str]:
+    """
+    :param path: cgroup's directory
+    :param name: interface file's name
+    :return: file's content or None - if the file doesn't exist (the kernel doesn't support it)
+    """
+    try:
+        with open(os.path.join(path, name)) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_cgroup_file(path: str, name: str, value: str):
+    """
+    :param path: cgroup's directory
+    :param name: interface file's name
+    :param value: value to write
+    """
+    with open(os.path.join(path, name), 'w') as f:
+        f.write(value)
+
+
+def get_delegated_cgroup(path: Optional[str]) -> Optional[str]:
+    """
+    Checks whether a cgroup delegated to the user can hold cgroups of test suites, it's the case if the cgroup
+    is writable by the user and its memory and pids controllers are enabled for child cgroups.
+    The cgroup is not modified
+    :param path: delegated cgroup's directory
+    :return: directory where cgroups of test suites are created or None - if cgroups cannot be used
+    """
+    if path is None or not os.access(path, os.W_OK):
+        return None
+    enabled = (read_cgroup_file(path, 'cgroup.subtree_control') or '').split()
+    if any(controller not in enabled for controller in CGROUP_CONTROLLERS):
+        return None
+    return path
+
+
+class Cgroup:
+    """
+    cgroup v2 of a test suite's process
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: cgroup's directory
+        """
+        self.path = path
+
+    @staticmethod
+    def create(parent: str, name: str, opts: TestSuiteExecOpts) -> 'Cgroup':
+        """
+        Creates a cgroup and sets its limits
+        :param parent: parent cgroup's directory
+        :param name: cgroup's name
+        :param opts: options which control tests execution
+        :return: created cgroup
+        """
+        cgroup = Cgroup(os.path.join(parent, name))
+        os.mkdir(cgroup.path)
+        try:
+            write_cgroup_file(cgroup.path, 'pids.max', str(SANDBOX_PIDS_MAX))
+            if opts.memory_limit_mb is not None:
+                write_cgroup_file(cgroup.path, 'memory.max', str((opts.memory_limit_mb + CGROUP_MEMORY_SLACK_MB) * MB))
+                if read_cgroup_file(cgroup.path, 'memory.swap.max') is not None:
+                    write_cgroup_file(cgroup.path, 'memory.swap.max', '0')
+            if read_cgroup_file(cgroup.path, 'cpu.max') is not None:
+                write_cgroup_file(cgroup.path, 'cpu.max',
+                                  f'{SANDBOX_CPU_CORES * CGROUP_CPU_PERIOD_US} {CGROUP_CPU_PERIOD_US}')
+        except OSError:
+            cgroup.remove()
+            raise
+        return cgroup
+
+    def attach(self, pid: int) -> bool:
+        """
+        Moves a process into the cgroup
+        :param pid: process id
+        :return: True - if the process has been moved
+        """
+        try:
+            write_cgroup_file(self.path, 'cgroup.procs', str(pid))
+        except OSError:
+            return False
+        return pid in self.get_pids()
+
+    def get_pids(self) -> List[int]:
+        """
+        :return: processes in the cgroup
+        """
+        return [int(pid) for pid in (read_cgroup_file(self.path, 'cgroup.procs') or '').split()]
+
+    def kill(self):
+        """
+        Kills all processes in the cgroup, cgroup.kill is used if the kernel supports it, otherwise the cgroup
+        is frozen, so that processes cannot fork while they're being killed
+        """
+        try:
+            if os.path.exists(os.path.join(self.path, 'cgroup.kill')):
+                write_cgroup_file(self.path, 'cgroup.kill', '1')
+                return
+            write_cgroup_file(self.path, 'cgroup.freeze', '1')
+            for pid in self.get_pids():
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            write_cgroup_file(self.path, 'cgroup.freeze', '0')
+        except OSError:
+            pass
+
+    def get_usage(self) -> ResourceUsage:
+        """
+        :return: CPU time, peak memory (if the kernel reports it) and OOM kills of the cgroup's processes
+        """
+        stats = dict(line.split() for line in (read_cgroup_file(self.path, 'cpu.stat') or '').splitlines()
+                     if len(line.split()) == 2)
+        events = dict(line.split() for line in (read_cgroup_file(self.path, 'memory.events') or '').splitlines()
+                      if len(line.split()) == 2)
+        peak = read_cgroup_file(self.path, 'memory.peak')
+        return ResourceUsage(int(stats.get('usage_usec', 0)) / 1000000,
+                             int(peak) // 1024 if peak and peak.strip().isdigit() else None,
+                             int(events.get('oom_kill', 0)) > 0)
+
+    def remove(self):
+        """
+        Removes the cgroup, it can be removed only after all its processes have exited
+        """
+        for _ in range(CGROUP_REMOVE_ATTEMPTS):
+            try:
+                os.rmdir(self.path)
+                return
+            except FileNotFoundError:
+                return
+            except OSError:
+                time.sleep(CGROUP_REMOVE_INTERVAL_SEC)
+
+
+class ExecutionBackend(ABC):
+    """
+    Starts, kills and accounts processes of test suites, compilers and warm workers
+    """
+
+    @abstractmethod
+    def start(self, cmd: Command, opts: Optional[TestSuiteExecOpts] = None, memory_overhead_mb: Optional[int] = None,
+              env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None) -> subprocess.Popen:
+        """
+        Starts a process with piped STDIN, STDOUT and STDERR (in text mode)
+        :param cmd: command to execute
+        :param opts: options which control tests execution, the process is limited according to them,
+                     None - if it's not a test suite's process
+        :param memory_overhead_mb: address space reserved by the language's runtime (see get_rlimits_setter)
+        :param env: environment variables, by default the current process's environment
+        :param cwd: working directory, unless the command sets it
+        :return: started process
+        """
+        pass
+
+    @abstractmethod
+    def kill(self, pid: int):
+        """
+        Kills a process started by the backend along with its children
+        :param pid: process id
+        """
+        pass
+
+    @abstractmethod
+    def release(self, proc: subprocess.Popen) -> Optional[ResourceUsage]:
+        """
+        Kills the rest of a process's tree, waits for it and frees its resources, the process must not be used
+        (or killed by its id) afterwards
+        :param proc: process started by the backend
+        :return: resources consumed by the process or None - if they are not known
+        """
+        pass
+
+    def is_oom_killed(self, pid: int) -> bool:
+        """
+        :param pid: process id
+        :return: True - if the process has been killed, because it has exceeded its memory limit
+        """
+        return False
+
+    def get_workdir_root(self) -> Optional[str]:
+        """
+        :return: directory, where working directories of test suites are created, None - the default temp directory
+        """
+        return None
+
+
+class ProcessBackend(ExecutionBackend):
+    """
+    Starts processes with the user's privileges, test suites are limited by rlimits (on Unix)
+    """
+
+    def start(self, cmd: Command, opts: Optional[TestSuiteExecOpts] = None, memory_overhead_mb: Optional[int] = None,
+              env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None) -> subprocess.Popen:
+        return subprocess.Popen(cmd.args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, env=cmd.get_env(env), cwd=cmd.cwd or cwd,
+                                preexec_fn=get_rlimits_setter(opts, memory_overhead_mb) if opts else None)
+
+    def kill(self, pid: int):
+        kill_process_tree(pid)
+
+    def release(self, proc: subprocess.Popen) -> Optional[ResourceUsage]:
+        if proc.returncode is None:
+            kill_process_tree(proc.pid)
+        if sys.platform.startswith('win32'):
+            proc.wait()
+            return None
+        usage = reap(proc)
+        return ResourceUsage(*usage) if usage is not None else None
+
+
+class SandboxBackend(ExecutionBackend):
+    """
+    Starts processes in sessions of their own, test suites are limited by rlimits and cgroups
+    (if the current cgroup is delegated), see the module's description
+    """
+
+    def __init__(self, cgroup_root: Optional[str] = None, workdir_root: Optional[str] = None,
+                 prlimit: Optional[str] = None):
+        """
+        :param cgroup_root: directory where cgroups of test suites are created, None - cgroups are not used
+        :param workdir_root: directory where working directories of test suites are created
+        :param prlimit: path of util-linux's prlimit, None - rlimits are set by a preexec function
+        """
+        self.cgroup_root = cgroup_root
+        self.workdir_root = workdir_root
+        self.prlimit = prlimit
+        self.cgroups: Dict[int, Cgroup] = {}
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def create() -> 'SandboxBackend':
+        """
+        :return: sandbox using the delegated cgroup (see CGROUP_ENV_VAR), tmpfs and prlimit, if they're available
+        """
+        return SandboxBackend(get_delegated_cgroup(os.environ.get(CGROUP_ENV_VAR)), get_tmpfs_workdir_root(),
+                              shutil.which('prlimit'))
+
+    def start(self, cmd: Command, opts: Optional[TestSuiteExecOpts] = None, memory_overhead_mb: Optional[int] = None,
+              env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None) -> subprocess.Popen:
+        cgroup = self.create_cgroup(opts) if opts is not None else None
+        limits = [(resource.RLIMIT_CORE, 0)]
+        if opts is not None:
+            limits += [(resource.RLIMIT_FSIZE, SANDBOX_FILE_SIZE_LIMIT)] + get_rlimits(opts, memory_overhead_mb)
+        if self.prlimit is not None:
+            args, preexec_fn = get_prlimit_args(self.prlimit, limits) + cmd.args, None
+        else:
+            args, preexec_fn = cmd.args, functools.partial(set_rlimits, limits)
+        try:
+            proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    text=True, env=cmd.get_env(env), cwd=cmd.cwd or cwd, start_new_session=True,
+                                    preexec_fn=preexec_fn)
+        except Exception:
+            if cgroup is not None:
+                cgroup.remove()
+            raise
+        if cgroup is not None:
+            if cgroup.attach(proc.pid):
+                with self.lock:
+                    self.cgroups[proc.pid] = cgroup
+            else:
+                # the process couldn't be moved into the cgroup, the process group is used instead
+                cgroup.remove()
+        return proc
+
+    def create_cgroup(self, opts: TestSuiteExecOpts) -> Optional[Cgroup]:
+        """
+        :param opts: options which control tests execution
+        :return: new cgroup for a test suite's process or None - if cgroups are not available
+        """
+        if self.cgroup_root is None:
+            return None
+        with self.lock:
+            self.counter += 1
+            name = f'{CGROUP_PREFIX}{os.getpid()}-{self.counter}'
+        try:
+            return Cgroup.create(self.cgroup_root, name, opts)
+        except OSError:
+            return None
+
+    def kill(self, pid: int):
+        with self.lock:
+            cgroup = self.cgroups.get(pid)
+        if cgroup is not None:
+            cgroup.kill()
+            return
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            # the process has exited or it's not a session leader
+            kill_process_tree(pid)
+
+    def release(self, proc: subprocess.Popen) -> Optional[ResourceUsage]:
+        with self.lock:
+            cgroup = self.cgroups.pop(proc.pid, None)
+        if cgroup is not None:
+            cgroup.kill()
+        elif proc.returncode is None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        usage = reap(proc)
+        if cgroup is not None:
+            cgroup_usage = cgroup.get_usage()
+            if cgroup_usage.peak_memory_kb is None and usage is not None:
+                cgroup_usage.peak_memory_kb = usage[1]
+            cgroup.remove()
+            return cgroup_usage
+        return ResourceUsage(*usage) if usage is not None else None
+
+    def is_oom_killed(self, pid: int) -> bool:
+        with self.lock:
+            cgroup = self.cgroups.get(pid)
+        return cgroup is not None and cgroup.get_usage().oom_killed
+
+    def get_workdir_root(self) -> Optional[str]:
+        return self.workdir_root
+
+
+def get_tmpfs_workdir_root() -> Optional[str]:
+    """
+    Creates a directory on tmpfs, which is accessible by the current user only
+    :return: directory's path or None - if there is no tmpfs, which allows execution of binaries
+    """
+    try:
+        with open('/proc/self/mounts') as f:
+            mount = next((line.split() for line in f if line.split()[1] == TMPFS_DIR), None)
+        if mount is None or mount[2] != 'tmpfs' or 'noexec' in mount[3].split(','):
+            return None
+        path = os.path.join(TMPFS_DIR, f'{CGROUP_PREFIX}{os.getuid()}')
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        if os.stat(path).st_uid != os.getuid():
+            return None
+        os.chmod(path, 0o700)
+        return path
+    except (OSError, IndexError):
+        return None
+
+
+backend: Optional[ExecutionBackend] = None
+backend_lock = threading.Lock()
+
+
+def get_execution_backend() -> ExecutionBackend:
+    """
+    :return: the session's execution backend: the sandbox on Linux (unless it's disabled), plain processes otherwise
+    """
+    global backend
+    with backend_lock:
+        if backend is None:
+            if sys.platform.startswith('linux') and os.environ.get(SANDBOX_ENV_VAR, '1') != '0':
+                backend = SandboxBackend.create()
+            else:
+                backend = ProcessBackend()
+        return backend
@@ -4,11 +4,32 @@
 String Utils
 """
 
+import functools
 import re
+from jinja2 import Template
 from jinja2.nativetypes import NativeEnvironment
 
 env = NativeEnvironment()
 IDENT_TAB_SIZE = 4
+TEMPLATE_CACHE_SIZE = 256
+
+LEADING_NEW_LINES = re.compile(r'^\n+')
+TRAILING_NEW_LINES = re.compile(r'\n+$')
+LEADING_SPACES = re.compile(r'^ +', re.MULTILINE)
+SPACE_BEFORE_COMMA = re.compile(r' ,')
+SPACES_BEFORE_PARENTHESIS = re.compile(r' +\)')
+SPACES_AFTER_PARENTHESIS = re.compile(r'\( +')
+EXTRA_NEW_LINES = re.compile(r'\n{3,}')
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(template: str) -> Template:
+    """
+    Compiles a template once, templates are string literals, so they are compiled on the first use only
+    :param template: source template
+    :return: compiled template
+    """
+    return env.from_string(template)
 
 
 def render_template(template: str = '', retab: bool = False, **kwargs) -> str:
@@ -21,18 +42,16 @@ def render_template(template: str = '', retab: bool = False, **kwargs) -> str:
     :param kwargs: model
     :return: rendered template string
     """
-    global env
     if template == '':
         return template
-    t = env.from_string(template)
-    s = t.render(kwargs)
-    s = re.sub(r'^\n+', '', s)
-    s = re.sub(r'\n+$', '', s)
-    s = '\n'.join([re.sub(r'^ +', '', line) for line in s.split('\n')])
-    s = re.sub(r' ,', ',', s)
-    s = re.sub(r' +\)', ')', s)
-    s = re.sub(r'\( +', '(', s)
-    s = re.sub(r'\n{3,}', '\n\n', s)
+    s = compile_template(template).render(kwargs)
+    s = LEADING_NEW_LINES.sub('', s)
+    s = TRAILING_NEW_LINES.sub('', s)
+    s = LEADING_SPACES.sub('', s)
+    s = SPACE_BEFORE_COMMA.sub(',', s)
+    s = SPACES_BEFORE_PARENTHESIS.sub(')', s)
+    s = SPACES_AFTER_PARENTHESIS.sub('(', s)
+    s = EXTRA_NEW_LINES.sub('\n\n', s)
     if retab:
         s = s.replace('\t', ' ' * IDENT_TAB_SIZE)
     return s
@@ -5,11 +5,21 @@ Syntax Tree API
 """
 
 from __future__ import annotations
+
+import re
 from abc import ABC, abstractmethod
-from typing import List
+from functools import lru_cache
+from typing import Iterable, List, Tuple
 
 from typing_extensions import Type
 
+SIGNATURE_CACHE_SIZE = 512
+CONTAINER_TYPES = frozenset(['list', 'map', 'linked_list', 'binary_tree'])
+PRIMITIVE_TYPES = frozenset(['int', 'float', 'string'])
+# tokens of a typing expression: [name], <user type>, punctuation, type name or a single unexpected character
+TOKEN = re.compile(r'\[[^\]]*\]|<[^>]*>|[(),]|[^()\[\]<>,\s]+(?:\s+[^()\[\]<>,\s]+)*|\S')
+END_TOKEN = ';'
+
 
 def validate_list(node: SyntaxTree):
     """
@@ -41,6 +51,21 @@ def validate_primitive(node: SyntaxTree):
         raise Exception('Primitive type cannot have inner-types')
 
 
+# node type -> validator and name of the visitor's method
+VISITORS = {
+    'array': (validate_list, 'visit_array'),
+    'list': (validate_list, 'visit_list'),
+    'linked_list': (validate_list, 'visit_linked_list'),
+    'binary_tree': (validate_list, 'visit_binary_tree'),
+    'map': (validate_map, 'visit_map'),
+    'int': (validate_primitive, 'visit_int'),
+    'long': (validate_primitive, 'visit_long'),
+    'bool': (validate_primitive, 'visit_bool'),
+    'float': (validate_primitive, 'visit_float'),
+    'string': (validate_primitive, 'visit_string'),
+}
+
+
 def is_primitive_type(node: SyntaxTree):
     """
     checks whether type is array, user type or one of [int, double, bool, long, string]
@@ -52,26 +77,37 @@ def is_primitive_type(node: SyntaxTree):
 
 class SyntaxTree:
     """
-    Tree structure to store parsed typing expression for a particular test suite
+    Tree structure to store parsed typing expression for a particular test suite.
+    Trees are immutable, so that parsed signatures can be shared (see parse_signature)
     """
 
-    def __init__(self, parent: SyntaxTree = None, node_type: str = None, user_type: bool = False):
-        self.parent = parent
-        self.node_type = node_type.strip() if node_type is not None else 'root'
-        self.name = ''
-        self.nodes = []
-        self.user_type = user_type
+    __slots__ = ('parent', 'node_type', 'name', 'nodes', 'user_type')
 
-    def add_child(self, node_type, user_type: bool = False):
+    def __init__(self, parent: SyntaxTree = None, node_type: str = None, name: str = '', user_type: bool = False,
+                 nodes: Iterable[SyntaxTree] = ()):
         """
-        Adds a child node to a particular node
-        :param node_type: input node's type name
+        :param parent: parent node
+        :param node_type: node's type name
+        :param name: node's name
         :param user_type: if a node's type is a custom user type (class, struct)
-        :return: child node created
+        :param nodes: child nodes
         """
-        node = SyntaxTree(self, node_type, user_type)
-        self.nodes.append(node)
-        return node
+        init = object.__setattr__
+        init(self, 'parent', parent)
+        init(self, 'node_type', node_type.strip() if node_type is not None else 'root')
+        init(self, 'name', name)
+        init(self, 'user_type', user_type)
+        init(self, 'nodes', tuple(nodes))
+
+    def __setattr__(self, key, value):
+        raise AttributeError('SyntaxTree is immutable')
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            object.__setattr__(self, slot, value)
 
     def first_child(self):
         """
@@ -92,10 +128,7 @@ class SyntaxTree:
         Takes a second child from a node
         :return: second child node
         """
-        sub_tree = SyntaxTree()
-        sub_tree.node_type = 'root'
-        sub_tree.nodes = [self.nodes[-1]]
-        return sub_tree
+        return SyntaxTree(nodes=[self.nodes[-1]])
 
     def accept(self, visitor: Type[SyntaxTreeVisitor], context=None):
         """
@@ -104,36 +137,11 @@ class SyntaxTree:
         :param context: data associated with the node
         :return: result of visitor's invocation
         """
-        if self.node_type == 'array':
-            validate_list(self)
-            return visitor.visit_array(self, context)
-        elif self.node_type == 'list':
-            validate_list(self)
-            return visitor.visit_list(self, context)
-        elif self.node_type == 'linked_list':
-            validate_list(self)
-            return visitor.visit_linked_list(self, context)
-        elif self.node_type == 'binary_tree':
-            validate_list(self)
-            return visitor.visit_binary_tree(self, context)
-        elif self.node_type == 'map':
-            validate_map(self)
-            return visitor.visit_map(self, context)
-        elif self.node_type == 'int':
-            validate_primitive(self)
-            return visitor.visit_int(self, context)
-        elif self.node_type == 'long':
-            validate_primitive(self)
-            return visitor.visit_long(self, context)
-        elif self.node_type == 'bool':
-            validate_primitive(self)
-            return visitor.visit_bool(self, context)
-        elif self.node_type == 'float':
-            validate_primitive(self)
-            return visitor.visit_float(self, context)
-        elif self.node_type == 'string':
-            validate_primitive(self)
-            return visitor.visit_string(self, context)
+        entry = VISITORS.get(self.node_type)
+        if entry is not None:
+            validate, method = entry
+            validate(self)
+            return getattr(visitor, method)(self, context)
         elif self.user_type:
             return visitor.visit_obj(self, context)
 
@@ -142,7 +150,7 @@ class SyntaxTree:
         Returns whether a node's type is of container type or not
         :return: if type is map or list - true, false otherwise
         """
-        return self.node_type in ['list', 'map', 'linked_list', 'binary_tree']
+        return self.node_type in CONTAINER_TYPES
 
     def is_array_type(self) -> bool:
         """
@@ -156,7 +164,7 @@ class SyntaxTree:
         Returns whether a node's type is of primitive type
         :return: if type is int, float, string - true, false otherwise
         """
-        return self.node_type in ['int', 'float', 'string']
+        return self.node_type in PRIMITIVE_TYPES
 
     def is_root(self) -> bool:
         """
@@ -172,34 +180,7 @@ class SyntaxTree:
         :param expression_list: source expressions
         :return: resultant syntax tree instance
         """
-        root = SyntaxTree()
-        user_types = []
-        for expr in expression_list:
-            node = root
-            buf = ''
-            for c in expr:
-                if c not in '()[]<>,':
-                    buf += c
-                    continue
-                if buf == '':
-                    if c in ',)':
-                        node = node.parent
-                elif c in '(<':
-                    node = node.add_child(buf)
-                elif c == '[':
-                    node = node.add_child(buf, buf in user_types)
-                elif c in ',)':
-                    node.add_child(buf)
-                elif c == ']':
-                    node.name = buf
-                elif c == '>':
-                    node.node_type = buf
-                    node.user_type = True
-                    user_types.append(buf)
-                buf = ''
-            if buf != '':
-                node.add_child(buf)
-        return root
+        return parse_signature(';'.join(expression_list))
 
     def to_string(self, buf: str = '\n', ident: int = 0):
         """
@@ -219,6 +200,83 @@ class SyntaxTree:
         return buf
 
 
+def tokenize(expression: str) -> List[str]:
+    """
+    Splits a typing expression into tokens
+    :param expression: source expression, e.g. map(string, list(int))[name]
+    :return: list of tokens: [name], <user type>, punctuation character or type name, ends with END_TOKEN
+    """
+    tokens = TOKEN.findall(expression)
+    tokens.append(END_TOKEN)
+    return tokens
+
+
+def parse_type(tokens: List[str], pos: int, parent: SyntaxTree, user_types: set) -> Tuple[SyntaxTree, int]:
+    """
+    Parses a type: type_name[(type, ...)][[name]][<user type>]
+    :param tokens: expression's tokens
+    :param pos: position of the type's first token
+    :param parent: parent node
+    :param user_types: names of the user types declared so far
+    :return: tuple of the type's node and position of the next token
+    """
+    node_type = tokens[pos]
+    if node_type[0] in '(),[]<>;':
+        raise Exception(f'Type name is expected, got {node_type!r}')
+    node = SyntaxTree.__new__(SyntaxTree)
+    name = ''
+    user_type = node_type in user_types
+    nodes = []
+    pos += 1
+    if tokens[pos] == '(':
+        pos += 1
+        while tokens[pos] != ')':
+            child, pos = parse_type(tokens, pos, node, user_types)
+            nodes.append(child)
+            if tokens[pos] == ',':
+                pos += 1
+            elif tokens[pos] != ')':
+                raise Exception(f"')' is expected, got {tokens[pos]!r}")
+        pos += 1
+    while tokens[pos][0] in '[<':
+        token = tokens[pos]
+        if len(token) == 1:
+            raise Exception(f'Unterminated {token!r}')
+        if token[0] == '[':
+            name = token[1:-1].strip()
+        else:
+            node_type = token[1:-1].strip()
+            user_type = True
+            user_types.add(node_type)
+        pos += 1
+    node.__init__(parent, node_type, name, user_type, nodes)
+    return node, pos
+
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def parse_signature(row: str) -> SyntaxTree:
+    """
+    Parses a card's signature row, parsed signatures are cached (trees are immutable, so they're shared)
+    :param row: typing expressions separated by ';', e.g. int[a];list(int)[b];int
+    :return: resultant syntax tree instance
+    """
+    root = SyntaxTree.__new__(SyntaxTree)
+    user_types = set()
+    nodes = []
+    for expression in row.split(';'):
+        tokens = tokenize(expression)
+        pos = 0
+        while tokens[pos] != END_TOKEN:
+            node, pos = parse_type(tokens, pos, root, user_types)
+            nodes.append(node)
+            if tokens[pos] == ',':
+                pos += 1
+            elif tokens[pos] != END_TOKEN:
+                raise Exception(f'Unexpected {tokens[pos]!r} in {expression}')
+    root.__init__(nodes=nodes)
+    return root
+
+
 class SyntaxTreeVisitor(ABC):
     """
     This is an abstract class which defines the API of handling different types. Depending on the target node's type
@@ -6,9 +6,12 @@ Template Generator API
 
 from abc import abstractmethod
 
+from testing.framework.generation_cache import GenerationCache, get_generation_key
 from testing.framework.types import TestSuite
 from testing.framework.syntax.syntax_tree import SyntaxTree
 
+template_cache = GenerationCache()
+
 
 class TemplateGenerator:
     """
@@ -24,3 +27,13 @@ class TemplateGenerator:
         :return solution template source code
         """
         pass
+
+    def generate_template(self, tree: SyntaxTree, ts: TestSuite) -> str:
+        """
+        Returns a code template for a single quiz, it's generated once per quiz's signature and language
+        :param tree: source syntax tree
+        :param ts: source test suite
+        :return solution template source code
+        """
+        key = (type(self).__name__,) + get_generation_key(tree, ts.fn_name, ts.description)
+        return template_cache.get(key, lambda: self.get_template(tree, ts))
@@ -0,0 +1,363 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Test Corpus API
+
+A card's test cases compiled once: the parsed signature, the execution options, the arguments
+serialized into lines (ready to be sent to a test suite) and the decoded expected values.
+Compiled corpora are cached in memory (LRU) by note id and modification time, optionally they are
+persisted on disk as JSON, so that repeated runs (and language switches) skip parsing of test cases.
+A persisted corpus keeps the signature, which is parsed again on load, so the file's layout
+doesn't depend on the syntax tree's or the options' structure.
+
+An argument of a test case can reference a large input stored in the media folder: @media:<file name>,
+the file contains the argument's JSON value. Such files are never loaded into memory,
+they are streamed to a test suite in chunks, when the test case is submitted.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, TextIO, Tuple, Union
+
+from testing.framework.syntax.syntax_tree import SyntaxTree, parse_signature
+from testing.framework.types import TestSuite, TestSuiteExecOpts
+
+CORPUS_RECORD_FIELDS = ['format', 'mtime', 'fn_name', 'description', 'signature', 'media_dir', 'cases']
+CORPUS_FORMAT = hashlib.sha256(json.dumps(CORPUS_RECORD_FIELDS).encode('utf-8')).hexdigest()[:16]
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_FILES = 1024
+CORPUS_FILE_EXT = '.corpus'
+MEDIA_REF_PREFIX = '@media:'
+STREAM_CHUNK_SIZE = 64 * 1024  # characters of a media file submitted at once
+
+
+class MediaFile:
+    """
+    Argument's value stored in a media file
+    """
+
+    def __init__(self, name: str, path: str):
+        """
+        :param name: file name in the media folder
+        :param path: absolute path of the file
+        """
+        self.name = name
+        self.path = path
+
+    def write_to(self, out: TextIO, chunk_size: int = STREAM_CHUNK_SIZE):
+        """
+        Streams the value in chunks, line breaks are replaced by spaces
+        (JSON strings cannot contain raw line breaks, so the value is kept intact)
+        :param out: target stream
+        :param chunk_size: max number of characters read at once
+        """
+        with open(self.path, 'r', encoding='utf-8') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                out.write(chunk.replace('\r', ' ').replace('\n', ' '))
+
+    def __str__(self):
+        return MEDIA_REF_PREFIX + self.name
+
+
+class StreamedArgs:
+    """
+    JSON arguments line of a test case, which references media files:
+    a list of the line's literal parts and media files, which are streamed in place
+    """
+
+    def __init__(self, parts: List[Union[str, MediaFile]]):
+        self.parts = parts
+
+    def write_to(self, out: TextIO, chunk_size: int = STREAM_CHUNK_SIZE):
+        """
+        Writes the arguments line (without the line break)
+        :param out: target stream
+        :param chunk_size: max number of characters of a media file read at once
+        """
+        for part in self.parts:
+            if isinstance(part, MediaFile):
+                part.write_to(out, chunk_size)
+            else:
+                out.write(part)
+
+    def __str__(self):
+        return ''.join(str(part) for part in self.parts)
+
+
+def get_media_file(value: str, media_dir: Optional[str]) -> Optional[MediaFile]:
+    """
+    :param value: an argument's value
+    :param media_dir: media folder
+    :return: media file referenced by the value or None, if the value is not a reference
+    """
+    value = value.strip()
+    if not value.startswith(MEDIA_REF_PREFIX):
+        return None
+    name = value[len(MEDIA_REF_PREFIX):].strip()
+    if media_dir is None:
+        raise Exception(f'Cannot read {name}, media folder is not available')
+    if not name or os.path.basename(name) != name:
+        raise Exception(f'Invalid media file name: {name}')
+    path = os.path.join(media_dir, name)
+    if not os.path.isfile(path):
+        raise Exception(f'Media file is not found: {name}')
+    return MediaFile(name, path)
+
+
+def parse_test_case(row: str, media_dir: Optional[str] = None) -> Tuple[Union[str, StreamedArgs], Any]:
+    """
+    Splits a test case row into arguments and expected value
+    :param row: test case row, values are separated with ';'
+    :param media_dir: media folder, which contains large inputs referenced by @media:<file name>
+    :return: tuple of JSON arguments line (or arguments streamed from media files) and decoded expected value
+    """
+    splt = re.split('(?<!\\\\);', row)
+    args = splt[:-1]
+    if get_media_file(splt[-1], media_dir) is not None:
+        raise Exception('Expected value cannot be stored in a media file')
+    if not any(arg.lstrip().startswith(MEDIA_REF_PREFIX) for arg in args):
+        return '[' + ','.join(args) + ']', json.loads(splt[-1])
+    parts = ['[']
+    for i, arg in enumerate(args):
+        media_file = get_media_file(arg, media_dir)
+        if media_file is not None:
+            parts.append(media_file)
+        elif isinstance(parts[-1], str):
+            parts[-1] += arg
+        else:
+            parts.append(arg)
+        sep = ',' if i < len(args) - 1 else ']'
+        if isinstance(parts[-1], str):
+            parts[-1] += sep
+        else:
+            parts.append(sep)
+    return StreamedArgs(parts), json.loads(splt[-1])
+
+
+class TestCorpus:
+    """
+    Compiled test cases of a card:
+        - ts - test suite (function name and description)
+        - tree - syntax tree of the signature
+        - opts - execution options declared in the signature
+        - cases - list of tuples: JSON arguments line (or StreamedArgs), decoded expected value
+        - signature - signature row, the corpus can be persisted only if it's set
+        - media_dir - media folder, which contains large inputs referenced by test cases
+    """
+
+    def __init__(self, ts: TestSuite, tree: SyntaxTree, opts: TestSuiteExecOpts,
+                 cases: List[Tuple[Union[str, StreamedArgs], Any]], signature: Optional[str] = None,
+                 media_dir: Optional[str] = None):
+        self.ts = ts
+        self.tree = tree
+        self.opts = opts
+        self.cases = cases
+        self.signature = signature
+        self.media_dir = media_dir
+
+    @staticmethod
+    def of(fn_name: str, description: str, rows: List[str], media_dir: Optional[str] = None) -> 'TestCorpus':
+        """
+        Compiles test case rows
+        :param fn_name: solution function name
+        :param description: card's description
+        :param rows: text rows, the first row is the signature, the others are test cases
+        :param media_dir: media folder, which contains large inputs referenced by test cases
+        :return: compiled corpus
+        """
+        cases = [parse_test_case(row, media_dir) for row in rows[1:]]
+        return TestCorpus.of_cases(fn_name, description, rows[0], cases, media_dir)
+
+    @staticmethod
+    def of_cases(fn_name: str, description: str, signature: str, cases: List[Tuple[Union[str, StreamedArgs], Any]],
+                 media_dir: Optional[str] = None) -> 'TestCorpus':
+        """
+        Builds a corpus of compiled test cases
+        :param fn_name: solution function name
+        :param description: card's description
+        :param signature: signature row
+        :param cases: compiled test cases
+        :param media_dir: media folder, which contains large inputs referenced by test cases
+        :return: corpus
+        """
+        tree = parse_signature(signature)
+        ts = TestSuite()
+        ts.fn_name = fn_name
+        ts.description = description
+        return TestCorpus(ts, tree, TestSuiteExecOpts(tree.nodes[-1].name), cases, signature, media_dir)
+
+    def to_record(self, mtime: int) -> dict:
+        """
+        :param mtime: note's modification time
+        :return: JSON serializable record of the corpus
+        """
+        cases = []
+        for args, expected in self.cases:
+            if isinstance(args, StreamedArgs):
+                args = [{'media': part.name} if isinstance(part, MediaFile) else part for part in args.parts]
+            cases.append([args, expected])
+        return {'format': CORPUS_FORMAT, 'mtime': mtime, 'fn_name': self.ts.fn_name,
+                'description': self.ts.description, 'signature': self.signature, 'media_dir': self.media_dir,
+                'cases': cases}
+
+    @staticmethod
+    def of_record(record: dict) -> 'TestCorpus':
+        """
+        Restores a corpus from its record, media files are looked up again
+        :param record: record built by to_record
+        :return: corpus
+        """
+        cases = []
+        for args, expected in record['cases']:
+            if isinstance(args, list):
+                args = StreamedArgs([part if isinstance(part, str) else
+                                     get_media_file(MEDIA_REF_PREFIX + part['media'], record['media_dir'])
+                                     for part in args])
+            elif not isinstance(args, str):
+                raise Exception(f'Invalid arguments: {args}')
+            cases.append((args, expected))
+        return TestCorpus.of_cases(record['fn_name'], record['description'], record['signature'], cases,
+                                   record['media_dir'])
+
+
+class CorpusCache:
+    """
+    LRU cache of compiled corpora, safe to be shared between threads.
+    If the directory is set, every corpus is also stored in a file named by its note id,
+    least recently used files are removed, when there are more than max_files of them
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, directory: Optional[str] = None,
+                 max_files: int = DEFAULT_MAX_FILES):
+        """
+        :param max_entries: max number of corpora kept in memory
+        :param directory: directory to persist corpora into, None - corpora are kept in memory only
+        :param max_files: max number of persisted corpora
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_files = max_files
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, note_id: int, mtime: int, compile_corpus: Callable[[], TestCorpus]) -> TestCorpus:
+        """
+        Looks up a note's corpus, compiles it if it's not cached or the note has been modified since
+        :param note_id: note id
+        :param mtime: note's modification time
+        :param compile_corpus: function compiling the note's corpus
+        :return: compiled corpus
+        """
+        with self.lock:
+            entry = self.entries.get(note_id)
+            if entry is not None and entry[0] == mtime:
+                self.entries.move_to_end(note_id)
+                return entry[1]
+        corpus = self.load(note_id, mtime)
+        if corpus is None:
+            corpus = compile_corpus()
+            self.store(note_id, mtime, corpus)
+        with self.lock:
+            self.entries[note_id] = (mtime, corpus)
+            self.entries.move_to_end(note_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return corpus
+
+    def get_path(self, note_id: int) -> str:
+        """
+        :param note_id: note id
+        :return: path of the note's corpus file
+        """
+        return os.path.join(self.directory, str(note_id) + CORPUS_FILE_EXT)
+
+    def load(self, note_id: int, mtime: int) -> Optional[TestCorpus]:
+        """
+        :param note_id: note id
+        :param mtime: note's modification time
+        :return: persisted corpus or None - if it's not found or outdated, outdated files are removed
+        """
+        if self.directory is None:
+            return None
+        path = self.get_path(note_id)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except OSError:
+            return None
+        except ValueError:
+            record = None
+        corpus = None
+        if isinstance(record, dict) and sorted(record) == sorted(CORPUS_RECORD_FIELDS) and \
+                record['format'] == CORPUS_FORMAT and record['mtime'] == mtime:
+            try:
+                corpus = TestCorpus.of_record(record)
+            except Exception:
+                # e.g. a referenced media file has been removed
+                corpus = None
+        try:
+            if corpus is None:
+                os.remove(path)
+            else:
+                os.utime(path)
+        except OSError:
+            pass
+        return corpus
+
+    def store(self, note_id: int, mtime: int, corpus: TestCorpus):
+        """
+        Persists a corpus (if the directory is set), the file is replaced atomically
+        :param note_id: note id
+        :param mtime: note's modification time
+        :param corpus: compiled corpus
+        """
+        if self.directory is None or corpus.signature is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(corpus.to_record(mtime), f)
+            os.replace(tmp, self.get_path(note_id))
+        except OSError:
+            return
+        self.evict_files()
+
+    def evict_files(self):
+        """
+        Removes least recently used corpus files, until there are at most max_files of them
+        """
+        try:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                     if name.endswith(CORPUS_FILE_EXT)]
+        except OSError:
+            return
+        files = []
+        for path in paths:
+            try:
+                files.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        for _, path in sorted(files)[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Drops the corpora kept in memory
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+corpus_cache = CorpusCache()
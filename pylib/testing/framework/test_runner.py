@@ -8,22 +8,28 @@ import json
 import os
 import subprocess
 import sys
-import tempfile
+import threading
 import re
-from json import JSONDecodeError
 
-import psutil
-import time
-
-from deepdiff import DeepDiff
+from collections import deque
 from abc import abstractmethod, ABC
-from os.path import normpath
-from typing import List, Optional, Tuple
-
-from testing.framework.io_utils import non_blocking_readlines
-from testing.framework.test_suite_gen import START_USER_SRC_MARKER
-from testing.framework.types import SrcFile, TestResponse, TestSuiteExecOpts
-from testing.framework.console_logger import ConsoleLogger
+from typing import Any, Callable, Deque, Dict, List, Optional, TextIO, Tuple, Union
+
+from testing.framework.comparator import describe_difference, get_comparator
+from testing.framework.compile_cache import compile_cache, hash_key
+from testing.framework.io_utils import FrameSplitter, PipeReader, LineSplitter
+from testing.framework.test_corpus import StreamedArgs, TestCorpus
+from testing.framework.test_suite_gen import RESULT_FRAME_MARKER, START_USER_SRC_MARKER
+from testing.framework.types import BENCHMARK_REPS_ENV_VAR, BENCHMARK_WARMUP_ENV_VAR, PROFILE_ENV_VAR, Command, \
+    SrcFile, TestResponse, TestSuiteExecOpts
+from testing.framework.console_logger import ConsoleLogger, TestLogger
+from testing.framework.cpu_budget import cpu_budget
+from testing.framework.diagnostics import DiagnosticParser
+from testing.framework.sandbox import ResourceUsage, get_execution_backend
+from testing.framework.watchdog import MEMORY_LIMIT_EXCEEDED, SUITE_TIME_LIMIT_EXCEEDED, Watchdog, check_duration, \
+    get_suite_deadline
+from testing.framework.worker_pool import JOB_DONE_MARKER, WorkerPool
+from testing.framework.workspace import Workspace, workspace_pool
 import pathlib
 
 isMac = sys.platform.startswith("darwin")
@@ -31,20 +37,47 @@ isWin = sys.platform.startswith("win32")
 isLin = sys.platform.startswith("linux")
 
 ERROR_LINE_OUTPUT_LIMIT = 100
+POLL_TIMEOUT_SEC = 0.5  # how often the stop flag is checked while waiting for the child process
+STDERR_SETTLE_SEC = 0.05  # STDERR is considered complete, when the child doesn't write to it within this interval
+STDOUT = 'stdout'
+STDERR = 'stderr'
+END_OF_JOB = ''  # empty line stops a test suite
+JOB_DONE_MARKER_BYTES = JOB_DONE_MARKER.encode()
+RESULT_FRAME_MARKER_BYTES = RESULT_FRAME_MARKER.encode()
+USER_OUTPUT_LIMIT = 64 * 1024  # max bytes of the user's output logged per test suite
+USER_OUTPUT_TRUNCATED = b'... output is truncated'
+TOOLCHAIN_VERSION_TIMEOUT_SEC = 30
 
+toolchain_versions: Dict[str, Optional[str]] = {}
 
-def create_src_file(src: str, name: str) -> SrcFile:
+
+def create_src_file(src: str, name: str, workspace: Workspace) -> SrcFile:
     """
-    Stores the source code provided into temporary file
+    Stores the source code provided into a workspace, the previous source is swapped atomically
     :param src: target source code
     :param name: name of the file
-    :return: Tuple - the file's parent dir and the target file
+    :param workspace: acquired workspace
+    :return: source file stored in the workspace
+    """
+    return SrcFile(src, workspace.write_file(name, src), workspace, get_code_offset(src, START_USER_SRC_MARKER))
+
+
+def get_toolchain_version(cmd: Command) -> Optional[str]:
+    """
+    Executes a toolchain's version command once per session
+    :param cmd: command printing a toolchain's version
+    :return: the command's output or None if the command has failed
     """
-    workdir = tempfile.TemporaryDirectory()
-    src_file = open(os.path.join(workdir.name, name), 'w')
-    src_file.write(src)
-    src_file.close()
-    return SrcFile(src, src_file, workdir)
+    key = str(cmd)
+    if key not in toolchain_versions:
+        try:
+            proc = subprocess.run(cmd.args, env=cmd.get_env(), cwd=cmd.cwd, stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                  timeout=TOOLCHAIN_VERSION_TIMEOUT_SEC)
+            toolchain_versions[key] = proc.stdout if proc.returncode == 0 else None
+        except (OSError, subprocess.SubprocessError):
+            toolchain_versions[key] = None
+    return toolchain_versions[key]
 
 
 def get_resource_path():
@@ -60,15 +93,7 @@ def get_resource_path():
         result = sys._MEIPASS
     else:
         result = os.path.join(pathlib.Path(__file__).parents[3], 'testing')
-    return '"' + result + '"'
-
-
-def compare(obj1, obj2, ignore_order=True) -> bool:
-    """
-    Performs deep difference between two objects
-    :return True - if objects are equal, False otherwise
-    """
-    return DeepDiff(obj1, obj2, ignore_order=ignore_order, significant_digits=4) == {}
+    return result
 
 
 def get_code_offset(src: str, user_src_start_marker: str) -> int:
@@ -76,33 +101,308 @@ def get_code_offset(src: str, user_src_start_marker: str) -> int:
     Returns number of lines which precede solution src
     :param src: solution src
     :param user_src_start_marker: begin of solution src marker
+    :return: number of lines or 0 - if there is no marker
     """
-    start_src_index = src.index(user_src_start_marker)
-    return len(src[:start_src_index].split('\n'))
+    start_src_index = src.find(user_src_start_marker)
+    if start_src_index == -1:
+        return 0
+    return src.count('\n', 0, start_src_index) + 1
 
 
-def parse_response(line: str) -> Tuple[Optional[TestResponse], str]:
+def is_profiling_enabled(opts: TestSuiteExecOpts) -> bool:
+    """
+    :param opts: options which control tests execution
+    :return: True - if a test suite must report its phases' timings, by the options or the environment variable
     """
-    Parses a line from stdout, extracts response JSON (if presented) and other text
-    :param line: target line
-    :return: tuple of parsed test response and a message
+    return opts.profile or os.environ.get(PROFILE_ENV_VAR, '') not in ('', '0')
+
+
+def get_test_suite_env(profile: bool, opts: Optional[TestSuiteExecOpts] = None) -> Dict[str, str]:
+    """
+    :param profile: if the test suite must report its phases' timings
+    :param opts: options which control tests execution, None - the test suite is not benchmarked
+    :return: environment of a test suite's process
+    """
+    benchmark = opts.benchmark if opts is not None else 0
+    warmup = opts.benchmark_warmup if opts is not None else 0
+    return dict(os.environ, **{PROFILE_ENV_VAR: '1' if profile else '0', BENCHMARK_REPS_ENV_VAR: str(benchmark),
+                               BENCHMARK_WARMUP_ENV_VAR: str(warmup)})
+
+
+def get_result_checker(corpus: TestCorpus, opts: TestSuiteExecOpts) -> Callable[[Any, Any], bool]:
+    """
+    :param corpus: compiled test cases
+    :param opts: options which control tests execution
+    :return: function, which checks whether a result is equal to the expected value,
+             it accepts any result if results must not be checked
+    """
+    if not opts.check_results:
+        return lambda result, expected: True
+    return get_comparator(corpus.tree.nodes[-1], opts.ignore_order)
+
+
+def parse_response(payload: bytes) -> TestResponse:
+    """
+    Parses a test response frame's payload
+    :param payload: JSON object printed by the test suite
+    :return: parsed test response
+    """
+    data = json.loads(payload)
+    return TestResponse(duration=data.get('duration'), result=data.get('result'), index=data.get('index'),
+                        duration_ns=data.get('duration_ns'), cpu_ns=data.get('cpu_ns'), profile=data.get('profile'),
+                        bench_ns=data.get('bench_ns'))
+
+
+class ResponseParser:
     """
-    buf = ''
-    line = line.strip()
-    end = len(line)
-    resp = None
-    if not line.endswith('}'):
-        return None, line
-    for i in range(0, len(line)):
-        if line[i] == '{':
+    Parses a child process's STDOUT as it arrives: extracts test responses (framed by RESULT_FRAME_MARKER)
+    and keeps them along with the output, which precedes them, until they are consumed. The rest of STDOUT
+    is the user's output, it's split into lines and truncated after USER_OUTPUT_LIMIT bytes.
+    With pipelining a chunk may contain responses of several test cases, so a test case's output is logged
+    right before its verdict, and the output of cases following a failed one is never logged
+    """
+
+    def __init__(self, output_limit: int = USER_OUTPUT_LIMIT):
+        self.frames = FrameSplitter(RESULT_FRAME_MARKER_BYTES)
+        self.lines = LineSplitter()
+        self.responses: Deque[Tuple[List[str], TestResponse]] = deque()
+        self.pending: List[str] = []  # output printed after the queued responses
+        self.job_done = False
+        self.output_limit = output_limit
+        self.output_size = 0
+
+    def feed(self, data: bytes) -> List[Tuple[List[str], Optional[TestResponse]]]:
+        """
+        Parses the next chunk of STDOUT
+        :param data: chunk of bytes, b'' - means EOF
+        :return: messages printed by the user's code grouped by the response they precede: tuples of messages
+                 and response, the last group's response is None - if its messages are not followed by a response yet
+        """
+        groups = []
+        messages = []
+        items = self.frames.feed(data) if data else [(False, self.frames.flush())]
+        for is_frame, chunk in items:
+            if is_frame:
+                # a test case's output ends with its response
+                self.add_messages([self.lines.flush()], messages)
+                groups.append((messages, parse_response(chunk)))
+                messages = []
+            else:
+                self.add_messages(self.split_lines(chunk), messages)
+        if not data:
+            self.add_messages([self.lines.flush()], messages)
+        if messages:
+            groups.append((messages, None))
+        return groups
+
+    def queue(self, groups: List[Tuple[List[str], Optional[TestResponse]]]) -> List[str]:
+        """
+        Queues parsed responses along with their output
+        :param groups: groups returned by feed
+        :return: messages to be logged right away: the output of the running test case, if no responses are queued
+        """
+        ready = []
+        for messages, response in groups:
+            if response is not None:
+                self.responses.append((self.pending + messages, response))
+                self.pending = []
+            elif self.responses:
+                self.pending += messages
+            else:
+                ready += messages
+        return ready
+
+    def take_output(self) -> List[str]:
+        """
+        :return: output of the running test case, which has been printed after the consumed responses
+        """
+        if self.responses:
+            return []
+        messages, self.pending = self.pending, []
+        return messages
+
+    def split_lines(self, text: bytes) -> List[bytes]:
+        """
+        :param text: chunk of the user's output
+        :return: complete lines, the output beyond the limit is dropped
+        """
+        if self.output_size > self.output_limit:
+            return []
+        self.output_size += len(text)
+        if self.output_size <= self.output_limit:
+            return self.lines.feed(text)
+        lines = self.lines.feed(text[:len(text) - self.output_size + self.output_limit])
+        return lines + [self.lines.flush(), USER_OUTPUT_TRUNCATED]
+
+    def add_messages(self, lines: List[bytes], messages: List[str]):
+        """
+        :param lines: lines of the user's output
+        :param messages: list of messages to be logged
+        """
+        for line in lines:
+            if line.strip() == JOB_DONE_MARKER_BYTES:
+                self.job_done = True
+            elif line.strip():
+                messages.append(line.decode('utf-8', 'replace').strip())
+
+
+class CaseWriter(threading.Thread):
+    """
+    Streams test cases to a child process's STDIN without waiting for their responses.
+    At most `window` test cases are in flight (submitted, but not consumed yet), so that
+    the child's pipes are not flooded and a failed test doesn't cost much redundant work
+    """
+
+    def __init__(self, stdin: TextIO, lines: List[Union[str, StreamedArgs]], window: int):
+        """
+        :param stdin: target STDIN
+        :param lines: list of lines to submit, lines referencing media files are streamed in chunks
+        :param window: max number of test cases in flight, 0 - unlimited
+        """
+        super().__init__(daemon=True)
+        self.stdin = stdin
+        self.lines = lines
+        self.window = threading.Semaphore(window) if window > 0 else None
+        self.closed = False
+
+    def run(self):
+        """
+        Submits lines to the child process, flushing STDIN only when the window is exhausted
+        or all lines are written
+        """
+        try:
+            for line in self.lines:
+                if self.window is not None and not self.window.acquire(blocking=False):
+                    self.stdin.flush()
+                    self.window.acquire()
+                if self.closed:
+                    return
+                if isinstance(line, StreamedArgs):
+                    line.write_to(self.stdin)
+                    self.stdin.write('\n')
+                else:
+                    self.stdin.write(line + '\n')
+            self.stdin.flush()
+        except (OSError, ValueError):
+            # the child process has exited or has been killed, or a media file cannot be read:
+            # STDIN is closed, so that the child doesn't wait for the rest of the test case
             try:
-                resp = json.loads(line[i:end], object_hook=lambda d: TestResponse(**d))
-            except JSONDecodeError:
+                self.stdin.close()
+            except (OSError, ValueError):
                 pass
-            if resp and isinstance(resp, TestResponse) and resp.duration is not None:
-                return resp, buf
-        buf += line[i]
-    return None, buf
+
+    def consumed(self):
+        """
+        Notifies the writer that a test case's response has been consumed
+        """
+        if self.window is not None:
+            self.window.release()
+
+    def close(self):
+        """
+        Stops submitting test cases
+        """
+        self.closed = True
+        self.consumed()
+
+
+class Shard:
+    """
+    Process executing a part of a test suite's cases: a shard i of n executes the cases i, i + n, i + 2n, ...
+    """
+
+    def __init__(self, proc: subprocess.Popen, indices: List[int]):
+        """
+        :param proc: process executing the test suite
+        :param indices: 0-based indices of the shard's test cases, in ascending order
+        """
+        self.proc = proc
+        self.indices = indices
+        self.pending = -1  # index of the test case, whose response is being awaited
+
+
+class ShardResults:
+    """
+    Collects outcomes of test cases executed by shards, so that they can be reported in the index order.
+    Messages logged by a shard are attributed to the test case being executed and replayed along with its outcome
+    """
+
+    def __init__(self, count: int):
+        """
+        :param count: number of test cases
+        """
+        self.outcomes: Dict[int, Tuple[Optional[TestResponse], bool, Optional[str]]] = {}
+        self.messages: Dict[int, List[Tuple[str, str]]] = {}
+        self.first_failure = count
+        self.cond = threading.Condition()
+
+    def put(self, index: int, response: Optional[TestResponse], passed: bool, violation: Optional[str] = None):
+        """
+        Stores a test case's outcome
+        :param index: test case's index
+        :param response: test case's response or None - if execution has failed (the error is already logged)
+        :param passed: True - if the result is equal to the expected value
+        :param violation: time or memory limit violated by the test case
+        """
+        with self.cond:
+            self.outcomes[index] = response, passed, violation
+            if not passed:
+                self.first_failure = min(self.first_failure, index)
+            self.cond.notify_all()
+
+    def add_message(self, index: int, kind: str, msg: str):
+        """
+        Stores a message logged while a test case was being executed
+        :param index: test case's index
+        :param kind: 'log' - user's output, 'info'/'error' - console logger's messages
+        :param msg: message
+        """
+        with self.cond:
+            self.messages.setdefault(index, []).append((kind, msg))
+
+    def wait(self, index: int) -> Tuple[Optional[TestResponse], bool, Optional[str]]:
+        """
+        Blocks until a test case's outcome is available
+        :param index: test case's index
+        :return: tuple of the test case's response, whether it has passed and the violated limit
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: index in self.outcomes)
+            return self.outcomes[index]
+
+    def replay(self, index: int, logger: ConsoleLogger, test_logger: TestLogger):
+        """
+        Logs messages stored for a test case
+        :param index: test case's index
+        :param logger: console logger
+        :param test_logger: test logger
+        """
+        with self.cond:
+            messages = self.messages.pop(index, [])
+        for kind, msg in messages:
+            if kind == 'log':
+                test_logger.log(msg)
+            else:
+                getattr(logger, kind)(msg)
+
+
+class ShardLogger:
+    """
+    Substitutes both the console and the test logger of a shard, messages are stored in the shard results
+    """
+
+    def __init__(self, results: ShardResults):
+        self.results = results
+        self.index = -1
+
+    def info(self, msg: str):
+        self.results.add_message(self.index, 'info', msg)
+
+    def error(self, msg: str):
+        self.results.add_message(self.index, 'error', msg)
+
+    def log(self, msg: str, flush: bool = False):
+        self.results.add_message(self.index, 'log', msg)
 
 
 class TestRunner(ABC):
@@ -115,92 +415,396 @@ class TestRunner(ABC):
 
     def __init__(self):
         self.pid = None
+        self.shard_pids: List[int] = []
+        self.procs: List[subprocess.Popen] = []
         self.stopped = False
+        self.benchmark_score: Optional[float] = None
+        self.compile_cache = compile_cache
+        self.backend = get_execution_backend()
 
-    def run(self, src_code: str, test_cases: List[str], opts: TestSuiteExecOpts, logger: ConsoleLogger):
+    def run(self, src_code: str, corpus: TestCorpus, opts: TestSuiteExecOpts, logger: ConsoleLogger,
+            worker_pool: Optional[WorkerPool] = None) -> bool:
         """
         Submits a source code for execution
         :param src_code: source code to run
-        :param test_cases: text rows containing a testing data
+        :param corpus: compiled test cases
         :param opts: options which control tests execution
         :param logger: console logger
+        :param worker_pool: pool of warm workers, if there is no warm worker - a new process is started,
+                            test cases sharded across several processes, limited in memory, profiled
+                            or benchmarked are never executed by warm workers
+        :return: True - if all tests have passed
         """
         if self.pid is not None:
             raise Exception('Another test is already running ' + str(self.pid))
 
         resource_path = get_resource_path()
-        src_file = create_src_file(src_code, self.get_src_file_name())
-        test_logger = logger.get_testing_logger(len(test_cases) - 1)
+        workspace = workspace_pool.acquire(self.get_src_file_name(), self.backend.get_workdir_root())
+        try:
+            src_file = create_src_file(src_code, self.get_src_file_name(), workspace)
+        except Exception:
+            workspace_pool.release(workspace, False)
+            raise
+        test_logger = logger.get_testing_logger(len(corpus.cases))
         self.stopped = False
+        self.benchmark_score = None
+        # shards would compete for CPU and memory bandwidth, so benchmarked test cases are never sharded
+        cpus = cpu_budget.acquire(1 if opts.benchmark else max(1, min(opts.parallel, len(corpus.cases))))
+        profile = is_profiling_enabled(opts)
+        # a warm worker's memory includes its runtime's state, so memory limits are checked (and peak RSS
+        # is profiled) in a fresh process, benchmarking is enabled at a process start
+        worker = worker_pool.acquire() if worker_pool is not None and cpus == 1 and opts.memory_limit_mb is None \
+            and not profile and not opts.benchmark else None
+        completed = False
 
         try:
-            compile_cmd = self.get_compile_cmd(src_file, resource_path, isWin)
-            if compile_cmd:
-                logger.info('Compiling...')
-                compile_cmd = normpath(compile_cmd)
-                proc = subprocess.Popen(compile_cmd, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-                                        stderr=subprocess.PIPE, text=True)
-                self.pid = proc.pid
-                stdout, stderr = proc.communicate()
-                if self.check_for_errors(stderr, src_file, logger):
-                    return
+            if worker is None:
+                if not self.compile(src_file, resource_path, logger):
+                    return False
 
-            logger.info('Running tests...<br/>')
-            run_cmd = self.get_run_cmd(src_file, resource_path, isWin)
-            run_cmd = normpath(run_cmd)
-
-            proc = subprocess.Popen(run_cmd, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-                                    stderr=subprocess.PIPE, text=True)
-            self.pid = proc.pid
-            line_iterator = non_blocking_readlines(proc.stdout)
-            error_iterator = non_blocking_readlines(proc.stderr)
-
-            for idx, tc in enumerate(test_cases[1:], start=1):
-                splt = re.split('(?<!\\\\);', tc)
-                expected_val = json.loads(splt[-1])
-                args = '[' + ','.join(splt[:-1]) + ']'
-
-                proc.stdin.write(args + '\n')
-                proc.stdin.flush()
-                tst_resp: Optional[TestResponse] = None
-                error = ''
-                while tst_resp is None and not self.stopped:
-                    for i, line in enumerate(error_iterator):
-                        if not line or self.stopped:
-                            break
-                        time.sleep(0.2)  # short sleep not to overload CPU
-                        error += line.decode('utf-8')
-                        if i > ERROR_LINE_OUTPUT_LIMIT:
-                            break
-                    if error and self.check_for_errors(error, src_file, logger):
-                        return
-                    error = ''
-                    for line in line_iterator:
-                        if self.stopped:
-                            break
-                        if not line:
-                            break
-                        tst_resp, msg = parse_response(line.decode('utf-8'))
-                        if msg:
-                            test_logger.log(msg + '<br>')
-                if self.stopped:
-                    test_logger.cancel()
-                    return
-                assert tst_resp is not None
-                if compare(tst_resp.result, expected_val, opts.ignore_order):
-                    test_logger.passed(idx, tst_resp.duration)
-                else:
-                    test_logger.fail(idx, args, expected_val, tst_resp.result)
-                    return
+                logger.info('Running tests...<br/>')
+                run_cmd = self.get_run_cmd(src_file, resource_path, isWin)
+                procs = self.procs = [self.start_process(run_cmd, opts, profile) for _ in range(cpus)]
+            else:
+                logger.info('Running tests...<br/>')
+                procs = [worker.proc]
+                worker.submit(src_file)
+            self.pid = procs[0].pid
+            self.shard_pids = [proc.pid for proc in procs[1:]]
+            if len(procs) > 1:
+                completed = self.execute_sharded(procs, corpus, opts, src_file, logger, test_logger)
+            else:
+                completed = self.execute(procs[0], corpus, opts, src_file, logger, test_logger,
+                                         worker is not None)
             if self.stopped:
                 test_logger.cancel()
-            else:
-                test_logger.log('<br/>All tests <span class="passed">PASSED</span><br/><br/>')
+            elif completed:
+                test_logger.log('<br/>All tests <span class="passed">PASSED</span><br/>')
+                test_logger.summary()
+                if worker is None:
+                    test_logger.resource_usage(self.release())
+                if profile:
+                    test_logger.instrumentation()
+                if opts.benchmark:
+                    self.benchmark_score = test_logger.benchmark(opts.benchmark, opts.benchmark_warmup)
+                test_logger.log('<br/>')
         except BrokenPipeError:
             if self.stopped:
                 test_logger.cancel()
         finally:
+            healthy = completed and not self.stopped
+            if worker is not None and healthy:
+                self.pid = None
             self.kill()
+            self.release()
+            cpu_budget.release(cpus)
+            if worker is not None:
+                worker_pool.release(worker, healthy)
+            workspace_pool.release(workspace)
+        return completed and not self.stopped
+
+    def compile(self, src_file: SrcFile, resource_path: str, logger: ConsoleLogger) -> bool:
+        """
+        Compiles a test suite, if the language requires compilation.
+        Compilation outputs are taken from the compile cache, if the same test suite has been already compiled.
+        The test suite is never executed, if the compiler has failed
+        :param src_file: target source file
+        :param resource_path: path containing resource files
+        :param logger: console logger
+        :return: True - if the test suite is ready to be executed, False - if compilation has failed
+        """
+        compile_cmd = self.get_compile_cmd(src_file, resource_path, isWin)
+        if not compile_cmd:
+            return True
+        cache_key = self.get_compile_cache_key(src_file, compile_cmd, resource_path)
+        workspace = src_file.directory
+        if cache_key is not None and workspace.has_outputs(cache_key):
+            return True
+        # outputs of another test suite must neither be executed nor cached
+        workspace.discard_outputs()
+        if cache_key is not None and self.compile_cache.restore(cache_key, workspace.name):
+            workspace.set_outputs(cache_key, self.get_compile_outputs(src_file))
+            return True
+
+        logger.info('Compiling...')
+        proc = self.backend.start(compile_cmd)
+        self.pid = proc.pid
+        parser = DiagnosticParser(self.get_src_file_name(), src_file.code_offset)
+        self.read_diagnostics(proc, parser)
+        self.backend.release(proc)
+        self.pid = None
+        if self.stopped:
+            return False
+        if parser.has_errors() or proc.returncode != 0:
+            logger.error(parser.to_html() or f'Compiler has exited with code {proc.returncode}')
+            return False
+        if cache_key is not None and proc.returncode == 0:
+            outputs = self.get_compile_outputs(src_file)
+            self.compile_cache.put(cache_key, outputs)
+            workspace.set_outputs(cache_key, outputs)
+        return True
+
+    def read_diagnostics(self, proc: subprocess.Popen, parser: DiagnosticParser):
+        """
+        Streams the compiler's STDERR to the parser until the compiler exits,
+        the compiler is killed as soon as the parser's limits are reached
+        :param proc: compiler's process
+        :param parser: parser of the compiler's diagnostics
+        """
+        proc.stdin.close()
+        reader = PipeReader()
+        reader.register(proc.stdout, STDOUT)
+        reader.register(proc.stderr, STDERR)
+        try:
+            while not reader.is_empty():
+                for key, data in reader.read():
+                    if key == STDERR and parser.feed(data):
+                        self.backend.kill(proc.pid)
+                        return
+        finally:
+            reader.close()
+            parser.flush()
+
+    def get_compile_cache_key(self, src_file: SrcFile, compile_cmd: Command, resource_path: str) -> Optional[str]:
+        """
+        :param src_file: target source file
+        :param compile_cmd: test suite's compile command
+        :param resource_path: path containing resource files
+        :return: key of the test suite's compilation outputs or None - if they cannot be cached
+        """
+        version_cmd = self.get_toolchain_version_cmd(resource_path, isWin)
+        version = get_toolchain_version(version_cmd) if version_cmd else None
+        if version is None:
+            return None
+        # workspaces are interchangeable, so the key doesn't depend on the workspace's path
+        return hash_key(src_file.text, str(compile_cmd).replace(src_file.directory.name, ''), version)
+
+    def get_compile_outputs(self, src_file: SrcFile) -> List[str]:
+        """
+        :param src_file: compiled source file
+        :return: files produced by the compiler
+        """
+        directory = src_file.directory.name
+        return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                if os.path.join(directory, name) != src_file.path]
+
+    def execute(self, proc: subprocess.Popen, corpus: TestCorpus, opts: TestSuiteExecOpts, src_file: SrcFile,
+                logger: ConsoleLogger, test_logger: TestLogger, is_worker: bool) -> bool:
+        """
+        Streams test cases to a running test suite and checks its responses
+        :param proc: process executing the test suite
+        :param corpus: compiled test cases
+        :param opts: options which control tests execution
+        :param src_file: target source file
+        :param logger: console logger
+        :param test_logger: test logger
+        :param is_worker: the process is a warm worker, which reports when the test suite has completed
+        :return: True - if all tests have passed (and the worker has completed the job)
+        """
+        reader = PipeReader()
+        reader.register(proc.stdout, STDOUT)
+        reader.register(proc.stderr, STDERR)
+        parser = ResponseParser()
+        compare = get_result_checker(corpus, opts)
+        cases = corpus.cases
+        writer = CaseWriter(proc.stdin, [args for args, _ in cases] + [END_OF_JOB], opts.pipeline)
+        writer.start()
+        watchdog = Watchdog.start_for(proc.pid, opts, get_suite_deadline(opts), self.backend.kill,
+                                      self.backend.is_oom_killed)
+
+        try:
+            for idx, (args, expected_val) in enumerate(cases, start=1):
+                if watchdog is not None:
+                    watchdog.start_case()
+                tst_resp = self.read_response(reader, parser, src_file, logger, test_logger, watchdog)
+                if tst_resp is None:
+                    self.report_violation(test_logger, idx, watchdog.violation if watchdog else None, opts)
+                    return False
+                if tst_resp.index is not None and tst_resp.index != idx - 1:
+                    logger.error(f'Unexpected response order: expected test {idx}, got {tst_resp.index + 1}')
+                    return False
+                writer.consumed()
+                violation = check_duration(tst_resp, opts)
+                if violation is not None:
+                    self.report_violation(test_logger, idx, violation, opts)
+                    return False
+                if compare(tst_resp.result, expected_val):
+                    test_logger.passed(idx, tst_resp.duration, tst_resp.cpu_duration, tst_resp.profile,
+                                       tst_resp.bench_ns)
+                else:
+                    test_logger.fail(idx, args, expected_val, tst_resp.result,
+                                     describe_difference(expected_val, tst_resp.result, opts.ignore_order))
+                    return False
+            return not is_worker or self.read_output(reader, parser, src_file, logger, test_logger,
+                                                     lambda: parser.job_done, watchdog)
+        finally:
+            if watchdog is not None:
+                watchdog.stop()
+            writer.close()
+            reader.close()
+
+    def execute_sharded(self, procs: List[subprocess.Popen], corpus: TestCorpus, opts: TestSuiteExecOpts,
+                        src_file: SrcFile, logger: ConsoleLogger, test_logger: TestLogger) -> bool:
+        """
+        Shards test cases across several processes executing the same test suite and reports their outcomes
+        in the index order. As soon as a test fails, shards which have moved past it are stopped
+        :param procs: processes executing the test suite
+        :param corpus: compiled test cases
+        :param opts: options which control tests execution
+        :param src_file: target source file
+        :param logger: console logger
+        :param test_logger: test logger
+        :return: True - if all tests have passed
+        """
+        compare = get_result_checker(corpus, opts)
+        cases = corpus.cases
+        results = ShardResults(len(cases))
+        suite_deadline = get_suite_deadline(opts)
+        shards = [Shard(proc, list(range(i, len(cases), len(procs)))) for i, proc in enumerate(procs)]
+        for shard in shards:
+            threading.Thread(target=self.run_shard, daemon=True,
+                             args=(shard, shards, cases, opts, src_file, compare, results, suite_deadline)).start()
+
+        for idx, (args, expected_val) in enumerate(cases):
+            tst_resp, passed, violation = results.wait(idx)
+            results.replay(idx, logger, test_logger)
+            if violation is not None:
+                self.report_violation(test_logger, idx + 1, violation, opts)
+                return False
+            if tst_resp is None:
+                return False
+            if passed:
+                test_logger.passed(idx + 1, tst_resp.duration, tst_resp.cpu_duration, tst_resp.profile,
+                                   tst_resp.bench_ns)
+            else:
+                test_logger.fail(idx + 1, args, expected_val, tst_resp.result,
+                                 describe_difference(expected_val, tst_resp.result, opts.ignore_order))
+                return False
+        return True
+
+    def run_shard(self, shard: Shard, shards: List[Shard], cases: List[Tuple[Union[str, StreamedArgs], Any]],
+                  opts: TestSuiteExecOpts, src_file: SrcFile, compare: Callable[[Any, Any], bool],
+                  results: ShardResults, suite_deadline: Optional[float]):
+        """
+        Streams a shard's test cases to its process and stores their outcomes, it's executed in a separate thread
+        :param shard: target shard
+        :param shards: all shards of the test suite
+        :param cases: all test cases of the test suite, tuples of JSON arguments and expected value
+        :param opts: options which control tests execution
+        :param src_file: target source file
+        :param compare: checks whether a result is equal to the expected value
+        :param results: outcomes of the test suite's cases
+        :param suite_deadline: time (time.monotonic) by which the test suite must complete
+        """
+        reader = PipeReader()
+        reader.register(shard.proc.stdout, STDOUT)
+        reader.register(shard.proc.stderr, STDERR)
+        parser = ResponseParser()
+        shard_logger = ShardLogger(results)
+        writer = CaseWriter(shard.proc.stdin, [cases[idx][0] for idx in shard.indices] + [END_OF_JOB], opts.pipeline)
+        writer.start()
+        watchdog = Watchdog.start_for(shard.proc.pid, opts, suite_deadline, self.backend.kill,
+                                      self.backend.is_oom_killed)
+
+        try:
+            for pos, idx in enumerate(shard.indices):
+                if results.first_failure < idx:
+                    return
+                shard.pending = shard_logger.index = idx
+                if watchdog is not None:
+                    watchdog.start_case()
+                tst_resp = self.read_response(reader, parser, src_file, shard_logger, shard_logger, watchdog)
+                if tst_resp is not None and tst_resp.index is not None and tst_resp.index != pos:
+                    shard_logger.error(f'Unexpected response order: expected test {idx + 1}')
+                    tst_resp = None
+                if tst_resp is None:
+                    violation = watchdog.violation if watchdog else None
+                else:
+                    violation = check_duration(tst_resp, opts)
+                passed = tst_resp is not None and violation is None and compare(tst_resp.result, cases[idx][1])
+                results.put(idx, tst_resp, passed, violation)
+                if not passed:
+                    for other in shards:
+                        if other.pending > idx:
+                            self.backend.kill(other.proc.pid)
+                    return
+                writer.consumed()
+        except Exception as ex:
+            # the test suite's outcome is awaited in another thread, so the error must be reported as a failure
+            shard.pending = shard_logger.index = max(shard.pending, shard.indices[0])
+            shard_logger.error('Unexpected runtime error: ' + str(ex))
+            results.put(shard.pending, None, False)
+        finally:
+            if watchdog is not None:
+                watchdog.stop()
+            writer.close()
+            reader.close()
+
+    def read_response(self, reader: PipeReader, parser: ResponseParser, src_file: SrcFile,
+                      logger: ConsoleLogger, test_logger: TestLogger,
+                      watchdog: Optional[Watchdog] = None) -> Optional[TestResponse]:
+        """
+        Waits (without polling) until the next test response is received from the child process.
+        :param reader: reader listening to the child's STDOUT and STDERR
+        :param parser: parser of the child's STDOUT
+        :param src_file: target source file
+        :param logger: console logger
+        :param test_logger: test logger
+        :param watchdog: watchdog enforcing the test suite's limits
+        :return: test response or None - if execution was interrupted, failed (errors are already logged)
+                 or has violated a limit (it's stored in the watchdog)
+        """
+        if self.read_output(reader, parser, src_file, logger, test_logger, lambda: parser.responses, watchdog):
+            messages, response = parser.responses.popleft()
+            for msg in messages:
+                test_logger.log(msg + '<br>')
+            return response
+        return None
+
+    def read_output(self, reader: PipeReader, parser: ResponseParser, src_file: SrcFile,
+                    logger: ConsoleLogger, test_logger: TestLogger, done: Callable[[], Any],
+                    watchdog: Optional[Watchdog] = None) -> bool:
+        """
+        Reads the child process's output, until the condition is met.
+        User's output is forwarded to the test logger, STDERR is collected and checked for errors
+        as soon as the child stops writing to it
+        :param reader: reader listening to the child's STDOUT and STDERR
+        :param parser: parser of the child's STDOUT
+        :param src_file: target source file
+        :param logger: console logger
+        :param test_logger: test logger
+        :param done: condition to wait for
+        :param watchdog: watchdog enforcing the test suite's limits, errors caused by a violated limit are not logged
+        :return: True - if the condition is met, False - if execution was interrupted or failed
+        """
+        error = b''
+        for msg in parser.take_output():
+            test_logger.log(msg + '<br>')
+        while not self.stopped:
+            if done() and not error:
+                return True
+            if reader.is_empty() or parser.job_done:
+                if watchdog is not None and watchdog.check_error(error.decode('utf-8', 'replace')):
+                    return False
+                if not error or not self.check_for_errors(error.decode('utf-8', 'replace'), src_file, logger):
+                    logger.error('Process has exited unexpectedly')
+                return False
+            has_error_output = False
+            for key, data in reader.read(STDERR_SETTLE_SEC if error else POLL_TIMEOUT_SEC):
+                if key == STDERR:
+                    error += data
+                    has_error_output = has_error_output or bool(data)
+                else:
+                    for msg in parser.queue(parser.feed(data)):
+                        test_logger.log(msg + '<br>')
+            if error and (not has_error_output or error.count(b'\n') > ERROR_LINE_OUTPUT_LIMIT):
+                # the child has stopped writing to STDERR, so the error message is complete
+                error_text = error.decode('utf-8', 'replace')
+                if watchdog is not None and watchdog.check_error(error_text) or \
+                        self.check_for_errors(error_text, src_file, logger):
+                    return False
+                error = b''
+        return False
 
     @abstractmethod
     def get_src_file_name(self) -> str:
@@ -210,7 +814,7 @@ class TestRunner(ABC):
         pass
 
     @abstractmethod
-    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_run_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Command:
         """
         test's run command
         :param src_file: tatget file to be executed
@@ -220,9 +824,9 @@ class TestRunner(ABC):
         pass
 
     @abstractmethod
-    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> str:
+    def get_compile_cmd(self, src_file: SrcFile, resource_path: str, is_win: bool) -> Optional[Command]:
         """
-        test's compile command
+        test's compile command, None - if the language requires no compilation
         :param src_file: tatget file to be executed
         :param resource_path: path containing resource files
         :param is_win: platform is windows if true (unix/osx if false)
@@ -240,6 +844,91 @@ class TestRunner(ABC):
         """
         pass
 
+    def get_toolchain_version_cmd(self, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        command printing the compiler's version, compilation outputs are cached only if it's defined
+        :param resource_path: path containing resource files
+        :param is_win: platform is windows if true (unix/osx if false)
+        """
+        return None
+
+    def get_worker_src(self) -> Optional[Tuple[str, str]]:
+        """
+        Warm worker's source, which executes test suites one after another (see worker_pool.py)
+        :return: worker's file name and source code or None - if the language doesn't support warm workers
+        """
+        return None
+
+    def get_worker_cmd(self, worker_dir: str, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        worker's run command
+        :param worker_dir: directory containing the worker's source
+        :param resource_path: path containing resource files
+        :param is_win: platform is windows if true (unix/osx if false)
+        """
+        return None
+
+    def get_worker_compile_cmd(self, worker_dir: str, resource_path: str, is_win: bool) -> Optional[Command]:
+        """
+        command compiling the worker before it's started
+        :param worker_dir: directory containing the worker's source
+        :param resource_path: path containing resource files
+        :param is_win: platform is windows if true (unix/osx if false)
+        :return: None - if the worker requires no compilation or it has been already compiled
+        """
+        return None
+
+    def get_memory_overhead_mb(self) -> Optional[int]:
+        """
+        address space reserved by the language's runtime on top of the solution's data, it's added to the address
+        space limit of a test suite's process
+        :return: overhead in MB or None - if the address space cannot be limited (JVM and V8 reserve huge address
+                 spaces), then the memory limit is enforced by the watchdog only
+        """
+        return None
+
+    def start_process(self, cmd: Command, opts: TestSuiteExecOpts, profile: bool = False) -> subprocess.Popen:
+        """
+        Starts a process executing a test suite, the process's resources are limited according to the options
+        :param cmd: test suite's run command
+        :param opts: options which control tests execution
+        :param profile: if the test suite must report its phases' timings
+        :return: test suite's process
+        """
+        return self.backend.start(cmd, opts, self.get_memory_overhead_mb(), get_test_suite_env(profile, opts))
+
+    @staticmethod
+    def report_violation(test_logger: TestLogger, index: int, violation: Optional[str], opts: TestSuiteExecOpts):
+        """
+        Logs a violated limit
+        :param test_logger: test logger
+        :param index: test's index
+        :param violation: violated limit, nothing is logged if it's None
+        :param opts: options which control tests execution
+        """
+        if violation == MEMORY_LIMIT_EXCEEDED:
+            test_logger.memory_limit_exceeded(index, opts.memory_limit_mb)
+        elif violation == SUITE_TIME_LIMIT_EXCEEDED:
+            test_logger.time_limit_exceeded(index, opts.suite_time_limit_ms, 'suite')
+        elif violation is not None:
+            test_logger.time_limit_exceeded(index, opts.time_limit_ms)
+
+    def start_worker(self, worker_dir: str) -> subprocess.Popen:
+        """
+        Starts a warm worker's process, the worker is compiled first (if the language requires it)
+        :param worker_dir: directory containing the worker's source
+        :return: worker's process
+        """
+        resource_path = get_resource_path()
+        compile_cmd = self.get_worker_compile_cmd(worker_dir, resource_path, isWin)
+        if compile_cmd is not None:
+            proc = self.backend.start(compile_cmd)
+            _, error = proc.communicate()
+            self.backend.release(proc)
+            if proc.returncode != 0:
+                raise Exception(f'Worker cannot be compiled: {error}')
+        return self.backend.start(self.get_worker_cmd(worker_dir, resource_path, isWin), env=get_test_suite_env(False))
+
     def check_for_errors(self, error, src_file: SrcFile, logger: ConsoleLogger) -> bool:
         """
         Checks if there are error messages in stderr, if there are errors - logs them to the console
@@ -250,8 +939,7 @@ class TestRunner(ABC):
         """
         if not error:
             return False
-        offset = get_code_offset(src_file.text, START_USER_SRC_MARKER)
-        error_msg = self.get_error_message(error, src_file.file.name, offset)
+        error_msg = self.get_error_message(error, src_file.path, src_file.code_offset)
         if error_msg:
             error_msg = re.sub('\n+', '<br>', error_msg)
             logger.error(error_msg)
@@ -263,15 +951,19 @@ class TestRunner(ABC):
         Stop currently executing processes
         """
         if self.pid is not None:
-            try:
-                self.stopped = True
-                parent = psutil.Process(self.pid)
-                children = parent.children(recursive=True)
-                for child in children:
-                    child.kill()
-                psutil.wait_procs(children, timeout=5)
-                parent.kill()
-            except:
-                pass
-            finally:
-                self.pid = None
+            self.stopped = True
+            for pid in [self.pid] + self.shard_pids:
+                self.backend.kill(pid)
+            self.pid = None
+            self.shard_pids = []
+
+    def release(self) -> Optional[ResourceUsage]:
+        """
+        Kills the rest of the test suite's processes and frees them (warm workers are not released)
+        :return: resources consumed by the test suite's processes or None - if they are not known
+        """
+        procs, self.procs = self.procs, []
+        if self.pid in [proc.pid for proc in procs]:
+            self.pid = None
+            self.shard_pids = []
+        return ResourceUsage.combine([self.backend.release(proc) for proc in procs])
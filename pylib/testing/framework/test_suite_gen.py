@@ -4,15 +4,26 @@
 Test Suite Generator API
 """
 
+import hashlib
+import re
 import textwrap
 from abc import abstractmethod, ABC
-from typing import Dict
+from typing import Dict, List, Tuple
 
+from testing.framework.generation_cache import GenerationCache, get_generation_key
 from testing.framework.type_converter import TypeConverter
-from testing.framework.types import TestSuite
+from testing.framework.types import ConverterFn, TestSuite
 from testing.framework.syntax.syntax_tree import SyntaxTree
 
 START_USER_SRC_MARKER = 'begin_user_src'
+# stands for the user's source, while the test suite's code is generated
+USER_SRC_PLACEHOLDER = '__ankicode_user_src__'
+# a test suite prints every test response as a frame: RESULT_FRAME_MARKER<length>\n<JSON>\n
+# (the length is counted in bytes, the marker starts with the ASCII record separator)
+RESULT_FRAME_MARKER = '\x1e__ankicode_result__'
+CONVERTER_NAME_PREFIX = 'converter_'
+CONVERTER_HASH_LENGTH = 12
+CONVERTER_NAME = re.compile(r'\bconverter\d+\b')  # names given to converters, before they are interned
 
 
 class TestSuiteConverters:
@@ -28,12 +39,39 @@ class TestSuiteConverters:
     """
 
     def __init__(self, input_converter: TypeConverter, output_converter: TypeConverter, tree: SyntaxTree):
+        registry = []
+        input_converters, _ = input_converter.get_converters(tree, registry)
+        output_converters, _ = output_converter.get_converters(tree, registry)
         self.all = []
-        converters, _ = input_converter.get_converters(tree, self.all)
-        self.args = converters[:-1]
-        self.result = converters[-1]
-        converters, _ = output_converter.get_converters(tree, self.all)
-        self.output = converters[-1]
+        interned = self.intern(registry)
+        self.args = [interned[id(c)] for c in input_converters[:-1]]
+        self.result = interned[id(input_converters[-1])]
+        self.output = interned[id(output_converters[-1])]
+
+    def intern(self, registry: List[ConverterFn]) -> Dict[int, ConverterFn]:
+        """
+        Keeps a single converter per distinct type conversion and names it by a hash of its signature,
+        so that the same test suite always produces the same source. Converters are registered after
+        the converters they call, so the callees are renamed first
+        :param registry: all converters generated for the test suite
+        :return: dict of a generated converter's id to its interned converter
+        """
+        names = {}
+        converters = {}
+        interned = {}
+        for converter in registry:
+            name = converter.fn_name
+            src = CONVERTER_NAME.sub(lambda m: names.get(m.group(0), m.group(0)), converter.src)
+            sha = hashlib.sha1('\0'.join([converter.arg_type, converter.ret_type, re.sub(r'\s', '', src)]).encode())
+            key = sha.hexdigest()[:CONVERTER_HASH_LENGTH]
+            if key not in converters:
+                converter.src = src
+                converter.fn_name = CONVERTER_NAME_PREFIX + key
+                converters[key] = converter
+                self.all.append(converter)
+            names[name] = converters[key].fn_name
+            interned[id(converter)] = converters[key]
+        return interned
 
 
 class TestSuiteGenerator(ABC):
@@ -45,6 +83,7 @@ class TestSuiteGenerator(ABC):
         self._line_comment_char = line_comment_char
         self._input_converter = input_converter
         self._output_converter = output_converter
+        self._cache = GenerationCache()
 
     @abstractmethod
     def get_imports(self) -> str:
@@ -78,12 +117,25 @@ class TestSuiteGenerator(ABC):
     def generate_test_suite_src(self, ts: TestSuite, tree: SyntaxTree, solution_src: str) -> str:
         """
         This method is used to generate a source code for an input test suite.
+        The code surrounding the solution is generated once per test suite, the solution is inserted as is
         :param ts: source test suite
         :param tree: source syntax tree holding parameter and result types
         :param solution_src: a solution's source code (provided by user)
         :return: a full test suite source code, ready to execute
         """
-        solution_src = self._line_comment_char + START_USER_SRC_MARKER + '\n' + solution_src
+        prefix, suffix = self._cache.get(get_generation_key(tree, ts.fn_name),
+                                         lambda: self.generate_test_suite_frame(ts, tree))
+        return prefix + solution_src + suffix
+
+    def generate_test_suite_frame(self, ts: TestSuite, tree: SyntaxTree) -> Tuple[str, str]:
+        """
+        Generates a test suite's source code surrounding the solution
+        :param ts: source test suite
+        :param tree: source syntax tree holding parameter and result types
+        :return: tuple of the source code preceding and following the solution
+        """
+        solution_src = self._line_comment_char + START_USER_SRC_MARKER + '\n' + USER_SRC_PLACEHOLDER
         test_suite_converters = TestSuiteConverters(self._input_converter, self._output_converter, tree)
         testing_src = self.get_testing_src(ts, test_suite_converters, solution_src)
-        return textwrap.dedent(self.get_imports()) + '\n' + testing_src
+        prefix, suffix = (textwrap.dedent(self.get_imports()) + '\n' + testing_src).split(USER_SRC_PLACEHOLDER)
+        return prefix, suffix
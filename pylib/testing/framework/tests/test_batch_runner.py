@@ -0,0 +1,149 @@
+import threading
+import unittest
+
+from testing.framework.batch_runner import BatchJob, BatchRunner, CardReport, COMPILE_ERROR, ERROR, FAILED, \
+    PASSED, TIME_LIMIT_EXCEEDED, make_report, verify
+from testing.framework.sandbox import ResourceUsage
+
+
+class FakeCorpus:
+    def __init__(self, cases_count: int):
+        self.ts = None
+        self.tree = None
+        self.opts = None
+        self.cases = [('[1]', 1)] * cases_count
+
+
+class FakeGenerator:
+    def generate_test_suite_src(self, ts, tree, src):
+        return src
+
+
+class FakeRunner:
+    """
+    Plays a test run scripted by the solution's source: pass, fail, tle, compile, crash
+    """
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def run(self, src, corpus, opts, logger, worker_pool=None):
+        with FakeRunner.lock:
+            FakeRunner.active += 1
+            FakeRunner.max_active = max(FakeRunner.max_active, FakeRunner.active)
+        try:
+            test_logger = logger.get_testing_logger(len(corpus.cases))
+            if src == 'compile':
+                logger.info('Compiling...')
+                logger.error('error: expected <b>;</b>')
+                return
+            logger.info('Running tests...<br/>')
+            for idx in range(1, len(corpus.cases) + 1):
+                if src == 'fail' and idx == 2:
+                    test_logger.fail(idx, '[1]', 1, 2)
+                    return
+                if src == 'tle' and idx == 2:
+                    test_logger.time_limit_exceeded(idx, 100)
+                    return
+                if src == 'crash' and idx == 2:
+                    logger.error('Traceback: ZeroDivisionError')
+                    return
+                if src == 'stop' and idx == 2:
+                    return
+                test_logger.passed(idx, 1.5, 1.0)
+            test_logger.resource_usage(ResourceUsage(0.25, 2048))
+        finally:
+            with FakeRunner.lock:
+                FakeRunner.active -= 1
+
+    def kill(self):
+        pass
+
+
+class FakeFactory:
+    def get_test_suite_generator(self):
+        return FakeGenerator()
+
+    def new_test_runner(self):
+        return FakeRunner()
+
+    def get_worker_pool(self):
+        return None
+
+
+def make_job(card_id: int, src: str, cases_count: int = 3) -> BatchJob:
+    return BatchJob(card_id, card_id * 10, src, lambda: FakeCorpus(cases_count))
+
+
+def broken_corpus():
+    raise Exception('Invalid signature')
+
+
+class BatchRunnerTests(unittest.TestCase):
+
+    def test_passed(self):
+        report = verify(make_job(1, 'pass'), FakeFactory(), FakeRunner())
+        self.assertEqual(PASSED, report.status)
+        self.assertEqual(3, report.tests_passed)
+        self.assertEqual({'card_id': 1, 'note_id': 10, 'status': PASSED, 'tests': 3, 'passed': 3,
+                          'failed_test': None, 'duration_ms': 4.5, 'max_duration_ms': 1.5, 'cpu_ms': 3.0,
+                          'process_cpu_sec': 0.25, 'peak_memory_kb': 2048, 'messages': []}, {k: v for k, v in report.to_dict().items() if k != 'elapsed_ms'})
+
+    def test_failed(self):
+        report = verify(make_job(1, 'fail'), FakeFactory(), FakeRunner())
+        self.assertEqual(FAILED, report.status)
+        self.assertEqual(2, report.failed_test)
+        self.assertEqual(['args: [1]\nexpected: 1\nresult: 2'], report.messages)
+
+    def test_time_limit_exceeded(self):
+        report = verify(make_job(1, 'tle'), FakeFactory(), FakeRunner())
+        self.assertEqual(TIME_LIMIT_EXCEEDED, report.status)
+        self.assertEqual(2, report.failed_test)
+
+    def test_compile_error(self):
+        report = verify(make_job(1, 'compile'), FakeFactory(), FakeRunner())
+        self.assertEqual(COMPILE_ERROR, report.status)
+        self.assertEqual(['error: expected ;'], report.messages)
+
+    def test_runtime_error(self):
+        report = verify(make_job(1, 'crash'), FakeFactory(), FakeRunner())
+        self.assertEqual(ERROR, report.status)
+        self.assertEqual(1, report.tests_passed)
+
+    def test_incomplete_run(self):
+        report = verify(make_job(1, 'stop'), FakeFactory(), FakeRunner())
+        self.assertEqual(ERROR, report.status)
+        self.assertIn('after 1 of 3 tests', report.messages[0])
+
+    def test_broken_card(self):
+        report = verify(BatchJob(1, 10, 'pass', broken_corpus), FakeFactory(), FakeRunner())
+        self.assertEqual(ERROR, report.status)
+        self.assertIn('Invalid signature', report.messages[0])
+
+    def test_batch(self):
+        FakeRunner.max_active = 0
+        sources = ['pass', 'fail', 'compile', 'pass', 'tle', 'pass'] * 3
+        progress = []
+        reports = BatchRunner(FakeFactory(), workers=2).run(
+            [make_job(i, src) for i, src in enumerate(sources)], lambda r, done, total: progress.append((done, total)))
+        self.assertEqual(list(range(len(sources))), [r.card_id for r in reports])
+        self.assertEqual([(i, len(sources)) for i in range(1, len(sources) + 1)], progress)
+        self.assertLessEqual(FakeRunner.max_active, 2)
+        report = make_report(reports, 'python', 'deck:Algorithms')
+        self.assertEqual(len(sources), report['cards'])
+        self.assertEqual({'passed': 9, 'failed': 3, 'time_limit_exceeded': 3, 'memory_limit_exceeded': 0,
+                          'compile_error': 3, 'error': 0, 'cancelled': 0}, report['statuses'])
+        self.assertEqual(len(sources), len(report['results']))
+
+    def test_empty_batch(self):
+        self.assertEqual([], BatchRunner(FakeFactory()).run([]))
+
+    def test_message_limit(self):
+        report = CardReport(1, 10)
+        for _ in range(10):
+            report.add_message('x' * 1000)
+        self.assertEqual(5, len(report.messages))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from testing.framework.comparator import describe_difference, get_comparator
+from testing.framework.syntax.syntax_tree import SyntaxTree
+
+
+def comparator(signature, ignore_order=True):
+    return get_comparator(SyntaxTree.of(signature.split(';')).nodes[-1], ignore_order)
+
+
+class ComparatorTests(unittest.TestCase):
+    def test_primitives(self):
+        compare = comparator('int[a];int')
+        self.assertTrue(compare(1, 1))
+        self.assertFalse(compare(1, 2))
+        self.assertFalse(compare(True, 1))
+        self.assertFalse(compare('1', 1))
+        self.assertTrue(comparator('string')('a', 'a'))
+        self.assertTrue(comparator('bool')(False, False))
+        self.assertFalse(comparator('bool')(False, 0))
+
+    def test_float_tolerance(self):
+        compare = comparator('float')
+        self.assertTrue(compare(0.33333, 0.33334))
+        self.assertTrue(compare(2, 2.0))
+        self.assertTrue(compare(-0.00001, 0.0))
+        self.assertFalse(compare(0.3333, 0.3334))
+        self.assertFalse(compare(None, 0.0))
+
+    def test_tolerance_only_on_floats(self):
+        self.assertFalse(comparator('list(long)')([100000001], [100000002]))
+        self.assertTrue(comparator('list(float)')([0.12341], [0.12342]))
+
+    def test_ordered_list(self):
+        compare = comparator('list(int)', ignore_order=False)
+        self.assertTrue(compare([1, 2, 3], [1, 2, 3]))
+        self.assertFalse(compare([1, 2, 3], [3, 2, 1]))
+        self.assertFalse(compare([1, 2], [1, 2, 3]))
+
+    def test_list_as_multiset(self):
+        compare = comparator('array(int)')
+        self.assertTrue(compare([1, 2, 3], [3, 1, 2]))
+        self.assertFalse(compare([1, 1, 2], [1, 2, 2]))
+        self.assertFalse(compare([1, 2], [1, 2, 2]))
+
+    def test_nested_multiset(self):
+        compare = comparator('list(list(float))')
+        self.assertTrue(compare([[1.00001, 2.0], [3.0]], [[3.0], [2.0, 1.0]]))
+        self.assertFalse(compare([[1.0, 2.0], [3.0]], [[1.0], [2.0, 3.0]]))
+
+    def test_binary_tree_is_ordered(self):
+        compare = comparator('binary_tree(int)')
+        self.assertTrue(compare([1, 2, 3, None, 4], [1, 2, 3, None, 4]))
+        self.assertFalse(compare([1, 2, 3, None, 4], [1, 2, 3, 4]))
+        self.assertFalse(compare([1, 2, 3], [1, 3, 2]))
+
+    def test_map(self):
+        compare = comparator('map(string, list(int))')
+        self.assertTrue(compare({'a': [1, 2], 'b': []}, {'b': [], 'a': [2, 1]}))
+        self.assertFalse(compare({'a': [1, 2]}, {'a': [1, 2], 'b': []}))
+        self.assertFalse(compare({'a': [1, 2]}, {'b': [1, 2]}))
+
+    def test_object_fields_are_ordered(self):
+        compare = comparator('object(int[a],float[b])<Edge>')
+        self.assertTrue(compare([1, 0.50001], [1, 0.5]))
+        self.assertFalse(compare([1, 2.0], [2, 1.0]))
+        # user types nested into containers are compared without type information
+        compare = comparator('object(int[a],float[b])<Edge>;list(Edge)')
+        self.assertTrue(compare([[1, 2.0], [2, 1.0]], [[2, 1.0], [1, 2.0]]))
+
+    def test_unexpected_types(self):
+        compare = comparator('list(int)')
+        self.assertFalse(compare(None, [1]))
+        self.assertTrue(compare(None, None))
+        self.assertFalse(compare([[1]], [1]))
+        self.assertFalse(compare([{'a': 1}], [1]))
+
+    def test_describe_difference(self):
+        self.assertIn('root[1]', describe_difference([1, 2], [1, 5], False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from testing.framework.compile_cache import CACHE_DIR_NAME, USER_DIR_PREFIX, CompileCache, get_default_cache_dir, \
+    hash_key
+
+
+class CompileCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.cache = CompileCache(os.path.join(self.workdir.name, 'cache'), max_size=100)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def make_file(self, name, size):
+        path = os.path.join(self.workdir.name, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        return path
+
+    def test_hash_key_depends_on_every_part(self):
+        self.assertEqual(hash_key('a', 'b'), hash_key('a', 'b'))
+        self.assertNotEqual(hash_key('a', 'b'), hash_key('a', 'c'))
+        self.assertNotEqual(hash_key('ab', ''), hash_key('a', 'b'))
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(self.cache.restore('key', self.workdir.name))
+
+    def test_put_and_restore(self):
+        self.cache.put('key', [self.make_file('main.run', 10)])
+        target = tempfile.TemporaryDirectory()
+        self.assertTrue(self.cache.restore('key', target.name))
+        self.assertEqual(['main.run'], os.listdir(target.name))
+        self.assertEqual(10, os.path.getsize(os.path.join(target.name, 'main.run')))
+        target.cleanup()
+
+    def test_build_in_place(self):
+        seen = []
+
+        def build(path):
+            seen.append(path)
+            # the entry is hidden until it's built
+            self.assertIsNone(self.cache.get('key'))
+            with open(os.path.join(path, 'lib.o'), 'w') as f:
+                f.write('x')
+            return True
+
+        path = self.cache.build('key', build)
+        self.assertEqual(os.path.join(self.cache.directory, 'key'), path)
+        self.assertEqual(seen, [path])
+        self.assertEqual(['lib.o'], os.listdir(path))
+        self.assertEqual(path, self.cache.get('key'))
+
+    def test_failed_build(self):
+        self.assertIsNone(self.cache.build('key', lambda path: False))
+        self.assertFalse(os.path.exists(os.path.join(self.cache.directory, 'key')))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.put('a', [self.make_file('a', 40)])
+        self.cache.put('b', [self.make_file('b', 40)])
+        past = time.time() - 10
+        os.utime(os.path.join(self.cache.directory, 'a'), (past, past))
+        os.utime(os.path.join(self.cache.directory, 'b'), (past - 10, past - 10))
+        self.cache.get('b')
+        self.cache.put('c', [self.make_file('c', 40)])
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+
+
+
+@unittest.skipIf(sys.platform.startswith('win32'), 'the temp directory is per-user on windows')
+class DefaultCacheDirTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patcher = mock.patch('tempfile.gettempdir', return_value=self.tmp.name)
+        self.patcher.start()
+        self.user_dir = os.path.join(self.tmp.name, f'{USER_DIR_PREFIX}{os.getuid()}')
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    def test_user_dir(self):
+        self.assertEqual(os.path.join(self.user_dir, CACHE_DIR_NAME), get_default_cache_dir())
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(self.user_dir).st_mode))
+
+    def test_writable_by_others(self):
+        os.makedirs(self.user_dir)
+        os.chmod(self.user_dir, 0o777)
+        self.assertIsNone(get_default_cache_dir())
+
+    def test_owned_by_another_user(self):
+        os.makedirs(self.user_dir, mode=0o700)
+        with mock.patch('os.getuid', return_value=os.getuid() + 1):
+            os.rename(self.user_dir, os.path.join(self.tmp.name, f'{USER_DIR_PREFIX}{os.getuid()}'))
+            self.assertIsNone(get_default_cache_dir())
+
+    def test_symlink(self):
+        target = os.path.join(self.tmp.name, 'target')
+        os.makedirs(target, mode=0o700)
+        os.symlink(target, self.user_dir)
+        self.assertIsNone(get_default_cache_dir())
+
+    def test_untrusted_dir_disables_cache(self):
+        os.makedirs(self.user_dir)
+        os.chmod(self.user_dir, 0o777)
+        cache = CompileCache()
+        with open(os.path.join(self.tmp.name, 'main.run'), 'w') as f:
+            f.write('x')
+        self.assertIsNone(cache.put('key', [f.name]))
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual([], os.listdir(self.user_dir))
+
+if __name__ == '__main__':
+    unittest.main()
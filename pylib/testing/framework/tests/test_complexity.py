@@ -0,0 +1,179 @@
+import json
+import math
+import unittest
+
+from testing.framework.complexity import COMPLEXITY_MODELS, MIN_FIT_POINTS, PROBE_REPS, PROBE_TIME_LIMIT_MS, \
+    ComplexityFit, ComplexityProbe, ProbeResult, fit_complexity, generate_args, get_complexity_order, \
+    make_probe_corpus
+from testing.framework.syntax.syntax_tree import SyntaxTree
+from testing.framework.test_corpus import TestCorpus
+from testing.framework.types import NS_PER_MS, TestSuite, TestSuiteExecOpts
+
+SIZES = [2 ** k for k in range(2, 17)]
+OVERHEAD_MS = 0.001
+GROWTH = {
+    '1': lambda n: 1.0,
+    'log n': lambda n: math.log2(n),
+    'n': lambda n: n,
+    'n log n': lambda n: n * math.log2(n),
+    'n^2': lambda n: n * n,
+}
+
+
+def make_corpus(signature, opts=''):
+    return TestCorpus(TestSuite(), SyntaxTree.of(signature), TestSuiteExecOpts(opts), [])
+
+
+def args(tree_signature, size, seed='seed'):
+    return json.loads(generate_args(SyntaxTree.of(tree_signature), size, seed))
+
+
+class FakeRunner:
+    """
+    "Runs" the probe's inputs: a call takes time_fn(size) ms, inputs over max_size exceed the time limit
+    """
+
+    def __init__(self, time_fn, max_size=None, errors=None):
+        self.time_fn = time_fn
+        self.max_size = max_size
+        self.errors = errors or []
+        self.opts = None
+
+    def run(self, src_code, corpus, opts, logger, worker_pool=None):
+        self.opts = opts
+        for error in self.errors:
+            logger.error(error)
+        test_logger = logger.get_testing_logger(len(corpus.cases))
+        for i, (case_args, _) in enumerate(corpus.cases, 1):
+            size = len(json.loads(case_args)[0])
+            if self.max_size is not None and size > self.max_size:
+                test_logger.time_limit_exceeded(i, opts.time_limit_ms)
+                return False
+            time_ns = int(self.time_fn(size) * NS_PER_MS)
+            test_logger.passed(i, 1, bench_ns=[time_ns] * opts.benchmark)
+        return True
+
+
+class ComplexityOrderTests(unittest.TestCase):
+    def test_notations(self):
+        self.assertEqual(3, get_complexity_order('n log n'))
+        self.assertEqual(3, get_complexity_order('O(nlogn)'))
+        self.assertEqual(3, get_complexity_order(' O(n * log n) '))
+        self.assertEqual(4, get_complexity_order('n^2'))
+        self.assertEqual(0, get_complexity_order('O(1)'))
+        self.assertEqual(len(COMPLEXITY_MODELS) - 1, get_complexity_order('2^N'))
+
+    def test_unknown_complexity(self):
+        with self.assertRaises(Exception) as ctx:
+            get_complexity_order('n^3')
+        self.assertIn('Unknown complexity: n^3', str(ctx.exception))
+
+
+class FitComplexityTests(unittest.TestCase):
+    def test_models(self):
+        for model, growth in GROWTH.items():
+            times = [OVERHEAD_MS + 0.01 * growth(n) for n in SIZES]
+            self.assertEqual(model, fit_complexity(SIZES, times).model, model)
+
+    def test_exponent_of_any_base(self):
+        sizes = list(range(4, 26, 3))
+        for base in [1.6, 2, 3]:
+            times = [OVERHEAD_MS + 1e-6 * base ** n for n in sizes]
+            self.assertEqual('2^n', fit_complexity(sizes, times).model, base)
+
+    def test_close_models_prefer_slower_growth(self):
+        # linear timings with a few percent of noise
+        noise = [1.03, 0.97, 1.02, 0.98, 1.04, 0.96]
+        times = [0.001 * n * noise[i % len(noise)] for i, n in enumerate(SIZES)]
+        fit = fit_complexity(SIZES, times)
+        self.assertEqual('n', fit.model)
+        self.assertLess(fit.error, 0.05)
+
+    def test_noise_floor(self):
+        times = [0.001 * (1 + i % 3) for i in range(len(SIZES))]
+        self.assertEqual('1', fit_complexity(SIZES, times).model)
+
+    def test_not_enough_points(self):
+        self.assertIsNone(fit_complexity(SIZES[:MIN_FIT_POINTS - 1], [1.0] * (MIN_FIT_POINTS - 1)))
+
+    def test_text(self):
+        self.assertEqual('O(n log n)', ComplexityFit(3, 0.1).to_text())
+
+
+class InputGeneratorTests(unittest.TestCase):
+    def test_inputs_are_reproducible(self):
+        self.assertEqual(args(['list(int)[a]', 'int'], 100), args(['list(int)[a]', 'int'], 100))
+        self.assertNotEqual(args(['list(int)[a]', 'int'], 100), args(['list(int)[a]', 'int'], 100, 'other'))
+
+    def test_containers(self):
+        values = args(['list(list(int))[a]', 'array(string)[b]', 'int'], 100)
+        self.assertEqual(100, len(values[0]))
+        self.assertTrue(all(len(nested) == 10 and all(isinstance(x, int) for x in nested) for nested in values[0]))
+        self.assertEqual(100, len(values[1]))
+        self.assertTrue(all(len(s) == 8 for s in values[1]))
+
+    def test_map(self):
+        values = args(['map(string, int)[m]', 'int'], 10)
+        self.assertEqual(20, len(values[0]))
+        self.assertTrue(all(isinstance(key, str) for key in values[0][::2]))
+
+    def test_binary_tree(self):
+        self.assertEqual(15, len(args(['binary_tree(int)[t]', 'int'], 15)[0]))
+
+    def test_scalar_size(self):
+        self.assertEqual([20], args(['int[n]', 'int'], 20))
+        values = args(['list(int)[a]', 'int[k]', 'int'], 20)
+        self.assertTrue(1 <= values[1] <= 20)
+
+    def test_string_size(self):
+        self.assertEqual(50, len(args(['string[s]', 'int'], 50)[0]))
+
+    def test_probe_corpus(self):
+        corpus = make_corpus(['list(int)[a]', 'int'], 'time_limit_ms=10,parallel=4')
+        probe_corpus = make_probe_corpus(corpus, [4, 8])
+        self.assertEqual([4, 8], [len(json.loads(case_args)[0]) for case_args, _ in probe_corpus.cases])
+        self.assertFalse(probe_corpus.opts.check_results)
+        self.assertEqual(PROBE_REPS, probe_corpus.opts.benchmark)
+        self.assertEqual(PROBE_TIME_LIMIT_MS, probe_corpus.opts.time_limit_ms)
+        self.assertEqual(1, probe_corpus.opts.parallel)
+        # the card's options are not modified
+        self.assertTrue(corpus.opts.check_results)
+        self.assertEqual(4, corpus.opts.parallel)
+
+
+class ComplexityProbeTests(unittest.TestCase):
+    def setUp(self):
+        self.corpus = make_corpus(['list(int)[a]', 'int'])
+
+    def test_probe(self):
+        runner = FakeRunner(lambda n: OVERHEAD_MS + 0.001 * n * n, max_size=2048)
+        result = ComplexityProbe(runner, SIZES).run('', self.corpus)
+        self.assertEqual(SIZES[:10], result.sizes)
+        self.assertAlmostEqual(OVERHEAD_MS + 0.016, result.times_ms[0])
+        self.assertEqual(4096, result.limit_size)
+        self.assertEqual('n^2', result.fit.model)
+        self.assertTrue(result.is_worse_than('n log n'))
+        self.assertFalse(result.is_worse_than('n^2'))
+        self.assertFalse(runner.opts.check_results)
+        self.assertTrue(result.to_html().startswith('Time complexity: O(n^2) (fit error: '))
+        self.assertTrue(result.to_html().endswith('input sizes: 4..2048, input of size 4096 has exceeded the limits)'))
+
+    def test_not_enough_timings(self):
+        result = ComplexityProbe(FakeRunner(lambda n: n, max_size=8), SIZES).run('', self.corpus)
+        self.assertIsNone(result.fit)
+        self.assertFalse(result.is_worse_than('1'))
+        self.assertIn('Complexity cannot be estimated', result.to_html())
+
+    def test_failed_probe(self):
+        result = ComplexityProbe(FakeRunner(lambda n: n, errors=['Segmentation fault']), SIZES).run('', self.corpus)
+        self.assertIsNone(result.fit)
+        self.assertEqual('Complexity probe has failed:<br/>Segmentation fault', result.to_html())
+
+    def test_interrupted_probe(self):
+        result = ProbeResult()
+        result.cancelled = True
+        self.assertEqual('Complexity probe was interrupted', result.to_html())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import time
+import unittest
+
+from testing.framework.console_logger import ConsoleLogger, LogPump, TestLogger, median, \
+    median_absolute_deviation, percentile
+
+
+class RecordingConsole:
+    def __init__(self):
+        self.messages = []
+
+    def log(self, msg):
+        self.messages.append(msg)
+
+    def eval(self, js):
+        self.messages.append(js)
+
+
+class ConsoleLoggerTests(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(95, percentile(values, 95))
+        self.assertEqual(100, percentile(values, 100))
+        self.assertEqual(7, percentile([7], 95))
+
+    def test_median(self):
+        self.assertEqual(2, median([3, 1, 2]))
+        self.assertEqual(2.5, median([4, 1, 3, 2]))
+        self.assertEqual(1, median_absolute_deviation([1, 2, 3, 4, 100]))
+        self.assertEqual(0, median_absolute_deviation([5]))
+
+    def test_passed_and_summary(self):
+        console = RecordingConsole()
+        logger = TestLogger(console, console, 2)
+        logger.passed(1, 0.0015, 0.002)
+        logger.passed(2, 1.5)
+        logger.summary()
+        logger.flush_buffer()
+        text = ''.join(console.messages)
+        self.assertIn('(1/2) - 0.002 ms (cpu 0.002 ms)', text)
+        self.assertIn('(2/2) - 1.500 ms<br/>', text)
+        self.assertIn('Total: 1.502 ms, mean: 0.751 ms, p50: 0.002 ms, p95: 1.500 ms, max: 1.500 ms', text)
+
+    def test_instrumentation(self):
+        console = RecordingConsole()
+        logger = TestLogger(console, console, 2)
+        logger.passed(1, 1.0, profile={'parse_ns': 500000, 'convert_in_ns': 1000000, 'convert_out_ns': 250000,
+                                       'serialize_ns': 250000, 'peak_rss_kb': 2048})
+        logger.passed(2, 3.0, profile={'parse_ns': 1500000, 'convert_in_ns': 3000000, 'convert_out_ns': 250000,
+                                       'serialize_ns': 250000, 'peak_rss_kb': 4096})
+        logger.instrumentation()
+        logger.flush_buffer()
+        text = ''.join(console.messages)
+        self.assertIn('parse: 2.000 ms (18.2%), mean: 1.000 ms, p95: 1.500 ms, max: 1.500 ms', text)
+        self.assertIn('convert-in: 4.000 ms (36.4%)', text)
+        self.assertIn('solve: 4.000 ms (36.4%), mean: 2.000 ms, p95: 3.000 ms, max: 3.000 ms', text)
+        self.assertIn('convert-out: 0.500 ms (4.5%)', text)
+        self.assertIn('serialize: 0.500 ms (4.5%)', text)
+        self.assertIn('peak RSS: 4.0 MB', text)
+
+    def test_benchmark(self):
+        console = RecordingConsole()
+        logger = TestLogger(console, console, 2)
+        logger.passed(1, 2.0, bench_ns=[1000000, 1200000, 9000000])
+        logger.passed(2, 1.0, bench_ns=[500000, 500000])
+        self.assertEqual(1.7, logger.benchmark(3, 5))
+        logger.flush_buffer()
+        text = ''.join(console.messages)
+        self.assertIn('(1/2) - 2.000 ms, median: 1.200 ms, MAD: 0.200 ms<br/>', text)
+        self.assertIn('Benchmark score: 1.700 ms (sum of medians of 3 runs after 5 warm-up runs per test)', text)
+
+    def test_benchmark_without_repetitions(self):
+        console = RecordingConsole()
+        logger = TestLogger(console, console, 1)
+        logger.passed(1, 1.0)
+        self.assertIsNone(logger.benchmark(3, 5))
+        logger.flush_buffer()
+        self.assertNotIn('Benchmark', ''.join(console.messages))
+
+    def test_instrumentation_without_profile(self):
+        console = RecordingConsole()
+        logger = TestLogger(console, console, 1)
+        logger.passed(1, 1.0)
+        logger.instrumentation()
+        logger.flush_buffer()
+        self.assertNotIn('Profile', ''.join(console.messages))
+
+
+class LogPumpTests(unittest.TestCase):
+    def test_messages_are_coalesced_into_a_frame(self):
+        web = RecordingConsole()
+        pump = LogPump(web, interval=60)
+        pump.write('a', '_setProgress("10")')
+        pump.write('b', '_setProgress("20")')
+        pump.write('c')
+        pump.flush()
+        self.assertEqual(['_showConsoleLog("abc");_setProgress("20")'], web.messages)
+        pump.flush()
+        self.assertEqual(1, len(web.messages))
+
+    def test_middle_is_truncated(self):
+        web = RecordingConsole()
+        pump = LogPump(web, interval=60, limit=8)
+        for msg in ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0']:
+            pump.write(msg)
+        pump.flush()
+        self.assertEqual(['_showConsoleLog("1234<br/>... output is truncated (2 characters)<br/>7890")'],
+                         web.messages)
+
+    def test_huge_message_is_truncated(self):
+        web = RecordingConsole()
+        pump = LogPump(web, interval=60, limit=8)
+        pump.write('abcdefghij')
+        pump.flush()
+        self.assertEqual(['_showConsoleLog("abij<br/>... output is truncated (6 characters)<br/>")'],
+                         web.messages)
+
+    def test_frames_are_displayed_in_background(self):
+        web = RecordingConsole()
+        pump = LogPump(web, interval=0.01)
+        pump.write('a')
+        pump.write('b')
+        deadline = time.monotonic() + 5
+        while not web.messages and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(['_showConsoleLog("ab")'], web.messages)
+
+    def test_clear_drops_buffered_messages(self):
+        web = RecordingConsole()
+        logger = ConsoleLogger(web)
+        logger.pump.interval = 60
+        logger.info('a')
+        logger.clear()
+        logger.flush()
+        self.assertEqual(['_cleanConsoleLog();_initializeProgress()'], web.messages)
+
+    def test_error_sets_progress_error(self):
+        web = RecordingConsole()
+        logger = ConsoleLogger(web)
+        logger.pump.interval = 60
+        logger.error('oops')
+        logger.flush()
+        self.assertEqual(['_showConsoleLog("<span class=\\"failed\\">oops</span><br/>");_setProgressError()'],
+                         web.messages)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -54,11 +54,8 @@ class CppOutputConverterTests(unittest.TestCase):
         self.assertEqual(ConverterFn('a', '''
             jute::jValue result;
             result.set_type(jute::JARRAY);
-            jute::jValue prop;
-            prop = converter1(value.a);
-            result.add_element(prop);
-            prop = converter2(value.b);
-            result.add_element(prop);
+            result.add_element(converter1(value.a));
+            result.add_element(converter2(value.b));
             return result;
         ''', 'Edge', 'jute::jValue'), converters[2])
 
@@ -87,11 +84,8 @@ class CppOutputConverterTests(unittest.TestCase):
         self.assertEqual(ConverterFn('a', '''
             jute::jValue result; 
             result.set_type(jute::JARRAY);
-            jute::jValue prop;
-            prop = converter2(value.a);
-            result.add_element(prop);
-            prop = converter3(value.b);
-            result.add_element(prop);
+            result.add_element(converter2(value.a));
+            result.add_element(converter3(value.b));
             return result;''', 'Edge', 'jute::jValue'), converters[3])
 
     def test_linked_list(self):
@@ -128,26 +122,22 @@ class CppOutputConverterTests(unittest.TestCase):
         self.assertEqual(ConverterFn('', '''
             jute::jValue result;
             result.set_type(jute::JARRAY);
-            queue<shared_ptr<BinaryTreeNode<int>>> q;
-            set<shared_ptr<BinaryTreeNode<int>>> visited;
-            q.push(value);
-            while (!q.empty()) {
-                shared_ptr<BinaryTreeNode<int>> node = q.front();
-                q.pop();
-                if (node != nullptr) {
-                    visited.insert(node);
-                    result.add_element(converter1(node->data));
-                    if (node->left != nullptr && visited.count(node->left) == 0) {
-                        q.push(node->left);
-                    }
-                    if (node->right != nullptr && visited.count(node->right) == 0) {
-                        q.push(node->right);
-                    }
+            if (value == nullptr) {
+                return result;
+            }
+            vector<shared_ptr<BinaryTreeNode<int>>> q;
+            unordered_set<BinaryTreeNode<int>*> visited;
+            q.push_back(value);
+            for (int i = 0; i < q.size(); i++) {
+                shared_ptr<BinaryTreeNode<int>> node = q[i];
+                if (node == nullptr || !visited.insert(node.get()).second) {
+                    result.add_element(jute::jValue(jute::JNULL));
                 } else {
-                    jute::jValue empty(jute::JNULL);
-                    result.add_element(empty);
+                    result.add_element(converter1(node->data));
+                    q.push_back(node->left);
+                    q.push_back(node->right);
                 }
-            } 
+            }
             result.reduce_right();
             return result;
         ''', 'shared_ptr<BinaryTreeNode<int>>', 'jute::jValue'), converters[1])
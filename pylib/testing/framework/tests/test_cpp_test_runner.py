@@ -0,0 +1,58 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from testing.framework.compile_cache import CompileCache
+from testing.framework.cpp.cpp_test_runner import CppTestRunner, JUTE_OBJECT, PCH_HEADER
+
+CLANG = shutil.which('clang++')
+CPP_LIB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cpp', 'cpp_lib')
+
+
+@unittest.skipUnless(CLANG and not sys.platform.startswith('win32'), 'clang is not installed')
+class ClangPrebuiltLibTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.resource_path = os.path.join(self.workdir.name, 'resources')
+        os.makedirs(os.path.join(self.resource_path, 'libs', 'cpp', 'headers'))
+        os.makedirs(os.path.join(self.resource_path, 'libs', 'cpp', 'bin'))
+        os.symlink(CLANG, os.path.join(self.resource_path, 'libs', 'cpp', 'bin', 'clang++'))
+        os.symlink(CPP_LIB_DIR, os.path.join(self.resource_path, 'cpp_lib'))
+        self.runner = CppTestRunner()
+        self.runner.compile_cache = CompileCache(os.path.join(self.workdir.name, 'cache'))
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def compile(self, flags):
+        src = os.path.join(self.workdir.name, 'main.cpp')
+        with open(src, 'w') as f:
+            f.write('int main() { std::vector<int> v; return (int) v.size(); }\n')
+        cmd = self.runner.get_lib_compile_cmd(self.resource_path, False, flags + [src, '-o', f'{src}.run'])
+        return subprocess.run(cmd.args, env=cmd.get_env(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    def test_precompiled_header(self):
+        flags = self.runner.get_pch_flags(self.resource_path, False)
+        self.assertEqual('-include-pch', flags[0])
+        self.assertTrue(flags[1].startswith(self.runner.compile_cache.directory))
+        proc = self.compile(flags)
+        self.assertEqual(0, proc.returncode, proc.stdout)
+        # the header is taken from the cache
+        self.assertEqual(flags, self.runner.get_pch_flags(self.resource_path, False))
+
+    def test_precompiled_header_is_built_in_place(self):
+        flags = self.runner.get_pch_flags(self.resource_path, False)
+        path = os.path.dirname(flags[1])
+        self.assertEqual(sorted([PCH_HEADER, PCH_HEADER + '.pch']), sorted(os.listdir(path)))
+
+    def test_jute_object(self):
+        path = self.runner.get_jute_object(self.resource_path, False)
+        self.assertEqual(JUTE_OBJECT, os.path.basename(path))
+        self.assertTrue(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
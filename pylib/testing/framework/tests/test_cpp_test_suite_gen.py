@@ -1,6 +1,6 @@
 from testing.framework.cpp.cpp_test_suite_gen import CppTestSuiteGenerator
 from testing.framework.tests.test_utils import GeneratorTestCase
-from testing.framework.types import TestSuite, ConverterFn
+from testing.framework.types import TestSuite
 from testing.framework.syntax.syntax_tree import SyntaxTree
 
 
@@ -8,7 +8,6 @@ class CppTestSuiteGeneratorTests(GeneratorTestCase):
 
     def setUp(self) -> None:
         self.generator = CppTestSuiteGenerator()
-        ConverterFn.reset_counter()
 
     def test_solution_generation_simple_int(self):
         tc = TestSuite()
@@ -29,65 +28,113 @@ class CppTestSuiteGeneratorTests(GeneratorTestCase):
             #include <stdexcept>
             #include <string>
             #include <chrono>
+            #include <ctime>
             #include <queue>
             #include <set>
+            #include <unordered_set>
+            #include <memory>
+            #include <cstdlib>
+            #ifndef _WIN32
+            #include <sys/resource.h>
+            #endif
             using namespace std;
 
             //begin_user_src
             int solution(int a, int b) {
                 return a + b;
             }
-            int converter1(jute::jValue value) {
+            int converter_a1a283f5c668(const jute::jValue& value) {
                 return value.as_int();
             }
-            int converter2(jute::jValue value) {
-                return value.as_int();
-            }
-
-            int converter3(jute::jValue value) {
-                return value.as_int();
-            }
-
-            jute::jValue converter4(int value) {
+            jute::jValue converter_f0c4f7330cb5(int value) {
                 jute::jValue result;
                 result.set_type(jute::JNUMBER);
                 result.set_string(std::to_string(value));
                 return result;
             }
             
-            jute::jValue converter5(int value) {
-                jute::jValue result;
-                result.set_type(jute::JNUMBER);
-                result.set_string(std::to_string(value));
-                return result;
+            long long get_elapsed_ns(std::chrono::steady_clock::time_point start,
+                std::chrono::steady_clock::time_point end) {
+                return std::chrono::duration_cast<std::chrono::nanoseconds>(end - start).count();
             }
-
-            jute::jValue converter6(int value) {
-                jute::jValue result;
-                result.set_type(jute::JNUMBER);
-                result.set_string(std::to_string(value));
-                return result;
+            long long get_peak_rss_kb() {
+            #ifdef _WIN32
+                return -1;
+            #else
+                struct rusage usage;
+                getrusage(RUSAGE_SELF, &usage);
+            #ifdef __APPLE__
+                return usage.ru_maxrss / 1024;
+            #else
+                return usage.ru_maxrss;
+            #endif
+            #endif
             }
-
             int main() {
                 Solution solution;
                 std::string buf;
-                while (true) {
-                    std::getline(std::cin, buf);
+                int index = 0;
+                const char* profile_env = std::getenv("ANKICODE_PROFILE");
+                bool profile = profile_env != nullptr && std::string(profile_env) == "1";
+                const char* bench_reps_env = std::getenv("ANKICODE_BENCHMARK_REPS");
+                int bench_reps = bench_reps_env != nullptr ? std::atoi(bench_reps_env) : 0;
+                const char* bench_warmup_env = std::getenv("ANKICODE_BENCHMARK_WARMUP");
+                int bench_warmup = bench_warmup_env != nullptr ? std::atoi(bench_warmup_env) : 0;
+                while (std::getline(std::cin, buf) && !buf.empty()) {
+                    auto parse_started = std::chrono::steady_clock::now();
                     jute::jValue row = jute::parser::parse(buf);
-                    auto started = std::chrono::high_resolution_clock::now();
-                    int result = solution.sum(converter1(row[0]), converter2(row[1]));
-                    auto done = std::chrono::high_resolution_clock::now();
-                    jute::jValue json_result = converter6(result);
+                    auto convert_in_started = std::chrono::steady_clock::now();
+                    int arg0 = converter_a1a283f5c668(row[0]);
+                    int arg1 = converter_a1a283f5c668(row[1]);
+                    auto started = std::chrono::steady_clock::now();
+                    std::clock_t started_cpu = std::clock();
+                    int result = solution.sum(arg0, arg1);
+                    std::clock_t done_cpu = std::clock();
+                    auto done = std::chrono::steady_clock::now();
+                    auto convert_out_started = std::chrono::steady_clock::now();
+                    jute::jValue json_result = converter_f0c4f7330cb5(result);
+                    auto serialize_started = std::chrono::steady_clock::now();
                     jute::jValue response;
                     response.set_type(jute::JOBJECT);
-                    response.add_property("result", json_result);
-                    jute::jValue duration;
-                    duration.set_type(jute::JNUMBER);
-                    duration.set_string(std::to_string(
-                        std::chrono::duration_cast<std::chrono::milliseconds>(done-started).count()));
-                    response.add_property("duration", duration);
-                    std::cout << response.to_string() << endl;
+                    jute::jValue response_index;
+                    response_index.set_type(jute::JNUMBER);
+                    response_index.set_string(std::to_string(index++));
+                    response.add_property("index", std::move(response_index));
+                    response.add_property("result", std::move(json_result));
+                    jute::jValue duration_ns;
+                    duration_ns.set_type(jute::JNUMBER);
+                    duration_ns.set_string(std::to_string(get_elapsed_ns(started, done)));
+                    response.add_property("duration_ns", std::move(duration_ns));
+                    jute::jValue cpu_ns;
+                    cpu_ns.set_type(jute::JNUMBER);
+                    cpu_ns.set_string(std::to_string((long long) ((done_cpu - started_cpu) * (1e9 / CLOCKS_PER_SEC))));
+                    response.add_property("cpu_ns", std::move(cpu_ns));
+                    std::string payload = response.to_string();
+                    if (profile) {
+                        long long peak_rss_kb = get_peak_rss_kb();
+                        payload.pop_back();
+                        payload += ",\\"profile\\":{\\"parse_ns\\":" + std::to_string(get_elapsed_ns(parse_started, convert_in_started)) +
+                            ",\\"convert_in_ns\\":" + std::to_string(get_elapsed_ns(convert_in_started, started)) +
+                            ",\\"convert_out_ns\\":" + std::to_string(get_elapsed_ns(convert_out_started, serialize_started)) +
+                            ",\\"serialize_ns\\":" + std::to_string(get_elapsed_ns(serialize_started, std::chrono::steady_clock::now())) +
+                            ",\\"peak_rss_kb\\":" + (peak_rss_kb < 0 ? std::string("null") : std::to_string(peak_rss_kb)) + "}}";
+                    }
+                    if (bench_reps > 0) {
+                        std::string bench_ns;
+                        for (int rep = 0; rep < bench_warmup + bench_reps; rep++) {
+                            int bench_arg0 = converter_a1a283f5c668(row[0]);
+                            int bench_arg1 = converter_a1a283f5c668(row[1]);
+                            auto bench_started = std::chrono::steady_clock::now();
+                            solution.sum(bench_arg0, bench_arg1);
+                            long long elapsed_ns = get_elapsed_ns(bench_started, std::chrono::steady_clock::now());
+                            if (rep >= bench_warmup) {
+                                bench_ns += (bench_ns.empty() ? "" : ",") + std::to_string(elapsed_ns);
+                            }
+                        }
+                        payload.pop_back();
+                        payload += ",\\"bench_ns\\":[" + bench_ns + "]}";
+                    }
+                    std::cout << "\\x1e__ankicode_result__" << payload.size() << '\\n' << payload << endl;
                 }
                 return 0;
             }''', testing_src)
@@ -0,0 +1,19 @@
+import unittest
+
+from testing.framework.cpu_budget import CpuBudget
+
+
+class CpuBudgetTests(unittest.TestCase):
+    def test_grants_at_least_one_core(self):
+        budget = CpuBudget(4)
+        self.assertEqual(3, budget.acquire(3))
+        self.assertEqual(1, budget.acquire(2))
+        self.assertEqual(1, budget.acquire(2))
+        budget.release(3)
+        budget.release(1)
+        budget.release(1)
+        self.assertEqual(4, budget.acquire(8))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from testing.framework.diagnostics import Diagnostic, DiagnosticParser
+from testing.framework.test_runner import TestRunner, create_src_file, get_code_offset
+from testing.framework.test_suite_gen import START_USER_SRC_MARKER
+from testing.framework.types import Command
+from testing.framework.workspace import WorkspacePool
+
+
+GCC_OUTPUT = b'''/tmp/ankicode-ws-1/main.cpp: In member function \xe2\x80\x98int Solution::sum(int, int)\xe2\x80\x99:
+/tmp/ankicode-ws-1/main.cpp:25:9: warning: unused variable \xe2\x80\x98x\xe2\x80\x99 [-Wunused-variable]
+   25 |     int x;
+      |         ^
+/tmp/ankicode-ws-1/main.cpp:26:9: error: \xe2\x80\x98retrn\xe2\x80\x99 was not declared in this scope
+   26 |         retrn a + b;
+      |         ^~~~~
+/usr/include/c++/12/bits/stl_map.h:846:9: note: candidate: insert(_Pair&&)
+  846 |         insert(_Pair&& __x)
+      |         ^~~~~~
+/tmp/ankicode-ws-1/jute.h:3:1: error: expected ';' after class
+'''
+
+JAVAC_OUTPUT = b'''Solution.java:14: error: cannot find symbol
+        retrn a + b;
+        ^
+  symbol:   class retrn
+Note: Some input files use unchecked or unsafe operations.
+1 error
+'''
+
+
+def parse(output, offset=20, src_file_name='main.cpp', chunk=None, **kwargs):
+    parser = DiagnosticParser(src_file_name, offset, **kwargs)
+    chunk = chunk or len(output)
+    for i in range(0, len(output), chunk):
+        if parser.feed(output[i:i + chunk]):
+            break
+    parser.flush()
+    return parser
+
+
+class FailingCompilerRunner(TestRunner):
+    """
+    Compiler which reports as many errors as requested, or exits with an error code silently
+    """
+
+    def __init__(self, errors, exit_code=1):
+        super().__init__()
+        self.errors = errors
+        self.exit_code = exit_code
+
+    def get_src_file_name(self):
+        return 'main.cpp'
+
+    def get_compile_cmd(self, src_file, resource_path, is_win):
+        script = f'import sys\nfor i in range({self.errors}): print("main.cpp:%d:1: error: e%d" % (i, i), ' \
+                 f'file=sys.stderr, flush=True)\nimport time; time.sleep(0.5 if {self.errors} else 0)\n' \
+                 f'sys.exit({self.exit_code})'
+        return Command([sys.executable, '-c', script])
+
+    def get_toolchain_version_cmd(self, resource_path, is_win):
+        return None
+
+    def get_run_cmd(self, src_file, resource_path, is_win):
+        return Command([])
+
+    def get_error_message(self, error, file_name, code_offset):
+        return error
+
+
+class FakeLogger:
+    def __init__(self):
+        self.errors = []
+
+    def info(self, msg):
+        pass
+
+    def error(self, msg):
+        self.errors.append(msg)
+
+
+class DiagnosticParserTests(unittest.TestCase):
+    def test_gcc_diagnostics(self):
+        parser = parse(GCC_OUTPUT)
+        expected = Diagnostic(6, 9, 'error', '‘retrn’ was not declared in this scope')
+        expected.context = ['    6 |         retrn a + b;', '      |         ^~~~~',
+                            '/usr/include/c++/12/bits/stl_map.h:846:9: note: candidate: insert(_Pair&&)',
+                            '  846 |         insert(_Pair&& __x)', '      |         ^~~~~~']
+        self.assertEqual([expected, Diagnostic(3, 1, 'error', "expected ';' after class", 'jute.h')],
+                         parser.diagnostics)
+        self.assertTrue(parser.has_errors())
+        self.assertFalse(parser.truncated)
+
+    def test_chunks(self):
+        for chunk in [1, 7, 64]:
+            self.assertEqual(parse(GCC_OUTPUT).diagnostics, parse(GCC_OUTPUT, chunk=chunk).diagnostics)
+
+    def test_javac_diagnostics(self):
+        parser = parse(JAVAC_OUTPUT, 10, 'Solution.java')
+        expected = Diagnostic(4, None, 'error', 'cannot find symbol')
+        expected.context = ['        retrn a + b;', '        ^', '  symbol:   class retrn']
+        self.assertEqual([expected], parser.diagnostics)
+        self.assertEqual('4: error: cannot find symbol<br>        retrn a + b;<br>        ^<br>'
+                         '  symbol:   class retrn', parser.to_html())
+
+    def test_location_outside_of_solution(self):
+        parser = parse(b'main.cpp:5:1: fatal error: vector: No such file or directory\n')
+        self.assertEqual([Diagnostic(None, 1, 'error', 'vector: No such file or directory')], parser.diagnostics)
+        self.assertEqual('error: vector: No such file or directory', parser.diagnostics[0].to_text())
+
+    def test_warnings_only(self):
+        parser = parse(b'main.cpp:25:9: warning: unused variable\n   25 |     int x;\nmain.cpp:1:1: note: here\n')
+        self.assertFalse(parser.has_errors())
+        self.assertEqual('', parser.to_html())
+
+    def test_linker_errors(self):
+        parser = parse(b"/usr/bin/ld: main.o: in function `main':\nmain.cpp:(.text+0x1d): undefined reference\n"
+                       b"collect2: error: ld returned 1 exit status")
+        self.assertFalse(parser.has_errors())
+        self.assertEqual(3, len(parser.other))
+
+    def test_output_is_escaped(self):
+        parser = parse(b'main.cpp:30:1: error: no match for vector<int> & map<int, int>\n')
+        self.assertEqual('10:1: error: no match for vector&lt;int&gt; &amp; map&lt;int, int&gt;', parser.to_html())
+
+    def test_errors_limit(self):
+        output = b''.join(b'main.cpp:%d:1: error: e%d\n   1 | x\n' % (i, i) for i in range(1000))
+        parser = DiagnosticParser('main.cpp', 0, max_errors=3)
+        self.assertTrue(parser.feed(output))
+        self.assertEqual(['e0', 'e1', 'e2'], [d.message for d in parser.diagnostics])
+        self.assertTrue(parser.to_html().endswith('... compiler output is truncated'))
+
+    def test_output_limit(self):
+        parser = parse(b'main.cpp:1:1: error: ' + b'x' * 1000 + b'\n' + b'   1 | ' + b'y' * 1000 + b'\n' * 10,
+                       max_chars=1500)
+        self.assertTrue(parser.truncated)
+        self.assertEqual(1, len(parser.diagnostics))
+
+    def test_code_offset(self):
+        self.assertEqual(2, get_code_offset(f'a\n{START_USER_SRC_MARKER}\nb', START_USER_SRC_MARKER))
+        self.assertEqual(0, get_code_offset('a\nb', START_USER_SRC_MARKER))
+
+
+class CompileErrorsTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.pool = WorkspacePool()
+        self.workspace = self.pool.acquire('cpp', self.root.name)
+        self.src_file = create_src_file(f'#include <map>\n{START_USER_SRC_MARKER}\nint x;', 'main.cpp',
+                                        self.workspace)
+        self.logger = FakeLogger()
+
+    def tearDown(self):
+        self.pool.release(self.workspace, False)
+        self.root.cleanup()
+
+    def test_code_offset_is_stored(self):
+        self.assertEqual(2, self.src_file.code_offset)
+
+    def test_compiler_is_stopped_early(self):
+        started = time.monotonic()
+        self.assertFalse(FailingCompilerRunner(100000).compile(self.src_file, '', self.logger))
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(1, len(self.logger.errors))
+        self.assertIn('e3', self.logger.errors[0])
+        self.assertTrue(self.logger.errors[0].endswith('truncated'))
+
+    def test_failed_compiler_without_diagnostics(self):
+        self.assertFalse(FailingCompilerRunner(0, 3).compile(self.src_file, '', self.logger))
+        self.assertEqual(['Compiler has exited with code 3'], self.logger.errors)
+
+    def test_successful_compilation(self):
+        self.assertTrue(FailingCompilerRunner(0, 0).compile(self.src_file, '', self.logger))
+        self.assertEqual([], self.logger.errors)
+        self.assertEqual(['main.cpp'], os.listdir(self.workspace.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
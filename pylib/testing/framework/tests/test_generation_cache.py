@@ -0,0 +1,56 @@
+import unittest
+
+from testing.framework.generation_cache import GenerationCache, get_generation_key
+from testing.framework.js.js_test_suite_gen import JsTestSuiteGenerator
+from testing.framework.python.python_template_gen import PythonTemplateGenerator
+from testing.framework.syntax.syntax_tree import SyntaxTree
+from testing.framework.types import TestSuite
+
+
+def make_test_suite(fn_name='sum', description=''):
+    ts = TestSuite()
+    ts.fn_name = fn_name
+    ts.description = description
+    return ts
+
+
+class GenerationCacheTests(unittest.TestCase):
+    def test_key_depends_on_signature_and_parts(self):
+        self.assertEqual(get_generation_key(SyntaxTree.of(['int[a]', 'int']), 'sum'),
+                         get_generation_key(SyntaxTree.of(['int[a]', 'int']), 'sum'))
+        self.assertNotEqual(get_generation_key(SyntaxTree.of(['int[a]', 'int']), 'sum'),
+                            get_generation_key(SyntaxTree.of(['int[a]', 'long']), 'sum'))
+        self.assertNotEqual(get_generation_key(SyntaxTree.of(['int[a]', 'int']), 'sum'),
+                            get_generation_key(SyntaxTree.of(['int[a]', 'int']), 'add'))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = GenerationCache(max_entries=2)
+        cache.get('a', lambda: 1)
+        cache.get('b', lambda: 2)
+        cache.get('a', lambda: 3)
+        cache.get('c', lambda: 4)
+        self.assertEqual(1, cache.get('a', lambda: 5))
+        self.assertEqual(6, cache.get('b', lambda: 6))
+
+    def test_test_suite_is_generated_once(self):
+        generator = JsTestSuiteGenerator()
+        tree = SyntaxTree.of(['int[a]', 'int'])
+        first = generator.generate_test_suite_src(make_test_suite(), tree, 'function sum(a) {\n  return f(a , 1);\n}')
+        self.assertIn('//begin_user_src\nfunction sum(a) {\n  return f(a , 1);\n}', first)
+        self.assertEqual(1, len(generator._cache.entries))
+        second = generator.generate_test_suite_src(make_test_suite(), SyntaxTree.of(['int[a]', 'int']), 'x')
+        self.assertEqual(1, len(generator._cache.entries))
+        self.assertEqual(first.replace('function sum(a) {\n  return f(a , 1);\n}', 'x'), second)
+
+    def test_template_is_generated_once(self):
+        generator = PythonTemplateGenerator()
+        tree = SyntaxTree.of(['int[a]', 'int'])
+        template = generator.generate_template(tree, make_test_suite('cached_fn'))
+        self.assertEqual(generator.get_template(tree, make_test_suite('cached_fn')), template)
+        self.assertIs(template,
+                      generator.generate_template(SyntaxTree.of(['int[a]', 'int']), make_test_suite('cached_fn')))
+        self.assertNotEqual(template, generator.generate_template(tree, make_test_suite('cached_fn', 'description')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from testing.framework.io_utils import FrameSplitter, LineSplitter, PipeReader
+
+
+class LineSplitterTests(unittest.TestCase):
+    def test_complete_lines(self):
+        splitter = LineSplitter()
+        self.assertEqual([b'a\n', b'b\n'], splitter.feed(b'a\nb\n'))
+        self.assertEqual(b'', splitter.flush())
+
+    def test_line_split_between_chunks(self):
+        splitter = LineSplitter()
+        self.assertEqual([], splitter.feed(b'he'))
+        self.assertEqual([], splitter.feed(b'll'))
+        self.assertEqual([b'hello\n'], splitter.feed(b'o\nwor'))
+        self.assertEqual(b'wor', splitter.flush())
+
+
+class FrameSplitterTests(unittest.TestCase):
+    def test_text_and_frames(self):
+        splitter = FrameSplitter(b'#!')
+        self.assertEqual([(False, b'a'), (True, b'xyz'), (False, b'b\n'), (True, b'')],
+                         splitter.feed(b'a#!3\nxyz\nb\n#!0\n\n'))
+        self.assertEqual(b'', splitter.flush())
+
+    def test_frame_split_between_chunks(self):
+        splitter = FrameSplitter(b'#!')
+        self.assertEqual([(False, b'a')], splitter.feed(b'a#'))
+        self.assertEqual([], splitter.feed(b'!1'))
+        self.assertEqual([], splitter.feed(b'2\n0123456789'))
+        self.assertEqual([(True, b'0123456789\n\n'), (False, b'b')], splitter.feed(b'\n\n\nb'))
+
+    def test_marker_without_length_is_text(self):
+        splitter = FrameSplitter(b'#!')
+        self.assertEqual([(False, b'#!'), (False, b'x\n')], splitter.feed(b'#!x\n'))
+
+    def test_incomplete_frame_is_flushed_as_text(self):
+        splitter = FrameSplitter(b'#!')
+        self.assertEqual([], splitter.feed(b'#!5\nab'))
+        self.assertEqual(b'ab', splitter.flush())
+
+
+class PipeReaderTests(unittest.TestCase):
+    SCRIPT = 'import sys\n' \
+             'sys.stdout.write("out\\n"); sys.stdout.flush()\n' \
+             'sys.stderr.write("err\\n"); sys.stderr.flush()\n'
+
+    def read_all(self, use_polling: bool):
+        proc = subprocess.Popen([sys.executable, '-c', self.SCRIPT], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        reader = PipeReader(use_polling=use_polling)
+        reader.register(proc.stdout, 'out')
+        reader.register(proc.stderr, 'err')
+        data = {'out': b'', 'err': b''}
+        while not reader.is_empty():
+            for key, chunk in reader.read(timeout=5):
+                data[key] += chunk
+        reader.close()
+        proc.wait()
+        return data
+
+    @unittest.skipIf(sys.platform.startswith('win32'), 'selectors do not support pipes on Windows')
+    def test_selectors(self):
+        self.assertEqual({'out': b'out\n', 'err': b'err\n'}, self.read_all(use_polling=False))
+
+    def test_polling(self):
+        self.assertEqual({'out': b'out\n', 'err': b'err\n'}, self.read_all(use_polling=True))
+
+    @unittest.skipIf(sys.platform.startswith('win32'), 'selectors do not support pipes on Windows')
+    def test_timeout_without_data(self):
+        r, w = os.pipe()
+        with os.fdopen(r, 'rb') as f:
+            reader = PipeReader(use_polling=False)
+            reader.register(f, 'r')
+            self.assertEqual([], reader.read(timeout=0.01))
+            os.close(w)
+            self.assertEqual([('r', b'')], reader.read(timeout=1))
+            self.assertTrue(reader.is_empty())
+            reader.close()
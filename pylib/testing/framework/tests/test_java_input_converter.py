@@ -120,27 +120,23 @@ class JavaInputConverterTests(unittest.TestCase):
         self.assertEqual(2, len(converters))
         self.assertEqual(ConverterFn('', '''return value.asText();''', 'JsonNode', 'String'), converters[0])
         self.assertEqual(ConverterFn('', '''
-            List<BinaryTreeNode<String>> nodes = new ArrayList<>();
+            List<BinaryTreeNode<String>> nodes = new ArrayList<>(value.size());
             for (JsonNode n : value) {
-                BinaryTreeNode<String> node = new BinaryTreeNode<>();
                 if (n.isNull()) {
-                    node = null;
+                    nodes.add(null);
                 } else {
-                    node.data = converter1(n);
+                    nodes.add(new BinaryTreeNode<>(converter1(n), null, null));
                 }
-                nodes.add(node);
             }
-            Deque<BinaryTreeNode<String>> children = new LinkedList<>(nodes);
-            BinaryTreeNode<String> root = children.removeFirst();
-            for (BinaryTreeNode<String> node : nodes) {
+            int child = 1;
+            for (int i = 0; i < nodes.size() && child < nodes.size(); i++) {
+                BinaryTreeNode<String> node = nodes.get(i);
                 if (node != null) {
-                    if (!children.isEmpty()) {
-                        node.left = children.removeFirst();
-                    }
-                    if (!children.isEmpty()) {
-                        node.right = children.removeFirst();
+                    node.left = nodes.get(child++);
+                    if (child < nodes.size()) {
+                        node.right = nodes.get(child++);
                     }
                 }
             }
-            return root;
+            return nodes.isEmpty() ? null : nodes.get(0);
         ''', 'JsonNode', 'BinaryTreeNode<String>'), converters[1])
@@ -111,30 +111,25 @@ class JavaOutputConverterTests(unittest.TestCase):
         self.assertEqual(ConverterFn('', 'return value;', 'Integer', 'Integer'), converters[0])
         self.assertEqual(ConverterFn('', '''
             List<Integer> result = new ArrayList<>();
-            Queue<BinaryTreeNode<Integer>> queue = new LinkedList<>();
+            if (value == null) {
+                return result;
+            }
+            List<BinaryTreeNode<Integer>> queue = new ArrayList<>();
             Set<BinaryTreeNode<Integer>> visited = new HashSet<>();
             queue.add(value);
-            while (!queue.isEmpty()) {
-                BinaryTreeNode<Integer> node = queue.poll();
-                if (node != null) {
-                    visited.add(node);
-                    result.add(converter1(node.data));
-                    if (node.left != null && !visited.contains(node.left)) {
-                        queue.add(node.left);
-                    }
-                    if (node.right != null && !visited.contains(node.right)) {
-                        queue.add(node.right);
-                    }
-                } else {
+            for (int i = 0; i < queue.size(); i++) {
+                BinaryTreeNode<Integer> node = queue.get(i);
+                if (node == null || !visited.add(node)) {
                     result.add(null);
-                }
-            }
-            for (int i = result.size() - 1; i > 0; i--) {
-                if (result.get(i) == null) {
-                    result.remove(i);
                 } else {
-                    break;
+                    result.add(converter1(node.data));
+                    queue.add(node.left);
+                    queue.add(node.right);
                 }
             }
-            return result;''', 'BinaryTreeNode<Integer>', 'List<Integer>'), converters[1])
+            while (result.get(result.size() - 1) == null) {
+                result.remove(result.size() - 1);
+            }
+            return result;
+        ''', 'BinaryTreeNode<Integer>', 'List<Integer>'), converters[1])
 
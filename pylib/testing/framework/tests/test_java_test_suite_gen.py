@@ -1,6 +1,6 @@
 from testing.framework.java.java_test_suite_gen import JavaTestSuiteGenerator
 from testing.framework.tests.test_utils import GeneratorTestCase
-from testing.framework.types import TestSuite, ConverterFn
+from testing.framework.types import TestSuite
 from testing.framework.syntax.syntax_tree import SyntaxTree
 
 
@@ -8,7 +8,6 @@ class JavaTestSuiteGeneratorTests(GeneratorTestCase):
 
     def setUp(self) -> None:
         self.generator = JavaTestSuiteGenerator()
-        ConverterFn.reset_counter()
 
     def test_solution_generation_simple_int(self):
         tc = TestSuite()
@@ -24,8 +23,11 @@ class JavaTestSuiteGeneratorTests(GeneratorTestCase):
             }'''
         testing_src = self.generator.generate_test_suite_src(tc, tree, solution_src)
         self.assertEqualsIgnoreWhiteSpaces('''
+            import java.io.BufferedReader;
             import java.io.File;
             import java.io.IOException;
+            import java.io.InputStreamReader;
+            import java.nio.charset.StandardCharsets;
             import java.util.stream.Collectors;
             import java.nio.file.Files;
             import java.nio.file.Path;
@@ -50,29 +52,15 @@ class JavaTestSuiteGeneratorTests(GeneratorTestCase):
                 static {
                     mapper = new ObjectMapper();
                     mapper.setVisibility(PropertyAccessor.FIELD, JsonAutoDetect.Visibility.ANY);
+                    // the response is ASCII only, so that its length is equal to the number of bytes
+                    mapper.configure(com.fasterxml.jackson.core.JsonGenerator.Feature.ESCAPE_NON_ASCII, true);
                 }
  
-                static int converter1(JsonNode value) {
+                static int converter_d6ff9b39a1a7(JsonNode value) {
                     return value.asInt();
                 }
 
-                static int converter2(JsonNode value) {
-                    return value.asInt();
-                }
-
-                static int converter3(JsonNode value) {
-                    return value.asInt();
-                }
-
-                static int converter4(int value) {
-                    return value;
-                }
-
-                static int converter5(int value) {
-                    return value;
-                }
-
-                static int converter6(int value) {
+                static int converter_82846e4b99f2(int value) {
                     return value;
                 }
 
@@ -83,21 +71,80 @@ class JavaTestSuiteGeneratorTests(GeneratorTestCase):
                         .findFirst()
                         .orElseThrow(() -> new IllegalStateException("Cannot find method sum"));
                     method.setAccessible(true);
-                    Scanner scanner = new Scanner(System.in);
-                    while (true) {
-                        String line = scanner.nextLine();
+                    java.lang.management.ThreadMXBean threads = java.lang.management.ManagementFactory.getThreadMXBean();
+                    boolean profile = "1".equals(System.getenv("ANKICODE_PROFILE"));
+                    int benchReps = getIntEnv("ANKICODE_BENCHMARK_REPS");
+                    int benchWarmup = getIntEnv("ANKICODE_BENCHMARK_WARMUP");
+                    // lines of large test cases are read in chunks of the buffer's size
+                    BufferedReader reader = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8), 1 << 16);
+                    int index = 0;
+                    String line;
+                    while ((line = reader.readLine()) != null) {
+                        if (line.isEmpty()) {
+                            break;
+                        }
+                        long parseStart = System.nanoTime();
                         JsonNode rows = mapper.readTree(line);
+                        long convertInStart = System.nanoTime();
+                        int arg0 = converter_d6ff9b39a1a7(rows.get(0));
+                        int arg1 = converter_d6ff9b39a1a7(rows.get(1));
                         long start = System.nanoTime();
-                        int result = solution.sum(converter1(rows.get(0)), converter2(rows.get(1)));
-                        long end = System.nanoTime();
-                        long duration = TimeUnit.MILLISECONDS.convert(end - start, TimeUnit.NANOSECONDS);
+                        long startCpu = threads.getCurrentThreadCpuTime();
+                        int result = solution.sum(arg0, arg1);
+                        long cpuNs = threads.getCurrentThreadCpuTime() - startCpu;
+                        long durationNs = System.nanoTime() - start;
+                        long convertOutStart = System.nanoTime();
+                        Object jsonResult = converter_82846e4b99f2(result);
+                        long serializeStart = System.nanoTime();
                         Map<String, Object> map = new HashMap<>();
-                        map.put("result", converter6(result));
-                        map.put("duration", duration);
-                        System.out.println(getJson(map));
+                        map.put("index", index++);
+                        map.put("result", jsonResult);
+                        map.put("duration_ns", durationNs);
+                        map.put("cpu_ns", cpuNs);
+                        String response = getJson(map);
+                        if (profile) {
+                            Map<String, Object> phases = new HashMap<>();
+                            phases.put("parse_ns", convertInStart - parseStart);
+                            phases.put("convert_in_ns", start - convertInStart);
+                            phases.put("convert_out_ns", serializeStart - convertOutStart);
+                            phases.put("serialize_ns", System.nanoTime() - serializeStart);
+                            phases.put("peak_rss_kb", getPeakRssKb());
+                            response = response.substring(0, response.length() - 1) + ", \\"profile\\": " + getJson(phases) + "}";
+                        }
+                        if (benchReps > 0) {
+                            List<Long> benchNs = new ArrayList<>();
+                            for (int rep = 0; rep < benchWarmup + benchReps; rep++) {
+                                int benchArg0 = converter_d6ff9b39a1a7(rows.get(0));
+                                int benchArg1 = converter_d6ff9b39a1a7(rows.get(1));
+                                long benchStart = System.nanoTime();
+                                solution.sum(benchArg0, benchArg1);
+                                long benchDurationNs = System.nanoTime() - benchStart;
+                                if (rep >= benchWarmup) {
+                                    benchNs.add(benchDurationNs);
+                                }
+                            }
+                            response = response.substring(0, response.length() - 1) + ", \\"bench_ns\\": " + getJson(benchNs) + "}";
+                        }
+                        System.out.print("\\u001e__ankicode_result__" + response.length() + "\\n" + response + "\\n");
                         System.out.flush();
                     }
                 }
+                static int getIntEnv(String name) {
+                    String value = System.getenv(name);
+                    return value == null || value.isEmpty() ? 0 : Integer.parseInt(value);
+                }
+                static Long getPeakRssKb() {
+                    try {
+                        for (String line : Files.readAllLines(new File("/proc/self/status").toPath())) {
+                            if (line.startsWith("VmHWM:")) {
+                                return Long.parseLong(line.replaceAll("[^0-9]", ""));
+                            }
+                        }
+                    } catch(Exception exc) {
+                        // peak RSS is reported on Linux only
+                    }
+                    return null;
+                }
                 static String getJson(Object obj) {
                     try {
                         return mapper.writeValueAsString(obj);
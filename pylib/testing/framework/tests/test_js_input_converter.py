@@ -81,29 +81,17 @@ class JsInputConverterTests(unittest.TestCase):
         self.assertEqual(ConverterFn('', '''return value''', ''), converters[0])
         self.assertEqual(ConverterFn('', '''
             const nodes = []
-            for (let n of value) {
-                let node = new BinaryTreeNode()
-                if (n == null) {
-                    node = null
-                } else {
-                    node.data = converter1(n)
-                }
-                nodes.push(node)
-            }
-            const children = []
-            for (n of nodes) {
-                children.push(n)
+            for (const item of value) {
+                nodes.push(item == null ? null : new BinaryTreeNode(converter1(item)))
             }
-            const root = children.shift()
-            for (let node of nodes) {
-                if (node != null) {
-                    if (children.length) {
-                        node.left = children.shift()
-                    }
-                    if (children.length) {
-                        node.right = children.shift()
+            let child = 1
+            for (let i = 0; i < nodes.length && child < nodes.length; i++) {
+                if (nodes[i] != null) {
+                    nodes[i].left = nodes[child++]
+                    if (child < nodes.length) {
+                        nodes[i].right = nodes[child++]
                     }
                 }
             }
-            return root 
-            ''', ''), converters[1])
+            return nodes.length ? nodes[0] : null
+        ''', ''), converters[1])
@@ -101,29 +101,24 @@ class JsOutputConverterTests(unittest.TestCase):
         self.assertEqual(ConverterFn('', 'return value', ''), converters[0])
         self.assertEqual(ConverterFn('', '''
             const result = []
-            const queue = []
+            if (value == null) {
+                return result
+            }
+            const queue = [value]
             const visited = new Set()
-            queue.push(value)
-            while (queue.length) {
-                node = queue.shift()
-                if (node) {
+            for (let i = 0; i < queue.length; i++) {
+                const node = queue[i]
+                if (node == null || visited.has(node)) {
+                    result.push(null)
+                } else {
                     visited.add(node)
                     result.push(converter1(node.data))
-                    if (node.left != null && !visited.has(node.left)) {
-                        queue.push(node.left)
-                    }
-                    if (node.right != null && !visited.has(node.right)) {
-                        queue.push(node.right)
-                    }
-                } else {
-                    result.push(null);
+                    queue.push(node.left)
+                    queue.push(node.right)
                 }
             }
-            for (let i = result.length - 1; i > 0; i--) {
-                if (result[i] == null) {
-                    result.pop()
-                } else {
-                    break
-                }
+            while (result[result.length - 1] == null) {
+                result.pop()
             }
-            return result''', ''), converters[1])
+            return result
+        ''', ''), converters[1])
@@ -1,6 +1,6 @@
 from testing.framework.js.js_test_suite_gen import JsTestSuiteGenerator
 from testing.framework.tests.test_utils import GeneratorTestCase
-from testing.framework.types import TestSuite, ConverterFn
+from testing.framework.types import TestSuite
 from testing.framework.syntax.syntax_tree import SyntaxTree
 
 
@@ -8,7 +8,6 @@ class JsTestSuiteGeneratorTests(GeneratorTestCase):
 
     def setUp(self):
         self.generator = JsTestSuiteGenerator()
-        ConverterFn.reset_counter()
 
     def test_solution_generation_simple_int(self):
         tc = TestSuite()
@@ -29,46 +28,66 @@ class JsTestSuiteGeneratorTests(GeneratorTestCase):
               output: process.stdout
             });
 
-            function converter1(value) {
+            function converter_c7fa1dd1b429(value) {
                 return value
             }
-
-            function converter2(value) {
-                return value
-            }
-
-            function converter3(value) {
-                return value
-            }
-
-            function converter4(value) {
-                return value
-            }
-
-            function converter5(value) {
-                return value
-            }
- 
-            function converter6(value) {
-                return value
-            }
- 
+  
             //begin_user_src
             function solution(a, b) {
                 return a + b;
             }
+            const profile = process.env.ANKICODE_PROFILE === '1';
+            const benchReps = parseInt(process.env.ANKICODE_BENCHMARK_REPS || '0', 10);
+            const benchWarmup = parseInt(process.env.ANKICODE_BENCHMARK_WARMUP || '0', 10);
+            let index = 0;
             rl.on('line', function(line) {
-                const start = new Date().getTime();
+                if (line === '') {
+                    rl.close();
+                    return;
+                }
+                const parseStart = process.hrtime.bigint();
                 const cols = JSON.parse(line)
-                
+                const convertInStart = process.hrtime.bigint();
                 const args = []
-                args.push(converter1(cols[0]));
-                args.push(converter2(cols[1]));
+                args.push(converter_c7fa1dd1b429(cols[0]));
+                args.push(converter_c7fa1dd1b429(cols[1]));
 
+                const start = process.hrtime.bigint();
+                const startCpu = process.cpuUsage();
                 const result = sum(...args);
-                const end = new Date().getTime();
-                console.log(JSON.stringify({
-                    'result': converter6(result),
-                    'duration': (end-start)
-                }));
+                const cpu = process.cpuUsage(startCpu);
+                const durationNs = Number(process.hrtime.bigint() - start);
+                const convertOutStart = process.hrtime.bigint();
+                const jsonResult = converter_c7fa1dd1b429(result);
+                const serializeStart = process.hrtime.bigint();
+                let response = JSON.stringify({
+                    'index': index++,
+                    'result': jsonResult,
+                    'duration_ns': durationNs,
+                    'cpu_ns': (cpu.user + cpu.system) * 1000
+                });
+                if (profile) {
+                    response = response.slice(0, -1) + ', "profile": ' + JSON.stringify({
+                        'parse_ns': Number(convertInStart - parseStart),
+                        'convert_in_ns': Number(start - convertInStart),
+                        'convert_out_ns': Number(serializeStart - convertOutStart),
+                        'serialize_ns': Number(process.hrtime.bigint() - serializeStart),
+                        'peak_rss_kb': process.resourceUsage().maxRSS
+                    }) + '}';
+                }
+                if (benchReps > 0) {
+                    const benchNs = [];
+                    for (let rep = 0; rep < benchWarmup + benchReps; rep++) {
+                        const benchArgs = [];
+                        benchArgs.push(converter_c7fa1dd1b429(cols[0]));
+                        benchArgs.push(converter_c7fa1dd1b429(cols[1]));
+                        const benchStart = process.hrtime.bigint();
+                        sum(...benchArgs);
+                        if (rep >= benchWarmup) {
+                            benchNs.push(Number(process.hrtime.bigint() - benchStart));
+                        }
+                    }
+                    response = response.slice(0, -1) + ', "bench_ns": ' + JSON.stringify(benchNs) + '}';
+                }
+                process.stdout.write('\\x1e__ankicode_result__' + Buffer.byteLength(response) + '\\n' + response + '\\n');
             });''', testing_src)
@@ -89,21 +89,15 @@ class PythonInputConverterTests(unittest.TestCase):
         self.assertEqual(2, len(converters))
         self.assertEqual(ConverterFn('', '\treturn str(value)', '', 'str'), converters[0])
         self.assertEqual(ConverterFn('', '''
-            nodes = []
-            for item in value:
-                node = BinaryTreeNode()
-                if item is None:
-                    node = None
-                else:
-                    node.data = converter1(item)
-                nodes.append(node)
-            children = [n for n in nodes]
-            root = children.pop(0)
+            nodes = [None if item is None else BinaryTreeNode(converter1(item)) for item in value]
+            child = 1
             for node in nodes:
+                if child >= len(nodes):
+                    break
                 if node is not None:
-                    if children:
-                        node.left = children.pop(0)
-                    if children:
-                        node.right = children.pop(0)
-            return root
+                    node.left = nodes[child]
+                    if child + 1 < len(nodes):
+                        node.right = nodes[child + 1]
+                    child += 2
+            return nodes[0] if nodes else None
         ''', '', 'BinaryTreeNode[str]'), converters[1])
@@ -92,27 +92,22 @@ class PythonOutputConverterTests(unittest.TestCase):
         self.assertEqual(ConverterFn('', 'return value', 'int', 'int'), converters[0])
         self.assertEqual(ConverterFn('', '''
             result = []
-            queue = []
-            visited = set([])
-            queue.append(value)
-            while queue:
-                node = queue.pop(0)
-                if node is not None:
-                    visited.add(node)
-                    result.append(converter1(node.data))
-                    if node.left is not None and not node.left in visited:
-                        queue.append(node.left)
-                    if node.right is not None and not node.right in visited:
-                        queue.append(node.right)
-                else:
+            if value is None:
+                return result
+            queue = [value]
+            visited = set()
+            i = 0
+            while i < len(queue):
+                node = queue[i]
+                i += 1
+                if node is None or node in visited:
                     result.append(None)
-            j = None
-            for i in range(len(result) - 1, 1, -1):
-                if result[i] is None:
-                    j = i
                 else:
-                    break
-            if j is not None:
-                result = result[:j]
+                    visited.add(node)
+                    result.append(converter1(node.data))
+                    queue.append(node.left)
+                    queue.append(node.right)
+            while result[-1] is None:
+                result.pop()
             return result
         ''', 'BinaryTreeNode[int]', 'List[int]'), converters[1])
@@ -1,7 +1,7 @@
 
 from testing.framework.python.python_test_suite_gen import PythonTestSuiteGenerator
 from testing.framework.tests.test_utils import GeneratorTestCase
-from testing.framework.types import TestSuite, ConverterFn
+from testing.framework.types import TestSuite
 from testing.framework.syntax.syntax_tree import SyntaxTree
 
 
@@ -9,7 +9,6 @@ class PythonTestSuiteGeneratorTests(GeneratorTestCase):
 
     def setUp(self) -> None:
         self.generator = PythonTestSuiteGenerator()
-        ConverterFn.reset_counter()
 
     def test_solution_generation_simple_int(self):
         tc = TestSuite()
@@ -19,45 +18,79 @@ class PythonTestSuiteGeneratorTests(GeneratorTestCase):
         solution_src = 'def solution(a: int, b: int) -> int:\n    return a + b'
         testing_src = self.generator.generate_test_suite_src(tc, tree, solution_src)
         self.assertEqual('''
-import datetime
 import json
+import os
+import sys
+import time
 from typing import *
 #begin_user_src
 def solution(a: int, b: int) -> int:
     return a + b
-def converter1(value) -> int:
+def converter_dc9d7999e994(value) -> int:
     return int(value)
 
-def converter2(value) -> int:
-    return int(value)
-
-def converter3(value) -> int:
-    return int(value)
-
-def converter4(value) -> int:
-    return value
-
-def converter5(value) -> int:
-    return value
-
-def converter6(value) -> int:
+def converter_39c2c40ffe20(value) -> int:
     return value
 
+def get_peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+profile = os.environ.get('ANKICODE_PROFILE') == '1'
+bench_reps = int(os.environ.get('ANKICODE_BENCHMARK_REPS') or 0)
+bench_warmup = int(os.environ.get('ANKICODE_BENCHMARK_WARMUP') or 0)
+index = 0
 while True:
-    line = input()
+    line = sys.stdin.readline().strip()
+    if not line:
+        break
+    parse_start = time.perf_counter_ns()
     values = json.loads(line)
+    convert_in_start = time.perf_counter_ns()
     args = []
 
-    args.append(converter1(values[0]))
+    args.append(converter_dc9d7999e994(values[0]))
 
-    args.append(converter2(values[1]))
+    args.append(converter_dc9d7999e994(values[1]))
 
-    start = datetime.datetime.now()
+    start = time.perf_counter_ns()
+    start_cpu = time.process_time_ns()
     result = solution(*args)
-    end = datetime.datetime.now()
-    time_diff = (end - start)
-    duration = (time_diff.days * 86400000) + (time_diff.seconds * 1000) + (time_diff.microseconds / 1000)
-    print(json.dumps({
-        'result': converter6(result),
-        'duration': duration }, default=lambda obj: obj.__dict__))\n''', testing_src)
+    cpu_ns = time.process_time_ns() - start_cpu
+    duration_ns = time.perf_counter_ns() - start
+    convert_out_start = time.perf_counter_ns()
+    json_result = converter_39c2c40ffe20(result)
+    serialize_start = time.perf_counter_ns()
+    response = json.dumps({
+        'index': index,
+        'result': json_result,
+        'duration_ns': duration_ns,
+        'cpu_ns': cpu_ns }, default=lambda obj: obj.__dict__)
+    if profile:
+        response = response[:-1] + ', "profile": ' + json.dumps({
+            'parse_ns': convert_in_start - parse_start,
+            'convert_in_ns': start - convert_in_start,
+            'convert_out_ns': serialize_start - convert_out_start,
+            'serialize_ns': time.perf_counter_ns() - serialize_start,
+            'peak_rss_kb': get_peak_rss_kb() }) + '}'
+    if bench_reps:
+        bench_ns = []
+        for rep in range(bench_warmup + bench_reps):
+            args = []
+
+            args.append(converter_dc9d7999e994(values[0]))
+
+            args.append(converter_dc9d7999e994(values[1]))
+
+            bench_start = time.perf_counter_ns()
+            solution(*args)
+            if rep >= bench_warmup:
+                bench_ns.append(time.perf_counter_ns() - bench_start)
+        response = response[:-1] + ', "bench_ns": ' + json.dumps(bench_ns) + '}'
+    sys.stdout.write('\\x1e__ankicode_result__' + str(len(response)) + '\\n' + response + '\\n')
+    sys.stdout.flush()
+    index += 1\n''', testing_src)
 
@@ -0,0 +1,179 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+if not sys.platform.startswith('win32'):
+    import resource
+
+from testing.framework.sandbox import SANDBOX_FILE_SIZE_LIMIT, Cgroup, ProcessBackend, ResourceUsage, \
+    SandboxBackend, get_delegated_cgroup, get_prlimit_args
+from testing.framework.types import Command, TestSuiteExecOpts
+from testing.framework.watchdog import MB, Watchdog
+
+PRLIMIT = shutil.which('prlimit')
+
+
+def python(script, env=None, cwd=None):
+    return Command([sys.executable, '-c', script], env, cwd)
+
+
+def write(path, name, value):
+    with open(os.path.join(path, name), 'w') as f:
+        f.write(value)
+
+
+def read(path, name):
+    with open(os.path.join(path, name)) as f:
+        return f.read()
+
+
+def is_running(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().split(')')[-1].split()[0] != 'Z'
+    except OSError:
+        return False
+
+
+class CommandTests(unittest.TestCase):
+    def test_env(self):
+        self.assertEqual({'PATH': '/bin', 'A': '1'}, Command(['node'], {'A': '1'}).get_env({'PATH': '/bin'}))
+
+    def test_str(self):
+        self.assertEqual("cd /res && A='1 2' /bin/node 'a b.js'",
+                         str(Command(['/bin/node', 'a b.js'], {'A': '1 2'}, '/res')))
+
+
+class ResourceUsageTests(unittest.TestCase):
+    def test_combine(self):
+        self.assertEqual(ResourceUsage(3.0, 200, True),
+                         ResourceUsage.combine([ResourceUsage(1.0, 100), ResourceUsage(2.0, 200, True)]))
+        self.assertIsNone(ResourceUsage.combine([ResourceUsage(1.0, 100), None]))
+        self.assertIsNone(ResourceUsage.combine([]))
+
+
+@unittest.skipIf(sys.platform.startswith('win32'), 'process groups are not supported')
+class BackendTests(unittest.TestCase):
+    def test_sandboxed_process(self):
+        for backend in [SandboxBackend(), SandboxBackend(prlimit=PRLIMIT)]:
+            proc = backend.start(python('import os; print(os.environ["X"], os.getcwd())', {'X': '1'}), cwd='/')
+            out, _ = proc.communicate(timeout=10)
+            self.assertEqual('1 /\n', out)
+            self.assertEqual(0, proc.returncode)
+            proc = backend.start(python('import os; print(os.getcwd())', cwd='/tmp'), cwd='/')
+            self.assertEqual('/tmp\n', proc.communicate(timeout=10)[0])
+
+    def test_process_group_is_killed(self):
+        backend = SandboxBackend()
+        proc = backend.start(python('import subprocess, time; '
+                                    'print(subprocess.Popen(["sleep", "100"]).pid, flush=True); time.sleep(100)'),
+                             TestSuiteExecOpts('time_limit_ms=1000'))
+        child = int(proc.stdout.readline())
+        self.assertEqual(os.getpgid(proc.pid), os.getpgid(child))
+        backend.kill(proc.pid)
+        usage = backend.release(proc)
+        self.assertNotEqual(0, proc.returncode)
+        self.assertGreater(usage.peak_memory_kb, 0)
+        for _ in range(100):
+            if not is_running(child):
+                break
+            time.sleep(0.01)
+        self.assertFalse(is_running(child))
+
+    def test_limits_are_applied(self):
+        backends = [SandboxBackend()] + ([SandboxBackend(prlimit=PRLIMIT)] if PRLIMIT else [])
+        for backend in backends:
+            # the limits are set before the program starts
+            proc = backend.start(python('import resource; print(*[resource.getrlimit(r)[0] for r in '
+                                        '[resource.RLIMIT_CORE, resource.RLIMIT_FSIZE, resource.RLIMIT_CPU]])'),
+                                 TestSuiteExecOpts('suite_time_limit_ms=1000'))
+            out, _ = proc.communicate(timeout=10)
+            backend.release(proc)
+            self.assertEqual(f'0 {SANDBOX_FILE_SIZE_LIMIT} 3\n', out)
+
+    def test_prlimit_args(self):
+        self.assertEqual(['/bin/prlimit', '--core=0', f'--as={64 * MB}', '--'],
+                         get_prlimit_args('/bin/prlimit', [(resource.RLIMIT_CORE, 0), (resource.RLIMIT_AS, 64 * MB)]))
+
+    def test_cpu_usage(self):
+        for backend in [ProcessBackend(), SandboxBackend()]:
+            proc = backend.start(python('import time; end = time.process_time() + 0.2\n'
+                                        'while time.process_time() < end: pass'))
+            proc.stdin.close()
+            proc.stdout.read()
+            usage = backend.release(proc)
+            self.assertGreaterEqual(usage.cpu_sec, 0.15)
+            self.assertIsNone(backend.release(proc))
+
+    def test_watchdog_kills_through_backend(self):
+        backend = SandboxBackend()
+        opts = TestSuiteExecOpts('time_limit_ms=10')
+        proc = backend.start(python('while True: pass'), opts)
+        watchdog = Watchdog.start_for(proc.pid, opts, None, backend.kill, backend.is_oom_killed)
+        watchdog.start_case()
+        proc.wait(10)
+        backend.release(proc)
+        self.assertIsNotNone(watchdog.violation)
+
+
+class CgroupTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = self.dir.name
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_limits(self):
+        cgroup = Cgroup.create(self.path, 'run', TestSuiteExecOpts('memory_limit_mb=128'))
+        self.assertEqual('256', read(cgroup.path, 'pids.max'))
+        self.assertEqual(str(192 * MB), read(cgroup.path, 'memory.max'))
+        # interface files which are not supported by the kernel are skipped
+        self.assertFalse(os.path.exists(os.path.join(cgroup.path, 'cpu.max')))
+        os.remove(os.path.join(cgroup.path, 'pids.max'))
+        os.remove(os.path.join(cgroup.path, 'memory.max'))
+        cgroup.remove()
+        self.assertFalse(os.path.exists(cgroup.path))
+
+    def test_usage(self):
+        write(self.path, 'cpu.stat', 'usage_usec 1500000\nuser_usec 1000000\nsystem_usec 500000\n')
+        write(self.path, 'memory.peak', str(64 * MB) + '\n')
+        write(self.path, 'memory.events', 'low 0\nhigh 0\nmax 3\noom 1\noom_kill 1\n')
+        self.assertEqual(ResourceUsage(1.5, 64 * 1024, True), Cgroup(self.path).get_usage())
+
+    def test_usage_without_peak(self):
+        write(self.path, 'cpu.stat', 'usage_usec 2000\n')
+        self.assertEqual(ResourceUsage(0.002, None, False), Cgroup(self.path).get_usage())
+
+    def test_kill(self):
+        write(self.path, 'cgroup.kill', '')
+        Cgroup(self.path).kill()
+        self.assertEqual('1', read(self.path, 'cgroup.kill'))
+
+    def test_delegation(self):
+        write(self.path, 'cgroup.controllers', 'cpuset cpu io memory pids')
+        write(self.path, 'cgroup.subtree_control', 'cpu memory pids')
+        self.assertEqual(self.path, get_delegated_cgroup(self.path))
+        # the delegated cgroup is not modified
+        self.assertEqual(['cgroup.controllers', 'cgroup.subtree_control'], sorted(os.listdir(self.path)))
+        self.assertEqual('cpu memory pids', read(self.path, 'cgroup.subtree_control'))
+
+    def test_no_delegation(self):
+        write(self.path, 'cgroup.controllers', 'cpu io memory pids')
+        write(self.path, 'cgroup.subtree_control', 'pids')
+        # controllers are not enabled for the user
+        self.assertIsNone(get_delegated_cgroup(self.path))
+        self.assertEqual('pids', read(self.path, 'cgroup.subtree_control'))
+        self.assertIsNone(get_delegated_cgroup(os.path.join(self.path, 'missing')))
+        self.assertIsNone(get_delegated_cgroup(None))
+
+    def test_attach_failure(self):
+        # the cgroup doesn't exist
+        self.assertFalse(Cgroup(os.path.join(self.path, 'missing')).attach(os.getpid()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
+import pickle
 import unittest
 
-from testing.framework.syntax.syntax_tree import SyntaxTree
+from testing.framework.syntax.syntax_tree import SyntaxTree, parse_signature
 
 
 class SyntaxTreeTests(unittest.TestCase):
@@ -122,3 +123,29 @@ root
             int
    obj2::Node
 ''')
+
+    def test_name_with_commas(self):
+        tree = SyntaxTree.of(['int[a]', 'int[ignore_order=True, parallel=2]'])
+        self.assertEqual(2, len(tree.nodes))
+        self.assertEqual('ignore_order=True, parallel=2', tree.nodes[-1].name)
+
+    def test_parsed_signatures_are_cached(self):
+        self.assertIs(parse_signature('list(int)[a];int'), SyntaxTree.of(['list(int)[a]', 'int']))
+
+    def test_tree_is_immutable(self):
+        tree = SyntaxTree.of(['list(int)[a]', 'int'])
+        with self.assertRaises(AttributeError):
+            tree.first_child().name = 'b'
+        with self.assertRaises(AttributeError):
+            tree.nodes.append(tree.first_child())
+
+    def test_pickle(self):
+        tree = SyntaxTree.of(['object(array(int)[arr])[obj]<Node>', 'Node[obj2]'])
+        restored = pickle.loads(pickle.dumps(tree))
+        self.assertEqual(tree.to_string(), restored.to_string())
+        self.assertIs(restored, restored.first_child().parent)
+        self.assertTrue(restored.second_child().user_type)
+
+    def test_invalid_signature(self):
+        with self.assertRaises(Exception):
+            SyntaxTree.of(['list(int[a]'])
@@ -0,0 +1,163 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from testing.framework.syntax.syntax_tree import SyntaxTree
+from testing.framework.test_corpus import CORPUS_FORMAT, CorpusCache, StreamedArgs, TestCorpus, parse_test_case
+from testing.framework.types import TestSuite, TestSuiteExecOpts
+
+ROWS = ['int[a];list(int)[b];list(int)[ignore_order=False]', '1;[2, 3];[1, 2, 3]', '0;[];[0]']
+
+
+class TestCaseParsingTests(unittest.TestCase):
+    def test_args_and_expected(self):
+        args, expected = parse_test_case('1;[2, 3];"a\\;b";[5]')
+        self.assertEqual('[1,[2, 3],"a\\;b"]', args)
+        self.assertEqual([5], expected)
+
+
+class MediaArgsTests(unittest.TestCase):
+    def setUp(self):
+        self.media_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.media_dir.name, 'big.json'), 'w') as f:
+            f.write('[1,\n 2,\r\n 3]\n')
+
+    def tearDown(self):
+        self.media_dir.cleanup()
+
+    def test_media_args_are_streamed(self):
+        args, expected = parse_test_case('1; @media:big.json;"x";6', self.media_dir.name)
+        self.assertIsInstance(args, StreamedArgs)
+        self.assertEqual('[1,@media:big.json,"x"]', str(args))
+        self.assertEqual(6, expected)
+        out = io.StringIO()
+        args.write_to(out, chunk_size=2)
+        self.assertEqual('[1,[1,  2,  3] ,"x"]', out.getvalue())
+
+    def test_media_arg_only(self):
+        args, _ = parse_test_case('@media:big.json;6', self.media_dir.name)
+        out = io.StringIO()
+        args.write_to(out)
+        self.assertEqual('[[1,  2,  3] ]', out.getvalue())
+
+    def test_invalid_media_refs(self):
+        for row in ['@media:missing.json;1', '@media:../big.json;1', '1;@media:big.json']:
+            with self.assertRaises(Exception):
+                parse_test_case(row, self.media_dir.name)
+        with self.assertRaises(Exception):
+            parse_test_case('@media:big.json;1')
+
+
+class TestCorpusTests(unittest.TestCase):
+    def test_compiled_rows(self):
+        corpus = TestCorpus.of('fn', 'description', ROWS)
+        self.assertEqual('fn', corpus.ts.fn_name)
+        self.assertEqual('list', corpus.tree.nodes[-1].node_type)
+        self.assertFalse(corpus.opts.ignore_order)
+        self.assertEqual([('[1,[2, 3]]', [1, 2, 3]), ('[0,[]]', [0])], corpus.cases)
+
+
+class CorpusCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.compiled = 0
+
+    def compile(self):
+        self.compiled += 1
+        return TestCorpus.of('fn', '', ROWS)
+
+    def test_corpus_is_compiled_once_per_modification(self):
+        cache = CorpusCache()
+        corpus = cache.get(1, 100, self.compile)
+        self.assertIs(corpus, cache.get(1, 100, self.compile))
+        self.assertEqual(1, self.compiled)
+        self.assertIsNot(corpus, cache.get(1, 101, self.compile))
+        self.assertEqual(2, self.compiled)
+
+    def test_least_recently_used_corpus_is_evicted(self):
+        cache = CorpusCache(max_entries=2)
+        cache.get(1, 100, self.compile)
+        cache.get(2, 100, self.compile)
+        cache.get(1, 100, self.compile)
+        cache.get(3, 100, self.compile)
+        self.assertEqual([1, 3], list(cache.entries.keys()))
+        cache.get(1, 100, self.compile)
+        self.assertEqual(3, self.compiled)
+
+    def test_persisted_corpus(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CorpusCache(directory=directory)
+            cache.get(1, 100, self.compile)
+            self.assertTrue(os.path.exists(cache.get_path(1)))
+            cache.clear()
+            corpus = cache.get(1, 100, self.compile)
+            self.assertEqual(1, self.compiled)
+            self.assertEqual('list', corpus.tree.nodes[-1].node_type)
+            cache.clear()
+            cache.get(1, 101, self.compile)
+            self.assertEqual(2, self.compiled)
+
+    def test_corpus_is_persisted_as_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CorpusCache(directory=directory)
+            cache.get(1, 100, self.compile)
+            with open(cache.get_path(1)) as f:
+                record = json.load(f)
+            self.assertEqual(CORPUS_FORMAT, record['format'])
+            self.assertEqual(ROWS[0], record['signature'])
+            self.assertEqual([['[1,[2, 3]]', [1, 2, 3]], ['[0,[]]', [0]]], record['cases'])
+
+    def test_persisted_media_args(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'big.json'), 'w') as f:
+                f.write('[1, 2]')
+            cache = CorpusCache(directory=os.path.join(directory, 'corpus'))
+            cache.get(1, 100, lambda: TestCorpus.of('fn', '', ['list(int)[a];int', '@media:big.json;3'], directory))
+            cache.clear()
+            args, expected = cache.get(1, 100, self.compile).cases[0]
+            out = io.StringIO()
+            args.write_to(out)
+            self.assertEqual('[[1, 2]]', out.getvalue())
+            self.assertEqual(3, expected)
+            # the referenced file has been removed since the corpus was persisted
+            os.remove(os.path.join(directory, 'big.json'))
+            cache.clear()
+            cache.get(1, 100, self.compile)
+            self.assertEqual(1, self.compiled)
+
+    def test_invalid_or_outdated_files_are_removed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CorpusCache(directory=directory)
+            for content in ['garbage', json.dumps({'format': 'other'}), '']:
+                with open(cache.get_path(1), 'w') as f:
+                    f.write(content)
+                self.assertIsNone(cache.load(1, 100))
+                self.assertFalse(os.path.exists(cache.get_path(1)))
+            cache.get(1, 100, self.compile)
+            self.assertIsNone(cache.load(1, 101))
+            self.assertFalse(os.path.exists(cache.get_path(1)))
+
+    def test_corpus_without_signature_is_not_persisted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CorpusCache(directory=directory)
+            cache.get(1, 100, lambda: TestCorpus(TestSuite(), SyntaxTree.of(['int']), TestSuiteExecOpts(''), []))
+            self.assertEqual([], os.listdir(directory))
+
+    def test_least_recently_used_files_are_removed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CorpusCache(directory=directory, max_files=2)
+            cache.get(1, 100, self.compile)
+            cache.get(2, 100, self.compile)
+            past = time.time() - 10
+            os.utime(cache.get_path(2), (past, past))
+            os.utime(cache.get_path(1), (past - 10, past - 10))
+            cache.clear()
+            cache.get(1, 100, self.compile)
+            cache.get(3, 100, self.compile)
+            self.assertEqual(['1.corpus', '3.corpus'], sorted(os.listdir(directory)))
+
+
+if __name__ == '__main__':
+    unittest.main()
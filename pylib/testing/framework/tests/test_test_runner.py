@@ -1,41 +1,231 @@
+import io
+import json
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from testing.framework.test_runner import parse_response
-from testing.framework.types import TestResponse
+from testing.framework.test_runner import parse_response, CaseWriter, ResponseParser, ShardLogger, \
+    ShardResults, get_result_checker, get_test_suite_env, is_profiling_enabled
+from testing.framework.syntax.syntax_tree import SyntaxTree
+from testing.framework.test_corpus import MediaFile, StreamedArgs, TestCorpus
+from testing.framework.types import BENCHMARK_REPS_ENV_VAR, BENCHMARK_WARMUP_ENV_VAR, PROFILE_ENV_VAR, \
+    TestResponse, TestSuite, TestSuiteExecOpts
+from testing.framework.watchdog import TIME_LIMIT_EXCEEDED
+
+
+def frame(payload: str) -> bytes:
+    data = payload.encode()
+    return b'\x1e__ankicode_result__' + str(len(data)).encode() + b'\n' + data + b'\n'
 
 
 class TestRunnerTests(unittest.TestCase):
-    def test_line_parser_only_json(self):
-        line = '{"duration": 1, "result": 1}'
-        tst_resp, msg = parse_response(line)
+    def test_parse_response(self):
+        tst_resp = parse_response(b'{"duration": 1, "result": 1}')
         self.assertEqual(TestResponse(result=1, duration=1), tst_resp)
-        self.assertEqual('', msg)
 
-    def test_line_parser_only_text(self):
-        line = '"duration": 1, "result": 1'
-        tst_resp, msg = parse_response(line)
-        self.assertEqual('"duration": 1, "result": 1', msg)
-        self.assertIsNone(tst_resp)
+    def test_parse_response_index(self):
+        tst_resp = parse_response(b'{"index": 3, "duration": 1, "result": [1]}')
+        self.assertEqual(TestResponse(result=[1], duration=1, index=3), tst_resp)
 
-    def test_line_parser_mixed_text_and_json(self):
-        line = 'ok{"duration": 1, "result": 1}'
-        tst_resp, msg = parse_response(line)
-        self.assertEqual(TestResponse(result=1, duration=1), tst_resp)
-        self.assertEqual('ok', msg)
+    def test_parse_response_nested_objects(self):
+        tst_resp = parse_response(b'{"index": 0, "duration": 1, "result": {"a": {"duration": 2}}}')
+        self.assertEqual({'a': {'duration': 2}}, tst_resp.result)
 
-    def test_line_parser_mixed_text_and_json_obscured(self):
-        line = 'ok{{{"duration": 1, "result": 1}'
-        tst_resp, msg = parse_response(line)
-        self.assertEqual(TestResponse(result=1, duration=1), tst_resp)
-        self.assertEqual('ok{{', msg)
+    def test_parse_response_ns_durations(self):
+        tst_resp = parse_response(b'{"index": 0, "result": 1, "duration_ns": 1500, "cpu_ns": 2000}')
+        self.assertEqual(0.0015, tst_resp.duration)
+        self.assertEqual(1500, tst_resp.duration_ns)
+        self.assertEqual(0.002, tst_resp.cpu_duration)
 
-    def test_line_parser_mixed_text_and_json_obscured_2(self):
-        line = 'ok{{}}{"duration": 1, "result": 1}'
-        tst_resp, msg = parse_response(line)
-        self.assertEqual(TestResponse(result=1, duration=1), tst_resp)
-        self.assertEqual('ok{{}}', msg)
+    def test_parse_response_profile(self):
+        tst_resp = parse_response(b'{"index": 0, "result": 1, "duration_ns": 1500, '
+                                  b'"profile": {"parse_ns": 100, "serialize_ns": 200, "peak_rss_kb": null}}')
+        self.assertEqual({'parse_ns': 100, 'serialize_ns': 200, 'peak_rss_kb': None}, tst_resp.profile)
+        self.assertIsNone(parse_response(b'{"index": 0, "result": 1}').profile)
+
+    def test_parse_response_bench(self):
+        tst_resp = parse_response(b'{"index": 0, "result": 1, "duration_ns": 1500, "bench_ns": [1000, 1100]}')
+        self.assertEqual([1000, 1100], tst_resp.bench_ns)
+        self.assertIsNone(parse_response(b'{"index": 0, "result": 1}').bench_ns)
+
+
+class ResponseParserTests(unittest.TestCase):
+    def test_only_text(self):
+        parser = ResponseParser()
+        self.assertEqual([(['{"duration": 1, "result": 1}'], None)], parser.feed(b'{"duration": 1, "result": 1}\n'))
+        self.assertFalse(parser.responses)
+
+    def test_text_followed_by_response(self):
+        parser = ResponseParser()
+        groups = parser.feed(b'ok{{' + frame('{"index": 0, "result": 1, "duration": 1}'))
+        self.assertEqual([(['ok{{'], TestResponse(result=1, duration=1, index=0))], groups)
+
+    def test_response_split_between_chunks(self):
+        parser = ResponseParser()
+        data = b'a\n' + frame('{"index": 0, "result": "\u00e9", "duration": 1}') + b'b\r\n'
+        groups = []
+        for i in range(len(data)):
+            groups += parser.feed(data[i:i + 1])
+        groups += parser.feed(b'')
+        self.assertEqual([(['a'], None), ([], TestResponse(result='\u00e9', duration=1, index=0)), (['b'], None)],
+                         groups)
+
+    def test_response_with_windows_new_lines(self):
+        parser = ResponseParser()
+        payload = '{"index": 0, "result": 1, "duration": 1}'
+        data = b'\x1e__ankicode_result__' + str(len(payload)).encode() + b'\r\n' + payload.encode() + b'\r\nc\r\n'
+        groups = parser.feed(data)
+        self.assertEqual(2, len(groups))
+        self.assertEqual((['c'], None), groups[1])
+
+    def test_job_done_marker_is_not_logged(self):
+        parser = ResponseParser()
+        groups = parser.feed(b'hi\n' + frame('{"index": 0, "result": 1, "duration": 1}') + b'__ankicode_job_done__\n')
+        self.assertEqual([(['hi'], TestResponse(result=1, duration=1, index=0))], groups)
+        self.assertTrue(parser.job_done)
+
+    def test_user_output_is_truncated(self):
+        parser = ResponseParser(output_limit=10)
+        groups = parser.feed(b'12345\n67890abcdef\n')
+        groups += parser.feed(b'more\n' + frame('{"index": 0, "result": 1, "duration": 1}'))
+        self.assertEqual([(['12345', '6789', '... output is truncated'], None),
+                          ([], TestResponse(result=1, duration=1, index=0))], groups)
+
+    def test_output_is_grouped_by_responses(self):
+        parser = ResponseParser()
+        data = b''.join(f'hello {i}\n'.encode() + frame(f'{{"index": {i}, "result": {i}, "duration": 1}}')
+                        for i in range(3)) + b'hello 3\n'
+        # the running test case's output is logged right away
+        self.assertEqual(['hello 0'], parser.queue(parser.feed(b'hello 0\n')))
+        self.assertEqual([], parser.queue(parser.feed(data[len(b'hello 0\n'):])))
+        self.assertEqual([([], 0), (['hello 1'], 1), (['hello 2'], 2)],
+                         [(messages, response.result) for messages, response in parser.responses])
+        # the output following the queued responses belongs to the next test case
+        self.assertEqual([], parser.take_output())
+        parser.responses.clear()
+        self.assertEqual(['hello 3'], parser.take_output())
+        self.assertEqual([], parser.take_output())
+
+
+class CaseWriterTests(unittest.TestCase):
+    def test_all_lines_are_written_when_window_is_unlimited(self):
+        stdin = io.StringIO()
+        writer = CaseWriter(stdin, ['[1]', '[2]', '[3]'], 0)
+        writer.start()
+        writer.join(5)
+        self.assertEqual('[1]\n[2]\n[3]\n', stdin.getvalue())
+
+    def test_window_limits_cases_in_flight(self):
+        stdin = io.StringIO()
+        writer = CaseWriter(stdin, ['[1]', '[2]', '[3]'], 2)
+        writer.start()
+        writer.join(0.2)
+        self.assertEqual('[1]\n[2]\n', stdin.getvalue())
+        writer.consumed()
+        writer.join(5)
+        self.assertEqual('[1]\n[2]\n[3]\n', stdin.getvalue())
+
+    def test_close_stops_writing(self):
+        stdin = io.StringIO()
+        writer = CaseWriter(stdin, ['[1]', '[2]'], 1)
+        writer.start()
+        writer.close()
+        writer.join(5)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual('[1]\n', stdin.getvalue())
+
+    def test_streamed_args(self):
+        with tempfile.TemporaryDirectory() as media_dir:
+            with open(os.path.join(media_dir, 'big.json'), 'w') as f:
+                f.write('[' + ','.join(['7'] * 100000) + ']')
+            stdin = io.StringIO()
+            writer = CaseWriter(stdin, ['[1]', StreamedArgs(['[', MediaFile('big.json', f.name), ']']), '[3]'], 0)
+            writer.start()
+            writer.join(5)
+            lines = stdin.getvalue().split('\n')
+            self.assertEqual(['[1]', '[3]', ''], [lines[0]] + lines[2:])
+            self.assertEqual([[7] * 100000], json.loads(lines[1]))
+
+    def test_unreadable_media_file_closes_stdin(self):
+        stdin = io.StringIO()
+        writer = CaseWriter(stdin, [StreamedArgs(['[', MediaFile('big.json', '/nonexistent/big.json'), ']'])], 0)
+        writer.start()
+        writer.join(5)
+        self.assertTrue(stdin.closed)
+
+
+class ShardResultsTests(unittest.TestCase):
+    def test_first_failure_is_the_lowest_failed_index(self):
+        results = ShardResults(10)
+        results.put(5, None, False, TIME_LIMIT_EXCEEDED)
+        results.put(3, TestResponse(1, 1), False)
+        results.put(1, TestResponse(1, 1), True)
+        self.assertEqual(3, results.first_failure)
+        self.assertEqual((None, False, TIME_LIMIT_EXCEEDED), results.wait(5))
+
+    def test_messages_are_replayed_per_index(self):
+        results = ShardResults(2)
+        logger = ShardLogger(results)
+        logger.index = 1
+        logger.log('user output')
+        logger.error('error')
+        replayed = []
+
+        class Recorder:
+            def log(self, msg):
+                replayed.append(('log', msg))
+
+            def error(self, msg):
+                replayed.append(('error', msg))
+
+        results.replay(0, Recorder(), Recorder())
+        self.assertEqual([], replayed)
+        results.replay(1, Recorder(), Recorder())
+        self.assertEqual([('log', 'user output'), ('error', 'error')], replayed)
+
+
+class TestSuiteExecOptsTests(unittest.TestCase):
+    def test_parallel_option(self):
+        self.assertEqual(1, TestSuiteExecOpts('').parallel)
+        self.assertEqual(4, TestSuiteExecOpts('ignore_order=False,parallel=4').parallel)
+
+    def test_limit_options(self):
+        opts = TestSuiteExecOpts('time_limit_ms=100, suite_time_limit_ms=2000, memory_limit_mb=64')
+        self.assertEqual(100, opts.time_limit_ms)
+        self.assertEqual(2000, opts.suite_time_limit_ms)
+        self.assertEqual(64, opts.memory_limit_mb)
+        self.assertIsNone(TestSuiteExecOpts('').time_limit_ms)
+
+    def test_profile_option(self):
+        with mock.patch.dict(os.environ, {PROFILE_ENV_VAR: ''}):
+            self.assertFalse(is_profiling_enabled(TestSuiteExecOpts('')))
+            self.assertTrue(is_profiling_enabled(TestSuiteExecOpts('profile=True')))
+            self.assertEqual('0', get_test_suite_env(False)[PROFILE_ENV_VAR])
+        with mock.patch.dict(os.environ, {PROFILE_ENV_VAR: '1'}):
+            self.assertTrue(is_profiling_enabled(TestSuiteExecOpts('')))
+            self.assertEqual('1', get_test_suite_env(True)[PROFILE_ENV_VAR])
+
+    def test_benchmark_option(self):
+        opts = TestSuiteExecOpts('benchmark=10, benchmark_warmup=2')
+        self.assertEqual(10, opts.benchmark)
+        self.assertEqual(2, opts.benchmark_warmup)
+        self.assertEqual(13, opts.get_calls_per_case())
+        env = get_test_suite_env(False, opts)
+        self.assertEqual('10', env[BENCHMARK_REPS_ENV_VAR])
+        self.assertEqual('2', env[BENCHMARK_WARMUP_ENV_VAR])
+        default = TestSuiteExecOpts('')
+        self.assertEqual(0, default.benchmark)
+        self.assertEqual(1, default.get_calls_per_case())
+        self.assertEqual('0', get_test_suite_env(False)[BENCHMARK_REPS_ENV_VAR])
+
+    def test_expected_complexity_option(self):
+        self.assertEqual('n log n', TestSuiteExecOpts('parallel=2, expected_complexity=n log n').expected_complexity)
+        self.assertIsNone(TestSuiteExecOpts('').expected_complexity)
 
-    def test_line_parser_mixed_text_and_json_obscured_2(self):
-        line = '{"duration": 0}'
-        tst_resp, msg = parse_response(line)
-        self.assertEqual(TestResponse(result=None, duration=0), tst_resp)
+    def test_result_checker(self):
+        corpus = TestCorpus(TestSuite(), SyntaxTree.of(['int[a]', 'int']), TestSuiteExecOpts(''), [])
+        opts = TestSuiteExecOpts('')
+        self.assertFalse(get_result_checker(corpus, opts)(1, 2))
+        opts.check_results = False
+        self.assertTrue(get_result_checker(corpus, opts)(1, 2))
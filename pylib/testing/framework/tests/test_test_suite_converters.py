@@ -1,6 +1,7 @@
 import unittest
 
 from testing.framework.java.java_input_converter import JavaInputConverter
+from testing.framework.java.java_output_converter import JavaOutputConverter
 from testing.framework.test_suite_gen import TestSuiteConverters
 from testing.framework.types import ConverterFn
 from testing.framework.syntax.syntax_tree import SyntaxTree
@@ -14,5 +15,27 @@ class TestSuiteConvertersTests(unittest.TestCase):
     def test_simple(self):
         tree = SyntaxTree.of(['array(array(int))[a]'])
         converters = TestSuiteConverters(JavaInputConverter(), JavaInputConverter(), tree)
-        self.assertEqual(6, len(converters.all))
-        self.assertEqual('converter3', converters.result.fn_name)
+        self.assertEqual(3, len(converters.all))
+        self.assertIs(converters.all[2], converters.result)
+        self.assertIs(converters.result, converters.output)
+        self.assertIn(converters.all[1].fn_name + '(node)', converters.result.src)
+
+    def test_identical_types_share_converter(self):
+        tree = SyntaxTree.of(['list(int)[a]', 'list(int)[b]', 'list(long)'])
+        converters = TestSuiteConverters(JavaInputConverter(), JavaOutputConverter(), tree)
+        self.assertIs(converters.args[0], converters.args[1])
+        self.assertIsNot(converters.args[0], converters.result)
+        self.assertEqual(len(converters.all), len({c.fn_name for c in converters.all}))
+        self.assertEqual(8, len(converters.all))
+
+    def test_names_are_stable(self):
+        tree = SyntaxTree.of(['map(string, list(int))[a]', 'int'])
+        first = TestSuiteConverters(JavaInputConverter(), JavaOutputConverter(), tree)
+        second = TestSuiteConverters(JavaInputConverter(), JavaOutputConverter(), tree)
+        self.assertEqual([c.fn_name for c in first.all], [c.fn_name for c in second.all])
+        self.assertEqual([c.src for c in first.all], [c.src for c in second.all])
+        self.assertTrue(all(c.fn_name.startswith('converter_') for c in first.all))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import subprocess
+import sys
+import time
+import unittest
+
+from testing.framework.types import TestResponse, TestSuiteExecOpts
+from testing.framework.watchdog import MEMORY_LIMIT_EXCEEDED, SUITE_TIME_LIMIT_EXCEEDED, TIME_LIMIT_EXCEEDED, \
+    Watchdog, check_duration, get_rlimits_setter, get_suite_deadline
+
+
+def start_python(src, opts=None, memory_overhead_mb=None):
+    preexec_fn = get_rlimits_setter(opts, memory_overhead_mb) if opts is not None else None
+    return subprocess.Popen([sys.executable, '-c', src], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                            preexec_fn=preexec_fn)
+
+
+class WatchdogTests(unittest.TestCase):
+    def test_no_watchdog_without_limits(self):
+        self.assertIsNone(Watchdog.start_for(0, TestSuiteExecOpts(''), None))
+
+    def test_duration_check(self):
+        opts = TestSuiteExecOpts('time_limit_ms=100')
+        self.assertIsNone(check_duration(TestResponse(99.5), opts))
+        self.assertEqual(TIME_LIMIT_EXCEEDED, check_duration(TestResponse(100.5), opts))
+        self.assertIsNone(check_duration(TestResponse(100.5), TestSuiteExecOpts('')))
+
+    def test_benchmarked_limits(self):
+        opts = TestSuiteExecOpts('time_limit_ms=100, suite_time_limit_ms=1000, benchmark=4, benchmark_warmup=5')
+        # the solution's call is limited, but not the repetitions
+        self.assertEqual(TIME_LIMIT_EXCEEDED, check_duration(TestResponse(100.5), opts))
+        watchdog = Watchdog(0, opts, None)
+        self.assertAlmostEqual(1.0, watchdog.case_limit_sec)
+        self.assertGreater(get_suite_deadline(opts), time.monotonic() + 9)
+
+    def test_hanging_test_case_is_killed(self):
+        proc = start_python('while True: pass')
+        watchdog = Watchdog.start_for(proc.pid, TestSuiteExecOpts('time_limit_ms=10'), None)
+        watchdog.start_case()
+        proc.wait(10)
+        self.assertEqual(TIME_LIMIT_EXCEEDED, watchdog.violation)
+
+    def test_suite_deadline(self):
+        opts = TestSuiteExecOpts('suite_time_limit_ms=100')
+        proc = start_python('import time; time.sleep(10)')
+        started = time.monotonic()
+        watchdog = Watchdog.start_for(proc.pid, opts, get_suite_deadline(opts))
+        proc.wait(10)
+        self.assertEqual(SUITE_TIME_LIMIT_EXCEEDED, watchdog.violation)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_resident_memory_limit(self):
+        proc = start_python('import time; data = bytearray(256 * 1024 * 1024); time.sleep(10)')
+        watchdog = Watchdog.start_for(proc.pid, TestSuiteExecOpts('memory_limit_mb=128'), None)
+        proc.wait(10)
+        self.assertEqual(MEMORY_LIMIT_EXCEEDED, watchdog.violation)
+
+    @unittest.skipIf(sys.platform.startswith('win32'), 'resource limits are not supported')
+    def test_address_space_limit(self):
+        opts = TestSuiteExecOpts('memory_limit_mb=64')
+        proc = start_python('data = bytearray(1024 * 1024 * 1024)', opts, 64)
+        watchdog = Watchdog(proc.pid, opts, None)
+        _, err = proc.communicate(timeout=10)
+        self.assertTrue(watchdog.check_error(err))
+        self.assertEqual(MEMORY_LIMIT_EXCEEDED, watchdog.violation)
+
+    def test_errors_are_not_violations(self):
+        watchdog = Watchdog(0, TestSuiteExecOpts('memory_limit_mb=64'), None)
+        self.assertFalse(watchdog.check_error('ValueError: boom'))
+        self.assertIsNone(watchdog.violation)
+
+
+if __name__ == '__main__':
+    unittest.main()
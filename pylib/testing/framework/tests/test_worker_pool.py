@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from testing.framework.python.python_worker import WORKER_FILE_NAME, WORKER_SRC
+from testing.framework.test_runner import create_src_file
+from testing.framework.worker_pool import WorkerPool
+from testing.framework.workspace import workspace_pool
+
+SUITE_SRC = 'import sys\n' \
+            'while True:\n' \
+            '    line = sys.stdin.readline().strip()\n' \
+            '    if not line:\n' \
+            '        break\n' \
+            '    print(int(line) * 2)\n'
+
+
+class FakeRunner:
+    def __init__(self, worker_src=(WORKER_FILE_NAME, WORKER_SRC)):
+        self.worker_src = worker_src
+        self.started = 0
+
+    def get_worker_src(self):
+        return self.worker_src
+
+    def start_worker(self, worker_dir):
+        self.started += 1
+        return subprocess.Popen([sys.executable, '-u', os.path.join(worker_dir, WORKER_FILE_NAME)],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def run_job(worker, src, cases):
+    workspace = workspace_pool.acquire('test.py')
+    src_file = create_src_file(src, 'test.py', workspace)
+    worker.submit(src_file)
+    worker.proc.stdin.write(''.join(case + '\n' for case in cases) + '\n')
+    worker.proc.stdin.flush()
+    output = b''
+    while not output.endswith(b'__ankicode_job_done__\n'):
+        data = os.read(worker.proc.stdout.fileno(), 1024)
+        if not data:
+            break
+        output += data
+    workspace_pool.release(workspace)
+    return output.decode().split('\n')[:-1]
+
+
+class WorkerPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(FakeRunner(), max_jobs=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def acquire(self):
+        self.pool.warm_up()
+        for _ in range(500):
+            worker = self.pool.acquire()
+            if worker is not None:
+                return worker
+            time.sleep(0.01)
+        self.fail('worker has not started')
+
+    def test_disabled_without_worker_src(self):
+        pool = WorkerPool(FakeRunner(None))
+        self.assertFalse(pool.enabled)
+        pool.warm_up()
+        self.assertIsNone(pool.acquire())
+
+    def test_repeated_warm_up_starts_one_worker(self):
+        for _ in range(10):
+            self.pool.warm_up()
+        for _ in range(500):
+            if self.pool.idle:
+                break
+            time.sleep(0.01)
+        self.pool.warm_up()
+        self.assertEqual(1, self.pool.runner.started)
+
+    def test_jobs_are_executed_by_the_same_worker(self):
+        worker = self.acquire()
+        self.assertEqual(['2', '4', '__ankicode_job_done__'], run_job(worker, SUITE_SRC, ['1', '2']))
+        self.pool.release(worker, True)
+        self.assertIs(worker, self.acquire())
+        self.assertEqual(['6', '__ankicode_job_done__'], run_job(worker, SUITE_SRC, ['3']))
+        self.assertTrue(worker.is_alive())
+
+    def test_worker_is_recycled_after_max_jobs(self):
+        worker = self.acquire()
+        run_job(worker, SUITE_SRC, ['1'])
+        run_job(worker, SUITE_SRC, ['1'])
+        self.pool.release(worker, True)
+        self.assertFalse(worker.is_alive())
+        self.assertIsNot(worker, self.acquire())
+
+    def test_worker_exits_on_failure(self):
+        worker = self.acquire()
+        self.assertEqual([], run_job(worker, 'raise ValueError("boom")', []))
+        self.assertEqual(1, worker.proc.wait(5))
+        error = worker.proc.stderr.read()
+        self.assertIn('ValueError: boom', error)
+        self.assertNotIn(WORKER_FILE_NAME, error)
+        self.pool.release(worker, False)
+        self.assertIsNot(worker, self.acquire())
+
+    def test_each_job_gets_fresh_globals(self):
+        worker = self.acquire()
+        run_job(worker, 'x = 1\n', [])
+        self.assertEqual(['False', '__ankicode_job_done__'],
+                         run_job(worker, 'print("x" in globals())\n', []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from testing.framework.compile_cache import CompileCache
+from testing.framework.test_runner import TestRunner, create_src_file
+from testing.framework.types import Command
+from testing.framework.workspace import WorkspacePool
+
+
+class FakeLogger:
+    def __init__(self):
+        self.errors = []
+
+    def info(self, msg):
+        pass
+
+    def error(self, msg):
+        self.errors.append(msg)
+
+
+class CompilingRunner(TestRunner):
+    """
+    "Compiles" main.src into main.out and counts compilations in a log file
+    """
+
+    def __init__(self, log_file, cache_dir):
+        super().__init__()
+        self.log_file = log_file
+        self.compile_cache = CompileCache(cache_dir)
+
+    def get_src_file_name(self):
+        return 'main.src'
+
+    def get_compile_cmd(self, src_file, resource_path, is_win):
+        script = f'import shutil; shutil.copy("main.src", "main.out"); open({self.log_file!r}, "a").write("x")'
+        return Command([sys.executable, '-c', script], cwd=src_file.directory.name)
+
+    def get_toolchain_version_cmd(self, resource_path, is_win):
+        return Command([sys.executable, '--version'])
+
+    def get_run_cmd(self, src_file, resource_path, is_win):
+        return Command([])
+
+    def get_error_message(self, error, file_name, code_offset):
+        return error
+
+
+class WorkspaceTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.pool = WorkspacePool(max_idle=1)
+
+    def tearDown(self):
+        self.pool.shutdown()
+        self.root.cleanup()
+
+    def test_source_is_swapped(self):
+        workspace = self.pool.acquire('python', self.root.name)
+        first = create_src_file('print(1)', 'test.py', workspace)
+        second = create_src_file('print(2)', 'test.py', workspace)
+        self.assertEqual(first.path, second.path)
+        with open(second.path) as f:
+            self.assertEqual('print(2)', f.read())
+        self.assertEqual(['test.py'], os.listdir(workspace.name))
+
+    def test_workspace_is_reused_and_cleaned(self):
+        workspace = self.pool.acquire('cpp', self.root.name)
+        create_src_file('int main() {}', 'main.cpp', workspace)
+        output = workspace.write_file('main.cpp.run', 'binary')
+        os.mkdir(os.path.join(workspace.name, 'tmp'))
+        workspace.set_outputs('key', [output])
+        self.pool.release(workspace)
+        self.assertEqual(['main.cpp.run'], os.listdir(workspace.name))
+        self.assertIs(workspace, self.pool.acquire('cpp', self.root.name))
+        self.assertTrue(workspace.has_outputs('key'))
+        self.assertFalse(workspace.has_outputs('other'))
+        workspace.discard_outputs()
+        self.assertEqual([], os.listdir(workspace.name))
+
+    def test_languages_are_not_mixed(self):
+        workspace = self.pool.acquire('cpp', self.root.name)
+        self.pool.release(workspace)
+        self.assertIsNot(workspace, self.pool.acquire('java', self.root.name))
+
+    def test_idle_limit(self):
+        first = self.pool.acquire('js', self.root.name)
+        second = self.pool.acquire('js', self.root.name)
+        self.pool.release(first)
+        self.pool.release(second)
+        self.assertTrue(os.path.exists(first.name))
+        self.assertFalse(os.path.exists(second.name))
+
+    def test_workspace_is_removed(self):
+        workspace = self.pool.acquire('js', self.root.name)
+        self.pool.release(workspace, False)
+        self.assertFalse(os.path.exists(workspace.name))
+        workspace = self.pool.acquire('js', self.root.name)
+        self.pool.release(workspace)
+        self.pool.shutdown()
+        self.assertFalse(os.path.exists(workspace.name))
+        self.assertEqual([], os.listdir(self.root.name))
+
+    def test_rerun_neither_compiles_nor_restores(self):
+        log_file = os.path.join(self.root.name, 'compilations.log')
+        runner = CompilingRunner(log_file, os.path.join(self.root.name, 'cache'))
+        workspace = self.pool.acquire('fake', self.root.name)
+        logger = FakeLogger()
+        for src in ['a', 'a', 'b', 'a']:
+            src_file = create_src_file(src, 'main.src', workspace)
+            self.assertTrue(runner.compile(src_file, '', logger))
+            with open(os.path.join(workspace.name, 'main.out')) as f:
+                self.assertEqual(src, f.read())
+            self.pool.release(workspace)
+            workspace = self.pool.acquire('fake', self.root.name)
+        self.assertEqual([], logger.errors)
+        # 'a' is compiled once, the last 'a' is restored from the compile cache
+        with open(log_file) as f:
+            self.assertEqual('xx', f.read())
+        self.assertEqual(['main.out'], os.listdir(workspace.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,9 +4,19 @@
 AnkiCode Types
 """
 
+import os
 import re
-import tempfile
-from typing import TextIO, Any, Optional
+import shlex
+from typing import Any, Dict, List, Optional
+
+from testing.framework.workspace import Workspace
+
+NS_PER_MS = 1000000
+# enables test suites' profiling: per-phase timings and peak RSS are reported along with every test response
+PROFILE_ENV_VAR = 'ANKICODE_PROFILE'
+# enable test suites' benchmarking: every test case is repeated after warm-up and the repetitions' timings are reported
+BENCHMARK_REPS_ENV_VAR = 'ANKICODE_BENCHMARK_REPS'
+BENCHMARK_WARMUP_ENV_VAR = 'ANKICODE_BENCHMARK_WARMUP'
 
 
 class Arg:
@@ -29,7 +39,7 @@ class Arg:
 class ConverterFn:
     """
     Represents a language specific type-conversion function:
-       - name (auto-generated, using self-incrementing counter)
+       - name (auto-generated, using self-incrementing counter, TestSuiteConverters renames it by its signature)
        - source code
        - argument's type (it accepts always 1 argument)
        - argument's name
@@ -76,11 +86,38 @@ class TestSuiteExecOpts:
     Defines additional options which must be applied during tests execution
         - ignore_order - if order of results must be ignored ([1,2,3] and [2,3,1] will be equal if ignore_order
                          is set to True)
-        TODO: add execution time constraints
+        - pipeline - how many test cases can be submitted to a solution's process ahead of their responses
+                     (0 - submit all test cases at once, 1 - wait for every response before submitting the next case)
+        - parallel - how many processes the test cases can be sharded across (limited by the global CPU budget)
+        - time_limit_ms - max duration of a test case
+        - suite_time_limit_ms - max duration of the whole test suite
+        - memory_limit_mb - max memory used by a test suite's process
+        - profile - if a test suite must report its phases' timings and peak RSS (it's also enabled for all test
+                    suites by the ANKICODE_PROFILE environment variable)
+        - benchmark - how many times every test case is repeated to measure its timing (0 - disabled)
+        - benchmark_warmup - how many times every test case is repeated before its timing is measured
+                             (lets JIT compilers, e.g. JVM or V8, optimize the solution)
+        - expected_complexity - the solution's expected time complexity, e.g. "n log n" (see complexity module),
+                                tests fail, if the complexity probe estimates a higher one
+        - check_results - if results are compared with the expected values, it's not set by cards: inputs generated
+                          by the complexity probe have no expected values
     """
 
+    DEFAULT_PIPELINE_WINDOW = 32
+    DEFAULT_BENCHMARK_WARMUP = 5
+
     def __init__(self, opts: str):
         self.ignore_order = True
+        self.pipeline = self.DEFAULT_PIPELINE_WINDOW
+        self.parallel = 1
+        self.time_limit_ms: Optional[int] = None
+        self.suite_time_limit_ms: Optional[int] = None
+        self.memory_limit_mb: Optional[int] = None
+        self.profile = False
+        self.benchmark = 0
+        self.benchmark_warmup = self.DEFAULT_BENCHMARK_WARMUP
+        self.expected_complexity: Optional[str] = None
+        self.check_results = True
 
         if opts:
             opts_dict = {}
@@ -89,6 +126,31 @@ class TestSuiteExecOpts:
                 opts_dict[kv[0].strip()] = kv[1].strip()
             if 'ignore_order' in opts_dict:
                 self.ignore_order = opts_dict['ignore_order'] == 'True'
+            if 'pipeline' in opts_dict:
+                self.pipeline = int(opts_dict['pipeline'])
+            if 'parallel' in opts_dict:
+                self.parallel = max(1, int(opts_dict['parallel']))
+            if 'time_limit_ms' in opts_dict:
+                self.time_limit_ms = int(opts_dict['time_limit_ms'])
+            if 'suite_time_limit_ms' in opts_dict:
+                self.suite_time_limit_ms = int(opts_dict['suite_time_limit_ms'])
+            if 'memory_limit_mb' in opts_dict:
+                self.memory_limit_mb = int(opts_dict['memory_limit_mb'])
+            if 'profile' in opts_dict:
+                self.profile = opts_dict['profile'] == 'True'
+            if 'benchmark' in opts_dict:
+                self.benchmark = max(0, int(opts_dict['benchmark']))
+            if 'benchmark_warmup' in opts_dict:
+                self.benchmark_warmup = max(0, int(opts_dict['benchmark_warmup']))
+            if 'expected_complexity' in opts_dict:
+                self.expected_complexity = opts_dict['expected_complexity']
+
+    def get_calls_per_case(self) -> int:
+        """
+        :return: how many times the solution is called per test case, time limits of a test case's execution
+                 (but not of the solution's call) are scaled by it
+        """
+        return 1 + self.benchmark_warmup + self.benchmark if self.benchmark else 1
 
 
 class TestSuite:
@@ -101,28 +163,82 @@ class TestSuite:
     fn_name: str
 
 
+class Command:
+    """
+    Command starting a process, it's executed without a shell:
+        - args - program's path and its arguments
+        - env - environment variables, which are set on top of the process's environment
+        - cwd - working directory, None - the working directory is not changed
+    """
+
+    def __init__(self, args: List[str], env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None):
+        self.args = args
+        self.env = env or {}
+        self.cwd = cwd
+
+    def get_env(self, base: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        :param base: environment of the process, by default the current process's environment
+        :return: environment of the process with the command's variables
+        """
+        return dict(base if base is not None else os.environ, **self.env)
+
+    def __str__(self):
+        cmd = ' '.join([f'{name}={shlex.quote(value)}' for name, value in self.env.items()] +
+                       [shlex.quote(arg) for arg in self.args])
+        return f'cd {shlex.quote(self.cwd)} && {cmd}' if self.cwd is not None else cmd
+
+    def __eq__(self, other):
+        return isinstance(other, Command) and self.__dict__ == other.__dict__
+
+
 class SrcFile:
     """
-    Holds file path, its parent directory and the source code
+    Holds file path, its parent directory (workspace), the source code and the number of lines
+    which precede the solution in the source code
     """
 
-    def __init__(self, text: str, file: TextIO, directory: tempfile.TemporaryDirectory):
+    def __init__(self, text: str, path: str, directory: Workspace, code_offset: int = 0):
         self.text = text
-        self.file = file
+        self.path = path
         self.directory = directory
+        self.code_offset = code_offset
 
 
 class TestResponse:
     """
-    Defines format of test response
+    Defines format of test response:
+        - result - value returned by the solution (converted to JSON)
+        - duration - wall time of the solution's call in ms, it's derived from duration_ns if it's not reported
+        - index - test case's index
+        - duration_ns - wall time of the solution's call in ns
+        - cpu_ns - CPU time consumed by the solution's call in ns
+        - profile - reported if profiling is enabled: test suite's phases timings in ns (parse_ns, convert_in_ns,
+                    convert_out_ns, serialize_ns) and the process's peak RSS in KB (peak_rss_kb)
+        - bench_ns - reported if benchmarking is enabled: wall time in ns of every repeated solution's call
     """
 
-    def __init__(self, duration: int, result: Optional[Any] = None):
+    def __init__(self, duration: Optional[float] = None, result: Optional[Any] = None, index: Optional[int] = None,
+                 duration_ns: Optional[int] = None, cpu_ns: Optional[int] = None,
+                 profile: Optional[Dict[str, int]] = None, bench_ns: Optional[List[int]] = None):
         self.result = result
-        self.duration = duration
+        self.duration = duration if duration is not None or duration_ns is None else duration_ns / NS_PER_MS
+        self.index = index
+        self.duration_ns = duration_ns
+        self.cpu_ns = cpu_ns
+        self.profile = profile
+        self.bench_ns = bench_ns
+
+    @property
+    def cpu_duration(self) -> Optional[float]:
+        """
+        :return: CPU time in ms or None - if it's not reported
+        """
+        return self.cpu_ns / NS_PER_MS if self.cpu_ns is not None else None
 
     def __eq__(self, other):
         """Overrides the default implementation"""
         if isinstance(other, TestResponse):
-            return self.result == other.result and self.duration == other.duration
+            return self.result == other.result and self.duration == other.duration and self.index == other.index \
+                   and self.cpu_ns == other.cpu_ns
         return False
@@ -0,0 +1,242 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Watchdog API
+
+Enforces a test suite's time and memory limits (see TestSuiteExecOpts):
+    - a watchdog thread kills the test suite's process, when a test case or the whole suite runs out of time,
+      or when the process tree's resident memory exceeds the memory limit
+    - on Unix the process is additionally started with resource limits (CPU time, address space), so that
+      the limits hold even if the watchdog doesn't catch up (e.g. a huge allocation at once)
+"""
+
+import math
+import sys
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import psutil
+
+if not sys.platform.startswith('win32'):
+    import resource
+
+from testing.framework.types import TestResponse, TestSuiteExecOpts
+
+TIME_LIMIT_EXCEEDED = 'Time Limit Exceeded'
+SUITE_TIME_LIMIT_EXCEEDED = 'Suite Time Limit Exceeded'
+MEMORY_LIMIT_EXCEEDED = 'Memory Limit Exceeded'
+
+WATCHDOG_INTERVAL_SEC = 0.05
+# a test case's time is measured by the test suite itself, the watchdog only kills a process which hangs,
+# so it gives extra time for the process start-up and the pipes' latency
+CASE_DEADLINE_GRACE_SEC = 0.5
+MB = 1024 * 1024
+# messages printed by the runtimes, when an allocation has failed
+OUT_OF_MEMORY_ERRORS = ['MemoryError', 'std::bad_alloc', 'java.lang.OutOfMemoryError', 'heap out of memory']
+
+
+def kill_process_tree(pid: int):
+    """
+    Kills a process along with its children
+    :param pid: process id
+    """
+    try:
+        parent = psutil.Process(pid)
+        children = parent.children(recursive=True)
+        for child in children:
+            child.kill()
+        psutil.wait_procs(children, timeout=5)
+        parent.kill()
+    except:
+        pass
+
+
+def has_limits(opts: TestSuiteExecOpts) -> bool:
+    """
+    :param opts: options which control tests execution
+    :return: True - if any of the time or memory limits is set
+    """
+    return opts.time_limit_ms is not None or opts.suite_time_limit_ms is not None or opts.memory_limit_mb is not None
+
+
+def get_suite_deadline(opts: TestSuiteExecOpts) -> Optional[float]:
+    """
+    :param opts: options which control tests execution
+    :return: time (time.monotonic) by which the test suite must complete or None - if there is no suite time limit
+    """
+    if opts.suite_time_limit_ms is None:
+        return None
+    return time.monotonic() + opts.suite_time_limit_ms * opts.get_calls_per_case() / 1000
+
+
+def check_duration(response: TestResponse, opts: TestSuiteExecOpts) -> Optional[str]:
+    """
+    :param response: test case's response
+    :param opts: options which control tests execution
+    :return: TIME_LIMIT_EXCEEDED - if the test case's duration exceeds the time limit, None otherwise
+    """
+    if opts.time_limit_ms is not None and response.duration is not None and response.duration > opts.time_limit_ms:
+        return TIME_LIMIT_EXCEEDED
+    return None
+
+
+def is_out_of_memory_error(error: str) -> bool:
+    """
+    :param error: test suite's STDERR
+    :return: True - if the test suite has failed to allocate memory
+    """
+    return any(marker in error for marker in OUT_OF_MEMORY_ERRORS)
+
+
+def get_rlimits(opts: TestSuiteExecOpts, memory_overhead_mb: Optional[int]) -> List[Tuple[int, int]]:
+    """
+    :param opts: options which control tests execution
+    :param memory_overhead_mb: address space reserved by the language's runtime on top of the solution's data,
+                               None - if the address space cannot be limited
+    :return: resource limits of a test suite's process: tuples of resource and value (Unix only)
+    """
+    if sys.platform.startswith('win32'):
+        return []
+    limits: List[Tuple[int, int]] = []
+    if opts.suite_time_limit_ms is not None:
+        # CPU time is consumed by all threads (including JIT and GC), so the limit is only a backstop
+        limits.append((resource.RLIMIT_CPU,
+                       2 * math.ceil(opts.suite_time_limit_ms * opts.get_calls_per_case() / 1000) + 1))
+    if opts.memory_limit_mb is not None and memory_overhead_mb is not None:
+        limits.append((resource.RLIMIT_AS, (opts.memory_limit_mb + memory_overhead_mb) * MB))
+    return limits
+
+
+def get_rlimits_setter(opts: TestSuiteExecOpts, memory_overhead_mb: Optional[int]) -> Optional[Callable[[], None]]:
+    """
+    Builds a function, which applies the limits to a child process before it executes a test suite (Unix only),
+    the limits are built before the process is forked, so that the function only makes system calls
+    :param opts: options which control tests execution
+    :param memory_overhead_mb: address space reserved by the language's runtime on top of the solution's data,
+                               None - if the address space cannot be limited
+    :return: function to be passed as Popen's preexec_fn or None - if there is nothing to limit
+    """
+    limits = get_rlimits(opts, memory_overhead_mb)
+    if not limits:
+        return None
+
+    def set_rlimits():
+        for limit, value in limits:
+            resource.setrlimit(limit, (value, value))
+
+    return set_rlimits
+
+
+class Watchdog(threading.Thread):
+    """
+    Watches a process executing a test suite and kills it, when a limit is violated
+    """
+
+    def __init__(self, pid: int, opts: TestSuiteExecOpts, suite_deadline: Optional[float],
+                 kill: Callable[[int], None] = kill_process_tree,
+                 is_oom_killed: Optional[Callable[[int], bool]] = None):
+        """
+        :param pid: process id
+        :param opts: options which control tests execution
+        :param suite_deadline: time (time.monotonic) by which the test suite must complete
+        :param kill: kills the process along with its children
+        :param is_oom_killed: checks whether the process has been killed by the OS for exceeding its memory limit
+        """
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.kill = kill
+        self.is_oom_killed = is_oom_killed
+        # a benchmarked test case calls the solution several times, while the time limit is set for one call
+        self.case_limit_sec = opts.time_limit_ms * opts.get_calls_per_case() / 1000 \
+            if opts.time_limit_ms is not None else None
+        self.memory_limit = opts.memory_limit_mb * MB if opts.memory_limit_mb is not None else None
+        self.suite_deadline = suite_deadline
+        self.case_deadline = None
+        self.violation = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    @staticmethod
+    def start_for(pid: int, opts: TestSuiteExecOpts, suite_deadline: Optional[float],
+                  kill: Callable[[int], None] = kill_process_tree,
+                  is_oom_killed: Optional[Callable[[int], bool]] = None) -> Optional['Watchdog']:
+        """
+        Starts watching a process, if any limit is set
+        :param pid: process id
+        :param opts: options which control tests execution
+        :param suite_deadline: time (time.monotonic) by which the test suite must complete
+        :param kill: kills the process along with its children
+        :param is_oom_killed: checks whether the process has been killed by the OS for exceeding its memory limit
+        :return: started watchdog or None - if there are no limits
+        """
+        if not has_limits(opts):
+            return None
+        watchdog = Watchdog(pid, opts, suite_deadline, kill, is_oom_killed)
+        watchdog.start()
+        return watchdog
+
+    def start_case(self):
+        """
+        Starts the next test case's clock
+        """
+        if self.case_limit_sec is not None:
+            self.case_deadline = time.monotonic() + self.case_limit_sec + CASE_DEADLINE_GRACE_SEC
+
+    def check_error(self, error: str) -> bool:
+        """
+        Checks the test suite's STDERR for failed allocations and whether the process has been killed by the OS
+        for exceeding its memory limit, if the memory is limited
+        :param error: test suite's STDERR
+        :return: True - if a limit has been violated (the error must not be reported as is)
+        """
+        if self.memory_limit is not None and (is_out_of_memory_error(error) or
+                                              self.is_oom_killed is not None and self.is_oom_killed(self.pid)):
+            self.fail(MEMORY_LIMIT_EXCEEDED)
+        return self.violation is not None
+
+    def fail(self, violation: str):
+        """
+        Records a violation and kills the process, only the first violation is kept
+        :param violation: violated limit
+        """
+        with self.lock:
+            if self.violation is None:
+                self.violation = violation
+        self.kill(self.pid)
+
+    def stop(self):
+        """
+        Stops watching the process
+        """
+        self.stopped.set()
+
+    def run(self):
+        try:
+            proc = psutil.Process(self.pid)
+        except psutil.Error:
+            return
+        while not self.stopped.wait(WATCHDOG_INTERVAL_SEC):
+            now = time.monotonic()
+            if self.suite_deadline is not None and now > self.suite_deadline:
+                self.fail(SUITE_TIME_LIMIT_EXCEEDED)
+            elif self.case_deadline is not None and now > self.case_deadline:
+                self.fail(TIME_LIMIT_EXCEEDED)
+            elif self.memory_limit is not None and self.get_rss(proc) > self.memory_limit:
+                self.fail(MEMORY_LIMIT_EXCEEDED)
+            if self.violation is not None:
+                return
+
+    @staticmethod
+    def get_rss(proc: psutil.Process) -> int:
+        """
+        :param proc: target process
+        :return: resident memory of the process and its children
+        """
+        rss = 0
+        try:
+            for p in [proc] + proc.children(recursive=True):
+                rss += p.memory_info().rss
+        except psutil.Error:
+            pass
+        return rss
@@ -0,0 +1,185 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Worker Pool API
+
+A worker is a pre-started language runtime (interpreter, JVM, node), which executes test suites one after another,
+so that a test run doesn't pay the runtime's start-up time. Worker protocol (line based, STDIN/STDOUT):
+    - a worker prints JOB_DONE_MARKER when it's ready to accept a job
+    - a job is submitted as a JSON line {"file": "<path to a test suite source>"}
+    - test case lines follow the job line, the job ends with an empty line (the test suite stops reading STDIN)
+    - a worker prints JOB_DONE_MARKER after the test suite has completed
+    - a worker exits on EOF, or if a test suite has failed
+"""
+
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import List, Optional
+
+from testing.framework.io_utils import LineSplitter
+from testing.framework.types import SrcFile
+
+JOB_DONE_MARKER = '__ankicode_job_done__'
+DEFAULT_MAX_JOBS = 50
+
+
+class Worker:
+    """
+    Holds a worker's process and the number of jobs it has executed
+    """
+
+    def __init__(self, proc: subprocess.Popen):
+        self.proc = proc
+        self.jobs = 0
+
+    def is_alive(self) -> bool:
+        """
+        :return: True if the worker's process is running
+        """
+        return self.proc.poll() is None
+
+    def submit(self, src_file: SrcFile):
+        """
+        Submits a test suite for execution, test case lines must be written to the worker's STDIN afterwards
+        :param src_file: test suite source file
+        """
+        self.jobs += 1
+        self.proc.stdin.write(json.dumps({'file': src_file.path}) + '\n')
+        self.proc.stdin.flush()
+
+    def wait_ready(self) -> bool:
+        """
+        Blocks until the worker is ready to accept a job
+        :return: True if the worker is ready, False if it has exited
+        """
+        lines = LineSplitter()
+        fd = self.proc.stdout.fileno()
+        while True:
+            data = os.read(fd, 1024)
+            if not data:
+                return False
+            if any(line.strip() == JOB_DONE_MARKER.encode() for line in lines.feed(data)):
+                return True
+
+    def terminate(self):
+        """
+        Stops the worker
+        """
+        try:
+            self.proc.kill()
+            self.proc.wait(5)
+        except Exception:
+            pass
+
+
+class WorkerPool:
+    """
+    Pool of warm workers for a language, it's owned by the language's factory.
+    Workers are started in background and recycled after max_jobs jobs or if a job has failed.
+    """
+
+    def __init__(self, runner, size: int = 1, max_jobs: int = DEFAULT_MAX_JOBS):
+        """
+        :param runner: language specific test runner, which provides a worker's source and starts its process
+        :param size: number of warm workers to keep
+        :param max_jobs: number of jobs after which a worker is recycled
+        """
+        self.runner = runner
+        self.size = size
+        self.max_jobs = max_jobs
+        self.enabled = runner.get_worker_src() is not None
+        self.idle: List[Worker] = []
+        self.starting = 0
+        self.lock = threading.Lock()
+        self.workdir = None
+
+    def warm_up(self):
+        """
+        Starts workers in background, until the pool is full. It's a cheap no-op, while the pool is full
+        """
+        if not self.enabled or len(self.idle) + self.starting >= self.size:
+            return
+        with self.lock:
+            missing = self.size - len(self.idle) - self.starting
+            self.starting += max(missing, 0)
+        for _ in range(missing):
+            threading.Thread(target=self._start_worker, daemon=True).start()
+
+    def acquire(self) -> Optional[Worker]:
+        """
+        Takes a warm worker from the pool, the pool is refilled in background
+        :return: warm worker or None if there are no warm workers (yet)
+        """
+        worker = None
+        with self.lock:
+            while self.idle and worker is None:
+                worker = self.idle.pop()
+                if not worker.is_alive():
+                    worker.terminate()
+                    worker = None
+        self.warm_up()
+        return worker
+
+    def release(self, worker: Worker, healthy: bool):
+        """
+        Returns a worker to the pool
+        :param worker: target worker
+        :param healthy: False if the worker's job has failed or has been interrupted, then the worker is recycled
+        """
+        if healthy and worker.jobs < self.max_jobs and worker.is_alive():
+            with self.lock:
+                if len(self.idle) < self.size:
+                    self.idle.append(worker)
+                    return
+        worker.terminate()
+        self.warm_up()
+
+    def shutdown(self):
+        """
+        Stops all idle workers and removes their sources
+        """
+        with self.lock:
+            workers, self.idle = self.idle, []
+        for worker in workers:
+            worker.terminate()
+        if self.workdir is not None:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+
+    def _start_worker(self):
+        """
+        Starts a worker's process and waits until it's ready
+        """
+        worker = None
+        try:
+            with self.lock:
+                if self.workdir is None:
+                    self.workdir = tempfile.mkdtemp(prefix='ankicode-worker-')
+                    atexit.register(self.shutdown)
+                    name, src = self.runner.get_worker_src()
+                    with open(os.path.join(self.workdir, name), 'w') as f:
+                        f.write(src)
+                workdir = self.workdir
+            worker = Worker(self.runner.start_worker(workdir))
+            if not worker.wait_ready():
+                # the runtime cannot host workers (e.g. missing compiler API), use cold runs only
+                self.enabled = False
+                worker.terminate()
+                return
+        except Exception:
+            if worker is not None:
+                worker.terminate()
+            return
+        finally:
+            with self.lock:
+                self.starting -= 1
+        with self.lock:
+            if len(self.idle) < self.size:
+                self.idle.append(worker)
+                return
+        worker.terminate()
@@ -0,0 +1,177 @@
+# Copyright: Daveight and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+"""
+Workspace API
+
+A workspace is a directory holding a test suite's source and its compilation outputs, it's used by one test run
+at a time. Workspaces are pooled per language and reused across runs:
+    - a source is written to a temporary file, which is renamed over the previous source (atomic swap)
+    - when a run is over, the workspace is cleaned up: all files are removed except the compilation outputs,
+      which are indexed by their compile cache key, so that rerunning the same test suite neither compiles
+      nor restores it again
+    - idle workspaces over the pool's limit and all idle workspaces at exit are removed
+Workspaces are created in the execution backend's working directory root (tmpfs if it's available, see sandbox).
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+WORKSPACE_PREFIX = 'ankicode-ws-'
+TMP_PREFIX = '.tmp-'
+DEFAULT_MAX_IDLE = 4  # idle workspaces kept per language
+
+
+class Workspace:
+    """
+    Working directory of a test run
+    """
+
+    def __init__(self, path: str, lang: str, root: Optional[str] = None):
+        """
+        :param path: directory's path
+        :param lang: language's key, workspaces of different languages are not mixed
+        :param root: directory where the workspace has been created, None - the system's temp directory
+        """
+        self.name = path
+        self.lang = lang
+        self.root = root
+        self.cache_key: Optional[str] = None
+        self.outputs: List[str] = []
+
+    def write_file(self, name: str, text: str) -> str:
+        """
+        Writes a file atomically: processes see either the previous or the new content
+        :param name: file's name
+        :param text: file's content
+        :return: file's path
+        """
+        path = os.path.join(self.name, name)
+        fd, tmp = tempfile.mkstemp(prefix=TMP_PREFIX, dir=self.name)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        return path
+
+    def has_outputs(self, cache_key: str) -> bool:
+        """
+        :param cache_key: compile cache key of a test suite
+        :return: True - if the test suite's compilation outputs are in the workspace
+        """
+        return cache_key == self.cache_key and all(os.path.exists(file) for file in self.outputs)
+
+    def set_outputs(self, cache_key: Optional[str], outputs: List[str]):
+        """
+        Indexes the compilation outputs in the workspace
+        :param cache_key: compile cache key of the compiled test suite, None - outputs are not kept across runs
+        :param outputs: files produced by the compiler
+        """
+        self.cache_key = cache_key
+        self.outputs = outputs if cache_key is not None else []
+
+    def discard_outputs(self):
+        """
+        Removes the indexed compilation outputs
+        """
+        for file in self.outputs:
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+        self.set_outputs(None, [])
+
+    def clean(self):
+        """
+        Removes all files from the workspace except the indexed compilation outputs
+        """
+        keep = set(self.outputs)
+        with os.scandir(self.name) as entries:
+            for entry in entries:
+                if entry.path in keep:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+    def remove(self):
+        """
+        Removes the workspace's directory
+        """
+        shutil.rmtree(self.name, ignore_errors=True)
+
+
+class WorkspacePool:
+    """
+    Workspaces reused across test runs, safe to be shared between threads
+    """
+
+    def __init__(self, max_idle: int = DEFAULT_MAX_IDLE):
+        """
+        :param max_idle: max number of idle workspaces kept per language
+        """
+        self.max_idle = max_idle
+        self.idle: Dict[Tuple[str, Optional[str]], List[Workspace]] = {}
+        self.registered = False
+        self.lock = threading.Lock()
+
+    def acquire(self, lang: str, root: Optional[str] = None) -> Workspace:
+        """
+        Takes an idle workspace or creates a new one
+        :param lang: language's key, workspaces of different languages are not mixed
+        :param root: directory where workspaces are created, by default the system's temp directory
+        :return: workspace owned by the caller until it's released
+        """
+        with self.lock:
+            idle = self.idle.get((lang, root))
+            if idle:
+                return idle.pop()
+            if not self.registered:
+                atexit.register(self.shutdown)
+                self.registered = True
+        return Workspace(tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=root), lang, root)
+
+    def release(self, workspace: Workspace, reuse: bool = True):
+        """
+        Cleans a workspace up and returns it to the pool
+        :param workspace: acquired workspace
+        :param reuse: False - if the workspace must be removed
+        """
+        if reuse:
+            try:
+                workspace.clean()
+            except OSError:
+                reuse = False
+        if reuse:
+            with self.lock:
+                idle = self.idle.setdefault((workspace.lang, workspace.root), [])
+                if len(idle) < self.max_idle:
+                    idle.append(workspace)
+                    return
+        workspace.remove()
+
+    def shutdown(self):
+        """
+        Removes all idle workspaces
+        """
+        with self.lock:
+            workspaces = [workspace for idle in self.idle.values() for workspace in idle]
+            self.idle = {}
+        for workspace in workspaces:
+            workspace.remove()
+
+
+workspace_pool = WorkspacePool()
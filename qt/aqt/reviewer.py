@@ -12,7 +12,8 @@ import threading
 import unicodedata as ucd
 from typing import List, Optional, Tuple
 
-from testing.framework.anki_testing_api import get_solution_template, run_tests, stop_tests
+from testing.framework.anki_testing_api import get_solution_template, run_benchmark, run_complexity_probe, \
+    run_tests, stop_tests
 from testing.framework.console_logger import ConsoleLogger
 
 from anki import hooks
@@ -377,6 +378,10 @@ class Reviewer:
             self.showContextMenu()
         elif url == "run":
             self.runTests()
+        elif url == "benchmark":
+            self.runBenchmark()
+        elif url == "complexity":
+            self.runComplexityProbe()
         elif url == "stop":
             self.stopTests()
         elif url.startswith("play:"):
@@ -423,6 +428,8 @@ class Reviewer:
                 <div id="editor-controls">
                     <div class="inner">
                         <button id="start-testing" onclick="pycmd('run')">Run <div class="icon icon-run"></div></button>
+                        <button id="start-benchmark" onclick="pycmd('benchmark')">Benchmark</button>
+                        <button id="start-complexity" onclick="pycmd('complexity')">Complexity</button>
                         <button id="stop-testing" class="disabled" onclick="pycmd('stop')" disabled="disabled">Stop <div class="icon icon-stop"></div></button>
                         <button onclick="pycmd('selectlang');">%(selLanguageLabel)s %(downArrow)s</button>
                         <button onclick="pycmd('selecttheme');">%(selSkinLabel)s %(downArrow)s</button>
@@ -451,6 +458,20 @@ class Reviewer:
                       lambda: self.web.eval("_activateRunButton()"))
         self.web.evalWithCallback("codeansJar ? codeansJar.toString() : null", onSolutionSrc)
 
+    def runBenchmark(self):
+        def onSolutionSrc(src):
+            self.web.eval("_activateStopButton()")
+            run_benchmark(self.card, src, self._getCurrentLang(), self._logger,
+                          lambda: self.web.eval("_activateRunButton()"))
+        self.web.evalWithCallback("codeansJar ? codeansJar.toString() : null", onSolutionSrc)
+
+    def runComplexityProbe(self):
+        def onSolutionSrc(src):
+            self.web.eval("_activateStopButton()")
+            run_complexity_probe(self.card, src, self._getCurrentLang(), self._logger,
+                                 lambda: self.web.eval("_activateRunButton()"))
+        self.web.evalWithCallback("codeansJar ? codeansJar.toString() : null", onSolutionSrc)
+
     def switchLang(self, lang):
         def onSolutionSrc(src):
             self._codingBuffer[self._getCurrentLang()] = src
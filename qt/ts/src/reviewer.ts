@@ -131,14 +131,14 @@ function _displayProgressBar(raise, barColor, barColorAlt = null) {
 }
 
 function _activateRunButton() {
-    var $runBtn = $('#start-testing');
+    var $runBtn = $('#start-testing, #start-benchmark, #start-complexity');
     var $stopBtn = $('#stop-testing');
     $stopBtn.addClass('disabled').attr('disabled', 'disabled')
     $runBtn.removeClass('disabled').removeAttr('disabled')
 }
 
 function _activateStopButton() {
-    var $runBtn = $('#start-testing');
+    var $runBtn = $('#start-testing, #start-benchmark, #start-complexity');
     var $stopBtn = $('#stop-testing');
     $runBtn.addClass('disabled').attr('disabled', 'disabled')
     $stopBtn.removeClass('disabled').removeAttr('disabled')